@@ -0,0 +1,247 @@
+"""
+Car Rental System - Fleet occupancy analytics
+Loads booking intervals in columnar form (NumPy arrays of fleet car index,
+start day and end day) and answers occupancy questions with array
+operations: a cars x days occupancy matrix, daily occupancy per car type,
+a histogram of per-car utilization and idle-gap statistics. Multi-million
+booking histories take seconds, most of it reading rows from the database.
+
+Usage: python analytics.py [--type suv] [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--daily]
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from car_rental_system import RENTAL_STATUSES, db_connection, get_backend
+
+# Rows fetched per round trip while loading intervals
+FETCH_SIZE = 50000
+
+# Upper bound on cells of the intermediate per-block arrays in occupancy_matrix
+BLOCK_CELLS = 1 << 22
+
+
+class FleetIntervals:
+    """Booking intervals of a fleet over a window of days, as parallel arrays.
+
+    Days are offsets from `since`. Booking ends are inclusive and clipped to
+    the window, so every start and end lies in [0, days).
+    """
+
+    def __init__(self, since, until, car_ids, car_types, car, start, end):
+        self.since = since
+        self.until = until
+        self.days = (until - since).days + 1
+        self.car_ids = car_ids        # fleet car ids, ascending
+        self.car_types = car_types    # type of each fleet car
+        self.car = car                # fleet index of each booking
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return len(self.car)
+
+    def dates(self):
+        """Return the date of each day in the window"""
+        return [self.since + timedelta(days=offset) for offset in range(self.days)]
+
+
+def _day_offset_sql(column):
+    # Whole days from the window start, computed by the database so no
+    # date objects are built per row
+    if get_backend().name == 'sqlite':
+        return f"CAST(julianday({column}) - julianday(%s) AS INTEGER)"
+    return f"DATEDIFF({column}, %s)"
+
+
+def _fetch_array(cursor, columns):
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if rows:
+            chunks.append(np.array(rows, dtype=np.int64).reshape(-1, columns))
+        if len(rows) < FETCH_SIZE:
+            break
+    return np.concatenate(chunks) if chunks else np.empty((0, columns), dtype=np.int64)
+
+
+def load_intervals(since, until, car_type=None, statuses=RENTAL_STATUSES):
+    """Load the bookings overlapping [since, until] for the fleet (or one car type).
+
+    Only bookings in `statuses` are loaded; by default the ones that count
+    as rentals. Returns a FleetIntervals, or None if the database is
+    unavailable.
+    """
+    if isinstance(since, str):
+        since, until = date.fromisoformat(since), date.fromisoformat(until)
+    type_filter = " AND c.type = %s" if car_type else ""
+    type_params = [car_type] if car_type else []
+    placeholders = ", ".join(["%s"] * len(statuses))
+
+    with db_connection() as conn:
+        if not conn:
+            return None
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT c.car_id, c.type FROM cars c WHERE 1 = 1{type_filter} ORDER BY c.car_id",
+                       type_params)
+        fleet = cursor.fetchall()
+        cursor.execute(f"""
+            SELECT b.car_id, {_day_offset_sql('b.start_date')}, {_day_offset_sql('b.end_date')}
+            FROM bookings b
+            JOIN cars c ON b.car_id = c.car_id
+            WHERE b.status IN ({placeholders})
+            AND b.end_date >= %s AND b.start_date <= %s{type_filter}
+        """, [since, since] + list(statuses) + [since, until] + type_params)
+        rows = _fetch_array(cursor, 3)
+
+    car_ids = np.array([car_id for car_id, _ in fleet], dtype=np.int64)
+    car_types = np.array([car_type for _, car_type in fleet], dtype=object)
+    days = (until - since).days + 1
+    car = np.searchsorted(car_ids, rows[:, 0])
+    return FleetIntervals(since, until, car_ids, car_types, car,
+                          np.clip(rows[:, 1], 0, days - 1), np.clip(rows[:, 2], 0, days - 1))
+
+
+def occupancy_matrix(intervals):
+    """Return a cars x days boolean array, True where the car is on rent that day"""
+    cars, days = len(intervals.car_ids), intervals.days
+    width = days + 1
+    matrix = np.zeros((cars, days), dtype=bool)
+    order = np.argsort(intervals.car, kind='stable')
+    car, start, end = intervals.car[order], intervals.start[order], intervals.end[order]
+
+    # Each booking adds +1 on its first day and -1 the day after its last;
+    # a running sum along a car's row then counts the bookings covering each
+    # day. Cars are processed in blocks to bound the intermediate arrays.
+    block = max(1, BLOCK_CELLS // width)
+    for first in range(0, cars, block):
+        last = min(cars, first + block)
+        low, high = np.searchsorted(car, [first, last])
+        rows = (car[low:high] - first) * width
+        cells = (last - first) * width
+        edges = (np.bincount(rows + start[low:high], minlength=cells)
+                 - np.bincount(rows + end[low:high] + 1, minlength=cells))
+        matrix[first:last] = np.cumsum(edges.reshape(last - first, width), axis=1)[:, :days] > 0
+    return matrix
+
+
+def daily_occupancy(intervals, matrix=None, car_type=None):
+    """Return the share of the fleet (or of one car type) on rent each day"""
+    if matrix is None:
+        matrix = occupancy_matrix(intervals)
+    if car_type is not None:
+        matrix = matrix[intervals.car_types == car_type]
+    if not len(matrix):
+        return np.zeros(intervals.days)
+    return matrix.mean(axis=0)
+
+
+def occupancy_by_type(intervals, matrix=None):
+    """Return {car type: daily occupancy array}"""
+    if matrix is None:
+        matrix = occupancy_matrix(intervals)
+    return {car_type: daily_occupancy(intervals, matrix, car_type)
+            for car_type in sorted(set(intervals.car_types))}
+
+
+def utilization_histogram(intervals, matrix=None, bins=10):
+    """Histogram of the share of days each car spent on rent.
+
+    Returns (counts, bin_edges) as from numpy.histogram over [0, 1].
+    """
+    if matrix is None:
+        matrix = occupancy_matrix(intervals)
+    utilization = matrix.mean(axis=1) if len(matrix) else np.empty(0)
+    return np.histogram(utilization, bins=bins, range=(0.0, 1.0))
+
+
+def idle_gaps(intervals):
+    """Return the idle days between consecutive bookings of the same car.
+
+    Overlapping bookings (which the booking checks prevent) yield no gap.
+    """
+    order = np.lexsort((intervals.start, intervals.car))
+    car, start, end = intervals.car[order], intervals.start[order], intervals.end[order]
+    gaps = start[1:] - end[:-1] - 1
+    return gaps[(car[1:] == car[:-1]) & (gaps >= 0)]
+
+
+def gap_stats(gaps):
+    """Summarise idle gaps: count, mean, median, 90th percentile and maximum in days"""
+    if not len(gaps):
+        return {'count': 0, 'mean': None, 'median': None, 'p90': None, 'max': None}
+    median, p90 = np.percentile(gaps, [50, 90])
+    return {'count': int(len(gaps)), 'mean': float(gaps.mean()), 'median': float(median),
+            'p90': float(p90), 'max': int(gaps.max())}
+
+
+def monthly_means(intervals, daily):
+    """Average a per-day array over each calendar month; returns [(YYYY-MM, mean)]"""
+    dates = intervals.dates()
+    starts = [offset for offset, day in enumerate(dates) if offset == 0 or day.day == 1]
+    sums = np.add.reduceat(daily, starts) if len(daily) else np.empty(0)
+    lengths = np.diff(starts + [len(dates)])
+    return [(dates[first].strftime('%Y-%m'), float(total / length))
+            for first, total, length in zip(starts, sums, lengths)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fleet occupancy analytics')
+    parser.add_argument('--type', help='only this car type (sedan, suv, van, truck, coupe)')
+    parser.add_argument('--since', help='first day (default: 365 days before --until)')
+    parser.add_argument('--until', help='last day (default: yesterday)')
+    parser.add_argument('--daily', action='store_true', help='print occupancy for every day')
+    args = parser.parse_args(argv)
+
+    until = date.fromisoformat(args.until) if args.until else date.today() - timedelta(days=1)
+    since = date.fromisoformat(args.since) if args.since else until - timedelta(days=364)
+    if since > until:
+        print("Error: --since is after --until")
+        return 1
+
+    start_time = time.perf_counter()
+    intervals = load_intervals(since, until, args.type)
+    if intervals is None:
+        print("Could not connect to the database")
+        return 1
+    loaded = time.perf_counter()
+    matrix = occupancy_matrix(intervals)
+    daily = daily_occupancy(intervals, matrix)
+    by_type = occupancy_by_type(intervals, matrix)
+    counts, edges = utilization_histogram(intervals, matrix)
+    gaps = gap_stats(idle_gaps(intervals))
+    done = time.perf_counter()
+
+    fleet = f"{args.type} fleet" if args.type else "fleet"
+    print(f"{len(intervals)} bookings over {len(intervals.car_ids)} cars, {since} to {until} "
+          f"(loaded in {loaded - start_time:.2f}s, analysed in {done - loaded:.2f}s)")
+    if intervals.days and len(intervals.car_ids):
+        peak = int(daily.argmax())
+        print(f"Average {fleet} occupancy {daily.mean():.1%}; "
+              f"peak {daily[peak]:.1%} on {since + timedelta(days=peak)}")
+    print("\nOccupancy by month:")
+    for month, mean in monthly_means(intervals, daily):
+        print(f"  {month}  {mean:6.1%}")
+    if len(by_type) > 1:
+        print("\nOccupancy by car type:")
+        for car_type, occupancy in by_type.items():
+            print(f"  {car_type:<8}{occupancy.mean():6.1%}")
+    print("\nCars by share of days on rent:")
+    for low, high, count in zip(edges[:-1], edges[1:], counts):
+        print(f"  {low:4.0%} - {high:4.0%}  {count}")
+    if gaps['count']:
+        print(f"\nIdle gaps between rentals: {gaps['count']}, mean {gaps['mean']:.1f} days, "
+              f"median {gaps['median']:.0f}, 90th percentile {gaps['p90']:.0f}, max {gaps['max']}")
+    if args.daily:
+        print("\nDaily occupancy:")
+        for day, share in zip(intervals.dates(), daily):
+            print(f"  {day}  {share:6.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,690 @@
+"""
+Car Rental System - asyncio data access
+Coroutine versions of the data-layer functions for services that run many
+queries at once, such as a booking API or batch jobs. They talk to the
+database through an async driver (see the async backends in backends.py)
+and an AsyncConnectionPool, so a query in flight holds a pooled connection
+but no thread, and requests beyond the pool size wait their turn without
+blocking the event loop.
+
+Each coroutine runs the same SQL as its namesake in car_rental_system and
+shares its booking cache, sessions, availability index, dashboard counters
+and rollups, so results and side effects are the same and both APIs can be
+used in one process. Bulk import and the paged listings are only offered
+by the blocking API. Queries are instrumented like the blocking ones (see
+get_query_stats), attributed to the async_data function that ran them.
+
+Every event loop gets its own pool; await close_pool() before it ends.
+
+    import async_data
+    cars = await async_data.list_available_cars()
+    details = await asyncio.gather(*(async_data.get_booking_details(i) for i in ids))
+    async for row in async_data.iter_table_rows('bookings'):
+        ...
+"""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import car_rental_system as crs
+from auth import hash_pool, hash_password, verify_password, needs_rehash
+from availability import ACTIVE_STATUSES
+from backends import ASYNC_DB_ERRORS, create_async_backend
+from car_rental_system import POOL_CONFIG, RESERVE_ATTEMPTS, RENTAL_STATUSES
+from db_pool import AsyncConnectionPool, PoolError
+from instrumentation import AsyncInstrumentedBackend
+
+# Pool settings for each event loop (see db_pool.AsyncConnectionPool). An
+# idle async connection costs no thread, so the pool can be larger than the
+# blocking one, and callers beyond it queue for longer before giving up.
+ASYNC_POOL_CONFIG = dict(POOL_CONFIG, size=20, timeout=30)
+
+_pools = weakref.WeakKeyDictionary()   # event loop -> AsyncConnectionPool
+
+
+def get_pool():
+    """Return the running event loop's connection pool, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        backend = AsyncInstrumentedBackend(
+            create_async_backend(crs.DB_BACKEND, crs.DB_CONFIG, crs.SQLITE_CONFIG))
+        pool = _pools[loop] = AsyncConnectionPool(backend, errors=ASYNC_DB_ERRORS,
+                                                  **ASYNC_POOL_CONFIG)
+    return pool
+
+
+async def get_db_connection():
+    """Borrow a pooled connection; await close() to return it (None if unavailable)"""
+    try:
+        return await get_pool().get_connection()
+    except (PoolError,) + ASYNC_DB_ERRORS as err:
+        print(f"Error connecting to database: {err}")
+        return None
+
+
+@asynccontextmanager
+async def db_connection():
+    """Async context manager that borrows a pooled connection (None if unavailable)"""
+    conn = await get_db_connection()
+    try:
+        yield conn
+    finally:
+        if conn:
+            await conn.close()
+
+
+def get_pool_stats():
+    """Return the running event loop's pool statistics"""
+    return get_pool().stats()
+
+
+async def close_pool():
+    """Close the running event loop's connection pool"""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+async def _fetch_all(sql, params=()):
+    async with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+
+async def _hashing(fn, *args):
+    """Run a password hashing call on auth's hashing pool without blocking the loop"""
+    return await asyncio.wrap_future(hash_pool().submit(fn, *args))
+
+
+# Streaming
+async def iter_rows(sql, params=(), chunk_size=500):
+    """Yield the rows of a query one at a time, read in chunks.
+
+    Rows come through an unbuffered cursor on a pooled connection that the
+    stream holds until it is fully read, so open streams count against the
+    pool like any other query. A stream left early (close it with
+    contextlib.aclosing) closes its connection rather than read the rest.
+    """
+    conn = await get_pool().get_connection()
+    finished = False
+    try:
+        cursor = conn.cursor(dictionary=True, buffered=False)
+        await cursor.execute(sql, params)
+        while True:
+            rows = await cursor.fetchmany(chunk_size)
+            for row in rows:
+                yield row
+            if len(rows) < chunk_size:
+                break
+        finished = True
+    finally:
+        await conn.close(discard=not finished)
+
+
+def iter_table_rows(table, after_key=None, since=None, until=None, chunk_size=1000):
+    """Yield the rows of an export table in primary key order (see crs.iter_table_rows)"""
+    return iter_rows(*crs._table_export_query(table, after_key, since, until), chunk_size=chunk_size)
+
+
+def iter_search(listing, text=None, filters=None, sort=None, chunk_size=500):
+    """Yield every row of a listing matching the search (see crs.stream_search)"""
+    return iter_rows(*crs.build_search_query(listing, text, filters, sort), chunk_size=chunk_size)
+
+
+# Dashboard Metrics
+async def _bump_counter(cursor, name, delta):
+    """Adjust a dashboard counter inside the caller's transaction"""
+    if not delta:
+        return
+    try:
+        await cursor.execute(crs.BUMP_COUNTER_SQL, (delta, name))
+        if cursor.rowcount == 0:
+            crs._metrics['rebuild'] = True
+    except ASYNC_DB_ERRORS as err:
+        print(f"Error updating dashboard counter {name}: {err}")
+        crs._metrics['rebuild'] = True
+    with crs._metrics_lock:
+        crs._metrics['stats'] = None
+
+
+async def rebuild_dashboard_counters():
+    """Recompute the dashboard counters from the base tables"""
+    async with db_connection() as conn:
+        if not conn:
+            return False
+        try:
+            cursor = conn.cursor()
+            for sql in crs.REBUILD_COUNTERS_SQL:
+                await cursor.execute(sql)
+            await conn.commit()
+        except ASYNC_DB_ERRORS as err:
+            print(f"Error rebuilding dashboard counters: {err}")
+            await conn.rollback()
+            return False
+    crs._metrics['rebuild'] = False
+    return True
+
+
+async def _read_dashboard_counters():
+    async with db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            cursor = conn.cursor()
+            await cursor.execute(crs.COUNTERS_SQL)
+            rows = await cursor.fetchall()
+        except ASYNC_DB_ERRORS:
+            return None
+    return crs._counter_stats(rows)
+
+
+async def get_dashboard_stats():
+    """Return the admin dashboard statistics, cached for crs.DASHBOARD_TTL seconds"""
+    with crs._metrics_lock:
+        if crs._metrics['stats'] and time.monotonic() - crs._metrics['loaded_at'] < crs.DASHBOARD_TTL:
+            return dict(crs._metrics['stats'])
+
+    stats = None if crs._metrics['rebuild'] else await _read_dashboard_counters()
+    if stats is None:
+        if not await rebuild_dashboard_counters():
+            return None
+        stats = await _read_dashboard_counters()
+        if stats is None:
+            return None
+
+    with crs._metrics_lock:
+        crs._metrics['stats'] = stats
+        crs._metrics['loaded_at'] = time.monotonic()
+    return dict(stats)
+
+
+# Reporting Rollups
+async def _add_to_rollup(cursor, table, columns, rows, source=None):
+    """Add rows to a rollup table inside the caller's transaction (see crs._add_to_rollup)"""
+    if not rows:
+        return
+    try:
+        await cursor.executemany(crs._rollup_upsert_sql(table, tuple(columns), source), rows)
+    except ASYNC_DB_ERRORS as err:
+        print(f"Error updating {table}: {err}")
+        crs._rollups['stale'] = True
+
+
+async def _rollup_booking_made(cursor, booking_id):
+    for table, columns, source in crs.BOOKING_ROLLUPS:
+        await _add_to_rollup(cursor, table, columns, [(booking_id,)], source)
+
+
+async def _rollup_rentals(cursor, rentals, sign):
+    """Count bookings in (sign=1) or out of (sign=-1) the rental rollups"""
+    if not rentals or not sign:
+        return
+    await cursor.execute(*crs._car_types_query([car_id for car_id, _, _ in rentals]))
+    types = dict(await cursor.fetchall())
+    for table, columns, rows in crs._rental_rollup_rows(types, rentals, sign):
+        await _add_to_rollup(cursor, table, columns, rows)
+
+
+async def _rollup_payment(cursor, payment_id):
+    for table, columns, source in crs.PAYMENT_ROLLUPS:
+        await _add_to_rollup(cursor, table, columns, [(payment_id,)], source)
+
+
+# Users and sessions
+async def register_user(full_name, email, password, role='customer', phone=None, address=None, license_no=None):
+    """Register a new user"""
+    # Hash before borrowing a connection so the slow part does not hold one
+    password_hash = await _hashing(hash_password, password)
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await cursor.execute(crs.USER_INSERT_SQL, (full_name, email, password_hash, role,
+                                                           phone, address, license_no))
+                await _bump_counter(cursor, 'total_users', 1)
+                await conn.commit()
+                print("User registered successfully!")
+                return cursor.lastrowid
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error registering user: {err}")
+                return None
+
+
+async def login_user(email, password):
+    """Authenticate user login; returns the user dict with a 'session_token', or None"""
+    async with db_connection() as conn:
+        if not conn:
+            return None
+        cursor = conn.cursor(dictionary=True)
+        await cursor.execute(crs.LOGIN_SQL, (email,))
+        user = await cursor.fetchone()
+    if not user:
+        print(f"No user found with email: {email}")
+        return None
+
+    # Verify with the connection already returned to the pool
+    stored = user.pop('password')
+    if not await _hashing(verify_password, password, stored):
+        print(f"Password mismatch for user: {email}")
+        return None
+
+    if needs_rehash(stored):
+        await _upgrade_password(user['user_id'], stored, await _hashing(hash_password, password))
+
+    user['session_token'] = crs._sessions.issue(user)
+    print("Login successful!")
+    return user
+
+
+async def _upgrade_password(user_id, old, new):
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await cursor.execute(crs.PASSWORD_UPGRADE_SQL, (new, user_id, old))
+                await conn.commit()
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error upgrading password hash: {err}")
+
+
+async def get_session_user(token, roles=None):
+    """Return the user for a live session token (optionally requiring a role), or None"""
+    # Sessions live in memory, shared with the blocking API
+    return crs.get_session_user(token, roles)
+
+
+async def logout_user(token):
+    """End a session, along with every other session of the same user"""
+    crs.logout_user(token)
+
+
+async def list_users():
+    """List all users"""
+    return await _fetch_all(crs.USERS_SQL)
+
+
+# Cars
+async def add_car(plate_no, brand, model, type, year, color, rate_per_day, seats=4, status='available', image_path=None):
+    """Add a new car"""
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await cursor.execute(crs.CAR_INSERT_SQL, (plate_no, brand, model, type, year, color,
+                                                          rate_per_day, seats, status, image_path))
+                car_id = cursor.lastrowid
+                await _bump_counter(cursor, 'total_cars', 1)
+                await conn.commit()
+                print("Car added successfully!")
+                return car_id
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error adding car: {err}")
+                return None
+
+
+async def update_car(car_id, **kwargs):
+    """Update car details"""
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await cursor.execute(*crs._update_car_query(car_id, kwargs))
+                await conn.commit()
+                print("Car updated successfully!")
+                return True
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error updating car: {err}")
+                return False
+
+
+async def list_cars():
+    """List all cars, newest first"""
+    return await _fetch_all(crs.CARS_SQL)
+
+
+async def list_bookable_cars():
+    """List cars customers can book (everything not in maintenance)"""
+    return await _fetch_all(crs.BOOKABLE_CARS_SQL)
+
+
+async def list_available_cars():
+    """List all available cars"""
+    return await _fetch_all(crs.AVAILABLE_CARS_SQL)
+
+
+# Availability
+async def sync_availability_index():
+    """Reload the shared availability index from the database"""
+    async with db_connection() as conn:
+        if not conn:
+            return False
+        cursor = conn.cursor()
+
+        async def _fetch():
+            await cursor.execute(crs.ACTIVE_BOOKINGS_SQL)
+            return await cursor.fetchall()
+
+        await crs._availability.rebuild_async(_fetch)
+        return True
+
+
+async def get_availability_index():
+    """Return the availability index, resyncing it first if it is stale"""
+    if crs._availability.is_stale() and not await sync_availability_index():
+        raise Exception("Could not connect to database")
+    return crs._availability
+
+
+async def check_car_availability(car_id, start_date, end_date):
+    """Return True if no approved or pending booking overlaps the given dates"""
+    return (await get_availability_index()).is_available(car_id, start_date, end_date)
+
+
+async def search_available_cars(start_date, end_date, car_type=None, min_seats=None, max_rate=None):
+    """List every car free for the whole date range, with optional filters.
+
+    Raises ValueError if the range ends before it starts.
+    """
+    sql, params = crs._bookable_cars_query(start_date, end_date, car_type, min_seats, max_rate)
+    index = await get_availability_index()
+    cars = await _fetch_all(sql, params)
+    if cars is None:
+        return None
+    return crs._free_cars(index, cars, start_date, end_date)
+
+
+# Bookings
+async def create_booking(customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, total_amount, payment_method):
+    """Create a new booking"""
+    async with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to database")
+
+        try:
+            cursor = conn.cursor()
+            await cursor.execute(crs.BOOKING_INSERT_SQL, (customer_id, car_id, start_date, end_date,
+                                                          pickup_location, dropoff_location,
+                                                          total_amount, payment_method))
+            booking_id = cursor.lastrowid
+            await _rollup_booking_made(cursor, booking_id)
+
+            await conn.commit()
+            crs._availability.add(booking_id, car_id, start_date, end_date)
+            crs.invalidate_booking_cache(customer_ids=[customer_id])
+            return booking_id
+        except ASYNC_DB_ERRORS as err:
+            await conn.rollback()
+            raise Exception(f"Database error: {str(err)}")
+
+
+async def reserve_car(customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, total_amount, payment_method):
+    """Check availability and create a pending booking in one transaction.
+
+    Returns (booking_id, None) on success or (None, reason) when the car
+    cannot be booked for those dates (see crs.reserve_car).
+    """
+    for attempt in range(1, RESERVE_ATTEMPTS + 1):
+        async with db_connection() as conn:
+            if not conn:
+                raise Exception("Could not connect to database")
+
+            try:
+                cursor = conn.cursor(dictionary=True)
+                await conn.start_transaction()
+
+                await cursor.execute(crs.CAR_LOCK_SQL, (car_id,))
+                car = await cursor.fetchone()
+                if not car:
+                    await conn.rollback()
+                    return None, "Car not found"
+                if car['status'] == 'maintenance':
+                    await conn.rollback()
+                    return None, "Car is under maintenance"
+
+                await cursor.execute(crs.BOOKING_CONFLICT_SQL, (car_id, end_date, start_date))
+                conflict = await cursor.fetchone()
+                if conflict:
+                    await conn.rollback()
+                    return None, (f"Car is already booked from {conflict['start_date']} "
+                                  f"to {conflict['end_date']}")
+
+                await cursor.execute(crs.BOOKING_INSERT_SQL,
+                                     (customer_id, car_id, start_date, end_date,
+                                      pickup_location, dropoff_location, total_amount, payment_method))
+                booking_id = cursor.lastrowid
+                await _rollup_booking_made(cursor, booking_id)
+                await conn.commit()
+            except ASYNC_DB_ERRORS as err:
+                await conn.rollback()
+                if get_pool().backend.is_retryable(err) and attempt < RESERVE_ATTEMPTS:
+                    print(f"Retrying reservation after lock error: {err}")
+                    continue
+                raise Exception(f"Database error: {str(err)}")
+
+        crs._availability.add(booking_id, car_id, start_date, end_date)
+        crs.invalidate_booking_cache(customer_ids=[customer_id])
+        return booking_id, None
+
+
+async def update_booking_status(booking_id, status):
+    """Update booking status and car availability"""
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await conn.start_transaction()
+
+                # Lock the booking and remember its old status and dates
+                await cursor.execute(crs.BOOKING_LOCK_SQL, (booking_id,))
+                current = await cursor.fetchone()
+                if not current:
+                    await conn.rollback()
+                    return False
+                old_status, customer_id, interval = current[0], current[1], tuple(current[2:])
+
+                await cursor.execute(crs.BOOKING_STATUS_SQL, (status, booking_id))
+                await _bump_counter(cursor, 'active_bookings',
+                                    (status == 'approved') - (old_status == 'approved'))
+                await _rollup_rentals(cursor, [interval],
+                                      (status in RENTAL_STATUSES) - (old_status in RENTAL_STATUSES))
+
+                car_status = crs.CAR_STATUS_FOR_BOOKING.get(status)
+                if car_status:
+                    await cursor.execute(crs.CAR_STATUS_SQL, (car_status, interval[0]))
+
+                await conn.commit()
+
+                if status in ACTIVE_STATUSES:
+                    crs._availability.add(booking_id, *interval)
+                else:
+                    crs._availability.remove(booking_id)
+                crs.invalidate_booking_cache([booking_id], [customer_id])
+                return True
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error updating booking: {err}")
+                await conn.rollback()
+                return False
+    return False
+
+
+async def update_booking_statuses(booking_ids, status):
+    """Approve or reject many pending bookings in one transaction.
+
+    Returns the list of booking ids that changed, or None on error (see
+    crs.update_booking_statuses).
+    """
+    booking_ids = list(booking_ids)
+    if not booking_ids:
+        return []
+    async with db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            cursor = conn.cursor()
+            await conn.start_transaction()
+
+            await cursor.execute(*crs._lock_pending_bookings_query(booking_ids))
+            pending = await cursor.fetchall()
+            if not pending:
+                await conn.rollback()
+                return []
+
+            ids = [row[0] for row in pending]
+            placeholders = ", ".join(["%s"] * len(ids))
+            await cursor.execute(f"UPDATE bookings SET status = %s WHERE booking_id IN ({placeholders})",
+                                 [status] + ids)
+
+            car_status = crs.CAR_STATUS_FOR_BOOKING.get(status)
+            if car_status:
+                car_ids = sorted({row[1] for row in pending})
+                placeholders = ", ".join(["%s"] * len(car_ids))
+                await cursor.execute(f"UPDATE cars SET status = %s WHERE car_id IN ({placeholders})",
+                                     [car_status] + car_ids)
+            if status == 'approved':
+                await _bump_counter(cursor, 'active_bookings', len(ids))
+            if status in RENTAL_STATUSES:
+                await _rollup_rentals(cursor, [tuple(row[1:4]) for row in pending], 1)
+
+            await conn.commit()
+        except ASYNC_DB_ERRORS as err:
+            print(f"Error updating bookings: {err}")
+            await conn.rollback()
+            return None
+
+    for booking_id, car_id, start_date, end_date, _customer_id in pending:
+        if status in ACTIVE_STATUSES:
+            crs._availability.add(booking_id, car_id, start_date, end_date)
+        else:
+            crs._availability.remove(booking_id)
+    crs.invalidate_booking_cache(ids, {row[4] for row in pending})
+    return ids
+
+
+async def get_booking_details(booking_id):
+    """Get complete booking details including customer and car information.
+
+    Served from the booking cache shared with the blocking API when possible.
+    """
+    async def _load():
+        async with db_connection() as conn:
+            if conn:
+                cursor = conn.cursor(dictionary=True)
+                await cursor.execute(crs.BOOKING_DETAILS_SQL + " WHERE b.booking_id = %s", (booking_id,))
+                return await cursor.fetchone()
+
+    details = await crs._booking_cache.get_or_load_async(('booking', booking_id), _load)
+    return dict(details) if details is not None else None
+
+
+async def list_user_bookings(user_id):
+    """List bookings for a specific user (served from the booking cache when possible)"""
+    bookings = await crs._booking_cache.get_or_load_async(
+        ('user_bookings', user_id), lambda: _fetch_all(crs.USER_BOOKINGS_SQL, (user_id,)))
+    return [dict(booking) for booking in bookings] if bookings is not None else None
+
+
+async def list_all_bookings():
+    """List every booking with customer and car names, newest first"""
+    return await _fetch_all(crs.ALL_BOOKINGS_SQL)
+
+
+# Payments and maintenance
+async def record_payment(booking_id, amount):
+    """Record a payment for a booking"""
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await cursor.execute(crs.PAYMENT_INSERT_SQL, (booking_id, amount))
+                payment_id = cursor.lastrowid
+                await cursor.execute(crs.BOOKING_PAID_SQL, (booking_id,))
+                await cursor.execute(crs.BOOKING_CUSTOMER_SQL, (booking_id,))
+                booking = await cursor.fetchone()
+                await _rollup_payment(cursor, payment_id)
+                await conn.commit()
+                crs.invalidate_booking_cache([booking_id], [booking[0]] if booking else [])
+                print("Payment recorded successfully!")
+                return True
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error recording payment: {err}")
+                return False
+
+
+async def get_payment_history(booking_id=None):
+    """Get payment history, optionally filtered by booking_id"""
+    if booking_id:
+        return await _fetch_all(crs.PAYMENTS_SQL + " WHERE booking_id = %s", (booking_id,))
+    return await _fetch_all(crs.PAYMENTS_SQL)
+
+
+async def create_maintenance_record(car_id, description):
+    """Put a car into maintenance and record why"""
+    async with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                await conn.start_transaction()
+                await cursor.execute(crs.CAR_MAINTENANCE_SQL, (car_id,))
+                await cursor.execute(crs.MAINTENANCE_INSERT_SQL, (car_id, description))
+                await conn.commit()
+                return True
+            except ASYNC_DB_ERRORS as err:
+                await conn.rollback()
+                print(f"Error creating maintenance record: {err}")
+                return False
+    return False
+
+
+async def list_maintenance_records(car_id=None):
+    """List maintenance records, optionally filtered by car_id"""
+    if car_id:
+        return await _fetch_all(crs.MAINTENANCE_SQL + " WHERE m.car_id = %s", (car_id,))
+    return await _fetch_all(crs.MAINTENANCE_SQL)
+
+
+# Listings, search and change tracking
+async def search_listing(listing, text=None, filters=None, sort=None, limit=crs.MAX_PAGE_SIZE):
+    """Return up to `limit` rows of a listing matching the search"""
+    sql, params = crs.build_search_query(listing, text, filters, sort)
+    return await _fetch_all(f"{sql} LIMIT %s", params + [int(limit)])
+
+
+async def _read_change_clock(cursor):
+    await cursor.execute(crs.CHANGE_CLOCK_SQL[get_pool().backend.name])
+    value = (await cursor.fetchone())[0]
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+async def get_change_version(table):
+    """Return the current change version of a tracked table (None if unavailable)"""
+    if table not in crs.CHANGES_SQL:
+        raise ValueError(f"Unknown tracked table: {table}")
+    async with db_connection() as conn:
+        if conn:
+            try:
+                return await _read_change_clock(conn.cursor())
+            except ASYNC_DB_ERRORS as err:
+                print(f"Error reading change version: {err}")
+                return None
+
+
+async def list_changes(table, since):
+    """List rows of a tracked table changed after version `since`.
+
+    Returns (rows, version), or None if the database is unavailable (see
+    crs.list_changes).
+    """
+    async with db_connection() as conn:
+        if conn:
+            # The clock is read first, so a row changed after this reading
+            # is listed by the next call rather than missed
+            version = await _read_change_clock(conn.cursor())
+            cursor = conn.cursor(dictionary=True)
+            await cursor.execute(crs.CHANGES_SQL[table], (since - crs.CHANGE_WINDOW,))
+            return await cursor.fetchall(), version
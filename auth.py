@@ -0,0 +1,143 @@
+"""
+Car Rental System - Password hashing and sessions
+Passwords are stored as salted scrypt hashes. Hashing is deliberately slow,
+so it runs on a small dedicated thread pool, and a successful login issues a
+short-lived session token that later operations check instead of the password.
+"""
+
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# scrypt cost parameters; stored with each hash so they can be raised later
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+HASH_PREFIX = 'scrypt$'
+
+# Each scrypt call uses ~16 MB and a full core, so only a few run at once
+HASH_WORKERS = 2
+
+SESSION_TTL = 30 * 60   # seconds of inactivity before a session expires
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def hash_pool():
+    """Return the shared thread pool used for password hashing"""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS,
+                                            thread_name_prefix='password-hash')
+        return _hash_pool
+
+
+def _b64(data):
+    return base64.b64encode(data).decode()
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Return a 'scrypt$n$r$p$salt$hash' string for the password"""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                            maxmem=256 * n * r + 1024 * 1024, dklen=32)
+    return f"{HASH_PREFIX}{n}${r}${p}${_b64(salt)}${_b64(digest)}"
+
+
+def is_legacy(stored):
+    """True if the stored password predates hashing (plaintext)"""
+    return not (stored or '').startswith(HASH_PREFIX)
+
+
+def needs_rehash(stored):
+    """True if the stored password is plaintext or uses weaker parameters"""
+    if is_legacy(stored):
+        return True
+    n, r, p = (int(value) for value in stored.split('$')[1:4])
+    return (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash (or legacy plaintext value)"""
+    if not stored:
+        return False
+    if is_legacy(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    try:
+        n, r, p, salt, expected = stored.split('$')[1:]
+        salt = base64.b64decode(salt)
+        expected = base64.b64decode(expected)
+        n, r, p = int(n), int(r), int(p)
+    except ValueError:
+        return False
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                            maxmem=256 * n * r + 1024 * 1024, dklen=len(expected))
+    return hmac.compare_digest(digest, expected)
+
+
+def hash_password_pooled(password):
+    """hash_password on the hashing pool; blocks the calling thread only"""
+    return hash_pool().submit(hash_password, password).result()
+
+
+def verify_password_pooled(password, stored):
+    """verify_password on the hashing pool; blocks the calling thread only"""
+    return hash_pool().submit(verify_password, password, stored).result()
+
+
+class SessionStore:
+    """Thread-safe in-memory map of session tokens to logged-in users"""
+
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}   # token -> (expires_at, user)
+        self._lock = threading.Lock()
+
+    def issue(self, user):
+        """Start a session for the user and return its token"""
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._purge()
+            self._sessions[token] = (time.monotonic() + self.ttl, dict(user))
+        return token
+
+    def validate(self, token, roles=None):
+        """Return the session's user, or None if it is unknown, expired or not in roles.
+
+        Each successful check extends the session by another ttl.
+        """
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if time.monotonic() >= expires_at:
+                del self._sessions[token]
+                return None
+            if roles and user.get('role') not in roles:
+                return None
+            self._sessions[token] = (time.monotonic() + self.ttl, user)
+            return dict(user)
+
+    def revoke(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def revoke_user(self, user_id):
+        """End every session belonging to a user"""
+        with self._lock:
+            for token in [token for token, (_, user) in self._sessions.items()
+                          if user.get('user_id') == user_id]:
+                del self._sessions[token]
+
+    def _purge(self):
+        now = time.monotonic()
+        for token in [token for token, (expires_at, _) in self._sessions.items()
+                      if expires_at <= now]:
+            del self._sessions[token]
@@ -0,0 +1,202 @@
+"""
+Car Rental System - Booking availability index
+Keeps approved and pending bookings in memory as sorted per-car date
+intervals so overlap checks are a binary search instead of a query, plus a
+per-car day-occupancy bitmap for checking the whole fleet at once.
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from itertools import accumulate
+
+# Bookings in these states block the car for their dates
+ACTIVE_STATUSES = ('approved', 'pending')
+
+
+def to_day(value):
+    """Convert a date, datetime or 'YYYY-MM-DD' string to a day number"""
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal()
+
+
+class CarIntervals:
+    """Booking intervals for one car, sorted by start day (end days are inclusive)"""
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals)   # (start, end, booking_id)
+        self.starts = [start for start, _, _ in self.intervals]
+        # max_ends[i] is the latest end among intervals[:i + 1]; it never
+        # decreases, so it can be bisected like starts
+        self.max_ends = list(accumulate((end for _, end, _ in self.intervals), max))
+        self._bitmap = None   # (base day, bitmap), rebuilt lazily after changes
+
+    def _update_max_ends(self, index):
+        """Recompute max_ends from position index on after an insert or delete"""
+        ends = [end for _, end, _ in self.intervals[index:]]
+        if index:
+            self.max_ends[index:] = list(accumulate(ends, max, initial=self.max_ends[index - 1]))[1:]
+        else:
+            self.max_ends[:] = accumulate(ends, max)
+
+    def add(self, start, end, booking_id):
+        entry = (start, end, booking_id)
+        index = bisect_right(self.intervals, entry)
+        self.intervals.insert(index, entry)
+        self.starts.insert(index, start)
+        self._update_max_ends(index)
+        self._bitmap = None
+
+    def remove(self, start, end, booking_id):
+        entry = (start, end, booking_id)
+        index = bisect_left(self.intervals, entry)
+        if index < len(self.intervals) and self.intervals[index] == entry:
+            del self.intervals[index]
+            del self.starts[index]
+            self._update_max_ends(index)
+            self._bitmap = None
+
+    def overlapping(self, start, end):
+        """Return booking ids whose interval overlaps [start, end].
+
+        Intervals before the first whose running max end reaches `start`
+        all end earlier, and those after the last starting by `end` start
+        later, so two bisects bound the scan. A car's active bookings never
+        overlap each other (reserve_car refuses them), so their ends are
+        sorted too and the scan visits only the matches: O(log n + k).
+        """
+        low = bisect_left(self.max_ends, start)
+        high = bisect_right(self.starts, end)
+        return [booking_id for s, e, booking_id in self.intervals[low:high] if e >= start]
+
+    def bitmap(self, base):
+        """Return an int whose bit i is set when the car is booked on day base + i"""
+        if self._bitmap is None or self._bitmap[0] != base:
+            bits = 0
+            for start, end, _ in self.intervals:
+                if end < base:
+                    continue
+                start = max(start, base)
+                bits |= ((1 << (end - start + 1)) - 1) << (start - base)
+            self._bitmap = (base, bits)
+        return self._bitmap[1]
+
+
+class AvailabilityIndex:
+    """Thread-safe per-car interval index of approved and pending bookings"""
+
+    def __init__(self, max_age=60):
+        # max_age: seconds before the index should be resynced from the
+        # database to pick up bookings made by other clients
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._cars = {}
+        self._bookings = {}   # booking_id -> (car_id, start, end)
+        self._journals = []   # one list of (method, args) per rebuild in progress
+        self.loaded_at = None
+
+    def rebuild(self, fetch):
+        """Replace the index contents with the rows fetch() returns.
+
+        Rows are (booking_id, car_id, start_date, end_date). add() and
+        remove() calls made while fetch runs are recorded and replayed onto
+        the new contents, so a booking committed after the snapshot was read
+        is not lost until the next rebuild.
+        """
+        journal = self._start_journal()
+        try:
+            self._load(fetch(), journal)
+        finally:
+            self._end_journal(journal)
+
+    async def rebuild_async(self, fetch):
+        """rebuild() for a fetch that is a coroutine function"""
+        journal = self._start_journal()
+        try:
+            self._load(await fetch(), journal)
+        finally:
+            self._end_journal(journal)
+
+    def _start_journal(self):
+        journal = []
+        with self._lock:
+            self._journals.append(journal)
+        return journal
+
+    def _end_journal(self, journal):
+        with self._lock:
+            self._journals.remove(journal)
+
+    def _load(self, rows, journal):
+        cars = {}
+        bookings = {}
+        for booking_id, car_id, start_date, end_date in rows:
+            start, end = to_day(start_date), to_day(end_date)
+            cars.setdefault(car_id, []).append((start, end, booking_id))
+            bookings[booking_id] = (car_id, start, end)
+
+        index = {car_id: CarIntervals(intervals) for car_id, intervals in cars.items()}
+
+        with self._lock:
+            self._cars = index
+            self._bookings = bookings
+            for method, args in journal:
+                method(*args)
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.max_age
+
+    def add(self, booking_id, car_id, start_date, end_date):
+        """Record an active booking"""
+        start, end = to_day(start_date), to_day(end_date)
+        with self._lock:
+            self._add(booking_id, car_id, start, end)
+            for journal in self._journals:
+                journal.append((self._add, (booking_id, car_id, start, end)))
+
+    def remove(self, booking_id):
+        """Forget a booking that no longer blocks its car"""
+        with self._lock:
+            self._remove(booking_id)
+            for journal in self._journals:
+                journal.append((self._remove, (booking_id,)))
+
+    def _add(self, booking_id, car_id, start, end):
+        self._remove(booking_id)
+        self._cars.setdefault(car_id, CarIntervals()).add(start, end, booking_id)
+        self._bookings[booking_id] = (car_id, start, end)
+
+    def _remove(self, booking_id):
+        entry = self._bookings.pop(booking_id, None)
+        if entry:
+            car_id, start, end = entry
+            self._cars[car_id].remove(start, end, booking_id)
+
+    def conflicts(self, car_id, start_date, end_date):
+        """Return ids of active bookings for the car that overlap the dates"""
+        start, end = to_day(start_date), to_day(end_date)
+        with self._lock:
+            car = self._cars.get(car_id)
+            return car.overlapping(start, end) if car else []
+
+    def is_available(self, car_id, start_date, end_date):
+        return not self.conflicts(car_id, start_date, end_date)
+
+    def free_cars(self, car_ids, start_date, end_date):
+        """Return the car ids (in the given order) with no booking on any of the dates"""
+        start, end = to_day(start_date), to_day(end_date)
+        # Anchor bitmaps at today so they only span days that can still be booked
+        base = min(start, date.today().toordinal())
+        mask = ((1 << (end - start + 1)) - 1) << (start - base)
+        with self._lock:
+            free = []
+            for car_id in car_ids:
+                car = self._cars.get(car_id)
+                if car is None or not car.bitmap(base) & mask:
+                    free.append(car_id)
+            return free
@@ -0,0 +1,483 @@
+"""
+Car Rental System - Storage backends
+The data layer talks to connections through the subset of the
+mysql-connector API it uses (cursor(dictionary=...), execute with %s
+placeholders, commit/rollback/start_transaction, in_transaction, ping).
+MySQLBackend hands out real mysql-connector connections; SQLiteBackend
+wraps an embedded SQLite database in the same interface so the application
+can run single-node without a database server.
+
+The async backends (see async_data.py) offer the same interface with every
+call that touches the database awaitable: AsyncMySQLBackend over aiomysql,
+and AsyncSQLiteBackend over aiosqlite, which runs each connection on its
+own thread since SQLite has no non-blocking API.
+"""
+
+import asyncio
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import mysql.connector
+    from mysql.connector import errorcode
+except ImportError:
+    mysql = None
+
+try:
+    import aiosqlite
+except ImportError:
+    aiosqlite = None
+
+try:
+    import aiomysql
+    from pymysql.constants import ER
+except ImportError:
+    aiomysql = None
+
+# Exceptions any backend's connections may raise
+DB_ERRORS = (sqlite3.Error,) + ((mysql.connector.Error,) if mysql else ())
+# ... and any async backend's
+ASYNC_DB_ERRORS = (sqlite3.Error,) + ((aiomysql.Error,) if aiomysql else ())
+
+
+class MySQLBackend:
+    """MySQL/MariaDB server through mysql-connector"""
+
+    name = 'mysql'
+
+    def __init__(self, config):
+        if mysql is None:
+            raise ImportError("mysql-connector-python is required for the MySQL backend")
+        self.config = dict(config)
+
+    def connect(self):
+        return mysql.connector.connect(**self.config)
+
+    def is_retryable(self, err):
+        """True for lock errors worth retrying the transaction for"""
+        return getattr(err, 'errno', None) in (errorcode.ER_LOCK_DEADLOCK,
+                                               errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+
+# SQLite stores dates, timestamps and decimals as text; convert them back to
+# the Python types mysql-connector returns, based on the declared column type
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()[:10]))
+for _type in ('DATETIME', 'TIMESTAMP'):
+    sqlite3.register_converter(_type, lambda value: datetime.fromisoformat(value.decode()))
+
+# Tuned for a local single-node database: WAL lets readers run alongside the
+# writer, NORMAL sync is durable across application crashes in WAL mode, and
+# busy_timeout plays the part of MySQL's lock wait timeout
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'busy_timeout': 5000,
+    'cache_size': -65536,          # 64 MB page cache
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,        # 256 MB
+}
+
+_WRITE = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+_FOR_UPDATE = re.compile(r'\bFOR\s+UPDATE\b', re.IGNORECASE)
+
+# MySQL functions used by the data layer and their SQLite equivalents
+_FUNCTIONS = [
+    (re.compile(r'\bCURDATE\(\)', re.IGNORECASE), "date('now', 'localtime')"),
+    (re.compile(r'\bNOW\(\)', re.IGNORECASE), "datetime('now', 'localtime')"),
+]
+
+
+@lru_cache(maxsize=512)
+def translate_sql(sql):
+    """Rewrite a MySQL-flavoured statement for SQLite.
+
+    Returns (sql, locks) where locks is True when the statement needs the
+    write lock (a write, or a SELECT ... FOR UPDATE).
+    """
+    locks = bool(_WRITE.match(sql) or _FOR_UPDATE.search(sql))
+    sql = _FOR_UPDATE.sub('', sql)
+    for pattern, replacement in _FUNCTIONS:
+        sql = pattern.sub(replacement, sql)
+    # %s placeholders become ?, and %% (a literal % under pyformat) becomes %
+    sql = re.sub(r'%(s|%)', lambda match: '?' if match.group(1) == 's' else '%', sql)
+    return sql, locks
+
+
+class SQLiteCursor:
+    """mysql-connector style cursor over a sqlite3 cursor"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+
+    def _prepare(self, sql):
+        sql, locks = translate_sql(sql)
+        # MySQL opens a transaction implicitly; take SQLite's write lock up
+        # front for writes and FOR UPDATE reads so the transaction cannot
+        # fail to upgrade later. Plain reads run in autocommit.
+        if locks and not self._connection.raw.in_transaction:
+            self._connection.raw.execute('BEGIN IMMEDIATE')
+        return sql
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(self._prepare(sql), tuple(params or ()))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(self._prepare(sql), [tuple(params) for params in seq_of_params])
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    @property
+    def column_names(self):
+        return [column[0] for column in self._cursor.description or ()]
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql-connector style connection over a sqlite3 connection"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=None):
+        # SQLite cursors step through results lazily, so buffered=False
+        # needs no special handling
+        return SQLiteCursor(self, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def start_transaction(self):
+        if not self.raw.in_transaction:
+            self.raw.execute('BEGIN IMMEDIATE')
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        self.raw.execute('SELECT 1')
+
+    def is_connected(self):
+        try:
+            self.ping()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteBackend:
+    """Embedded SQLite database file in WAL mode"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, pragmas=None):
+        self.path = path
+        self.pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+        self._wal_lock = threading.Lock()
+
+    def connect(self):
+        raw = sqlite3.connect(self.path, timeout=self.pragmas['busy_timeout'] / 1000,
+                              detect_types=sqlite3.PARSE_DECLTYPES,
+                              isolation_level=None, check_same_thread=False)
+        with self._wal_lock:
+            # journal_mode is persistent, but switching it needs a moment
+            # without other writers, so serialise it with other opens
+            for pragma, value in self.pragmas.items():
+                raw.execute(f"PRAGMA {pragma} = {value}")
+        return SQLiteConnection(raw)
+
+    def is_retryable(self, err):
+        """True for busy/locked errors worth retrying the transaction for"""
+        message = str(err).lower()
+        return isinstance(err, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def create_backend(name, mysql_config=None, sqlite_config=None):
+    """Create the backend named 'mysql' or 'sqlite'"""
+    if name == 'mysql':
+        return MySQLBackend(mysql_config or {})
+    if name == 'sqlite':
+        return SQLiteBackend(**(sqlite_config or {}))
+    raise ValueError(f"Unknown database backend: {name}")
+
+
+class AsyncMySQLCursor:
+    """Awaitable mysql-connector style cursor over an aiomysql cursor"""
+
+    def __init__(self, connection, dictionary=False, buffered=True):
+        self._connection = connection
+        if buffered:
+            self._class = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+        else:
+            self._class = aiomysql.SSDictCursor if dictionary else aiomysql.SSCursor
+        self._cursor = None
+
+    async def _raw(self):
+        if self._cursor is None:
+            self._cursor = await self._connection.raw.cursor(self._class)
+        return self._cursor
+
+    async def execute(self, sql, params=()):
+        # Always pass a tuple, so %% reads as % with or without parameters
+        await (await self._raw()).execute(sql, tuple(params or ()))
+        return self
+
+    async def executemany(self, sql, seq_of_params):
+        await (await self._raw()).executemany(sql, [tuple(params) for params in seq_of_params])
+        return self
+
+    @property
+    def description(self):
+        return self._cursor.description if self._cursor else None
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    async def fetchone(self):
+        return await self._cursor.fetchone()
+
+    async def fetchmany(self, size=1):
+        return list(await self._cursor.fetchmany(size))
+
+    async def fetchall(self):
+        return list(await self._cursor.fetchall())
+
+    async def close(self):
+        if self._cursor is not None:
+            await self._cursor.close()
+
+
+class AsyncMySQLConnection:
+    """Awaitable mysql-connector style connection over an aiomysql connection"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=True):
+        return AsyncMySQLCursor(self, dictionary, buffered)
+
+    @property
+    def in_transaction(self):
+        return self.raw.get_transaction_status()
+
+    async def start_transaction(self):
+        await self.raw.begin()
+
+    async def commit(self):
+        await self.raw.commit()
+
+    async def rollback(self):
+        await self.raw.rollback()
+
+    async def ping(self, reconnect=False):
+        await self.raw.ping(reconnect=reconnect)
+
+    async def close(self):
+        self.raw.close()
+
+
+class AsyncMySQLBackend:
+    """MySQL/MariaDB server through aiomysql"""
+
+    name = 'mysql'
+
+    def __init__(self, config):
+        if aiomysql is None:
+            raise ImportError("aiomysql is required for the async MySQL backend")
+        self.config = dict(config)
+        # aiomysql names the database 'db'; match mysql-connector's charset
+        if 'database' in self.config:
+            self.config['db'] = self.config.pop('database')
+        self.config.setdefault('charset', 'utf8mb4')
+
+    async def connect(self):
+        return AsyncMySQLConnection(await aiomysql.connect(**self.config))
+
+    def is_retryable(self, err):
+        """True for lock errors worth retrying the transaction for"""
+        return bool(err.args) and err.args[0] in (ER.LOCK_DEADLOCK, ER.LOCK_WAIT_TIMEOUT)
+
+
+class AsyncSQLiteCursor:
+    """Awaitable SQLiteCursor over an aiosqlite connection"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._dictionary = dictionary
+        self._cursor = None
+
+    async def _prepare(self, sql):
+        sql, locks = translate_sql(sql)
+        # Same transaction handling as SQLiteCursor
+        if locks and not self._connection.raw.in_transaction:
+            await self._connection.raw.execute('BEGIN IMMEDIATE')
+        if self._cursor is None:
+            self._cursor = await self._connection.raw.cursor()
+        return sql
+
+    async def execute(self, sql, params=()):
+        sql = await self._prepare(sql)
+        await self._cursor.execute(sql, tuple(params or ()))
+        return self
+
+    async def executemany(self, sql, seq_of_params):
+        sql = await self._prepare(sql)
+        await self._cursor.executemany(sql, [tuple(params) for params in seq_of_params])
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    @property
+    def column_names(self):
+        return [column[0] for column in self.description or ()]
+
+    @property
+    def description(self):
+        return self._cursor.description if self._cursor else None
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    async def fetchone(self):
+        return self._row(await self._cursor.fetchone())
+
+    async def fetchmany(self, size=1):
+        return [self._row(row) for row in await self._cursor.fetchmany(size)]
+
+    async def fetchall(self):
+        return [self._row(row) for row in await self._cursor.fetchall()]
+
+    async def close(self):
+        if self._cursor is not None:
+            await self._cursor.close()
+
+
+class AsyncSQLiteConnection:
+    """Awaitable SQLiteConnection over an aiosqlite connection"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=None):
+        return AsyncSQLiteCursor(self, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    async def start_transaction(self):
+        if not self.raw.in_transaction:
+            await self.raw.execute('BEGIN IMMEDIATE')
+
+    async def commit(self):
+        await self.raw.commit()
+
+    async def rollback(self):
+        await self.raw.rollback()
+
+    async def ping(self, reconnect=False):
+        await self.raw.execute('SELECT 1')
+
+    async def close(self):
+        await self.raw.close()
+
+
+class AsyncSQLiteBackend:
+    """Embedded SQLite database file in WAL mode, through aiosqlite"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, pragmas=None):
+        if aiosqlite is None:
+            raise ImportError("aiosqlite is required for the async SQLite backend")
+        self.path = path
+        self.pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+        self._wal_lock = None
+
+    async def connect(self):
+        raw = await aiosqlite.connect(self.path, timeout=self.pragmas['busy_timeout'] / 1000,
+                                      detect_types=sqlite3.PARSE_DECLTYPES,
+                                      isolation_level=None)
+        try:
+            if self._wal_lock is None:
+                self._wal_lock = asyncio.Lock()
+            # Serialised like SQLiteBackend.connect
+            async with self._wal_lock:
+                for pragma, value in self.pragmas.items():
+                    await raw.execute(f"PRAGMA {pragma} = {value}")
+        except BaseException:
+            await raw.close()
+            raise
+        return AsyncSQLiteConnection(raw)
+
+    is_retryable = SQLiteBackend.is_retryable
+
+
+def create_async_backend(name, mysql_config=None, sqlite_config=None):
+    """Create the async backend named 'mysql' or 'sqlite'"""
+    if name == 'mysql':
+        return AsyncMySQLBackend(mysql_config or {})
+    if name == 'sqlite':
+        return AsyncSQLiteBackend(**(sqlite_config or {}))
+    raise ValueError(f"Unknown database backend: {name}")
@@ -0,0 +1,12 @@
+"""
+Car Rental System - Benchmarks
+Seeds a local database with synthetic data and times the data-access
+functions, writing percentile results as JSON so runs can be compared.
+
+Usage: python -m benchmarks seed --cars 10000 --bookings 5000000
+       python -m benchmarks run --output results.json
+       python -m benchmarks compare baseline.json results.json
+"""
+
+from benchmarks.datagen import seed_database
+from benchmarks.runner import run_benchmarks, compare_results
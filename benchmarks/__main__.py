@@ -0,0 +1,81 @@
+"""Command line entry point: python -m benchmarks {seed,run,compare}"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.datagen import seed_database
+from benchmarks.runner import run_benchmarks, compare_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Car rental system benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    seed = sub.add_parser('seed', help='insert synthetic data into the configured database')
+    seed.add_argument('--users', type=int, default=1000)
+    seed.add_argument('--cars', type=int, default=10000)
+    seed.add_argument('--bookings', type=int, default=100000)
+    seed.add_argument('--maintenance', type=int, help='default: one per five cars')
+    seed.add_argument('--history-days', type=int, default=730,
+                      help='how far back booking history goes (default 730)')
+    seed.add_argument('--batch-size', type=int, default=5000)
+    seed.add_argument('--seed', type=int, default=42)
+
+    run = sub.add_parser('run', help='time the data-access functions')
+    run.add_argument('--iterations', type=int, default=20)
+    run.add_argument('--heavy', action='store_true', help='include whole-table listings')
+    run.add_argument('--writes', action='store_true', help='include functions that modify data')
+    run.add_argument('--only', nargs='+', help='only cases whose name contains one of these')
+    run.add_argument('--output', help='write results as JSON to this file')
+    run.add_argument('--seed', type=int, default=42)
+
+    compare = sub.add_parser('compare', help='compare two result files by p95 latency')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='relative p95 increase reported as a regression (default 0.10)')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'seed':
+            report = seed_database(args.users, args.cars, args.bookings, args.maintenance,
+                                   args.history_days, args.batch_size, args.seed)
+            print(f"Seeded {report['users']} users, {report['cars']} cars, {report['bookings']} bookings, "
+                  f"{report['payments']} payments, {report['maintenance']} maintenance records "
+                  f"in {report['elapsed']:.1f}s ({report['rows_per_second']:.0f} rows/s)")
+            return 0
+
+        if args.command == 'run':
+            results = run_benchmarks(args.iterations, include_heavy=args.heavy,
+                                     include_writes=args.writes, only=args.only, seed=args.seed)
+            print(f"{'case':<34}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rows/s':>12}")
+            for name, result in results['results'].items():
+                print(f"{name:<34}{result['p50_ms'] or 0:>10.2f}{result['p95_ms'] or 0:>10.2f}"
+                      f"{result['p99_ms'] or 0:>10.2f}{result['rows_per_second']:>12.0f}")
+            if results['untimed_functions']:
+                print(f"Not timed: {', '.join(results['untimed_functions'])}")
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, indent=2)
+            return 0
+
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    regressions = 0
+    for name, old, new, change, regressed in compare_results(baseline, current, args.threshold):
+        regressions += regressed
+        print(f"{name:<34}{old:>10.2f}{new:>10.2f}{change:>+9.1%}{'  REGRESSION' if regressed else ''}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 0 if not regressions else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
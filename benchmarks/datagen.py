@@ -0,0 +1,212 @@
+"""
+Car Rental System - Synthetic benchmark data
+Generates users, cars, bookings, payments and maintenance records with
+realistic shapes: bookings are laid out along each car's timeline with short
+rentals far more common than long ones, demand peaks on weekends and in
+summer, and only past or running bookings are paid.
+"""
+
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from auth import hash_password
+from car_rental_system import db_connection, rebuild_dashboard_counters, rebuild_rollups
+from schema import migrate
+
+BENCH_PASSWORD = 'benchmark'
+
+BRANDS = {
+    'Toyota': ['Corolla', 'Camry', 'RAV4', 'Hiace'],
+    'Honda': ['Civic', 'Accord', 'CR-V'],
+    'Ford': ['Focus', 'Ranger', 'Transit', 'Mustang'],
+    'Hyundai': ['Elantra', 'Tucson', 'Staria'],
+    'Nissan': ['Sentra', 'X-Trail', 'Navara'],
+    'BMW': ['3 Series', 'X5', 'M4'],
+}
+CAR_TYPES = [('sedan', 5, 40), ('suv', 7, 70), ('van', 12, 90), ('truck', 3, 80), ('coupe', 2, 120)]
+COLORS = ['white', 'black', 'silver', 'red', 'blue', 'grey']
+LOCATIONS = ['Airport', 'Downtown', 'Central Station', 'Harbor', 'North Mall']
+PAYMENT_METHODS = ['credit_card', 'debit_card', 'cash', 'bank_transfer']
+# Rental length in days and how often it occurs
+DURATIONS = [(1, 20), (2, 22), (3, 18), (4, 10), (5, 8), (7, 10), (10, 5), (14, 5), (30, 2)]
+MEAN_DAYS = sum(days * weight for days, weight in DURATIONS) / sum(weight for _, weight in DURATIONS)
+
+
+def _rental_days(rng):
+    days, weights = zip(*DURATIONS)
+    return rng.choices(days, weights)[0]
+
+
+def _demand(day):
+    """Relative booking demand for a day: weekends and summer are busier"""
+    weekend = 1.4 if day.weekday() >= 4 else 1.0
+    summer = 1.3 if day.month in (6, 7, 8, 12) else 1.0
+    return weekend * summer
+
+
+def _insert(cursor, sql, rows, batch_size):
+    for i in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[i:i + batch_size])
+
+
+def _next_id(cursor, table, key):
+    cursor.execute(f"SELECT COALESCE(MAX({key}), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def generate_users(rng, count, first_id, password_hash):
+    rows = []
+    for i in range(count):
+        user_id = first_id + i
+        role = 'admin' if i == 0 else 'staff' if i % 200 == 1 else 'customer'
+        rows.append((user_id, f"Bench User {user_id}", f"bench{user_id}@example.com",
+                     password_hash, role, f"555-{rng.randrange(10 ** 7):07d}",
+                     f"{rng.randrange(1, 999)} Main St", f"LIC{user_id:08d}"))
+    return rows
+
+
+def generate_cars(rng, count, first_id):
+    rows = []
+    brands = list(BRANDS)
+    for i in range(count):
+        car_id = first_id + i
+        brand = rng.choice(brands)
+        car_type, seats, base_rate = rng.choice(CAR_TYPES)
+        status = 'maintenance' if rng.random() < 0.03 else 'available'
+        rate = Decimal(base_rate + rng.randrange(0, 60)).quantize(Decimal('0.01'))
+        rows.append((car_id, f"BN-{car_id:07d}", brand, rng.choice(BRANDS[brand]), car_type,
+                     rng.randrange(2012, 2026), rng.choice(COLORS), rate, seats, status))
+    return rows
+
+
+def generate_bookings(rng, count, cars, customer_ids, first_id, history_days, today):
+    """Yield booking rows laid out along each car's timeline.
+
+    Each car gets an even share of the bookings, separated by idle gaps sized
+    so the timeline ends a few weeks after today. It starts history_days ago,
+    or earlier when a car has more bookings than fit in that window.
+    """
+    per_car, extra = divmod(count, len(cars))
+    booking_id = first_id
+    now = datetime.now()
+    for index, (car_id, rate) in enumerate(cars):
+        n = per_car + (1 if index < extra else 0)
+        if not n:
+            continue
+        span = max(history_days + 60, n * (MEAN_DAYS + 0.5))
+        mean_gap = max(0.5, span / n - MEAN_DAYS)
+        day = today + timedelta(days=60 - int(span) + rng.randrange(7))
+        for _ in range(n):
+            # Busier days get shorter idle gaps before them
+            day += timedelta(days=int(rng.expovariate(_demand(day) / mean_gap)))
+            days = _rental_days(rng)
+            start, end = day, day + timedelta(days=days - 1)
+            day = end + timedelta(days=1)
+
+            if end < today:
+                status = rng.choices(['completed', 'approved', 'rejected', 'cancelled'], [70, 15, 10, 5])[0]
+            elif start <= today:
+                status = 'approved'
+            else:
+                status = rng.choices(['pending', 'approved', 'rejected'], [50, 40, 10])[0]
+            paid = status in ('completed', 'approved') and (start <= today or rng.random() < 0.3)
+
+            lead = timedelta(days=min(int(rng.expovariate(1 / 7)), 90), hours=rng.randrange(8, 21))
+            created = min(datetime.combine(start, datetime.min.time()) - lead, now)
+            yield (booking_id, rng.choice(customer_ids), car_id, start, end,
+                   rng.choice(LOCATIONS), rng.choice(LOCATIONS), rate * days, status,
+                   'paid' if paid else 'pending', rng.choice(PAYMENT_METHODS), created)
+            booking_id += 1
+
+
+def seed_database(users=1000, cars=10000, bookings=100000, maintenance=None,
+                  history_days=730, batch_size=5000, seed=42):
+    """Insert synthetic rows into the configured database; returns row counts and timings.
+
+    Rows are added after whatever is already there, with explicit ids so
+    payments can reference the bookings they pay for.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    maintenance = cars // 5 if maintenance is None else maintenance
+    migrate()
+
+    # One hash shared by every benchmark user; hashing per row would dominate seeding
+    password_hash = hash_password(BENCH_PASSWORD)
+    report = {'users': 0, 'cars': 0, 'bookings': 0, 'payments': 0, 'maintenance': 0}
+    start_time = time.perf_counter()
+
+    with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to the database")
+        cursor = conn.cursor()
+
+        first_user = _next_id(cursor, 'users', 'user_id')
+        user_rows = generate_users(rng, users, first_user, password_hash)
+        _insert(cursor, """INSERT INTO users (user_id, full_name, email, password, role, phone,
+                           address, license_no) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                user_rows, batch_size)
+        conn.commit()
+        customer_ids = [row[0] for row in user_rows if row[4] == 'customer'] or [first_user]
+        report['users'] = len(user_rows)
+
+        car_rows = generate_cars(rng, cars, _next_id(cursor, 'cars', 'car_id'))
+        _insert(cursor, """INSERT INTO cars (car_id, plate_no, brand, model, type, year, color,
+                           rate_per_day, seats, status) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                car_rows, batch_size)
+        conn.commit()
+        report['cars'] = len(car_rows)
+
+        # Bookings are generated lazily and flushed a batch at a time so
+        # millions of rows never sit in memory at once
+        booking_sql = """INSERT INTO bookings (booking_id, customer_id, car_id, start_date, end_date,
+                         pickup_location, dropoff_location, total_amount, status, payment_status,
+                         payment_method, date_created)
+                         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+        payment_sql = "INSERT INTO payments (booking_id, amount, payment_date) VALUES (%s, %s, %s)"
+        batch, payments = [], []
+        booking_rows = generate_bookings(rng, bookings, [(row[0], row[7]) for row in car_rows],
+                                         customer_ids, _next_id(cursor, 'bookings', 'booking_id'),
+                                         history_days, today)
+        for row in booking_rows:
+            batch.append(row)
+            if row[9] == 'paid':
+                payments.append((row[0], row[7],
+                                 min(row[11] + timedelta(hours=rng.randrange(1, 48)), datetime.now())))
+            if len(batch) >= batch_size:
+                cursor.executemany(booking_sql, batch)
+                if payments:
+                    cursor.executemany(payment_sql, payments)
+                conn.commit()
+                report['bookings'] += len(batch)
+                report['payments'] += len(payments)
+                batch, payments = [], []
+        if batch:
+            cursor.executemany(booking_sql, batch)
+            if payments:
+                cursor.executemany(payment_sql, payments)
+            conn.commit()
+            report['bookings'] += len(batch)
+            report['payments'] += len(payments)
+
+        maintenance_rows = []
+        for _ in range(maintenance):
+            when = datetime.combine(today, datetime.min.time()) - timedelta(
+                days=rng.randrange(history_days), hours=rng.randrange(24))
+            maintenance_rows.append((rng.choice(car_rows)[0],
+                                     rng.choice(['Oil change', 'Tire rotation', 'Brake service',
+                                                 'Body repair', 'Annual inspection']), when))
+        _insert(cursor, "INSERT INTO maintenance (car_id, description, date_created) VALUES (%s, %s, %s)",
+                maintenance_rows, batch_size)
+        conn.commit()
+        report['maintenance'] = len(maintenance_rows)
+
+    rebuild_dashboard_counters()
+    rebuild_rollups()
+    elapsed = time.perf_counter() - start_time
+    total = sum(report.values())
+    report['elapsed'] = elapsed
+    report['rows_per_second'] = total / elapsed if elapsed else 0.0
+    return report
@@ -0,0 +1,340 @@
+"""
+Car Rental System - Benchmark runner
+Times the public functions in car_rental_system.py against the configured
+database and reports latency percentiles and rows/s per function.
+
+Stream functions are timed the way the MainWindow tables load them: open the
+stream (or row generator), read the first chunk and close it. Functions that write are only run
+with include_writes, and whole-table listings only with include_heavy.
+"""
+
+import functools
+import inspect
+import itertools
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import car_rental_system as crs
+from benchmarks.datagen import BENCH_PASSWORD
+
+# Rows per chunk read by RowTableModel, so stream timings match the UI
+FIRST_CHUNK = 200
+
+# Public functions deliberately not benchmarked (connection plumbing)
+NOT_TIMED = {'get_backend', 'get_pool', 'get_db_connection', 'db_connection', 'close_pool'}
+
+
+def _case(name, fn, args=None, heavy=False, writes=False, stream=False):
+    # args: fn(ctx, rng) -> (args tuple, kwargs dict), called outside the timer
+    return {'name': name, 'fn': fn, 'args': args or (lambda ctx, rng: ((), {})),
+            'heavy': heavy, 'writes': writes, 'stream': stream}
+
+
+def _dates(rng, max_days=7):
+    start = date.today() + timedelta(days=rng.randrange(1, 60))
+    return start.isoformat(), (start + timedelta(days=rng.randrange(max_days))).isoformat()
+
+
+def _one(key):
+    return lambda ctx, rng: ((rng.choice(ctx[key]),), {})
+
+
+def _rolled_back(fn):
+    """Wrap a function taking a cursor so it runs in a transaction that is then rolled back"""
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        with crs.db_connection() as conn:
+            if not conn:
+                raise Exception("Could not connect to the database")
+            try:
+                return fn(conn.cursor(), *args, **kwargs)
+            finally:
+                conn.rollback()
+    return call
+
+
+def build_cases():
+    """Return the benchmark cases, one or more per public function"""
+    def reserve(ctx, rng):
+        start, end = _dates(rng)
+        return (rng.choice(ctx['customer_ids']), rng.choice(ctx['car_ids']), start, end,
+                'Airport', 'Downtown', 100, 'cash'), {}
+
+    def session(ctx, rng):
+        return (ctx['session_token'],), {}
+
+    def changes(ctx, rng):
+        # A refresh after an edit: the rows changed within CHANGE_WINDOW
+        table = rng.choice(sorted(ctx['change_versions']))
+        return (table, ctx['change_versions'][table]), {}
+
+    return [
+        # Dashboard and listings
+        _case('get_dashboard_stats', crs.get_dashboard_stats),
+        _case('list_users', crs.list_users),
+        _case('list_cars', crs.list_cars),
+        _case('list_bookable_cars', crs.list_bookable_cars),
+        _case('list_available_cars', crs.list_available_cars),
+        _case('list_all_bookings', crs.list_all_bookings, heavy=True),
+        _case('list_bookings_page', crs.list_bookings_page),
+        _case('list_user_bookings', crs.list_user_bookings, _one('customer_ids')),
+        _case('list_user_bookings_page', crs.list_user_bookings_page, _one('customer_ids')),
+        _case('get_booking_details', crs.get_booking_details, _one('booking_ids')),
+        _case('get_payment_history', crs.get_payment_history, _one('booking_ids')),
+        _case('get_payment_history:all', crs.get_payment_history, heavy=True),
+        _case('get_payment_history_page', crs.get_payment_history_page),
+        _case('list_maintenance_records', crs.list_maintenance_records, _one('car_ids')),
+        _case('list_maintenance_records:all', crs.list_maintenance_records, heavy=True),
+        _case('list_maintenance_records_page', crs.list_maintenance_records_page),
+
+        # MainWindow table loads
+        _case('stream_users', crs.stream_users, stream=True),
+        _case('stream_cars', crs.stream_cars, stream=True),
+        _case('stream_bookable_cars', crs.stream_bookable_cars, stream=True),
+        _case('stream_all_bookings', crs.stream_all_bookings, stream=True),
+        _case('stream_user_bookings', crs.stream_user_bookings, _one('customer_ids'), stream=True),
+        _case('stream_paid_booking_details', crs.stream_paid_booking_details, stream=True),
+
+        # Availability
+        _case('sync_availability_index', crs.sync_availability_index),
+        _case('get_availability_index', crs.get_availability_index),
+        _case('check_car_availability', crs.check_car_availability,
+              lambda ctx, rng: ((rng.choice(ctx['car_ids']),) + _dates(rng), {})),
+        _case('search_available_cars', crs.search_available_cars,
+              lambda ctx, rng: (_dates(rng), {})),
+        _case('search_available_cars:filtered', crs.search_available_cars,
+              lambda ctx, rng: (_dates(rng), {'car_type': 'suv', 'min_seats': 5, 'max_rate': 100})),
+
+        # Admin table search
+        _case('search_listing:cars', crs.search_listing,
+              lambda ctx, rng: (('cars', rng.choice(['toyota', 'civic', 'white', 'bn'])), {})),
+        _case('search_listing:bookings', crs.search_listing,
+              lambda ctx, rng: (('bookings', rng.choice(['toyota', 'bench'])),
+                                {'filters': {'status': 'pending'}})),
+        _case('stream_search:bookings', crs.stream_search,
+              lambda ctx, rng: (('bookings',), {'filters': {'status': 'approved',
+                                                            'start_from': date.today().isoformat()},
+                                                'sort': 'start_date'}),
+              stream=True),
+        _case('search_terms', crs.search_terms,
+              lambda ctx, rng: ((rng.choice(['Toyota Corolla', 'bench user 42', 'BN-1234 white']),), {})),
+        _case('build_search_query', crs.build_search_query,
+              lambda ctx, rng: (('bookings', rng.choice(['toyota', 'bench 42', ''])),
+                                {'filters': {'status': 'pending'}, 'sort': 'start_date'})),
+
+        # Table refresh after edits
+        _case('get_change_version', crs.get_change_version,
+              lambda ctx, rng: ((rng.choice(sorted(ctx['change_versions'])),), {})),
+        _case('list_changes', crs.list_changes, changes),
+
+        # Exports
+        _case('stream_table_export', crs.stream_table_export,
+              lambda ctx, rng: ((rng.choice(sorted(crs.EXPORT_TABLES)),), {}), stream=True),
+        _case('iter_table_rows', crs.iter_table_rows,
+              lambda ctx, rng: (('bookings',), {'after_key': rng.choice(ctx['booking_ids'])}),
+              stream=True),
+
+        # Auth and bookkeeping
+        _case('login_user', crs.login_user,
+              lambda ctx, rng: ((rng.choice(ctx['emails']), BENCH_PASSWORD), {})),
+        _case('get_session_user', crs.get_session_user, session),
+        _case('logout_user', crs.logout_user, lambda ctx, rng: (('unknown-token',), {})),
+        _case('get_pool_stats', crs.get_pool_stats),
+        _case('get_cache_stats', crs.get_cache_stats),
+        _case('invalidate_booking_cache', crs.invalidate_booking_cache,
+              lambda ctx, rng: (([rng.choice(ctx['booking_ids'])],), {})),
+        _case('rebuild_dashboard_counters', crs.rebuild_dashboard_counters, heavy=True, writes=True),
+        _case('rebuild_rollups', crs.rebuild_rollups, heavy=True, writes=True),
+        _case('write_rollups', _rolled_back(crs.write_rollups), heavy=True, writes=True),
+        _case('rollups_stale', crs.rollups_stale),
+
+        # Writes
+        _case('register_user', crs.register_user,
+              lambda ctx, rng: (('Bench Run', f"run-{uuid.uuid4().hex}@example.com", BENCH_PASSWORD), {}),
+              writes=True),
+        _case('add_car', crs.add_car,
+              lambda ctx, rng: ((f"BR-{uuid.uuid4().hex[:12]}", 'Toyota', 'Corolla', 'sedan',
+                                 2024, 'white', 45), {}),
+              writes=True),
+        _case('add_cars_bulk', crs.add_cars_bulk,
+              lambda ctx, rng: (([(i, (f"BB-{uuid.uuid4().hex[:12]}", 'Honda', 'Civic', 'sedan', 2023,
+                                       'black', 50, 5, 'available', None)) for i in range(100)],), {}),
+              writes=True),
+        _case('update_car', crs.update_car,
+              lambda ctx, rng: ((rng.choice(ctx['car_ids']),), {'color': rng.choice(['red', 'blue'])}),
+              writes=True),
+        _case('create_booking', crs.create_booking, reserve, writes=True),
+        _case('reserve_car', crs.reserve_car, reserve, writes=True),
+        _case('update_booking_status', crs.update_booking_status,
+              lambda ctx, rng: ((rng.choice(ctx['booking_ids']), 'approved'), {}), writes=True),
+        _case('update_booking_statuses', crs.update_booking_statuses,
+              lambda ctx, rng: ((rng.sample(ctx['booking_ids'], min(20, len(ctx['booking_ids']))),
+                                 'rejected'), {}),
+              writes=True),
+        _case('record_payment', crs.record_payment,
+              lambda ctx, rng: ((rng.choice(ctx['booking_ids']), 100), {}), writes=True),
+        _case('log_maintenance', crs.log_maintenance,
+              lambda ctx, rng: ((rng.choice(ctx['car_ids']), 'Benchmark service'), {}), writes=True),
+        _case('create_maintenance_record', crs.create_maintenance_record,
+              lambda ctx, rng: ((rng.choice(ctx['car_ids']), 'Benchmark service'), {}), writes=True),
+    ]
+
+
+def _sample_ids(cursor, table, key, rng, count, where='1 = 1'):
+    # Pick random ids from the key range; cheaper than ORDER BY RAND() on big tables
+    cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table} WHERE {where}")
+    low, high = cursor.fetchone()
+    if low is None:
+        return []
+    picks = sorted({rng.randint(low, high) for _ in range(count)})
+    placeholders = ', '.join(['%s'] * len(picks))
+    cursor.execute(f"SELECT {key} FROM {table} WHERE {key} IN ({placeholders}) AND {where}", picks)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def build_context(rng, sample_size=200):
+    """Sample ids and a session from the seeded database for the cases to use"""
+    with crs.db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to the database")
+        cursor = conn.cursor()
+        ctx = {
+            'customer_ids': _sample_ids(cursor, 'users', 'user_id', rng, sample_size, "role = 'customer'"),
+            'car_ids': _sample_ids(cursor, 'cars', 'car_id', rng, sample_size),
+            'booking_ids': _sample_ids(cursor, 'bookings', 'booking_id', rng, sample_size),
+        }
+        cursor.execute("SELECT email FROM users WHERE email LIKE 'bench%@example.com' LIMIT 20")
+        ctx['emails'] = [row[0] for row in cursor.fetchall()]
+    if not all(ctx.values()):
+        raise Exception("Database has no benchmark data; run 'python -m benchmarks seed' first")
+    ctx['change_versions'] = {table: crs.get_change_version(table) for table in crs.CHANGES_SQL}
+    user = crs.login_user(ctx['emails'][0], BENCH_PASSWORD)
+    ctx['session_token'] = user['session_token'] if user else None
+    return ctx
+
+
+def _count_rows(result):
+    if isinstance(result, (list, tuple)):
+        # (rows, next_token) from the *_page functions
+        if len(result) == 2 and isinstance(result[0], list):
+            return len(result[0])
+        return len(result)
+    return 0 if result is None else 1
+
+
+def _call(case, args, kwargs):
+    if not case['stream']:
+        return case['fn'](*args, **kwargs)
+    stream = case['fn'](*args, **kwargs)
+    try:
+        if inspect.isgenerator(stream):
+            return list(itertools.islice(stream, FIRST_CHUNK))
+        return stream.fetch(FIRST_CHUNK)
+    finally:
+        stream.close()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def run_case(case, ctx, rng, iterations):
+    """Time one case; returns its result record"""
+    timings = []
+    rows = 0
+    errors = 0
+    for i in range(iterations + 1):
+        args, kwargs = case['args'](ctx, rng)
+        start = time.perf_counter()
+        try:
+            result = _call(case, args, kwargs)
+        except Exception as e:
+            errors += 1
+            if errors == 1:
+                print(f"  {case['name']}: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        # The first call only warms connections and caches
+        if i:
+            timings.append(elapsed)
+            rows += _count_rows(result)
+
+    timings.sort()
+    total = sum(timings)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'iterations': len(timings),
+        'errors': errors,
+        'mean_ms': ms(total / len(timings)) if timings else None,
+        'p50_ms': ms(percentile(timings, 50)),
+        'p95_ms': ms(percentile(timings, 95)),
+        'p99_ms': ms(percentile(timings, 99)),
+        'max_ms': ms(timings[-1]) if timings else None,
+        'rows': rows,
+        'rows_per_second': round(rows / total, 1) if total else 0.0,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(iterations=20, heavy_iterations=3, include_heavy=False, include_writes=False,
+                   only=None, seed=42):
+    """Run the benchmark cases; returns a JSON-serialisable results dict"""
+    rng = random.Random(seed)
+    ctx = build_context(rng)
+    cases = build_cases()
+    timed = {case['fn'].__name__ for case in cases}
+    public = {name for name, fn in inspect.getmembers(crs, inspect.isfunction)
+              if fn.__module__ == crs.__name__ and not name.startswith('_')}
+
+    results = {}
+    skipped = []
+    for case in cases:
+        if only and not any(pattern in case['name'] for pattern in only):
+            continue
+        if (case['heavy'] and not include_heavy) or (case['writes'] and not include_writes):
+            skipped.append(case['name'])
+            continue
+        print(f"Timing {case['name']}...")
+        results[case['name']] = run_case(case, ctx, rng,
+                                         heavy_iterations if case['heavy'] else iterations)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': iterations,
+            'seed': seed,
+        },
+        'results': results,
+        'skipped': skipped,
+        'untimed_functions': sorted(public - timed - NOT_TIMED),
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """Compare two result dicts by p95; returns (name, old_ms, new_ms, change, regressed) rows"""
+    rows = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if not old or not old.get('p95_ms') or new.get('p95_ms') is None:
+            continue
+        change = (new['p95_ms'] - old['p95_ms']) / old['p95_ms']
+        rows.append((name, old['p95_ms'], new['p95_ms'], change, change > threshold))
+    return rows
@@ -0,0 +1,127 @@
+"""
+Car Rental System - Bulk car import
+Streams cars from a CSV or JSON-lines file, validates each row and inserts
+them in batches.
+
+Usage: python bulk_import.py cars.csv [--batch-size 500] [--format csv|jsonl]
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+from car_rental_system import add_cars_bulk
+
+CAR_TYPES = ('sedan', 'suv', 'van', 'truck', 'coupe')
+CAR_STATUSES = ('available', 'maintenance')
+REQUIRED_FIELDS = ('plate_no', 'brand', 'model', 'type', 'year', 'color', 'rate_per_day')
+
+
+def read_rows(path, file_format=None):
+    """Yield (line_no, row dict) pairs from a CSV or JSON-lines file, one at a time"""
+    file_format = file_format or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    yield line_no, ValueError(f"Invalid JSON: {e}")
+
+
+def validate_car(row):
+    """Return the insert values for a row dict, raising ValueError if it is invalid"""
+    if isinstance(row, ValueError):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("Row is not an object")
+
+    row = {key: str(value).strip() if value is not None else '' for key, value in row.items()}
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    if row['type'] not in CAR_TYPES:
+        raise ValueError(f"Unknown car type: {row['type']}")
+
+    status = row.get('status') or 'available'
+    if status not in CAR_STATUSES:
+        raise ValueError(f"Invalid status: {status}")
+
+    try:
+        year = int(row['year'])
+        seats = int(row.get('seats') or 4)
+        rate = Decimal(row['rate_per_day'])
+    except (ValueError, InvalidOperation):
+        raise ValueError("year, seats and rate_per_day must be numbers")
+    # Same limits as AddCarDialog
+    if not 1990 <= year <= 2030:
+        raise ValueError(f"Year out of range: {year}")
+    if not 2 <= seats <= 12:
+        raise ValueError(f"Seats out of range: {seats}")
+    if not 0 <= rate <= 10000:
+        raise ValueError(f"Rate per day out of range: {rate}")
+
+    return (row['plate_no'], row['brand'], row['model'], row['type'], year,
+            row['color'], rate, seats, status, row.get('image_path') or None)
+
+
+def import_cars(path, batch_size=500, file_format=None):
+    """Import cars from a file; returns a report dict with counts, errors and throughput"""
+    errors = []
+
+    def valid_rows():
+        for line_no, row in read_rows(path, file_format):
+            try:
+                yield line_no, validate_car(row)
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+
+    start = time.perf_counter()
+    inserted, insert_errors = add_cars_bulk(valid_rows(), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    errors.extend(insert_errors)
+    errors.sort()
+    return {
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': errors,
+        'elapsed': elapsed,
+        'rows_per_second': inserted / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk import cars from CSV or JSON-lines')
+    parser.add_argument('path', help='CSV or JSON-lines file with one car per row')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='rows per executemany transaction (default 500)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help='input format (default: guessed from the file extension)')
+    args = parser.parse_args(argv)
+
+    try:
+        report = import_cars(args.path, args.batch_size, args.format)
+    except Exception as e:
+        print(f"Import failed: {e}")
+        return 1
+
+    for line_no, message in report['errors']:
+        print(f"Line {line_no}: {message}")
+    print(f"Inserted {report['inserted']} cars, {report['failed']} failed "
+          f"in {report['elapsed']:.2f}s ({report['rows_per_second']:.0f} rows/s)")
+    return 0 if not report['failed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
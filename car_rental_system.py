@@ -1,346 +1,1602 @@
-import mysql.connector
-from datetime import datetime
-from decimal import Decimal
-
-# Database connection configuration
-DB_CONFIG = {
-    # Use the correct host/database for your local phpMyAdmin setup.
-    # Update 'user' and 'password' to match your MySQL credentials if needed.
-    'host': '127.0.0.1',
-    'user': 'root',
-    'password': '',
-    'database': 'carrental'
-}
-
-def get_db_connection():
-    """Establish and return database connection"""
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except mysql.connector.Error as err:
-        print(f"Error connecting to database: {err}")
-        return None
-
-# User Management Functions
-def register_user(full_name, email, password, role='customer', phone=None, address=None, license_no=None):
-    """Register a new user"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            sql = """INSERT INTO users (full_name, email, password, role, phone, address, license_no) 
-                     VALUES (%s, %s, %s, %s, %s, %s, %s)"""
-            cursor.execute(sql, (full_name, email, password, role, phone, address, license_no))
-            conn.commit()
-            print("User registered successfully!")
-            return cursor.lastrowid
-        except mysql.connector.Error as err:
-            print(f"Error registering user: {err}")
-            return None
-        finally:
-            conn.close()
-
-def login_user(email, password):
-    """Authenticate user login"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            # First look up the user by email
-            cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-            user = cursor.fetchone()
-            if not user:
-                print(f"No user found with email: {email}")
-                return None
-
-            # For now passwords are stored in plaintext in this project (not recommended for production)
-            # Compare the stored password with the provided one
-            stored = user.get('password')
-            if stored == password:
-                print("Login successful!")
-                return user
-            else:
-                print(f"Password mismatch for user: {email}")
-                return None
-        finally:
-            conn.close()
-
-def list_users():
-    """List all users"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            # Update the query to include phone and other relevant fields
-            cursor.execute("""
-                SELECT user_id, full_name, email, role, phone, address, license_no 
-                FROM users
-            """)
-            users = cursor.fetchall()
-            return users
-        finally:
-            conn.close()
-
-# Car Management Functions
-def add_car(plate_no, brand, model, type, year, color, rate_per_day, seats=4, status='available', image_path=None):
-    """Add a new car"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            sql = """INSERT INTO cars (plate_no, brand, model, type, year, color, 
-                     rate_per_day, seats, status, image_path) 
-                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
-            cursor.execute(sql, (plate_no, brand, model, type, year, color, 
-                               rate_per_day, seats, status, image_path))
-            conn.commit()
-            print("Car added successfully!")
-            return cursor.lastrowid
-        except mysql.connector.Error as err:
-            print(f"Error adding car: {err}")
-            return None
-        finally:
-            conn.close()
-
-def update_car(car_id, **kwargs):
-    """Update car details"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            set_clause = ", ".join([f"{key} = %s" for key in kwargs.keys()])
-            sql = f"UPDATE cars SET {set_clause} WHERE car_id = %s"
-            values = list(kwargs.values()) + [car_id]
-            cursor.execute(sql, values)
-            conn.commit()
-            print("Car updated successfully!")
-            return True
-        except mysql.connector.Error as err:
-            print(f"Error updating car: {err}")
-            return False
-        finally:
-            conn.close()
-
-def list_available_cars():
-    """List all available cars"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM cars WHERE status = 'available'")
-            cars = cursor.fetchall()
-            return cars
-        finally:
-            conn.close()
-
-# Booking Management Functions
-def create_booking(customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, total_amount, payment_method):
-    """Create a new booking"""
-    conn = get_db_connection()
-    if not conn:
-        raise Exception("Could not connect to database")
-    
-    try:
-        cursor = conn.cursor()
-        sql = """INSERT INTO bookings 
-                (customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, 
-                 total_amount, status, payment_status, payment_method) 
-                 VALUES (%s, %s, %s, %s, %s, %s, %s, 'pending', 'pending', %s)"""
-        cursor.execute(sql, (customer_id, car_id, start_date, end_date, 
-                           pickup_location, dropoff_location, total_amount, payment_method))
-        
-        conn.commit()
-        booking_id = cursor.lastrowid
-        return booking_id
-    except mysql.connector.Error as err:
-        conn.rollback()
-        raise Exception(f"Database error: {str(err)}")
-    finally:
-        conn.close()
-
-def update_booking_status(booking_id, status):
-    """Update booking status and car availability"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            # Start transaction
-            conn.start_transaction()
-            
-            # Update booking status
-            cursor.execute("UPDATE bookings SET status = %s WHERE booking_id = %s", 
-                         (status, booking_id))
-            
-            # If approved, update car status to 'rented'
-            if status == 'approved':
-                cursor.execute("""
-                    UPDATE cars c
-                    JOIN bookings b ON c.car_id = b.car_id
-                    SET c.status = 'rented'
-                    WHERE b.booking_id = %s
-                """, (booking_id,))
-            
-            # If rejected, ensure car remains/returns to 'available'
-            elif status == 'rejected':
-                cursor.execute("""
-                    UPDATE cars c
-                    JOIN bookings b ON c.car_id = b.car_id
-                    SET c.status = 'available'
-                    WHERE b.booking_id = %s
-                """, (booking_id,))
-            
-            # Commit transaction
-            conn.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Error updating booking: {err}")
-            conn.rollback()
-            return False
-        finally:
-            conn.close()
-    return False
-
-def list_user_bookings(user_id):
-    """List bookings for a specific user"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT b.*, c.brand, c.model 
-                FROM bookings b 
-                JOIN cars c ON b.car_id = c.car_id 
-                WHERE b.customer_id = %s
-                """, (user_id,))
-            bookings = cursor.fetchall()
-            return bookings
-        finally:
-            conn.close()
-
-# Payment Functions
-def record_payment(booking_id, amount):
-    """Record a payment for a booking"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO payments (booking_id, amount) VALUES (%s, %s)", 
-                         (booking_id, amount))
-            cursor.execute("UPDATE bookings SET payment_status = 'paid' WHERE booking_id = %s", 
-                         (booking_id,))
-            conn.commit()
-            print("Payment recorded successfully!")
-            return True
-        except mysql.connector.Error as err:
-            print(f"Error recording payment: {err}")
-            return False
-        finally:
-            conn.close()
-
-def get_payment_history(booking_id=None):
-    """Get payment history, optionally filtered by booking_id"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            if booking_id:
-                cursor.execute("SELECT * FROM payments WHERE booking_id = %s", (booking_id,))
-            else:
-                cursor.execute("SELECT * FROM payments")
-            payments = cursor.fetchall()
-            return payments
-        finally:
-            conn.close()
-
-# Maintenance Functions
-def log_maintenance(car_id, description):
-    """Log a maintenance record for a car"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO maintenance (car_id, description) VALUES (%s, %s)", 
-                         (car_id, description))
-            conn.commit()
-            print("Maintenance record logged successfully!")
-            return cursor.lastrowid
-        except mysql.connector.Error as err:
-            print(f"Error logging maintenance: {err}")
-            return None
-        finally:
-            conn.close()
-
-def create_maintenance_record(car_id, description):
-    """Create a maintenance record for a car"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            # Start transaction
-            conn.start_transaction()
-            
-            # Update car status
-            cursor.execute("UPDATE cars SET status = 'maintenance' WHERE car_id = %s", 
-                         (car_id,))
-            
-            # Create maintenance record
-            cursor.execute("""
-                INSERT INTO maintenance (car_id, description, date_created)
-                VALUES (%s, %s, NOW())
-            """, (car_id, description))
-            
-            conn.commit()
-            return True
-        except mysql.connector.Error as err:
-            conn.rollback()
-            print(f"Error creating maintenance record: {err}")
-            return False
-        finally:
-            conn.close()
-    return False
-
-def list_maintenance_records(car_id=None):
-    """List maintenance records, optionally filtered by car_id"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            if car_id:
-                cursor.execute("""
-                    SELECT m.*, c.brand, c.model 
-                    FROM maintenance m 
-                    JOIN cars c ON m.car_id = c.car_id 
-                    WHERE m.car_id = %s
-                    """, (car_id,))
-            else:
-                cursor.execute("""
-                    SELECT m.*, c.brand, c.model 
-                    FROM maintenance m 
-                    JOIN cars c ON m.car_id = c.car_id
-                    """)
-            records = cursor.fetchall()
-            return records
-        finally:
-            conn.close()
-
-def get_booking_details(booking_id):
-    """Get complete booking details including customer and car information"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            sql = """
-                SELECT 
-                    b.*, 
-                    u.full_name, u.email, u.phone, u.license_no,
-                    c.brand, c.model, c.plate_no, c.color, c.rate_per_day
-                FROM bookings b
-                JOIN users u ON b.customer_id = u.user_id
-                JOIN cars c ON b.car_id = c.car_id
-                WHERE b.booking_id = %s
-            """
-            cursor.execute(sql, (booking_id,))
-            return cursor.fetchone()
-        finally:
-            conn.close()
-    return None
+import base64
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from auth import (SessionStore, hash_password_pooled, verify_password_pooled,
+                  needs_rehash)
+from availability import AvailabilityIndex, ACTIVE_STATUSES, to_day
+from backends import DB_ERRORS, create_backend
+from db_pool import ConnectionPool, PoolError
+from instrumentation import InstrumentedBackend, get_query_stats, reset_query_stats
+from query_cache import QueryCache
+
+# Database connection configuration
+DB_CONFIG = {
+    # Use the correct host/database for your local phpMyAdmin setup.
+    # Update 'user' and 'password' to match your MySQL credentials if needed.
+    'host': '127.0.0.1',
+    'user': 'root',
+    'password': '',
+    'database': 'carrental'
+}
+
+# Storage backend: 'mysql' (server, DB_CONFIG) or 'sqlite' (embedded file,
+# SQLITE_CONFIG). See backends.py.
+DB_BACKEND = os.environ.get('CAR_RENTAL_BACKEND', 'mysql')
+SQLITE_CONFIG = {
+    'path': os.environ.get('CAR_RENTAL_SQLITE_PATH', 'carrental.db')
+}
+
+# Connection pool configuration (see db_pool.ConnectionPool)
+POOL_CONFIG = {
+    'size': 5,          # maximum open connections
+    'timeout': 10,      # seconds to wait for a free connection
+    'recycle': 1800,    # seconds before a connection is replaced
+    'ping_after': 5     # idle seconds before a borrowed connection is pinged
+}
+
+_backend = None
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_backend():
+    """Return the configured storage backend"""
+    global _backend
+    with _pool_lock:
+        if _backend is None:
+            # Every connection is instrumented (see get_query_stats)
+            _backend = InstrumentedBackend(create_backend(DB_BACKEND, DB_CONFIG, SQLITE_CONFIG))
+        return _backend
+
+def get_pool():
+    """Return the shared connection pool, creating it on first use"""
+    global _pool
+    backend = get_backend()
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(backend, errors=DB_ERRORS, **POOL_CONFIG)
+        return _pool
+
+def get_db_connection():
+    """Borrow a pooled database connection; close() returns it to the pool"""
+    try:
+        return get_pool().get_connection()
+    except (PoolError,) + DB_ERRORS as err:
+        print(f"Error connecting to database: {err}")
+        return None
+
+@contextmanager
+def db_connection():
+    """Context manager that borrows a pooled connection (None if unavailable)"""
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        if conn:
+            conn.close()
+
+def get_pool_stats():
+    """Return connection pool statistics (borrows, wait times, exhaustion events)"""
+    return get_pool().stats()
+
+def close_pool():
+    """Close the shared connection pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+class RowStream:
+    """Reads a query result in chunks through an unbuffered (server-side) cursor.
+
+    The stream owns a dedicated connection rather than a pooled one, since an
+    unbuffered result keeps its connection busy until it is fully read.
+    """
+
+    def __init__(self, sql, params=(), version=None):
+        # version: change version of the listing when the stream was opened,
+        # for fetching later changes with list_changes
+        self.version = version
+        self.conn = get_backend().connect()
+        try:
+            self.cursor = self.conn.cursor(dictionary=True, buffered=False)
+            self.cursor.execute(sql, params)
+        except DB_ERRORS:
+            self.conn.close()
+            raise
+        self.exhausted = False
+
+    def fetch(self, size):
+        """Return up to `size` more rows; closes the stream once it runs dry"""
+        if self.exhausted:
+            return []
+        rows = self.cursor.fetchmany(size)
+        if len(rows) < size:
+            self.close()
+        return rows
+
+    def close(self):
+        """Release the connection, discarding any unread rows"""
+        if not self.exhausted:
+            self.exhausted = True
+            try:
+                self.conn.close()
+            except DB_ERRORS:
+                pass
+
+# Pagination helpers
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def _encode_page_token(listing, key):
+    """Pack the last row's sort key into an opaque continuation token"""
+    payload = json.dumps({'l': listing, 'k': [v if isinstance(v, int) else str(v) for v in key]})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def _decode_page_token(listing, token):
+    """Unpack a continuation token, checking it belongs to this listing"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        key = payload['k']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid page token")
+    if payload.get('l') != listing:
+        raise ValueError(f"Page token does not belong to the {listing} listing")
+    return key
+
+def _fetch_keyset_page(listing, select_sql, conditions, params, key_columns, page_size, page_token):
+    """Run a newest-first keyset-paginated query.
+
+    key_columns is a list of (qualified column, result column) pairs that
+    uniquely order the rows. Instead of an OFFSET the query seeks past the
+    key of the last row on the previous page, so every page costs the same.
+    Returns (rows, next_page_token); the token is None on the last page.
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    conditions = list(conditions)
+    params = list(params)
+    if page_token:
+        last_key = _decode_page_token(listing, page_token)
+        columns = ", ".join(column for column, _ in key_columns)
+        placeholders = ", ".join(["%s"] * len(key_columns))
+        conditions.append(f"({columns}) < ({placeholders})")
+        params.extend(last_key)
+
+    sql = select_sql
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + ", ".join(f"{column} DESC" for column, _ in key_columns)
+    sql += " LIMIT %s"
+    params.append(page_size + 1)
+
+    with db_connection() as conn:
+        if not conn:
+            return None, None
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    next_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_token = _encode_page_token(listing, [rows[-1][name] for _, name in key_columns])
+    return rows, next_token
+
+# Read-through cache for booking details and customers' booking lists.
+# Writers call invalidate_booking_cache so changes show up immediately.
+CACHE_CONFIG = {
+    'max_entries': 2000,
+    'ttl': 300          # seconds; also bounds staleness from other clients
+}
+_booking_cache = QueryCache(**CACHE_CONFIG)
+
+def invalidate_booking_cache(booking_ids=(), customer_ids=()):
+    """Drop cached booking details and booking lists affected by a write"""
+    keys = [('booking', booking_id) for booking_id in booking_ids]
+    keys += [('user_bookings', customer_id) for customer_id in customer_ids]
+    _booking_cache.invalidate(*keys)
+
+def get_cache_stats():
+    """Return booking cache hit/miss statistics"""
+    return _booking_cache.stats()
+
+# Dashboard Metrics
+# Counts shown on the admin dashboard are kept in a small counters table that
+# writers adjust inside their own transactions, so reading them never needs a
+# COUNT(*) scan. The counters are rebuilt from the base tables if they are
+# missing or an adjustment failed.
+DASHBOARD_COUNTERS = ('total_cars', 'active_bookings', 'total_users')
+DASHBOARD_TTL = 30  # seconds the dashboard stats are cached in memory
+
+_metrics = {'stats': None, 'loaded_at': 0, 'rebuild': False}
+_metrics_lock = threading.Lock()
+
+BUMP_COUNTER_SQL = "UPDATE dashboard_counters SET value = value + %s WHERE name = %s"
+REBUILD_COUNTERS_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        name VARCHAR(50) PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    # Delete and reinsert in one transaction; portable across backends
+    "DELETE FROM dashboard_counters",
+    """
+    INSERT INTO dashboard_counters (name, value)
+    SELECT 'total_cars', COUNT(*) FROM cars
+    UNION ALL
+    SELECT 'active_bookings', COUNT(*) FROM bookings WHERE status = 'approved'
+    UNION ALL
+    SELECT 'total_users', COUNT(*) FROM users
+    """,
+)
+COUNTERS_SQL = "SELECT name, value FROM dashboard_counters"
+
+def _bump_counter(cursor, name, delta):
+    """Adjust a dashboard counter inside the caller's transaction"""
+    if not delta:
+        return
+    try:
+        cursor.execute(BUMP_COUNTER_SQL, (delta, name))
+        if cursor.rowcount == 0:
+            _metrics['rebuild'] = True
+    except DB_ERRORS as err:
+        print(f"Error updating dashboard counter {name}: {err}")
+        _metrics['rebuild'] = True
+    with _metrics_lock:
+        _metrics['stats'] = None
+
+def rebuild_dashboard_counters():
+    """Recompute the dashboard counters from the base tables"""
+    with db_connection() as conn:
+        if not conn:
+            return False
+        try:
+            cursor = conn.cursor()
+            for sql in REBUILD_COUNTERS_SQL:
+                cursor.execute(sql)
+            conn.commit()
+        except DB_ERRORS as err:
+            print(f"Error rebuilding dashboard counters: {err}")
+            conn.rollback()
+            return False
+    _metrics['rebuild'] = False
+    return True
+
+def _read_dashboard_counters():
+    with db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(COUNTERS_SQL)
+            rows = cursor.fetchall()
+        except DB_ERRORS:
+            return None
+    return _counter_stats(rows)
+
+def _counter_stats(rows):
+    """Dashboard stats from the counter rows, or None if any is missing"""
+    stats = {name: int(value) for name, value in rows}
+    if not all(name in stats for name in DASHBOARD_COUNTERS):
+        return None
+    return stats
+
+def get_dashboard_stats():
+    """Return the admin dashboard statistics in one round trip, cached for DASHBOARD_TTL seconds"""
+    with _metrics_lock:
+        if _metrics['stats'] and time.monotonic() - _metrics['loaded_at'] < DASHBOARD_TTL:
+            return dict(_metrics['stats'])
+
+    stats = None if _metrics['rebuild'] else _read_dashboard_counters()
+    if stats is None:
+        if not rebuild_dashboard_counters():
+            return None
+        stats = _read_dashboard_counters()
+        if stats is None:
+            return None
+
+    with _metrics_lock:
+        _metrics['stats'] = stats
+        _metrics['loaded_at'] = time.monotonic()
+    return dict(stats)
+
+# Reporting Rollups
+# Revenue and utilization reports (reports.py) read two small rollup tables
+# (schema migration 5) that writers adjust inside their own transactions,
+# like the dashboard counters:
+#   rollup_daily: per day and car type, bookings made, rentals starting,
+#                 their length in days, cars out on rent, payments, revenue
+#   rollup_car:   per car, rentals, rental days, payments, revenue
+# A booking counts as a rental while it is approved or completed. Rentals
+# and payments are attributed to the car's type at the time of the change.
+RENTAL_STATUSES = ('approved', 'completed')
+ROLLUP_KEYS = {'rollup_daily': ('day', 'car_type'), 'rollup_car': ('car_id',)}
+
+_rollups = {'stale': False}   # set when an adjustment failed; cleared by rebuild_rollups
+_rollup_sql = {}
+
+def _rollup_upsert_sql(table, columns, source=None):
+    """INSERT that adds to the columns of an existing rollup row.
+
+    The row comes from VALUES, or from source: a SELECT of the key and
+    column values.
+    """
+    key = (get_backend().name, table, columns, source)
+    sql = _rollup_sql.get(key)
+    if sql is None:
+        names = ROLLUP_KEYS[table] + columns
+        sql = f"INSERT INTO {table} ({', '.join(names)}) "
+        sql += source or f"VALUES ({', '.join(['%s'] * len(names))})"
+        if get_backend().name == 'sqlite':
+            sql += (f" ON CONFLICT ({', '.join(ROLLUP_KEYS[table])}) DO UPDATE SET "
+                    + ", ".join(f"{column} = {column} + excluded.{column}" for column in columns))
+        else:
+            sql += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{column} = {column} + VALUES({column})"
+                                                             for column in columns)
+        _rollup_sql[key] = sql
+    return sql
+
+def _add_to_rollup(cursor, table, columns, rows, source=None):
+    """Add rows of (key..., amount...) to a rollup table inside the caller's transaction.
+
+    With source, rows are instead the parameters of that SELECT.
+    """
+    if not rows:
+        return
+    try:
+        cursor.executemany(_rollup_upsert_sql(table, tuple(columns), source), rows)
+    except DB_ERRORS as err:
+        print(f"Error updating {table}: {err}")
+        _rollups['stale'] = True
+
+def _car_types_query(car_ids):
+    car_ids = sorted(set(car_ids))
+    placeholders = ", ".join(["%s"] * len(car_ids))
+    return f"SELECT car_id, type FROM cars WHERE car_id IN ({placeholders})", car_ids
+
+def _car_types(cursor, car_ids):
+    cursor.execute(*_car_types_query(car_ids))
+    return dict(cursor.fetchall())
+
+# Bookings and payments are counted on the day the database stamped them
+# with, read back from the new row, just as write_rollups buckets them, so
+# the two agree around midnight and whatever the application's clock says
+BOOKING_MADE_SQL = """
+    SELECT DATE(b.date_created), c.type, 1
+    FROM bookings b
+    JOIN cars c ON b.car_id = c.car_id
+    WHERE b.booking_id = %s
+"""
+PAYMENT_DAILY_SQL = """
+    SELECT DATE(p.payment_date), c.type, 1, p.amount
+    FROM payments p
+    JOIN bookings b ON p.booking_id = b.booking_id
+    JOIN cars c ON b.car_id = c.car_id
+    WHERE p.payment_id = %s
+"""
+PAYMENT_CAR_SQL = """
+    SELECT b.car_id, 1, p.amount
+    FROM payments p
+    JOIN bookings b ON p.booking_id = b.booking_id
+    WHERE p.payment_id = %s
+"""
+
+# (table, columns, source) of the rollup rows a new booking or payment adds
+BOOKING_ROLLUPS = [('rollup_daily', ['bookings'], BOOKING_MADE_SQL)]
+PAYMENT_ROLLUPS = [
+    ('rollup_daily', ['payments', 'revenue'], PAYMENT_DAILY_SQL),
+    ('rollup_car', ['payments', 'revenue'], PAYMENT_CAR_SQL),
+]
+
+def _rollup_booking_made(cursor, booking_id):
+    for table, columns, source in BOOKING_ROLLUPS:
+        _add_to_rollup(cursor, table, columns, [(booking_id,)], source)
+
+def _rollup_rentals(cursor, rentals, sign):
+    """Count bookings in (sign=1) or out of (sign=-1) the rental rollups.
+
+    rentals is a list of (car_id, start_date, end_date).
+    """
+    if not rentals or not sign:
+        return
+    types = _car_types(cursor, [car_id for car_id, _, _ in rentals])
+    for table, columns, rows in _rental_rollup_rows(types, rentals, sign):
+        _add_to_rollup(cursor, table, columns, rows)
+
+def _rental_rollup_rows(types, rentals, sign):
+    """The (table, columns, rows) to add to the rollups for _rollup_rentals"""
+    starts, days_out, cars = defaultdict(lambda: [0, 0]), defaultdict(int), defaultdict(lambda: [0, 0])
+    for car_id, start_date, end_date in rentals:
+        car_type = types.get(car_id)
+        if car_type is None:
+            continue
+        days = (end_date - start_date).days + 1
+        starts[(start_date, car_type)][0] += sign
+        starts[(start_date, car_type)][1] += sign * days
+        for offset in range(days):
+            days_out[(start_date + timedelta(days=offset), car_type)] += sign
+        cars[car_id][0] += sign
+        cars[car_id][1] += sign * days
+    return [
+        ('rollup_daily', ['rentals', 'rental_days'],
+         [key + tuple(values) for key, values in starts.items()]),
+        ('rollup_daily', ['rented_car_days'], [key + (count,) for key, count in days_out.items()]),
+        ('rollup_car', ['rentals', 'rental_days'],
+         [(car_id,) + tuple(values) for car_id, values in cars.items()]),
+    ]
+
+def _rollup_payment(cursor, payment_id):
+    for table, columns, source in PAYMENT_ROLLUPS:
+        _add_to_rollup(cursor, table, columns, [(payment_id,)], source)
+
+def rollups_stale():
+    """True if a rollup adjustment failed since the last rebuild_rollups"""
+    return _rollups['stale']
+
+def _as_date(value):
+    # DATE() of a timestamp comes back as text from SQLite
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+def _as_money(value):
+    return Decimal(str(value or 0)).quantize(Decimal('0.01'))
+
+def write_rollups(cursor):
+    """Recompute the reporting rollups from the base tables with the caller's
+    cursor, inside its transaction. Returns the number of rollup rows written.
+    """
+    # (day, car type) -> [bookings, rentals, rental_days, rented_car_days, payments, revenue]
+    daily = defaultdict(lambda: [0, 0, 0, 0, 0, Decimal(0)])
+    # car_id -> [rentals, rental_days, payments, revenue]
+    per_car = defaultdict(lambda: [0, 0, 0, Decimal(0)])
+
+    cursor.execute("""
+        SELECT DATE(b.date_created), c.type, COUNT(*)
+        FROM bookings b
+        JOIN cars c ON b.car_id = c.car_id
+        GROUP BY DATE(b.date_created), c.type
+    """)
+    for day, car_type, count in cursor.fetchall():
+        daily[(_as_date(day), car_type)][0] = count
+
+    # Rentals are expanded into the days they cover, so read them in chunks
+    cursor.execute("""
+        SELECT b.car_id, c.type, b.start_date, b.end_date
+        FROM bookings b
+        JOIN cars c ON b.car_id = c.car_id
+        WHERE b.status IN ('approved', 'completed')
+    """)
+    while True:
+        rows = cursor.fetchmany(10000)
+        for car_id, car_type, start_date, end_date in rows:
+            days = (end_date - start_date).days + 1
+            daily[(start_date, car_type)][1] += 1
+            daily[(start_date, car_type)][2] += days
+            for offset in range(days):
+                daily[(start_date + timedelta(days=offset), car_type)][3] += 1
+            per_car[car_id][0] += 1
+            per_car[car_id][1] += days
+        if len(rows) < 10000:
+            break
+
+    cursor.execute("""
+        SELECT DATE(p.payment_date), c.type, COUNT(*), SUM(p.amount)
+        FROM payments p
+        JOIN bookings b ON p.booking_id = b.booking_id
+        JOIN cars c ON b.car_id = c.car_id
+        GROUP BY DATE(p.payment_date), c.type
+    """)
+    for day, car_type, count, revenue in cursor.fetchall():
+        daily[(_as_date(day), car_type)][4] = count
+        daily[(_as_date(day), car_type)][5] = _as_money(revenue)
+
+    cursor.execute("""
+        SELECT b.car_id, COUNT(*), SUM(p.amount)
+        FROM payments p
+        JOIN bookings b ON p.booking_id = b.booking_id
+        GROUP BY b.car_id
+    """)
+    for car_id, count, revenue in cursor.fetchall():
+        per_car[car_id][2] = count
+        per_car[car_id][3] = _as_money(revenue)
+
+    # Delete and reinsert in one transaction, like the dashboard counters
+    cursor.execute("DELETE FROM rollup_daily")
+    cursor.execute("DELETE FROM rollup_car")
+    cursor.executemany("""
+        INSERT INTO rollup_daily
+        (day, car_type, bookings, rentals, rental_days, rented_car_days, payments, revenue)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, [key + tuple(values) for key, values in daily.items()])
+    cursor.executemany("""
+        INSERT INTO rollup_car (car_id, rentals, rental_days, payments, revenue)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [(car_id,) + tuple(values) for car_id, values in per_car.items()])
+    return len(daily) + len(per_car)
+
+def rebuild_rollups():
+    """Recompute the reporting rollups from the base tables.
+
+    Bookings and payments written while this runs may be counted twice or
+    not at all, so backfill while the system is quiet. Returns the number
+    of rollup rows written, or None on error.
+    """
+    with db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            written = write_rollups(conn.cursor())
+            conn.commit()
+        except DB_ERRORS as err:
+            print(f"Error rebuilding rollups: {err}")
+            conn.rollback()
+            return None
+    _rollups['stale'] = False
+    return written
+
+# User Management Functions
+USER_INSERT_SQL = """INSERT INTO users (full_name, email, password, role, phone, address, license_no) 
+                     VALUES (%s, %s, %s, %s, %s, %s, %s)"""
+PASSWORD_UPGRADE_SQL = "UPDATE users SET password = %s WHERE user_id = %s AND password = %s"
+
+def register_user(full_name, email, password, role='customer', phone=None, address=None, license_no=None):
+    """Register a new user"""
+    # Hash before borrowing a connection so the slow part does not hold one
+    password_hash = hash_password_pooled(password)
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(USER_INSERT_SQL, (full_name, email, password_hash, role, phone, address, license_no))
+                _bump_counter(cursor, 'total_users', 1)
+                conn.commit()
+                print("User registered successfully!")
+                return cursor.lastrowid
+            except DB_ERRORS as err:
+                print(f"Error registering user: {err}")
+                return None
+
+# Only the columns a session needs; looked up through the unique email index
+LOGIN_SQL = """
+    SELECT user_id, full_name, email, password, role, phone, address, license_no
+    FROM users WHERE email = %s
+"""
+
+_sessions = SessionStore()
+
+def login_user(email, password):
+    """Authenticate user login.
+
+    Returns the user dict with a 'session_token' for get_session_user, or
+    None. Plaintext passwords from before hashing are upgraded on success.
+    """
+    with db_connection() as conn:
+        if not conn:
+            return None
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(LOGIN_SQL, (email,))
+        user = cursor.fetchone()
+    if not user:
+        print(f"No user found with email: {email}")
+        return None
+
+    # Verify with the connection already returned to the pool
+    stored = user.pop('password')
+    if not verify_password_pooled(password, stored):
+        print(f"Password mismatch for user: {email}")
+        return None
+
+    if needs_rehash(stored):
+        _upgrade_password(user['user_id'], stored, hash_password_pooled(password))
+
+    user['session_token'] = _sessions.issue(user)
+    print("Login successful!")
+    return user
+
+def _upgrade_password(user_id, old, new):
+    """Replace a legacy or outdated password value, unless it changed meanwhile"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(PASSWORD_UPGRADE_SQL, (new, user_id, old))
+                conn.commit()
+            except DB_ERRORS as err:
+                print(f"Error upgrading password hash: {err}")
+
+def get_session_user(token, roles=None):
+    """Return the user for a live session token (optionally requiring a role), or None"""
+    return _sessions.validate(token, roles) if token else None
+
+def logout_user(token):
+    """End a session, along with every other session of the same user"""
+    user = _sessions.validate(token) if token else None
+    if user:
+        _sessions.revoke_user(user['user_id'])
+    _sessions.revoke(token)
+
+USERS_SQL = """
+    SELECT user_id, full_name, email, role, phone, address, license_no 
+    FROM users
+    ORDER BY user_id DESC
+"""
+
+def list_users():
+    """List all users"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            # Update the query to include phone and other relevant fields
+            cursor.execute(USERS_SQL)
+            users = cursor.fetchall()
+            return users
+
+def stream_users():
+    """Open a RowStream over all users, newest first"""
+    return RowStream(USERS_SQL, version=get_change_version('users'))
+
+# Car Management Functions
+CAR_INSERT_SQL = """INSERT INTO cars (plate_no, brand, model, type, year, color, 
+                    rate_per_day, seats, status, image_path) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+
+def add_car(plate_no, brand, model, type, year, color, rate_per_day, seats=4, status='available', image_path=None):
+    """Add a new car"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(CAR_INSERT_SQL, (plate_no, brand, model, type, year, color, 
+                                                rate_per_day, seats, status, image_path))
+                car_id = cursor.lastrowid
+                _bump_counter(cursor, 'total_cars', 1)
+                conn.commit()
+                print("Car added successfully!")
+                return car_id
+            except DB_ERRORS as err:
+                print(f"Error adding car: {err}")
+                return None
+
+def add_cars_bulk(cars, batch_size=500):
+    """Insert many cars with batched executemany transactions.
+
+    cars is an iterable of (row_ref, values) pairs, where values follow the
+    CAR_INSERT_SQL column order and row_ref identifies the row in error
+    reports. It is consumed lazily, so it can stream from a file. A batch
+    that fails is retried row by row, so a bad row only costs itself.
+    Returns (inserted, errors) with errors as a list of (row_ref, message).
+    """
+    inserted = 0
+    errors = []
+    with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to database")
+        cursor = conn.cursor()
+
+        def flush(batch):
+            try:
+                cursor.executemany(CAR_INSERT_SQL, [values for _, values in batch])
+                _bump_counter(cursor, 'total_cars', len(batch))
+                conn.commit()
+                return len(batch)
+            except DB_ERRORS:
+                conn.rollback()
+
+            # A failed statement only undoes itself, so the good rows of the
+            # batch can still share one transaction
+            count = 0
+            for row_ref, values in batch:
+                try:
+                    cursor.execute(CAR_INSERT_SQL, values)
+                    count += 1
+                except DB_ERRORS as err:
+                    errors.append((row_ref, str(err)))
+            _bump_counter(cursor, 'total_cars', count)
+            conn.commit()
+            return count
+
+        batch = []
+        for row in cars:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                inserted += flush(batch)
+                batch = []
+        if batch:
+            inserted += flush(batch)
+
+    print(f"Bulk import added {inserted} cars ({len(errors)} failed)")
+    return inserted, errors
+
+def _update_car_query(car_id, changes):
+    set_clause = ", ".join([f"{key} = %s" for key in changes.keys()])
+    return f"UPDATE cars SET {set_clause} WHERE car_id = %s", list(changes.values()) + [car_id]
+
+def update_car(car_id, **kwargs):
+    """Update car details"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(*_update_car_query(car_id, kwargs))
+                conn.commit()
+                print("Car updated successfully!")
+                return True
+            except DB_ERRORS as err:
+                print(f"Error updating car: {err}")
+                return False
+
+CARS_SQL = "SELECT * FROM cars ORDER BY created_at DESC"
+BOOKABLE_CARS_SQL = "SELECT * FROM cars WHERE status != 'maintenance' ORDER BY brand, model"
+
+def list_cars():
+    """List all cars, newest first"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(CARS_SQL)
+            return cursor.fetchall()
+
+def stream_cars():
+    """Open a RowStream over all cars, newest first"""
+    return RowStream(CARS_SQL, version=get_change_version('cars'))
+
+def list_bookable_cars():
+    """List cars customers can book (everything not in maintenance)"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(BOOKABLE_CARS_SQL)
+            return cursor.fetchall()
+
+def stream_bookable_cars():
+    """Open a RowStream over the cars customers can book"""
+    return RowStream(BOOKABLE_CARS_SQL)
+
+AVAILABLE_CARS_SQL = "SELECT * FROM cars WHERE status = 'available'"
+
+def list_available_cars():
+    """List all available cars"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(AVAILABLE_CARS_SQL)
+            cars = cursor.fetchall()
+            return cars
+
+# Booking Management Functions
+BOOKING_INSERT_SQL = """INSERT INTO bookings 
+        (customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, 
+         total_amount, status, payment_status, payment_method) 
+         VALUES (%s, %s, %s, %s, %s, %s, %s, 'pending', 'pending', %s)"""
+
+def create_booking(customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, total_amount, payment_method):
+    """Create a new booking"""
+    with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to database")
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute(BOOKING_INSERT_SQL, (customer_id, car_id, start_date, end_date, 
+                               pickup_location, dropoff_location, total_amount, payment_method))
+            booking_id = cursor.lastrowid
+            _rollup_booking_made(cursor, booking_id)
+
+            conn.commit()
+            _availability.add(booking_id, car_id, start_date, end_date)
+            invalidate_booking_cache(customer_ids=[customer_id])
+            return booking_id
+        except DB_ERRORS as err:
+            conn.rollback()
+            raise Exception(f"Database error: {str(err)}")
+
+# Attempts at a reservation that hits a lock error (see backend is_retryable)
+RESERVE_ATTEMPTS = 3
+
+CAR_LOCK_SQL = "SELECT status FROM cars WHERE car_id = %s FOR UPDATE"
+BOOKING_CONFLICT_SQL = """
+    SELECT start_date, end_date
+    FROM bookings
+    WHERE car_id = %s
+    AND status IN ('approved', 'pending')
+    AND start_date <= %s AND end_date >= %s
+    LIMIT 1
+"""
+
+def reserve_car(customer_id, car_id, start_date, end_date, pickup_location, dropoff_location, total_amount, payment_method):
+    """Check availability and create a pending booking in one transaction.
+
+    The car row is locked with SELECT ... FOR UPDATE, so concurrent
+    reservations for the same car are serialized while other cars are
+    unaffected. Returns (booking_id, None) on success or (None, reason)
+    when the car cannot be booked for those dates.
+    """
+    for attempt in range(1, RESERVE_ATTEMPTS + 1):
+        with db_connection() as conn:
+            if not conn:
+                raise Exception("Could not connect to database")
+
+            try:
+                cursor = conn.cursor(dictionary=True)
+                conn.start_transaction()
+
+                cursor.execute(CAR_LOCK_SQL, (car_id,))
+                car = cursor.fetchone()
+                if not car:
+                    conn.rollback()
+                    return None, "Car not found"
+                if car['status'] == 'maintenance':
+                    conn.rollback()
+                    return None, "Car is under maintenance"
+
+                cursor.execute(BOOKING_CONFLICT_SQL, (car_id, end_date, start_date))
+                conflict = cursor.fetchone()
+                if conflict:
+                    conn.rollback()
+                    return None, (f"Car is already booked from {conflict['start_date']} "
+                                  f"to {conflict['end_date']}")
+
+                cursor.execute(BOOKING_INSERT_SQL,
+                    (customer_id, car_id, start_date, end_date,
+                     pickup_location, dropoff_location, total_amount, payment_method))
+                booking_id = cursor.lastrowid
+                _rollup_booking_made(cursor, booking_id)
+                conn.commit()
+            except DB_ERRORS as err:
+                conn.rollback()
+                if get_backend().is_retryable(err) and attempt < RESERVE_ATTEMPTS:
+                    print(f"Retrying reservation after lock error: {err}")
+                    continue
+                raise Exception(f"Database error: {str(err)}")
+
+        _availability.add(booking_id, car_id, start_date, end_date)
+        invalidate_booking_cache(customer_ids=[customer_id])
+        return booking_id, None
+
+BOOKING_LOCK_SQL = """
+    SELECT status, customer_id, car_id, start_date, end_date
+    FROM bookings WHERE booking_id = %s FOR UPDATE
+"""
+BOOKING_STATUS_SQL = "UPDATE bookings SET status = %s WHERE booking_id = %s"
+CAR_STATUS_SQL = "UPDATE cars SET status = %s WHERE car_id = %s"
+# What a booking's new status does to its car
+CAR_STATUS_FOR_BOOKING = {'approved': 'rented', 'rejected': 'available'}
+
+def _lock_pending_bookings_query(booking_ids):
+    placeholders = ", ".join(["%s"] * len(booking_ids))
+    return f"""
+        SELECT booking_id, car_id, start_date, end_date, customer_id
+        FROM bookings
+        WHERE booking_id IN ({placeholders}) AND status = 'pending'
+        FOR UPDATE
+    """, booking_ids
+
+def update_booking_status(booking_id, status):
+    """Update booking status and car availability"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                # Start transaction
+                conn.start_transaction()
+
+                # Lock the booking and remember its old status and dates
+                cursor.execute(BOOKING_LOCK_SQL, (booking_id,))
+                current = cursor.fetchone()
+                if not current:
+                    conn.rollback()
+                    return False
+                old_status, customer_id, interval = current[0], current[1], current[2:]
+
+                # Update booking status
+                cursor.execute(BOOKING_STATUS_SQL, (status, booking_id))
+                _bump_counter(cursor, 'active_bookings',
+                              (status == 'approved') - (old_status == 'approved'))
+                _rollup_rentals(cursor, [interval],
+                                (status in RENTAL_STATUSES) - (old_status in RENTAL_STATUSES))
+
+                # Approved rents the car out; rejected returns it to 'available'
+                car_status = CAR_STATUS_FOR_BOOKING.get(status)
+                if car_status:
+                    cursor.execute(CAR_STATUS_SQL, (car_status, interval[0]))
+
+                # Commit transaction
+                conn.commit()
+
+                if status in ACTIVE_STATUSES:
+                    _availability.add(booking_id, *interval)
+                else:
+                    _availability.remove(booking_id)
+                invalidate_booking_cache([booking_id], [customer_id])
+                return True
+            except DB_ERRORS as err:
+                print(f"Error updating booking: {err}")
+                conn.rollback()
+                return False
+    return False
+
+def update_booking_statuses(booking_ids, status):
+    """Approve or reject many pending bookings in one transaction.
+
+    Bookings that are no longer pending are skipped. Car statuses are
+    updated with one set-based statement. Returns the list of booking ids
+    that changed, or None on error.
+    """
+    booking_ids = list(booking_ids)
+    if not booking_ids:
+        return []
+    with db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            cursor = conn.cursor()
+            conn.start_transaction()
+
+            cursor.execute(*_lock_pending_bookings_query(booking_ids))
+            pending = cursor.fetchall()
+            if not pending:
+                conn.rollback()
+                return []
+
+            ids = [row[0] for row in pending]
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(f"UPDATE bookings SET status = %s WHERE booking_id IN ({placeholders})",
+                           [status] + ids)
+
+            car_status = CAR_STATUS_FOR_BOOKING.get(status)
+            if car_status:
+                car_ids = sorted({row[1] for row in pending})
+                placeholders = ", ".join(["%s"] * len(car_ids))
+                cursor.execute(f"UPDATE cars SET status = %s WHERE car_id IN ({placeholders})",
+                               [car_status] + car_ids)
+            if status == 'approved':
+                _bump_counter(cursor, 'active_bookings', len(ids))
+            if status in RENTAL_STATUSES:
+                _rollup_rentals(cursor, [row[1:4] for row in pending], 1)
+
+            conn.commit()
+        except DB_ERRORS as err:
+            print(f"Error updating bookings: {err}")
+            conn.rollback()
+            return None
+
+    for booking_id, car_id, start_date, end_date, _customer_id in pending:
+        if status in ACTIVE_STATUSES:
+            _availability.add(booking_id, car_id, start_date, end_date)
+        else:
+            _availability.remove(booking_id)
+    invalidate_booking_cache(ids, {row[4] for row in pending})
+    return ids
+
+USER_BOOKINGS_SQL = """
+    SELECT b.*, c.brand, c.model 
+    FROM bookings b 
+    JOIN cars c ON b.car_id = c.car_id 
+    WHERE b.customer_id = %s
+    ORDER BY b.date_created DESC
+"""
+
+ALL_BOOKINGS_SQL = """
+    SELECT b.*, 
+           u.full_name as customer_name,
+           c.brand as car_brand,
+           c.model as car_model
+    FROM bookings b
+    JOIN users u ON b.customer_id = u.user_id
+    JOIN cars c ON b.car_id = c.car_id
+    ORDER BY b.date_created DESC
+"""
+
+def list_user_bookings(user_id):
+    """List bookings for a specific user (served from the booking cache when possible)"""
+    bookings = _booking_cache.get_or_load(('user_bookings', user_id),
+                                          lambda: _load_user_bookings(user_id))
+    return [dict(booking) for booking in bookings] if bookings is not None else None
+
+def _load_user_bookings(user_id):
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(USER_BOOKINGS_SQL, (user_id,))
+            bookings = cursor.fetchall()
+            return bookings
+
+def list_user_bookings_page(user_id, page_size=DEFAULT_PAGE_SIZE, page_token=None):
+    """List one page of a user's bookings, newest first; returns (rows, next_page_token)"""
+    return _fetch_keyset_page(
+        'user_bookings',
+        """SELECT b.*, c.brand, c.model 
+           FROM bookings b 
+           JOIN cars c ON b.car_id = c.car_id""",
+        ["b.customer_id = %s"], [user_id],
+        [('b.date_created', 'date_created'), ('b.booking_id', 'booking_id')],
+        page_size, page_token)
+
+def stream_user_bookings(user_id):
+    """Open a RowStream over a user's bookings, newest first"""
+    return RowStream(USER_BOOKINGS_SQL, (user_id,))
+
+def list_all_bookings():
+    """List every booking with customer and car names, newest first"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(ALL_BOOKINGS_SQL)
+            return cursor.fetchall()
+
+def list_bookings_page(page_size=DEFAULT_PAGE_SIZE, page_token=None):
+    """List one page of all bookings with customer and car names; returns (rows, next_page_token)"""
+    return _fetch_keyset_page(
+        'bookings',
+        """SELECT b.*, 
+                  u.full_name as customer_name,
+                  c.brand as car_brand,
+                  c.model as car_model
+           FROM bookings b
+           JOIN users u ON b.customer_id = u.user_id
+           JOIN cars c ON b.car_id = c.car_id""",
+        [], [],
+        [('b.date_created', 'date_created'), ('b.booking_id', 'booking_id')],
+        page_size, page_token)
+
+def stream_all_bookings():
+    """Open a RowStream over every booking with customer and car names"""
+    return RowStream(ALL_BOOKINGS_SQL, version=get_change_version('bookings'))
+
+# Change tracking: every insert and update of a car, booking or user stamps
+# the row's updated_at from the database clock (schema migration 3), so a
+# listing that is already on screen can fetch just the rows changed since it
+# was loaded. A version is a reading of that clock. A row is stamped when it
+# is written but only shows up once its transaction commits, so each fetch
+# looks CHANGE_WINDOW seconds further back than its version: a write that
+# commits within that long of being stamped is never missed, and rows
+# changed in the last CHANGE_WINDOW seconds are simply listed again (patching
+# a row twice is harmless). Writers never wait on one another for this.
+# Each query returns rows in the same shape as the table's full listing.
+CHANGE_WINDOW = timedelta(seconds=30)   # must exceed the longest write transaction
+
+CHANGES_SQL = {
+    'cars': "SELECT * FROM cars WHERE updated_at > %s",
+    'users': """
+        SELECT user_id, full_name, email, role, phone, address, license_no
+        FROM users
+        WHERE updated_at > %s
+    """,
+    'bookings': """
+        SELECT b.*, 
+               u.full_name as customer_name,
+               c.brand as car_brand,
+               c.model as car_model
+        FROM bookings b
+        JOIN users u ON b.customer_id = u.user_id
+        JOIN cars c ON b.car_id = c.car_id
+        WHERE b.updated_at > %s
+    """,
+}
+# The clock updated_at is stamped from (SQLite triggers stamp UTC, see
+# schema.SQLITE_NOW_MS)
+CHANGE_CLOCK_SQL = {
+    'mysql': "SELECT NOW(6)",
+    'sqlite': "SELECT strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now')",
+}
+
+def _read_change_clock(cursor):
+    cursor.execute(CHANGE_CLOCK_SQL[get_backend().name])
+    value = cursor.fetchone()[0]
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def get_change_version(table):
+    """Return the current change version of a tracked table (None if unavailable)"""
+    if table not in CHANGES_SQL:
+        raise ValueError(f"Unknown tracked table: {table}")
+    with db_connection() as conn:
+        if conn:
+            try:
+                return _read_change_clock(conn.cursor())
+            except DB_ERRORS as err:
+                print(f"Error reading change version: {err}")
+                return None
+
+def list_changes(table, since):
+    """List rows of a tracked table changed after version `since`.
+
+    Returns (rows, version); pass version to the next call. Rows changed
+    within CHANGE_WINDOW before `since` are listed again. Returns None if
+    the database is unavailable.
+    """
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor()
+            # The clock is read first, so a row changed after this reading
+            # is listed by the next call rather than missed
+            version = _read_change_clock(cursor)
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(CHANGES_SQL[table], (since - CHANGE_WINDOW,))
+            return cursor.fetchall(), version
+
+# Server-side search over the admin listings. Filters, sort order and free
+# text are all pushed down to SQL, so only matching rows are ever read.
+# Free text goes through the full-text indexes of schema migration 4:
+# MySQL FULLTEXT indexes, or FTS5 tables named <table>_fts on SQLite.
+FULLTEXT_COLUMNS = {
+    'cars': ('car_id', ['plate_no', 'brand', 'model', 'color']),
+    'users': ('user_id', ['full_name', 'email', 'phone', 'license_no']),
+}
+
+# InnoDB does not index words shorter than innodb_ft_min_token_size (3 by
+# default); shorter terms fall back to prefix LIKE on MySQL
+FULLTEXT_MIN_TOKEN = 3
+
+# InnoDB's default full-text stopwords; a required stopword matches nothing,
+# so MySQL searches ignore them
+FULLTEXT_STOPWORDS = frozenset(
+    'a about an are as at be by com de en for from how i in is it la of on or '
+    'that the this to was what when where who will with und www'.split())
+
+SEARCHES = {
+    'cars': {
+        'select': "SELECT * FROM cars",
+        # (key column, table whose full-text index the free text searches)
+        'text': [('car_id', 'cars')],
+        'filters': {
+            'status': "status = %s",
+            'type': "type = %s",
+            'brand': "brand = %s",
+        },
+        'sorts': {
+            'newest': "created_at DESC, car_id DESC",
+            'brand': "brand, model, car_id",
+            'rate_low': "rate_per_day, car_id",
+            'rate_high': "rate_per_day DESC, car_id DESC",
+        },
+    },
+    'users': {
+        'select': "SELECT user_id, full_name, email, role, phone, address, license_no FROM users",
+        'text': [('user_id', 'users')],
+        'filters': {
+            'role': "role = %s",
+        },
+        'sorts': {
+            'newest': "user_id DESC",
+            'name': "full_name, user_id",
+        },
+    },
+    'bookings': {
+        'select': """SELECT b.*, 
+                            u.full_name as customer_name,
+                            c.brand as car_brand,
+                            c.model as car_model
+                     FROM bookings b
+                     JOIN users u ON b.customer_id = u.user_id
+                     JOIN cars c ON b.car_id = c.car_id""",
+        # Each word may match the customer or the car; a number also
+        # matches the booking id
+        'text': [('b.customer_id', 'users'), ('b.car_id', 'cars')],
+        'id_column': 'b.booking_id',
+        'filters': {
+            'status': "b.status = %s",
+            'payment_status': "b.payment_status = %s",
+            'customer_id': "b.customer_id = %s",
+            'car_id': "b.car_id = %s",
+            'start_from': "b.start_date >= %s",
+            'start_to': "b.start_date <= %s",
+        },
+        'sorts': {
+            'newest': "b.date_created DESC, b.booking_id DESC",
+            'start_date': "b.start_date, b.booking_id",
+            'amount_high': "b.total_amount DESC, b.booking_id DESC",
+        },
+    },
+}
+
+def search_terms(text):
+    """Split free text into lower-case search words"""
+    return re.findall(r'\w+', (text or '').lower())
+
+def _fulltext_keys(table, terms, sqlite):
+    """Return (sql, params) selecting the keys of rows of table matching every term"""
+    key, columns = FULLTEXT_COLUMNS[table]
+    if sqlite:
+        # Quoted prefix queries: words are \w+ only, so nothing needs escaping
+        return (f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s",
+                [' '.join(f'"{term}"*' for term in terms)])
+    conditions, params = [], []
+    terms = [term for term in terms if term not in FULLTEXT_STOPWORDS]
+    indexed = [term for term in terms if len(term) >= FULLTEXT_MIN_TOKEN]
+    if indexed:
+        conditions.append(f"MATCH({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)")
+        params.append(' '.join(f"+{term}*" for term in indexed))
+    for term in terms:
+        if len(term) < FULLTEXT_MIN_TOKEN:
+            conditions.append('(' + ' OR '.join(f"{column} LIKE %s" for column in columns) + ')')
+            params.extend([term + '%'] * len(columns))
+    return f"SELECT {key} FROM {table} WHERE {' AND '.join(conditions or ['1 = 1'])}", params
+
+def build_search_query(listing, text=None, filters=None, sort=None):
+    """Build (sql, params) for a search over one of the SEARCHES listings.
+
+    filters maps filter names to values (empty values are ignored) and sort
+    names one of the listing's sort orders, defaulting to the first.
+    Raises ValueError for unknown listings, filters or sorts.
+    """
+    search = SEARCHES.get(listing)
+    if search is None:
+        raise ValueError(f"Unknown listing: {listing}")
+    sqlite = get_backend().name == 'sqlite'
+    conditions, params = [], []
+
+    for name, value in (filters or {}).items():
+        if name not in search['filters']:
+            raise ValueError(f"Unknown filter for {listing}: {name}")
+        if value is not None and value != '':
+            conditions.append(search['filters'][name])
+            params.append(value)
+
+    terms = search_terms(text)
+    if terms:
+        groups = [terms] if len(search['text']) == 1 else [[term] for term in terms]
+        for group in groups:
+            matches = []
+            for column, table in search['text']:
+                sql, sql_params = _fulltext_keys(table, group, sqlite)
+                matches.append(f"{column} IN ({sql})")
+                params.extend(sql_params)
+            if search.get('id_column') and len(group) == 1 and group[0].isdigit():
+                matches.append(f"{search['id_column']} = %s")
+                params.append(int(group[0]))
+            conditions.append('(' + ' OR '.join(matches) + ')')
+
+    sorts = search['sorts']
+    if sort is None:
+        sort = next(iter(sorts))
+    if sort not in sorts:
+        raise ValueError(f"Unknown sort for {listing}: {sort}")
+
+    sql = search['select']
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return f"{sql} ORDER BY {sorts[sort]}", params
+
+def search_listing(listing, text=None, filters=None, sort=None, limit=MAX_PAGE_SIZE):
+    """Return up to `limit` rows of a listing matching the search"""
+    sql, params = build_search_query(listing, text, filters, sort)
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(f"{sql} LIMIT %s", params + [int(limit)])
+            return cursor.fetchall()
+
+# The only sort order changed rows can be patched into: new rows go to the
+# top (see RowTableModel.apply_changes), and updates never move a row since
+# the order is by creation
+CHANGES_SORT = 'newest'
+# The row fields each listing's CHANGES_SORT order is by, newest first
+CHANGE_ORDER = {
+    'cars': ('created_at', 'car_id'),
+    'users': ('user_id',),
+    'bookings': ('date_created', 'booking_id'),
+}
+
+def stream_search(listing, text=None, filters=None, sort=None):
+    """Open a RowStream over every row of a listing matching the search.
+
+    An unfiltered search in CHANGES_SORT order keeps the listing's change
+    version, so it can be refreshed with list_changes like the full
+    listing. Any other search has no version and is reloaded instead.
+    """
+    sql, params = build_search_query(listing, text, filters, sort)
+    filtered = search_terms(text) or any(value not in (None, '') for value in (filters or {}).values())
+    if sort is None:
+        sort = next(iter(SEARCHES[listing]['sorts']))
+    version = None if filtered or sort != CHANGES_SORT else get_change_version(listing)
+    return RowStream(sql, params, version=version)
+
+# Availability index of approved and pending bookings (see availability.py)
+_availability = AvailabilityIndex()
+
+ACTIVE_BOOKINGS_SQL = """
+    SELECT booking_id, car_id, start_date, end_date
+    FROM bookings
+    WHERE status IN ('approved', 'pending')
+    AND end_date >= CURDATE()
+"""
+
+def sync_availability_index():
+    """Reload the availability index from the database.
+
+    Only bookings that have not ended yet are loaded, since new bookings
+    cannot start in the past.
+    """
+    with db_connection() as conn:
+        if not conn:
+            return False
+        cursor = conn.cursor()
+
+        def fetch():
+            cursor.execute(ACTIVE_BOOKINGS_SQL)
+            return cursor.fetchall()
+
+        _availability.rebuild(fetch)
+        return True
+
+def get_availability_index():
+    """Return the availability index, resyncing it first if it is stale"""
+    if _availability.is_stale() and not sync_availability_index():
+        raise Exception("Could not connect to database")
+    return _availability
+
+def check_car_availability(car_id, start_date, end_date):
+    """Return True if no approved or pending booking overlaps the given dates"""
+    return get_availability_index().is_available(car_id, start_date, end_date)
+
+def search_available_cars(start_date, end_date, car_type=None, min_seats=None, max_rate=None):
+    """List every car free for the whole date range, with optional filters.
+
+    Cars are fetched with one query; the date check runs against the
+    availability index's day-occupancy bitmaps rather than per-car queries.
+    Raises ValueError if the range ends before it starts.
+    """
+    sql, params = _bookable_cars_query(start_date, end_date, car_type, min_seats, max_rate)
+    index = get_availability_index()
+    with db_connection() as conn:
+        if not conn:
+            return None
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, params)
+        cars = cursor.fetchall()
+    return _free_cars(index, cars, start_date, end_date)
+
+def _bookable_cars_query(start_date, end_date, car_type, min_seats, max_rate):
+    """(sql, params) of the bookable cars matching search_available_cars' filters"""
+    if to_day(end_date) < to_day(start_date):
+        raise ValueError("End date is before start date")
+    conditions = ["status != 'maintenance'"]
+    params = []
+    if car_type:
+        conditions.append("type = %s")
+        params.append(car_type)
+    if min_seats:
+        conditions.append("seats >= %s")
+        params.append(min_seats)
+    if max_rate:
+        conditions.append("rate_per_day <= %s")
+        params.append(max_rate)
+    return f"SELECT * FROM cars WHERE {' AND '.join(conditions)} ORDER BY brand, model", params
+
+def _free_cars(index, cars, start_date, end_date):
+    free = set(index.free_cars([car['car_id'] for car in cars], start_date, end_date))
+    return [car for car in cars if car['car_id'] in free]
+
+# Payment Functions
+PAYMENT_INSERT_SQL = "INSERT INTO payments (booking_id, amount) VALUES (%s, %s)"
+BOOKING_PAID_SQL = "UPDATE bookings SET payment_status = 'paid' WHERE booking_id = %s"
+BOOKING_CUSTOMER_SQL = "SELECT customer_id FROM bookings WHERE booking_id = %s"
+PAYMENTS_SQL = "SELECT * FROM payments"
+
+def record_payment(booking_id, amount):
+    """Record a payment for a booking"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(PAYMENT_INSERT_SQL, (booking_id, amount))
+                payment_id = cursor.lastrowid
+                cursor.execute(BOOKING_PAID_SQL, (booking_id,))
+                cursor.execute(BOOKING_CUSTOMER_SQL, (booking_id,))
+                booking = cursor.fetchone()
+                _rollup_payment(cursor, payment_id)
+                conn.commit()
+                invalidate_booking_cache([booking_id], [booking[0]] if booking else [])
+                print("Payment recorded successfully!")
+                return True
+            except DB_ERRORS as err:
+                print(f"Error recording payment: {err}")
+                return False
+
+def get_payment_history(booking_id=None):
+    """Get payment history, optionally filtered by booking_id"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            if booking_id:
+                cursor.execute(PAYMENTS_SQL + " WHERE booking_id = %s", (booking_id,))
+            else:
+                cursor.execute(PAYMENTS_SQL)
+            payments = cursor.fetchall()
+            return payments
+
+def get_payment_history_page(booking_id=None, page_size=DEFAULT_PAGE_SIZE, page_token=None):
+    """Get one page of payments, newest first, optionally filtered by booking_id.
+
+    Returns (rows, next_page_token).
+    """
+    conditions, params = [], []
+    if booking_id:
+        conditions.append("booking_id = %s")
+        params.append(booking_id)
+    return _fetch_keyset_page(
+        'payments', "SELECT * FROM payments", conditions, params,
+        [('payment_id', 'payment_id')],
+        page_size, page_token)
+
+# Maintenance Functions
+def log_maintenance(car_id, description):
+    """Log a maintenance record for a car"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO maintenance (car_id, description) VALUES (%s, %s)", 
+                             (car_id, description))
+                conn.commit()
+                print("Maintenance record logged successfully!")
+                return cursor.lastrowid
+            except DB_ERRORS as err:
+                print(f"Error logging maintenance: {err}")
+                return None
+
+CAR_MAINTENANCE_SQL = "UPDATE cars SET status = 'maintenance' WHERE car_id = %s"
+MAINTENANCE_INSERT_SQL = """
+    INSERT INTO maintenance (car_id, description, date_created)
+    VALUES (%s, %s, NOW())
+"""
+MAINTENANCE_SQL = """
+    SELECT m.*, c.brand, c.model 
+    FROM maintenance m 
+    JOIN cars c ON m.car_id = c.car_id
+"""
+
+def create_maintenance_record(car_id, description):
+    """Create a maintenance record for a car"""
+    with db_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                # Start transaction
+                conn.start_transaction()
+
+                # Update car status
+                cursor.execute(CAR_MAINTENANCE_SQL, (car_id,))
+
+                # Create maintenance record
+                cursor.execute(MAINTENANCE_INSERT_SQL, (car_id, description))
+
+                conn.commit()
+                return True
+            except DB_ERRORS as err:
+                conn.rollback()
+                print(f"Error creating maintenance record: {err}")
+                return False
+    return False
+
+def list_maintenance_records(car_id=None):
+    """List maintenance records, optionally filtered by car_id"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            if car_id:
+                cursor.execute(MAINTENANCE_SQL + " WHERE m.car_id = %s", (car_id,))
+            else:
+                cursor.execute(MAINTENANCE_SQL)
+            records = cursor.fetchall()
+            return records
+
+def list_maintenance_records_page(car_id=None, page_size=DEFAULT_PAGE_SIZE, page_token=None):
+    """List one page of maintenance records, newest first, optionally filtered by car_id.
+
+    Returns (rows, next_page_token).
+    """
+    conditions, params = [], []
+    if car_id:
+        conditions.append("m.car_id = %s")
+        params.append(car_id)
+    return _fetch_keyset_page(
+        'maintenance',
+        """SELECT m.*, c.brand, c.model 
+           FROM maintenance m 
+           JOIN cars c ON m.car_id = c.car_id""",
+        conditions, params,
+        [('m.date_created', 'date_created'), ('m.maintenance_id', 'maintenance_id')],
+        page_size, page_token)
+
+def get_booking_details(booking_id):
+    """Get complete booking details including customer and car information.
+
+    Served from the booking cache when possible.
+    """
+    details = _booking_cache.get_or_load(('booking', booking_id),
+                                         lambda: _load_booking_details(booking_id))
+    return dict(details) if details is not None else None
+
+BOOKING_DETAILS_SQL = """
+    SELECT 
+        b.*, 
+        u.full_name, u.email, u.phone, u.license_no,
+        c.brand, c.model, c.plate_no, c.color, c.rate_per_day
+    FROM bookings b
+    JOIN users u ON b.customer_id = u.user_id
+    JOIN cars c ON b.car_id = c.car_id
+"""
+
+def _load_booking_details(booking_id):
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(BOOKING_DETAILS_SQL + " WHERE b.booking_id = %s", (booking_id,))
+            return cursor.fetchone()
+    return None
+
+def stream_paid_booking_details(since=None, until=None):
+    """Open a RowStream over the full details of every paid booking.
+
+    since/until optionally limit the bookings to those created in
+    [since, until); rows come back in booking id order.
+    """
+    conditions = ["b.payment_status = 'paid'"]
+    params = []
+    if since:
+        conditions.append("b.date_created >= %s")
+        params.append(since)
+    if until:
+        conditions.append("b.date_created < %s")
+        params.append(until)
+    sql = BOOKING_DETAILS_SQL + " WHERE " + " AND ".join(conditions) + " ORDER BY b.booking_id"
+    return RowStream(sql, tuple(params))
+
+# Table exports (see data_export.py). Rows are read in primary key order, so
+# an interrupted export can resume after the last key it wrote.
+EXPORT_TABLES = {
+    # table: (primary key, timestamp column for since/until)
+    'bookings': ('booking_id', 'date_created'),
+    'payments': ('payment_id', 'payment_date'),
+    'maintenance': ('maintenance_id', 'date_created'),
+}
+
+def stream_table_export(table, after_key=None, since=None, until=None):
+    """Open a RowStream over an export table in primary key order.
+
+    after_key skips rows up to and including that key; since/until limit
+    the rows to those timestamped in [since, until).
+    """
+    return RowStream(*_table_export_query(table, after_key, since, until))
+
+def _table_export_query(table, after_key, since, until):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    key, timestamp = EXPORT_TABLES[table]
+    conditions = []
+    params = []
+    if after_key is not None:
+        conditions.append(f"{key} > %s")
+        params.append(after_key)
+    if since:
+        conditions.append(f"{timestamp} >= %s")
+        params.append(since)
+    if until:
+        conditions.append(f"{timestamp} < %s")
+        params.append(until)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return f"SELECT * FROM {table}{where} ORDER BY {key}", tuple(params)
+
+def iter_table_rows(table, after_key=None, since=None, until=None, chunk_size=1000):
+    """Yield the rows of an export table one at a time, in primary key order.
+
+    Rows come through an unbuffered cursor chunk by chunk, so memory use
+    does not grow with the table. Closing the generator early releases the
+    connection.
+    """
+    stream = stream_table_export(table, after_key, since, until)
+    try:
+        while not stream.exhausted:
+            yield from stream.fetch(chunk_size)
+    finally:
+        stream.close()
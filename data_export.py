@@ -0,0 +1,219 @@
+"""
+Car Rental System - Table export
+Streams bookings, payments or maintenance records to CSV or JSON lines,
+optionally gzipped. Rows come through an unbuffered cursor and go straight
+to the file, so memory use stays flat however large the table is. Long
+exports write a checkpoint every so many rows and can be resumed from it.
+
+Usage: python data_export.py TABLE OUT [--format csv|jsonl] [--gzip]
+                             [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+                             [--checkpoint-every 50000] [--resume]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from car_rental_system import EXPORT_TABLES, iter_table_rows
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+CHECKPOINT_EVERY = 50000   # rows between checkpoints
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def detect_format(path, fmt=None, compress=None):
+    """Work out (format, gzip) from explicit options or the file name"""
+    name = path.lower()
+    if compress is None:
+        compress = name.endswith('.gz')
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if fmt is None:
+        fmt = 'jsonl' if name.endswith(('.jsonl', '.json')) else 'csv'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return fmt, compress
+
+
+class _Output:
+    """Export file that can be cut back to its last checkpoint.
+
+    With gzip, each checkpoint ends a gzip member and starts a new one, so
+    the file is complete gzip at every checkpointed offset; gzip readers
+    decompress consecutive members as one stream.
+    """
+
+    def __init__(self, path, compress, offset=0):
+        self.compress = compress
+        if offset:
+            if os.path.getsize(path) < offset:
+                raise ValueError(f"{path} is shorter than its checkpoint")
+            self.raw = open(path, 'r+b')
+            # Drop anything written after the checkpoint
+            self.raw.truncate(offset)
+            self.raw.seek(offset)
+        else:
+            self.raw = open(path, 'wb')
+        self._open()
+
+    def _open(self):
+        binary = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6) if self.compress else self.raw
+        self.text = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        self.csv = csv.writer(self.text)
+
+    def checkpoint(self):
+        """Make everything written so far durable; returns the offset to resume from"""
+        self.text.flush()
+        if self.compress:
+            # Closing the member leaves the underlying file open
+            self.text.detach().close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        offset = self.raw.tell()
+        if self.compress:
+            # The next member's header is written as soon as it is opened
+            self._open()
+        return offset
+
+    def close(self):
+        self.text.close()
+        self.raw.close()
+
+
+def _read_checkpoint(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_checkpoint(path, state):
+    # Write to a temporary name first so a crash never leaves a partial checkpoint
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+
+def export_table(table, out, fmt=None, compress=None, since=None, until=None,
+                 checkpoint_every=CHECKPOINT_EVERY, resume=False):
+    """Export a table (see EXPORT_TABLES) to a CSV or JSON-lines file.
+
+    Progress is checkpointed to OUT.checkpoint every checkpoint_every rows.
+    With resume, an export continues from that checkpoint, provided it was
+    started with the same table, format and date range. Otherwise it starts
+    over. The checkpoint is removed once the export completes. Returns a
+    report dict.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    fmt, compress = detect_format(out, fmt, compress)
+    key = EXPORT_TABLES[table][0]
+    checkpoint_path = f"{out}.checkpoint"
+    settings = {'table': table, 'format': fmt, 'gzip': compress,
+                'since': str(since) if since else None, 'until': str(until) if until else None}
+
+    state = {'last_key': None, 'rows': 0, 'offset': 0, 'columns': None}
+    if resume and os.path.exists(checkpoint_path):
+        saved = _read_checkpoint(checkpoint_path)
+        if {name: saved.get(name) for name in settings} != settings:
+            raise ValueError(f"{checkpoint_path} belongs to a different export")
+        state = {name: saved[name] for name in state}
+    resumed_from = state['rows']
+
+    start_time = time.perf_counter()
+    output = _Output(out, compress, state['offset'])
+    columns = state['columns']
+    rows = state['rows']
+    last_key = state['last_key']
+    pending = 0
+    try:
+        for row in iter_table_rows(table, last_key, since, until):
+            if columns is None:
+                columns = list(row)
+                if fmt == 'csv':
+                    output.csv.writerow(columns)
+            if fmt == 'csv':
+                output.csv.writerow([_csv_value(row[column]) for column in columns])
+            else:
+                output.text.write(json.dumps(row, default=_json_default, separators=(',', ':')))
+                output.text.write('\n')
+            last_key = row[key]
+            rows += 1
+            pending += 1
+            if pending >= checkpoint_every:
+                offset = output.checkpoint()
+                _write_checkpoint(checkpoint_path, dict(settings, last_key=last_key, rows=rows,
+                                                        offset=offset, columns=columns))
+                pending = 0
+    finally:
+        output.close()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    elapsed = time.perf_counter() - start_time
+    exported = rows - resumed_from
+    return {
+        'table': table,
+        'format': fmt,
+        'gzip': compress,
+        'rows': rows,
+        'resumed_from': resumed_from,
+        'bytes': os.path.getsize(out),
+        'elapsed': elapsed,
+        'rows_per_second': exported / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export a table to CSV or JSON lines')
+    parser.add_argument('table', choices=sorted(EXPORT_TABLES))
+    parser.add_argument('out', help='output file; a .gz suffix implies --gzip')
+    parser.add_argument('--format', choices=EXPORT_FORMATS,
+                        help='default: from the file name (.jsonl/.json or csv)')
+    parser.add_argument('--gzip', action='store_true', default=None, help='gzip the output')
+    parser.add_argument('--since', help='only rows timestamped on or after this date')
+    parser.add_argument('--until', help='only rows timestamped before this date')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f'rows between checkpoints (default {CHECKPOINT_EVERY})')
+    parser.add_argument('--resume', action='store_true', help='continue from OUT.checkpoint')
+    args = parser.parse_args(argv)
+
+    try:
+        report = export_table(args.table, args.out, args.format, args.gzip, args.since, args.until,
+                              args.checkpoint_every, args.resume)
+    except Exception as e:
+        print(f"Export failed: {e}")
+        if os.path.exists(f"{args.out}.checkpoint"):
+            print("Run again with --resume to continue from the last checkpoint")
+        return 1
+
+    resumed = f" (resumed after {report['resumed_from']})" if report['resumed_from'] else ""
+    print(f"Exported {report['rows']} {report['table']} rows{resumed} to {args.out} "
+          f"({report['bytes'] / 1024 / 1024:.1f} MB) in {report['elapsed']:.2f}s "
+          f"({report['rows_per_second']:.0f} rows/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
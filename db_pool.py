@@ -0,0 +1,404 @@
+"""
+Car Rental System - Database connection pool
+Keeps a bounded set of database connections open so callers skip the
+TCP/auth handshake (or file open) on every query. AsyncConnectionPool does
+the same for the async backends, with waiting borrowers suspended instead
+of blocked.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+
+class PoolError(Exception):
+    """Raised when no connection can be borrowed from the pool"""
+
+
+def _new_stats():
+    return {
+        'borrows': 0,
+        'created': 0,
+        'recycled': 0,
+        'failed_health_checks': 0,
+        'exhaustion_events': 0,
+        'waits': 0,
+        'total_wait_time': 0.0,
+        'max_wait_time': 0.0,
+    }
+
+
+def _stats_snapshot(pool):
+    stats = dict(pool._stats)
+    stats['size'] = pool.size
+    stats['open'] = pool._open
+    stats['idle'] = len(pool._idle)
+    stats['in_use'] = pool._open - len(pool._idle)
+    stats['avg_wait_time'] = (stats['total_wait_time'] / stats['borrows']
+                              if stats['borrows'] else 0.0)
+    return stats
+
+
+class PooledConnection:
+    """Wrapper around a raw connection that returns it to the pool on close()"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise PoolError("Connection has already been returned to the pool")
+        return getattr(self._raw, name)
+
+    def close(self):
+        """Give the connection back to the pool instead of closing it"""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections with health checks and recycling"""
+
+    def __init__(self, backend, size=5, timeout=10, recycle=1800, ping_after=5, errors=(Exception,)):
+        # backend: object whose connect() opens a new raw connection
+        # errors: exception types the backend's connections raise
+        # size: maximum number of open connections
+        # timeout: seconds to wait for a free connection before giving up
+        # recycle: seconds after which a connection is closed and replaced
+        # ping_after: idle seconds after which a borrowed connection is pinged
+        self.backend = backend
+        self.errors = tuple(errors)
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (raw connection, created_at, returned_at)
+        self._created_at = {}
+        self._open = 0
+        self._closed = False
+
+        self._stats = _new_stats()
+
+    def _connect(self):
+        raw = self.backend.connect()
+        with self._lock:
+            self._created_at[id(raw)] = time.monotonic()
+            self._stats['created'] += 1
+        return raw
+
+    def _discard(self, raw):
+        """Close a connection and free its slot (caller holds the lock)"""
+        self._created_at.pop(id(raw), None)
+        self._open -= 1
+        self._lock.notify()
+        try:
+            raw.close()
+        except self.errors:
+            pass
+
+    def _is_stale(self, raw, now):
+        return now - self._created_at.get(id(raw), now) > self.recycle
+
+    def _is_healthy(self, raw, returned_at, now):
+        if now - returned_at < self.ping_after:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except self.errors:
+            return False
+
+    def get_connection(self):
+        """Borrow a connection, waiting up to `timeout` seconds if the pool is full"""
+        start = time.monotonic()
+        while True:
+            raw, returned_at = self._checkout(start)
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except self.errors:
+                    with self._lock:
+                        self._open -= 1
+                        self._lock.notify()
+                    raise
+                break
+
+            # Health checks happen outside the lock so a slow ping never
+            # blocks other borrowers
+            now = time.monotonic()
+            if self._is_stale(raw, now):
+                with self._lock:
+                    self._stats['recycled'] += 1
+                    self._discard(raw)
+                continue
+            if not self._is_healthy(raw, returned_at, now):
+                with self._lock:
+                    self._stats['failed_health_checks'] += 1
+                    self._discard(raw)
+                continue
+            break
+
+        wait_time = time.monotonic() - start
+        with self._lock:
+            self._stats['borrows'] += 1
+            self._stats['total_wait_time'] += wait_time
+            self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait_time)
+        return PooledConnection(self, raw)
+
+    def _checkout(self, start):
+        """Take an idle connection, or reserve a slot for a new one (raw is None)"""
+        waited = False
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle:
+                    raw, _created, returned_at = self._idle.pop()
+                    return raw, returned_at
+                if self._open < self.size:
+                    self._open += 1
+                    return None, None
+
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._stats['exhaustion_events'] += 1
+                    raise PoolError(
+                        f"No free connection after {self.timeout}s (pool size {self.size})")
+                if not waited:
+                    waited = True
+                    self._stats['waits'] += 1
+                self._lock.wait(remaining)
+
+    def _release(self, raw):
+        # Never hand the next borrower an open transaction or a stale snapshot
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            healthy = True
+        except self.errors:
+            healthy = False
+
+        with self._lock:
+            now = time.monotonic()
+            if self._closed or not healthy:
+                self._discard(raw)
+            elif self._is_stale(raw, now):
+                self._stats['recycled'] += 1
+                self._discard(raw)
+            else:
+                self._idle.append((raw, self._created_at.get(id(raw), now), now))
+                self._lock.notify()
+
+    def stats(self):
+        """Return a snapshot of pool usage statistics"""
+        with self._lock:
+            return _stats_snapshot(self)
+
+    def close(self):
+        """Close every idle connection; borrowed ones are closed when returned"""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                raw, _created, _returned = self._idle.pop()
+                self._discard(raw)
+            self._lock.notify_all()
+
+
+class AsyncPooledConnection:
+    """PooledConnection for an AsyncConnectionPool; await close() to return it"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise PoolError("Connection has already been returned to the pool")
+        return getattr(self._raw, name)
+
+    async def close(self, discard=False):
+        """Give the connection back to the pool, or close it for good with discard"""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            await self._pool._release(raw, discard)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class AsyncConnectionPool:
+    """ConnectionPool for an async backend, used from a single event loop.
+
+    Borrowers past `size` wait their turn in order without holding a
+    thread, so the pool alone bounds how many queries are in flight.
+    Everything between two awaits runs uninterrupted on the loop, which
+    takes the place of ConnectionPool's lock.
+    """
+
+    def __init__(self, backend, size=5, timeout=10, recycle=1800, ping_after=5, errors=(Exception,)):
+        # Same parameters as ConnectionPool; backend.connect() is a coroutine
+        self.backend = backend
+        self.errors = tuple(errors)
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._idle = deque()  # (raw connection, created_at, returned_at)
+        self._created_at = {}
+        self._waiters = deque()  # futures of borrowers waiting for a connection
+        self._open = 0
+        self._closed = False
+        self._stats = _new_stats()
+
+    def _wake(self):
+        """Let the longest waiting borrower retry"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _discard(self, raw):
+        """Close a connection and free its slot"""
+        # The slot is freed before the first await, so a cancelled close
+        # cannot leak it
+        self._created_at.pop(id(raw), None)
+        self._open -= 1
+        self._wake()
+        try:
+            await raw.close()
+        except self.errors:
+            pass
+
+    _is_stale = ConnectionPool._is_stale
+
+    async def _is_healthy(self, raw, returned_at, now):
+        if now - returned_at < self.ping_after:
+            return True
+        try:
+            await raw.ping(reconnect=False)
+            return True
+        except self.errors:
+            return False
+
+    async def get_connection(self):
+        """Borrow a connection, waiting up to `timeout` seconds if the pool is full"""
+        start = time.monotonic()
+        while True:
+            raw, returned_at = await self._checkout(start)
+            if raw is None:
+                try:
+                    raw = await self.backend.connect()
+                except BaseException:
+                    self._open -= 1
+                    self._wake()
+                    raise
+                self._created_at[id(raw)] = time.monotonic()
+                self._stats['created'] += 1
+                break
+
+            now = time.monotonic()
+            if self._is_stale(raw, now):
+                self._stats['recycled'] += 1
+                await self._discard(raw)
+                continue
+            try:
+                healthy = await self._is_healthy(raw, returned_at, now)
+            except BaseException:
+                await self._discard(raw)
+                raise
+            if not healthy:
+                self._stats['failed_health_checks'] += 1
+                await self._discard(raw)
+                continue
+            break
+
+        wait_time = time.monotonic() - start
+        self._stats['borrows'] += 1
+        self._stats['total_wait_time'] += wait_time
+        self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait_time)
+        return AsyncPooledConnection(self, raw)
+
+    async def _checkout(self, start):
+        """Take an idle connection, or reserve a slot for a new one (raw is None)"""
+        waited = False
+        while True:
+            if self._closed:
+                raise PoolError("Connection pool is closed")
+            if self._idle:
+                raw, _created, returned_at = self._idle.pop()
+                return raw, returned_at
+            if self._open < self.size:
+                self._open += 1
+                return None, None
+
+            remaining = self.timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                self._stats['exhaustion_events'] += 1
+                raise PoolError(
+                    f"No free connection after {self.timeout}s (pool size {self.size})")
+            if not waited:
+                waited = True
+                self._stats['waits'] += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # Pass on a wake-up that arrived together with the cancellation
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+
+    async def _release(self, raw, discard=False):
+        # Never hand the next borrower an open transaction or a stale snapshot
+        healthy = not discard
+        if healthy:
+            try:
+                if raw.in_transaction:
+                    await raw.rollback()
+            except self.errors:
+                healthy = False
+            except BaseException:
+                await self._discard(raw)
+                raise
+
+        now = time.monotonic()
+        if self._closed or not healthy:
+            await self._discard(raw)
+        elif self._is_stale(raw, now):
+            self._stats['recycled'] += 1
+            await self._discard(raw)
+        else:
+            self._idle.append((raw, self._created_at.get(id(raw), now), now))
+            self._wake()
+
+    def stats(self):
+        """Return a snapshot of pool usage statistics"""
+        return _stats_snapshot(self)
+
+    async def close(self):
+        """Close every idle connection; borrowed ones are closed when returned"""
+        self._closed = True
+        while self._waiters:
+            self._wake()
+        while self._idle:
+            raw, _created, _returned = self._idle.pop()
+            await self._discard(raw)
@@ -0,0 +1,369 @@
+"""
+Car Rental System - Query instrumentation
+Wraps backend connections so every cursor.execute is timed and attributed to
+the data-layer function that issued it. Latencies go into per-function
+histograms, and queries slower than a threshold are written to a slow-query
+log with their parameters redacted.
+"""
+
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+import weakref
+
+INSTRUMENTATION_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 200,               # queries at least this slow are logged
+    # Relative paths are taken from the application directory, not the
+    # working directory
+    'slow_query_log': os.environ.get('CAR_RENTAL_SLOW_QUERY_LOG', 'slow_queries.log'),
+}
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is unbounded
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Modules that only carry queries for their callers (connections, backends,
+# pooling, caching); attribution looks past their frames
+PLUMBING_MODULES = frozenset({'instrumentation', 'backends', 'db_pool', 'query_cache'})
+
+_lock = threading.Lock()
+_stats = {}   # function name -> stats dict (see _new_stats)
+
+_slow_log = logging.getLogger('car_rental.slow_queries')
+_slow_log.propagate = False
+_slow_log_lock = threading.Lock()
+
+
+def _new_stats():
+    return {'calls': 0, 'errors': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'buckets': [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _is_plumbing(module):
+    # The standard library (threading, concurrent.futures, contextlib, ...)
+    # only ever runs app code on someone's behalf
+    return module in PLUMBING_MODULES or module.partition('.')[0] in sys.stdlib_module_names
+
+
+def _calling_function():
+    """Name the public function behind the current query.
+
+    Walks out from the query past the plumbing modules, however many
+    wrapper layers there are. Private helpers and lambdas are skipped, so
+    a query issued by _load_booking_details through the cache counts
+    towards get_booking_details.
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not _is_plumbing(module):
+            name = frame.f_code.co_name
+            qualified = f"{module}.{name}"
+            if fallback is None:
+                fallback = qualified
+            if not name.startswith(('_', '<')):
+                return qualified
+        frame = frame.f_back
+    return fallback or 'unknown'
+
+
+def _redact(params):
+    """Show only the type of each parameter value"""
+    if not params:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f"{key}: <{type(value).__name__}>" for key, value in params.items()) + '}'
+    return '(' + ', '.join(f"<{type(value).__name__}>" for value in params) + ')'
+
+
+def slow_query_log_path():
+    """Return the absolute path of the slow-query log"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), INSTRUMENTATION_CONFIG['slow_query_log'])
+
+
+def _log_slow_query(function, elapsed_ms, sql, params):
+    if not _slow_log.handlers:
+        # Queries finish on many threads; only the first may add the handler
+        with _slow_log_lock:
+            if not _slow_log.handlers:
+                handler = logging.FileHandler(slow_query_log_path(), encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+                _slow_log.setLevel(logging.INFO)
+                _slow_log.addHandler(handler)
+    _slow_log.info("%.1fms %s %s params=%s", elapsed_ms, function,
+                   ' '.join(sql.split()), _redact(params))
+
+
+def record_query(function, elapsed_ms, rows=0, error=False):
+    """Add one query's timing to its function's histogram"""
+    with _lock:
+        stats = _stats.get(function)
+        if stats is None:
+            stats = _stats[function] = _new_stats()
+        stats['calls'] += 1
+        stats['errors'] += error
+        stats['rows'] += rows
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['buckets'][bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+
+def _percentile(buckets, calls, pct):
+    """Upper bound of the histogram bucket holding the given percentile"""
+    target = calls * pct / 100
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if count and seen >= target:
+            return BUCKETS_MS[index] if index < len(BUCKETS_MS) else float('inf')
+    return None
+
+
+def get_query_stats():
+    """Return per-function query statistics.
+
+    Percentiles are bucket upper bounds from the latency histogram, so they
+    are estimates with the resolution of BUCKETS_MS.
+    """
+    with _lock:
+        snapshot = {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in _stats.items()}
+    for stats in snapshot.values():
+        calls = stats['calls']
+        stats['mean_ms'] = stats['total_ms'] / calls if calls else 0.0
+        for pct in (50, 95, 99):
+            stats[f"p{pct}_ms"] = _percentile(stats['buckets'], calls, pct)
+        stats['buckets'] = dict(zip([f"<={bound}" for bound in BUCKETS_MS] + ['>5000'],
+                                    stats['buckets']))
+    return snapshot
+
+
+def reset_query_stats():
+    with _lock:
+        _stats.clear()
+
+
+def set_slow_query_threshold(milliseconds):
+    INSTRUMENTATION_CONFIG['slow_query_ms'] = milliseconds
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times each query from execute until its rows are read.
+
+    Unbuffered and SQLite cursors do most of their work while fetching, so a
+    query is only recorded once its result is exhausted, the cursor runs
+    another statement, or the cursor is closed. Time spent between fetches is
+    not counted.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._query = None   # [function, sql, params, elapsed_ms, rows]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(100)
+            yield from rows
+            if len(rows) < 100:
+                return
+
+    def _finish(self, error=False):
+        if self._query is None:
+            return
+        function, sql, params, elapsed_ms, rows = self._query
+        self._query = None
+        record_query(function, elapsed_ms, rows, error)
+        if elapsed_ms >= INSTRUMENTATION_CONFIG['slow_query_ms']:
+            _log_slow_query(function, elapsed_ms, sql, params)
+
+    def _begin(self, sql, params):
+        self._finish()
+        self._query = [_calling_function(), sql, params, 0.0, 0]
+        return time.perf_counter()
+
+    def _ran(self, start, error=False):
+        query = self._query
+        query[3] += (time.perf_counter() - start) * 1000
+        if error:
+            self._finish(error=True)
+        elif self._cursor.description is None:
+            # No result set: a write, whose affected rows are the row count
+            query[4] = max(self._cursor.rowcount or 0, 0)
+            self._finish()
+
+    def _run(self, method, sql, params):
+        start = self._begin(sql, params)
+        try:
+            result = method(sql, params)
+        except Exception:
+            self._ran(start, error=True)
+            raise
+        self._ran(start)
+        return result
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(self._cursor.executemany, sql, list(seq_of_params))
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        self._fetched(start, result)
+        return result
+
+    def _fetched(self, start, result):
+        query = self._query
+        if query is not None:
+            query[3] += (time.perf_counter() - start) * 1000
+            if isinstance(result, list):
+                query[4] += len(result)
+            elif result is not None:
+                query[4] += 1
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._fetch(self._cursor.fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(self._cursor.fetchall)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __del__(self):
+        # Queries whose result was only partly read (fetchone of one row)
+        # are recorded when the cursor goes away
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._cursors = weakref.WeakSet()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = InstrumentedCursor(self._raw.cursor(*args, **kwargs))
+        self._cursors.add(cursor)
+        return cursor
+
+    def close(self):
+        # A RowStream closed early leaves its query unfinished; record it now
+        for cursor in list(self._cursors):
+            cursor._finish()
+        return self._raw.close()
+
+
+class InstrumentedBackend:
+    """Backend proxy whose connections are instrumented"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def connect(self):
+        raw = self._backend.connect()
+        return InstrumentedConnection(raw) if INSTRUMENTATION_CONFIG['enabled'] else raw
+
+
+class AsyncInstrumentedCursor(InstrumentedCursor):
+    """InstrumentedCursor for an async backend's cursor.
+
+    Times are from each await to its result, so they include any time the
+    event loop took to get back to the query.
+    """
+
+    __iter__ = None
+
+    async def _run(self, method, sql, params):
+        start = self._begin(sql, params)
+        try:
+            result = await method(sql, params)
+        except Exception:
+            self._ran(start, error=True)
+            raise
+        self._ran(start)
+        return result
+
+    async def execute(self, sql, params=()):
+        return await self._run(self._cursor.execute, sql, params)
+
+    async def executemany(self, sql, seq_of_params):
+        return await self._run(self._cursor.executemany, sql, list(seq_of_params))
+
+    async def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = await method(*args)
+        self._fetched(start, result)
+        return result
+
+    async def fetchone(self):
+        row = await self._fetch(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    async def fetchmany(self, size=1):
+        rows = await self._fetch(self._cursor.fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    async def fetchall(self):
+        rows = await self._fetch(self._cursor.fetchall)
+        self._finish()
+        return rows
+
+    async def close(self):
+        self._finish()
+        return await self._cursor.close()
+
+
+class AsyncInstrumentedConnection(InstrumentedConnection):
+    """InstrumentedConnection for an async backend's connection"""
+
+    def cursor(self, *args, **kwargs):
+        cursor = AsyncInstrumentedCursor(self._raw.cursor(*args, **kwargs))
+        self._cursors.add(cursor)
+        return cursor
+
+    async def close(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+        return await self._raw.close()
+
+
+class AsyncInstrumentedBackend(InstrumentedBackend):
+    """InstrumentedBackend for an async backend"""
+
+    async def connect(self):
+        raw = await self._backend.connect()
+        return AsyncInstrumentedConnection(raw) if INSTRUMENTATION_CONFIG['enabled'] else raw
@@ -1,1307 +1,1551 @@
-"""
-Car Rental System - PyQt6 Desktop Application
-Main application file
-"""
-
-import sys
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
-                              QTableWidget, QTableWidgetItem, QMessageBox, 
-                              QDialog, QFormLayout, QComboBox, QDateEdit,
-                              QTextEdit, QStackedWidget, QTabWidget, QSpinBox,
-                              QDoubleSpinBox, QFileDialog, QHeaderView, QFrame)
-from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QPixmap, QIcon
-from datetime import datetime, date
-from decimal import Decimal
-import os
-
-# Import database functions
-from car_rental_system import (
-    login_user, get_db_connection, add_car, list_available_cars, 
-    list_users, register_user, update_booking_status, create_booking, 
-    get_booking_details, create_maintenance_record, list_maintenance_records
-)
-
-
-class LoginWindow(QDialog):
-    """Login dialog window"""
-    
-    def __init__(self):
-        super().__init__()
-        self.user = None
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Car Rental System - Login')
-        self.setFixedSize(400, 300)
-        
-        layout = QVBoxLayout()
-        
-        # Title
-        title = QLabel('Car Rental System')
-        title.setStyleSheet('font-size: 24px; font-weight: bold; margin: 20px;')
-        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(title)
-        
-        # Form layout
-        form_layout = QFormLayout()
-        
-        self.email_input = QLineEdit()
-        self.email_input.setPlaceholderText('Enter your email')
-        form_layout.addRow('Email:', self.email_input)
-        
-        self.password_input = QLineEdit()
-        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
-        self.password_input.setPlaceholderText('Enter your password')
-        self.password_input.returnPressed.connect(self.login)
-        form_layout.addRow('Password:', self.password_input)
-        
-        layout.addLayout(form_layout)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        self.login_btn = QPushButton('Login')
-        self.login_btn.clicked.connect(self.login)
-        self.login_btn.setStyleSheet('padding: 10px; font-size: 14px;')
-        btn_layout.addWidget(self.login_btn)
-        
-        self.signup_btn = QPushButton('Sign Up')
-        self.signup_btn.clicked.connect(self.show_signup)
-        self.signup_btn.setStyleSheet('padding: 10px; font-size: 14px;')
-        btn_layout.addWidget(self.signup_btn)
-        
-        layout.addLayout(btn_layout)
-        layout.addStretch()
-        
-        self.setLayout(layout)
-        
-    def login(self):
-        email = self.email_input.text().strip()
-        password = self.password_input.text().strip()
-        
-        if not email or not password:
-            QMessageBox.warning(self, 'Error', 'Please enter both email and password')
-            return
-        
-        user = login_user(email, password)
-        if user:
-            self.user = user
-            self.accept()
-        else:
-            QMessageBox.warning(self, 'Error', 'Invalid email or password')
-            
-    def show_signup(self):
-        signup_dialog = SignupDialog(self)
-        if signup_dialog.exec() == QDialog.DialogCode.Accepted:
-            QMessageBox.information(self, 'Success', 'Registration successful! Please login.')
-
-
-class SignupDialog(QDialog):
-    """Signup dialog for new customers"""
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Sign Up - New Customer')
-        self.setFixedSize(450, 500)
-        
-        layout = QVBoxLayout()
-        
-        # Title
-        title = QLabel('Create New Account')
-        title.setStyleSheet('font-size: 20px; font-weight: bold; margin: 10px;')
-        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(title)
-        
-        # Form layout
-        form_layout = QFormLayout()
-        
-        self.fullname_input = QLineEdit()
-        form_layout.addRow('Full Name:', self.fullname_input)
-        
-        self.email_input = QLineEdit()
-        form_layout.addRow('Email:', self.email_input)
-        
-        self.phone_input = QLineEdit()
-        form_layout.addRow('Phone:', self.phone_input)
-        
-        self.address_input = QLineEdit()
-        form_layout.addRow('Address:', self.address_input)
-        
-        self.license_input = QLineEdit()
-        form_layout.addRow('License No:', self.license_input)
-        
-        self.password_input = QLineEdit()
-        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
-        form_layout.addRow('Password:', self.password_input)
-        
-        self.confirm_password_input = QLineEdit()
-        self.confirm_password_input.setEchoMode(QLineEdit.EchoMode.Password)
-        form_layout.addRow('Confirm Password:', self.confirm_password_input)
-        
-        layout.addLayout(form_layout)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        self.signup_btn = QPushButton('Sign Up')
-        self.signup_btn.clicked.connect(self.signup)
-        self.signup_btn.setStyleSheet('padding: 10px; font-size: 14px;')
-        btn_layout.addWidget(self.signup_btn)
-        
-        self.cancel_btn = QPushButton('Cancel')
-        self.cancel_btn.clicked.connect(self.reject)
-        self.cancel_btn.setStyleSheet('padding: 10px; font-size: 14px;')
-        btn_layout.addWidget(self.cancel_btn)
-        
-        layout.addLayout(btn_layout)
-        
-        self.setLayout(layout)
-        
-    def signup(self):
-        # Validate inputs
-        if not all([
-            self.fullname_input.text().strip(),
-            self.email_input.text().strip(),
-            self.phone_input.text().strip(),
-            self.password_input.text().strip()
-        ]):
-            QMessageBox.warning(self, 'Error', 'Please fill in all required fields')
-            return
-        
-        if self.password_input.text() != self.confirm_password_input.text():
-            QMessageBox.warning(self, 'Error', 'Passwords do not match')
-            return
-        
-        # Register user
-        user_id = register_user(
-            full_name=self.fullname_input.text().strip(),
-            email=self.email_input.text().strip(),
-            password=self.password_input.text().strip(),
-            role='customer',
-            phone=self.phone_input.text().strip(),
-            address=self.address_input.text().strip(),
-            license_no=self.license_input.text().strip()
-        )
-        
-        if user_id:
-            self.accept()
-        else:
-            QMessageBox.warning(self, 'Error', 'Registration failed. Email may already exist.')
-
-
-class MainWindow(QMainWindow):
-    """Main application window"""
-    
-    def __init__(self, user):
-        super().__init__()
-        self.user = user
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle(f'Car Rental System - {self.user["role"].title()} Dashboard')
-        self.setGeometry(100, 100, 1200, 700)
-        
-        # Create central widget and layout
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        
-        main_layout = QVBoxLayout()
-        central_widget.setLayout(main_layout)
-        
-        # Header
-        header = QLabel(f'Welcome, {self.user["full_name"]} ({self.user["role"].title()})')
-        header.setStyleSheet('font-size: 18px; font-weight: bold; padding: 10px; background-color: #3498db; color: white;')
-        main_layout.addWidget(header)
-        
-        # Logout button
-        logout_btn = QPushButton('Logout')
-        logout_btn.clicked.connect(self.logout)
-        logout_btn.setMaximumWidth(100)
-        main_layout.addWidget(logout_btn, alignment=Qt.AlignmentFlag.AlignRight)
-        
-        # Load dashboard based on role
-        if self.user['role'] == 'admin':
-            self.load_admin_dashboard(main_layout)
-        elif self.user['role'] == 'staff':
-            self.load_staff_dashboard(main_layout)
-        else:
-            self.load_customer_dashboard(main_layout)
-            
-    def logout(self):
-        self.close()
-        login_window = LoginWindow()
-        if login_window.exec() == QDialog.DialogCode.Accepted:
-            main_window = MainWindow(login_window.user)
-            main_window.show()
-            
-    def load_admin_dashboard(self, layout):
-        """Load admin dashboard"""
-        tabs = QTabWidget()
-        
-        # Dashboard tab
-        dashboard_tab = QWidget()
-        dashboard_layout = QVBoxLayout()
-        
-        # Statistics
-        stats_frame = QFrame()
-        stats_frame.setFrameStyle(QFrame.Shape.Box)
-        stats_layout = QHBoxLayout()
-        
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM cars")
-            total_cars = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'approved'")
-            active_bookings = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM users")
-            total_users = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            stats_layout.addWidget(self.create_stat_widget('Total Cars', total_cars))
-            stats_layout.addWidget(self.create_stat_widget('Active Bookings', active_bookings))
-            stats_layout.addWidget(self.create_stat_widget('Total Users', total_users))
-        
-        stats_frame.setLayout(stats_layout)
-        dashboard_layout.addWidget(stats_frame)
-        dashboard_layout.addStretch()
-        dashboard_tab.setLayout(dashboard_layout)
-        
-        # Cars tab
-        cars_tab = self.create_cars_tab()
-        
-        # Users tab
-        users_tab = self.create_users_tab()
-        
-        # Bookings tab
-        bookings_tab = self.create_bookings_tab()
-        
-        tabs.addTab(dashboard_tab, 'Dashboard')
-        tabs.addTab(cars_tab, 'Cars')
-        tabs.addTab(users_tab, 'Users')
-        tabs.addTab(bookings_tab, 'Bookings')
-        
-        layout.addWidget(tabs)
-        
-    def create_stat_widget(self, title, value):
-        """Create a statistics widget"""
-        widget = QFrame()
-        widget.setFrameStyle(QFrame.Shape.Box)
-        widget.setStyleSheet('background-color: #ecf0f1; padding: 20px; border-radius: 5px;')
-        
-        layout = QVBoxLayout()
-        
-        title_label = QLabel(title)
-        title_label.setStyleSheet('font-size: 14px; color: #7f8c8d;')
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        
-        value_label = QLabel(str(value))
-        value_label.setStyleSheet('font-size: 32px; font-weight: bold; color: #2c3e50;')
-        value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        
-        layout.addWidget(title_label)
-        layout.addWidget(value_label)
-        
-        widget.setLayout(layout)
-        return widget
-        
-    def create_cars_tab(self):
-        """Create cars management tab"""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        # Add car button
-        add_car_btn = QPushButton('Add New Car')
-        add_car_btn.clicked.connect(self.add_car_dialog)
-        add_car_btn.setMaximumWidth(150)
-        layout.addWidget(add_car_btn)
-        
-        # Cars table
-        self.cars_table = QTableWidget()
-        self.cars_table.setColumnCount(9)
-        self.cars_table.setHorizontalHeaderLabels([
-            'ID', 'Plate No', 'Brand', 'Model', 'Year', 'Color', 
-            'Rate/Day', 'Status', 'Actions'
-        ])
-        self.cars_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        layout.addWidget(self.cars_table)
-        
-        # Refresh button
-        refresh_btn = QPushButton('Refresh')
-        refresh_btn.clicked.connect(self.load_cars_data)
-        refresh_btn.setMaximumWidth(100)
-        layout.addWidget(refresh_btn)
-        
-        widget.setLayout(layout)
-        
-        # Load initial data
-        self.load_cars_data()
-        
-        return widget
-        
-    def load_cars_data(self):
-        """Load cars data into table"""
-        conn = get_db_connection()
-        if not conn:
-            return
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM cars ORDER BY created_at DESC")
-        cars = cursor.fetchall()
-        conn.close()
-        
-        self.cars_table.setRowCount(len(cars))
-        
-        for row, car in enumerate(cars):
-            self.cars_table.setItem(row, 0, QTableWidgetItem(str(car['car_id'])))
-            self.cars_table.setItem(row, 1, QTableWidgetItem(car['plate_no']))
-            self.cars_table.setItem(row, 2, QTableWidgetItem(car['brand']))
-            self.cars_table.setItem(row, 3, QTableWidgetItem(car['model']))
-            self.cars_table.setItem(row, 4, QTableWidgetItem(str(car['year'])))
-            self.cars_table.setItem(row, 5, QTableWidgetItem(car['color']))
-            self.cars_table.setItem(row, 6, QTableWidgetItem(f"${car['rate_per_day']:.2f}"))
-            self.cars_table.setItem(row, 7, QTableWidgetItem(car['status']))
-            
-            # Action button
-            action_btn = QPushButton('Update Status')
-            action_btn.clicked.connect(lambda checked, c=car: self.update_car_status_dialog(c))
-            self.cars_table.setCellWidget(row, 8, action_btn)
-            
-    def add_car_dialog(self):
-        """Show add car dialog"""
-        dialog = AddCarDialog(self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_cars_data()
-            
-    def update_car_status_dialog(self, car):
-        """Show update car status dialog"""
-        dialog = UpdateCarStatusDialog(car, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_cars_data()
-            
-    def create_users_tab(self):
-        """Create users management tab"""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        # Add user button
-        add_user_btn = QPushButton('Add New User')
-        add_user_btn.clicked.connect(self.add_user_dialog)
-        add_user_btn.setMaximumWidth(150)
-        layout.addWidget(add_user_btn)
-        
-        # Users table
-        self.users_table = QTableWidget()
-        self.users_table.setColumnCount(7)
-        self.users_table.setHorizontalHeaderLabels([
-            'ID', 'Full Name', 'Email', 'Role', 'Phone', 'License No', 'Address'
-        ])
-        self.users_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        layout.addWidget(self.users_table)
-        
-        # Refresh button
-        refresh_btn = QPushButton('Refresh')
-        refresh_btn.clicked.connect(self.load_users_data)
-        refresh_btn.setMaximumWidth(100)
-        layout.addWidget(refresh_btn)
-        
-        widget.setLayout(layout)
-        
-        # Load initial data
-        self.load_users_data()
-        
-        return widget
-        
-    def load_users_data(self):
-        """Load users data into table"""
-        users = list_users()
-        if not users:
-            return
-            
-        self.users_table.setRowCount(len(users))
-        
-        for row, user in enumerate(users):
-            self.users_table.setItem(row, 0, QTableWidgetItem(str(user['user_id'])))
-            self.users_table.setItem(row, 1, QTableWidgetItem(user['full_name']))
-            self.users_table.setItem(row, 2, QTableWidgetItem(user['email']))
-            self.users_table.setItem(row, 3, QTableWidgetItem(user['role']))
-            self.users_table.setItem(row, 4, QTableWidgetItem(user.get('phone', '')))
-            self.users_table.setItem(row, 5, QTableWidgetItem(user.get('license_no', '')))
-            self.users_table.setItem(row, 6, QTableWidgetItem(user.get('address', '')))
-            
-    def add_user_dialog(self):
-        """Show add user dialog"""
-        dialog = AddUserDialog(self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_users_data()
-            
-    def create_bookings_tab(self):
-        """Create bookings management tab"""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        # Bookings table
-        self.bookings_table = QTableWidget()
-        self.bookings_table.setColumnCount(10)
-        self.bookings_table.setHorizontalHeaderLabels([
-            'ID', 'Customer', 'Car', 'Start Date', 'End Date', 
-            'Total Amount', 'Status', 'Payment', 'Actions', 'Receipt'
-        ])
-        self.bookings_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        layout.addWidget(self.bookings_table)
-        
-        # Refresh button
-        refresh_btn = QPushButton('Refresh')
-        refresh_btn.clicked.connect(self.load_bookings_data)
-        refresh_btn.setMaximumWidth(100)
-        layout.addWidget(refresh_btn)
-        
-        widget.setLayout(layout)
-        
-        # Load initial data
-        self.load_bookings_data()
-        
-        return widget
-        
-    def load_bookings_data(self):
-        """Load bookings data into table"""
-        conn = get_db_connection()
-        if not conn:
-            return
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT b.*, 
-                   u.full_name as customer_name,
-                   c.brand as car_brand,
-                   c.model as car_model
-            FROM bookings b
-            JOIN users u ON b.customer_id = u.user_id
-            JOIN cars c ON b.car_id = c.car_id
-            ORDER BY b.date_created DESC
-        """)
-        bookings = cursor.fetchall()
-        conn.close()
-        
-        self.bookings_table.setRowCount(len(bookings))
-        
-        for row, booking in enumerate(bookings):
-            self.bookings_table.setItem(row, 0, QTableWidgetItem(str(booking['booking_id'])))
-            self.bookings_table.setItem(row, 1, QTableWidgetItem(booking['customer_name']))
-            self.bookings_table.setItem(row, 2, QTableWidgetItem(f"{booking['car_brand']} {booking['car_model']}"))
-            self.bookings_table.setItem(row, 3, QTableWidgetItem(str(booking['start_date'])))
-            self.bookings_table.setItem(row, 4, QTableWidgetItem(str(booking['end_date'])))
-            self.bookings_table.setItem(row, 5, QTableWidgetItem(f"${booking['total_amount']:.2f}"))
-            self.bookings_table.setItem(row, 6, QTableWidgetItem(booking['status']))
-            self.bookings_table.setItem(row, 7, QTableWidgetItem(booking.get('payment_status', 'pending')))
-            
-            # Action button
-            if booking['status'] == 'pending':
-                action_btn = QPushButton('Manage')
-                action_btn.clicked.connect(lambda checked, b=booking: self.manage_booking_dialog(b))
-                self.bookings_table.setCellWidget(row, 8, action_btn)
-            
-            # Receipt button
-            receipt_btn = QPushButton('View Receipt')
-            receipt_btn.clicked.connect(lambda checked, b=booking: self.view_receipt(b['booking_id']))
-            self.bookings_table.setCellWidget(row, 9, receipt_btn)
-            
-    def manage_booking_dialog(self, booking):
-        """Show manage booking dialog"""
-        dialog = ManageBookingDialog(booking, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_bookings_data()
-            
-    def view_receipt(self, booking_id):
-        """View booking receipt"""
-        dialog = ReceiptDialog(booking_id, self)
-        dialog.exec()
-        
-    def load_staff_dashboard(self, layout):
-        """Load staff dashboard"""
-        tabs = QTabWidget()
-        
-        # Bookings tab
-        bookings_tab = self.create_bookings_tab()
-        
-        # Cars tab
-        cars_tab = self.create_cars_tab()
-        
-        tabs.addTab(bookings_tab, 'Bookings')
-        tabs.addTab(cars_tab, 'Cars')
-        
-        layout.addWidget(tabs)
-        
-    def load_customer_dashboard(self, layout):
-        """Load customer dashboard"""
-        tabs = QTabWidget()
-        
-        # Available Cars tab
-        available_cars_tab = self.create_available_cars_tab()
-        
-        # My Bookings tab
-        my_bookings_tab = self.create_my_bookings_tab()
-        
-        tabs.addTab(available_cars_tab, 'Available Cars')
-        tabs.addTab(my_bookings_tab, 'My Bookings')
-        
-        layout.addWidget(tabs)
-        
-    def create_available_cars_tab(self):
-        """Create available cars tab for customers"""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        # Available cars table
-        self.available_cars_table = QTableWidget()
-        self.available_cars_table.setColumnCount(8)
-        self.available_cars_table.setHorizontalHeaderLabels([
-            'Brand', 'Model', 'Year', 'Color', 'Seats', 'Rate/Day', 'Status', 'Book'
-        ])
-        self.available_cars_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        layout.addWidget(self.available_cars_table)
-        
-        # Refresh button
-        refresh_btn = QPushButton('Refresh')
-        refresh_btn.clicked.connect(self.load_available_cars)
-        refresh_btn.setMaximumWidth(100)
-        layout.addWidget(refresh_btn)
-        
-        widget.setLayout(layout)
-        
-        # Load initial data
-        self.load_available_cars()
-        
-        return widget
-        
-    def load_available_cars(self):
-        """Load available cars for booking"""
-        conn = get_db_connection()
-        if not conn:
-            return
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM cars WHERE status != 'maintenance' ORDER BY brand, model")
-        cars = cursor.fetchall()
-        conn.close()
-        
-        self.available_cars_table.setRowCount(len(cars))
-        
-        for row, car in enumerate(cars):
-            self.available_cars_table.setItem(row, 0, QTableWidgetItem(car['brand']))
-            self.available_cars_table.setItem(row, 1, QTableWidgetItem(car['model']))
-            self.available_cars_table.setItem(row, 2, QTableWidgetItem(str(car['year'])))
-            self.available_cars_table.setItem(row, 3, QTableWidgetItem(car['color']))
-            self.available_cars_table.setItem(row, 4, QTableWidgetItem(str(car['seats'])))
-            self.available_cars_table.setItem(row, 5, QTableWidgetItem(f"${car['rate_per_day']:.2f}"))
-            self.available_cars_table.setItem(row, 6, QTableWidgetItem(car['status']))
-            
-            # Book button
-            if car['status'] == 'available':
-                book_btn = QPushButton('Book Now')
-                book_btn.clicked.connect(lambda checked, c=car: self.book_car_dialog(c))
-                self.available_cars_table.setCellWidget(row, 7, book_btn)
-            
-    def book_car_dialog(self, car):
-        """Show book car dialog"""
-        dialog = BookCarDialog(car, self.user, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_available_cars()
-            
-    def create_my_bookings_tab(self):
-        """Create my bookings tab for customers"""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        # My bookings table
-        self.my_bookings_table = QTableWidget()
-        self.my_bookings_table.setColumnCount(8)
-        self.my_bookings_table.setHorizontalHeaderLabels([
-            'ID', 'Car', 'Start Date', 'End Date', 'Total', 'Status', 'Payment', 'Receipt'
-        ])
-        self.my_bookings_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
-        layout.addWidget(self.my_bookings_table)
-        
-        # Refresh button
-        refresh_btn = QPushButton('Refresh')
-        refresh_btn.clicked.connect(self.load_my_bookings)
-        refresh_btn.setMaximumWidth(100)
-        layout.addWidget(refresh_btn)
-        
-        widget.setLayout(layout)
-        
-        # Load initial data
-        self.load_my_bookings()
-        
-        return widget
-        
-    def load_my_bookings(self):
-        """Load customer's bookings"""
-        conn = get_db_connection()
-        if not conn:
-            return
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT b.*, c.brand, c.model
-            FROM bookings b
-            JOIN cars c ON b.car_id = c.car_id
-            WHERE b.customer_id = %s
-            ORDER BY b.date_created DESC
-        """, (self.user['user_id'],))
-        bookings = cursor.fetchall()
-        conn.close()
-        
-        self.my_bookings_table.setRowCount(len(bookings))
-        
-        for row, booking in enumerate(bookings):
-            self.my_bookings_table.setItem(row, 0, QTableWidgetItem(str(booking['booking_id'])))
-            self.my_bookings_table.setItem(row, 1, QTableWidgetItem(f"{booking['brand']} {booking['model']}"))
-            self.my_bookings_table.setItem(row, 2, QTableWidgetItem(str(booking['start_date'])))
-            self.my_bookings_table.setItem(row, 3, QTableWidgetItem(str(booking['end_date'])))
-            self.my_bookings_table.setItem(row, 4, QTableWidgetItem(f"${booking['total_amount']:.2f}"))
-            self.my_bookings_table.setItem(row, 5, QTableWidgetItem(booking['status']))
-            self.my_bookings_table.setItem(row, 6, QTableWidgetItem(booking.get('payment_status', 'pending')))
-            
-            # Receipt button
-            receipt_btn = QPushButton('View Receipt')
-            receipt_btn.clicked.connect(lambda checked, b=booking: self.view_receipt(b['booking_id']))
-            self.my_bookings_table.setCellWidget(row, 7, receipt_btn)
-
-
-class AddCarDialog(QDialog):
-    """Dialog for adding a new car"""
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Add New Car')
-        self.setFixedSize(450, 500)
-        
-        layout = QVBoxLayout()
-        form_layout = QFormLayout()
-        
-        self.plate_no_input = QLineEdit()
-        form_layout.addRow('Plate Number:', self.plate_no_input)
-        
-        self.brand_input = QLineEdit()
-        form_layout.addRow('Brand:', self.brand_input)
-        
-        self.model_input = QLineEdit()
-        form_layout.addRow('Model:', self.model_input)
-        
-        self.type_combo = QComboBox()
-        self.type_combo.addItems(['sedan', 'suv', 'van', 'truck', 'coupe'])
-        form_layout.addRow('Type:', self.type_combo)
-        
-        self.year_input = QSpinBox()
-        self.year_input.setRange(1990, 2030)
-        self.year_input.setValue(2024)
-        form_layout.addRow('Year:', self.year_input)
-        
-        self.color_input = QLineEdit()
-        form_layout.addRow('Color:', self.color_input)
-        
-        self.rate_input = QDoubleSpinBox()
-        self.rate_input.setRange(0, 10000)
-        self.rate_input.setValue(50.0)
-        self.rate_input.setPrefix('$')
-        form_layout.addRow('Rate per Day:', self.rate_input)
-        
-        self.seats_input = QSpinBox()
-        self.seats_input.setRange(2, 12)
-        self.seats_input.setValue(4)
-        form_layout.addRow('Seats:', self.seats_input)
-        
-        self.status_combo = QComboBox()
-        self.status_combo.addItems(['available', 'maintenance'])
-        form_layout.addRow('Status:', self.status_combo)
-        
-        layout.addLayout(form_layout)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        save_btn = QPushButton('Save')
-        save_btn.clicked.connect(self.save_car)
-        btn_layout.addWidget(save_btn)
-        
-        cancel_btn = QPushButton('Cancel')
-        cancel_btn.clicked.connect(self.reject)
-        btn_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(btn_layout)
-        self.setLayout(layout)
-        
-    def save_car(self):
-        if not all([
-            self.plate_no_input.text().strip(),
-            self.brand_input.text().strip(),
-            self.model_input.text().strip(),
-            self.color_input.text().strip()
-        ]):
-            QMessageBox.warning(self, 'Error', 'Please fill in all required fields')
-            return
-        
-        car_id = add_car(
-            plate_no=self.plate_no_input.text().strip(),
-            brand=self.brand_input.text().strip(),
-            model=self.model_input.text().strip(),
-            type=self.type_combo.currentText(),
-            year=self.year_input.value(),
-            color=self.color_input.text().strip(),
-            rate_per_day=self.rate_input.value(),
-            seats=self.seats_input.value(),
-            status=self.status_combo.currentText()
-        )
-        
-        if car_id:
-            QMessageBox.information(self, 'Success', 'Car added successfully!')
-            self.accept()
-        else:
-            QMessageBox.warning(self, 'Error', 'Failed to add car')
-
-
-class UpdateCarStatusDialog(QDialog):
-    """Dialog for updating car status"""
-    
-    def __init__(self, car, parent=None):
-        super().__init__(parent)
-        self.car = car
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Update Car Status')
-        self.setFixedSize(350, 200)
-        
-        layout = QVBoxLayout()
-        
-        label = QLabel(f"Update status for {self.car['brand']} {self.car['model']}")
-        label.setStyleSheet('font-weight: bold; margin: 10px;')
-        layout.addWidget(label)
-        
-        form_layout = QFormLayout()
-        
-        self.status_combo = QComboBox()
-        self.status_combo.addItems(['available', 'maintenance', 'rented'])
-        self.status_combo.setCurrentText(self.car['status'])
-        form_layout.addRow('Status:', self.status_combo)
-        
-        layout.addLayout(form_layout)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        save_btn = QPushButton('Update')
-        save_btn.clicked.connect(self.update_status)
-        btn_layout.addWidget(save_btn)
-        
-        cancel_btn = QPushButton('Cancel')
-        cancel_btn.clicked.connect(self.reject)
-        btn_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(btn_layout)
-        self.setLayout(layout)
-        
-    def update_status(self):
-        new_status = self.status_combo.currentText()
-        
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE cars SET status = %s WHERE car_id = %s", 
-                             (new_status, self.car['car_id']))
-                conn.commit()
-                conn.close()
-                QMessageBox.information(self, 'Success', 'Car status updated successfully!')
-                self.accept()
-            except Exception as e:
-                QMessageBox.warning(self, 'Error', f'Failed to update: {str(e)}')
-
-
-class AddUserDialog(QDialog):
-    """Dialog for adding a new user"""
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Add New User')
-        self.setFixedSize(450, 450)
-        
-        layout = QVBoxLayout()
-        form_layout = QFormLayout()
-        
-        self.fullname_input = QLineEdit()
-        form_layout.addRow('Full Name:', self.fullname_input)
-        
-        self.email_input = QLineEdit()
-        form_layout.addRow('Email:', self.email_input)
-        
-        self.password_input = QLineEdit()
-        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
-        form_layout.addRow('Password:', self.password_input)
-        
-        self.role_combo = QComboBox()
-        self.role_combo.addItems(['customer', 'staff', 'admin'])
-        form_layout.addRow('Role:', self.role_combo)
-        
-        self.phone_input = QLineEdit()
-        form_layout.addRow('Phone:', self.phone_input)
-        
-        self.address_input = QLineEdit()
-        form_layout.addRow('Address:', self.address_input)
-        
-        self.license_input = QLineEdit()
-        form_layout.addRow('License No:', self.license_input)
-        
-        layout.addLayout(form_layout)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        save_btn = QPushButton('Save')
-        save_btn.clicked.connect(self.save_user)
-        btn_layout.addWidget(save_btn)
-        
-        cancel_btn = QPushButton('Cancel')
-        cancel_btn.clicked.connect(self.reject)
-        btn_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(btn_layout)
-        self.setLayout(layout)
-        
-    def save_user(self):
-        if not all([
-            self.fullname_input.text().strip(),
-            self.email_input.text().strip(),
-            self.password_input.text().strip()
-        ]):
-            QMessageBox.warning(self, 'Error', 'Please fill in all required fields')
-            return
-        
-        user_id = register_user(
-            full_name=self.fullname_input.text().strip(),
-            email=self.email_input.text().strip(),
-            password=self.password_input.text().strip(),
-            role=self.role_combo.currentText(),
-            phone=self.phone_input.text().strip(),
-            address=self.address_input.text().strip(),
-            license_no=self.license_input.text().strip()
-        )
-        
-        if user_id:
-            QMessageBox.information(self, 'Success', 'User added successfully!')
-            self.accept()
-        else:
-            QMessageBox.warning(self, 'Error', 'Failed to add user. Email may already exist.')
-
-
-class ManageBookingDialog(QDialog):
-    """Dialog for managing bookings"""
-    
-    def __init__(self, booking, parent=None):
-        super().__init__(parent)
-        self.booking = booking
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Manage Booking')
-        self.setFixedSize(400, 300)
-        
-        layout = QVBoxLayout()
-        
-        # Booking details
-        details = f"""
-        Booking ID: {self.booking['booking_id']}
-        Customer: {self.booking['customer_name']}
-        Car: {self.booking['car_brand']} {self.booking['car_model']}
-        Start Date: {self.booking['start_date']}
-        End Date: {self.booking['end_date']}
-        Total Amount: ${self.booking['total_amount']:.2f}
-        Current Status: {self.booking['status']}
-        """
-        
-        details_label = QLabel(details)
-        details_label.setStyleSheet('background-color: #ecf0f1; padding: 10px; border-radius: 5px;')
-        layout.addWidget(details_label)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        approve_btn = QPushButton('Approve')
-        approve_btn.clicked.connect(lambda: self.update_booking('approved'))
-        approve_btn.setStyleSheet('background-color: #27ae60; color: white; padding: 10px;')
-        btn_layout.addWidget(approve_btn)
-        
-        reject_btn = QPushButton('Reject')
-        reject_btn.clicked.connect(lambda: self.update_booking('rejected'))
-        reject_btn.setStyleSheet('background-color: #e74c3c; color: white; padding: 10px;')
-        btn_layout.addWidget(reject_btn)
-        
-        layout.addLayout(btn_layout)
-        
-        cancel_btn = QPushButton('Cancel')
-        cancel_btn.clicked.connect(self.reject)
-        layout.addWidget(cancel_btn)
-        
-        self.setLayout(layout)
-        
-    def update_booking(self, status):
-        success = update_booking_status(self.booking['booking_id'], status)
-        if success:
-            QMessageBox.information(self, 'Success', f'Booking {status} successfully!')
-            self.accept()
-        else:
-            QMessageBox.warning(self, 'Error', 'Failed to update booking status')
-
-
-class BookCarDialog(QDialog):
-    """Dialog for booking a car"""
-    
-    def __init__(self, car, user, parent=None):
-        super().__init__(parent)
-        self.car = car
-        self.user = user
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Book Car')
-        self.setFixedSize(450, 450)
-        
-        layout = QVBoxLayout()
-        
-        # Car details
-        car_info = QLabel(f"{self.car['brand']} {self.car['model']} ({self.car['year']})\n"
-                         f"Rate: ${self.car['rate_per_day']:.2f} per day")
-        car_info.setStyleSheet('font-weight: bold; font-size: 14px; margin: 10px;')
-        layout.addWidget(car_info)
-        
-        form_layout = QFormLayout()
-        
-        self.start_date = QDateEdit()
-        self.start_date.setDate(QDate.currentDate())
-        self.start_date.setCalendarPopup(True)
-        self.start_date.setMinimumDate(QDate.currentDate())
-        self.start_date.dateChanged.connect(self.calculate_total)
-        form_layout.addRow('Start Date:', self.start_date)
-        
-        self.end_date = QDateEdit()
-        self.end_date.setDate(QDate.currentDate().addDays(1))
-        self.end_date.setCalendarPopup(True)
-        self.end_date.setMinimumDate(QDate.currentDate().addDays(1))
-        self.end_date.dateChanged.connect(self.calculate_total)
-        form_layout.addRow('End Date:', self.end_date)
-        
-        self.pickup_input = QLineEdit()
-        form_layout.addRow('Pickup Location:', self.pickup_input)
-        
-        self.dropoff_input = QLineEdit()
-        form_layout.addRow('Dropoff Location:', self.dropoff_input)
-        
-        self.payment_combo = QComboBox()
-        self.payment_combo.addItems(['credit_card', 'debit_card', 'cash', 'bank_transfer'])
-        form_layout.addRow('Payment Method:', self.payment_combo)
-        
-        self.total_label = QLabel('$0.00')
-        self.total_label.setStyleSheet('font-size: 16px; font-weight: bold; color: #2c3e50;')
-        form_layout.addRow('Total Amount:', self.total_label)
-        
-        layout.addLayout(form_layout)
-        
-        # Calculate initial total
-        self.calculate_total()
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        
-        book_btn = QPushButton('Book Now')
-        book_btn.clicked.connect(self.book_car)
-        book_btn.setStyleSheet('background-color: #3498db; color: white; padding: 10px;')
-        btn_layout.addWidget(book_btn)
-        
-        cancel_btn = QPushButton('Cancel')
-        cancel_btn.clicked.connect(self.reject)
-        btn_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(btn_layout)
-        self.setLayout(layout)
-        
-    def calculate_total(self):
-        start = self.start_date.date().toPyDate()
-        end = self.end_date.date().toPyDate()
-        
-        if end > start:
-            days = (end - start).days + 1
-            total = Decimal(self.car['rate_per_day']) * days
-            self.total_label.setText(f"${total:.2f}")
-        else:
-            self.total_label.setText('Invalid dates')
-            
-    def book_car(self):
-        if not all([
-            self.pickup_input.text().strip(),
-            self.dropoff_input.text().strip()
-        ]):
-            QMessageBox.warning(self, 'Error', 'Please fill in all fields')
-            return
-        
-        start_date = self.start_date.date().toPyDate()
-        end_date = self.end_date.date().toPyDate()
-        
-        if end_date <= start_date:
-            QMessageBox.warning(self, 'Error', 'End date must be after start date')
-            return
-        
-        # Check if car is available for selected dates
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT COUNT(*) as count
-                FROM bookings
-                WHERE car_id = %s
-                AND status IN ('approved', 'pending')
-                AND ((start_date <= %s AND end_date >= %s) 
-                OR (start_date <= %s AND end_date >= %s)
-                OR (start_date >= %s AND end_date <= %s))
-            """, (self.car['car_id'], end_date, start_date, 
-                  start_date, end_date, start_date, end_date))
-            
-            result = cursor.fetchone()
-            if result['count'] > 0:
-                QMessageBox.warning(self, 'Error', 'Car is not available for selected dates')
-                conn.close()
-                return
-            
-            # Calculate total
-            days = (end_date - start_date).days + 1
-            total_amount = Decimal(self.car['rate_per_day']) * days
-            
-            # Create booking
-            try:
-                booking_id = create_booking(
-                    customer_id=self.user['user_id'],
-                    car_id=self.car['car_id'],
-                    start_date=start_date.strftime('%Y-%m-%d'),
-                    end_date=end_date.strftime('%Y-%m-%d'),
-                    pickup_location=self.pickup_input.text().strip(),
-                    dropoff_location=self.dropoff_input.text().strip(),
-                    total_amount=total_amount,
-                    payment_method=self.payment_combo.currentText()
-                )
-                
-                if booking_id:
-                    QMessageBox.information(self, 'Success', 
-                        'Booking created successfully! Waiting for approval.')
-                    self.accept()
-                else:
-                    QMessageBox.warning(self, 'Error', 'Failed to create booking')
-            except Exception as e:
-                QMessageBox.warning(self, 'Error', f'Failed to create booking: {str(e)}')
-            finally:
-                conn.close()
-
-
-class ReceiptDialog(QDialog):
-    """Dialog for viewing booking receipt"""
-    
-    def __init__(self, booking_id, parent=None):
-        super().__init__(parent)
-        self.booking_id = booking_id
-        self.init_ui()
-        
-    def init_ui(self):
-        self.setWindowTitle('Booking Receipt')
-        self.setFixedSize(600, 700)
-        
-        layout = QVBoxLayout()
-        
-        # Get booking details
-        booking_details = get_booking_details(self.booking_id)
-        
-        if not booking_details:
-            QMessageBox.warning(self, 'Error', 'Booking not found')
-            self.reject()
-            return
-        
-        # Calculate rental duration
-        start_date = datetime.strptime(str(booking_details['start_date']), '%Y-%m-%d')
-        end_date = datetime.strptime(str(booking_details['end_date']), '%Y-%m-%d')
-        days = (end_date - start_date).days + 1
-        
-        # Receipt content
-        receipt_html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; padding: 20px; }}
-                .header {{ text-align: center; border-bottom: 2px solid #333; padding-bottom: 20px; }}
-                .header h1 {{ color: #3498db; margin: 10px 0; }}
-                .section {{ margin: 20px 0; padding: 15px; background-color: #f8f9fa; border-radius: 5px; }}
-                .section-title {{ font-weight: bold; color: #2c3e50; font-size: 16px; margin-bottom: 10px; }}
-                .detail-row {{ display: flex; justify-content: space-between; margin: 5px 0; }}
-                .detail-label {{ font-weight: bold; }}
-                .total {{ font-size: 20px; color: #27ae60; font-weight: bold; }}
-                .footer {{ margin-top: 30px; text-align: center; color: #7f8c8d; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>CAR RENTAL SYSTEM</h1>
-                <p>Booking Receipt</p>
-                <p>Receipt Date: {datetime.now().strftime('%Y-%m-%d')}</p>
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Booking Information</div>
-                <div class="detail-row">
-                    <span class="detail-label">Booking ID:</span>
-                    <span>#{booking_details['booking_id']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Booking Date:</span>
-                    <span>{booking_details.get('date_created', 'N/A')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Status:</span>
-                    <span>{booking_details['status']}</span>
-                </div>
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Customer Information</div>
-                <div class="detail-row">
-                    <span class="detail-label">Name:</span>
-                    <span>{booking_details['full_name']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Email:</span>
-                    <span>{booking_details['email']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Phone:</span>
-                    <span>{booking_details.get('phone', 'N/A')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">License No:</span>
-                    <span>{booking_details.get('license_no', 'N/A')}</span>
-                </div>
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Car Information</div>
-                <div class="detail-row">
-                    <span class="detail-label">Car:</span>
-                    <span>{booking_details['brand']} {booking_details['model']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Plate Number:</span>
-                    <span>{booking_details['plate_no']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Color:</span>
-                    <span>{booking_details['color']}</span>
-                </div>
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Rental Details</div>
-                <div class="detail-row">
-                    <span class="detail-label">Start Date:</span>
-                    <span>{booking_details['start_date']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">End Date:</span>
-                    <span>{booking_details['end_date']}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Rental Duration:</span>
-                    <span>{days} day(s)</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Rate per Day:</span>
-                    <span>${booking_details['rate_per_day']:.2f}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Pickup Location:</span>
-                    <span>{booking_details.get('pickup_location', 'N/A')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Dropoff Location:</span>
-                    <span>{booking_details.get('dropoff_location', 'N/A')}</span>
-                </div>
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Payment Information</div>
-                <div class="detail-row">
-                    <span class="detail-label">Payment Method:</span>
-                    <span>{booking_details.get('payment_method', 'N/A')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Payment Status:</span>
-                    <span>{booking_details.get('payment_status', 'pending')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label total">Total Amount:</span>
-                    <span class="total">${float(booking_details['total_amount']):.2f}</span>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>Thank you for choosing our Car Rental System!</p>
-                <p>For any inquiries, please contact our support team.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        from PyQt6.QtWidgets import QTextBrowser
-        
-        text_browser = QTextBrowser()
-        text_browser.setHtml(receipt_html)
-        layout.addWidget(text_browser)
-        
-        # Close button
-        close_btn = QPushButton('Close')
-        close_btn.clicked.connect(self.accept)
-        layout.addWidget(close_btn)
-        
-        self.setLayout(layout)
-
-
-def main():
-    app = QApplication(sys.argv)
-    
-    # Show login window
-    login_window = LoginWindow()
-    if login_window.exec() == QDialog.DialogCode.Accepted:
-        # Show main window with user data
-        main_window = MainWindow(login_window.user)
-        main_window.show()
-        sys.exit(app.exec())
-    else:
-        sys.exit(0)
-
-
-if __name__ == '__main__':
-    main()
+"""
+Car Rental System - PyQt6 Desktop Application
+Main application file
+"""
+
+import sys
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
+                              QMessageBox, QDialog, QFormLayout, QComboBox, QDateEdit,
+                              QTextEdit, QStackedWidget, QTabWidget, QSpinBox,
+                              QDoubleSpinBox, QFileDialog, QFrame,
+                              QAbstractItemView)
+from PyQt6.QtCore import Qt, QDate, QTimer, QSize
+from PyQt6.QtGui import QPixmap, QIcon
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+import os
+
+# Import database functions
+from car_rental_system import (
+    login_user, logout_user, get_session_user, get_dashboard_stats, add_car, update_car, list_available_cars, 
+    list_users, register_user, update_booking_status, update_booking_statuses,
+    get_booking_details, create_maintenance_record, list_maintenance_records,
+    stream_search, stream_bookable_cars,
+    list_user_bookings, reserve_car, sync_availability_index,
+    search_available_cars, get_backend, list_changes, CHANGE_ORDER
+)
+from workers import DataLoader
+from bulk_import import import_cars
+from receipts import render_receipt
+from reports import revenue_report, top_cars
+from schema import migrate
+from table_models import RowTableModel, SearchBar, create_table_view
+from thumbnails import ThumbnailCache, THUMBNAIL_SIZE
+
+# Roles whose sessions may run the staff and admin actions
+STAFF_ROLES = ('admin', 'staff')
+ADMIN_ROLES = ('admin',)
+
+
+class LoginWindow(QDialog):
+    """Login dialog window"""
+    
+    def __init__(self):
+        super().__init__()
+        self.user = None
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Car Rental System - Login')
+        self.setFixedSize(400, 300)
+        
+        layout = QVBoxLayout()
+        
+        # Title
+        title = QLabel('Car Rental System')
+        title.setStyleSheet('font-size: 24px; font-weight: bold; margin: 20px;')
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+        
+        # Form layout
+        form_layout = QFormLayout()
+        
+        self.email_input = QLineEdit()
+        self.email_input.setPlaceholderText('Enter your email')
+        form_layout.addRow('Email:', self.email_input)
+        
+        self.password_input = QLineEdit()
+        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.password_input.setPlaceholderText('Enter your password')
+        self.password_input.returnPressed.connect(self.login)
+        form_layout.addRow('Password:', self.password_input)
+        
+        layout.addLayout(form_layout)
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.login_btn = QPushButton('Login')
+        self.login_btn.clicked.connect(self.login)
+        self.login_btn.setStyleSheet('padding: 10px; font-size: 14px;')
+        btn_layout.addWidget(self.login_btn)
+        
+        self.signup_btn = QPushButton('Sign Up')
+        self.signup_btn.clicked.connect(self.show_signup)
+        self.signup_btn.setStyleSheet('padding: 10px; font-size: 14px;')
+        btn_layout.addWidget(self.signup_btn)
+        
+        layout.addLayout(btn_layout)
+        layout.addStretch()
+        
+        self.setLayout(layout)
+        
+    def login(self):
+        email = self.email_input.text().strip()
+        password = self.password_input.text().strip()
+        
+        if not email or not password:
+            QMessageBox.warning(self, 'Error', 'Please enter both email and password')
+            return
+        
+        # Password verification is slow by design, so it runs off the UI thread
+        self.login_btn.setEnabled(False)
+        self.login_btn.setText('Logging in...')
+        self.loader.submit('login', login_user, email, password,
+                           on_result=self.on_login,
+                           on_error=lambda message: self.on_login(None))
+        
+    def on_login(self, user):
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText('Login')
+        if user:
+            self.user = user
+            self.accept()
+        else:
+            QMessageBox.warning(self, 'Error', 'Invalid email or password')
+            
+    def show_signup(self):
+        signup_dialog = SignupDialog(self)
+        if signup_dialog.exec() == QDialog.DialogCode.Accepted:
+            QMessageBox.information(self, 'Success', 'Registration successful! Please login.')
+
+
+class SignupDialog(QDialog):
+    """Signup dialog for new customers"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Sign Up - New Customer')
+        self.setFixedSize(450, 500)
+        
+        layout = QVBoxLayout()
+        
+        # Title
+        title = QLabel('Create New Account')
+        title.setStyleSheet('font-size: 20px; font-weight: bold; margin: 10px;')
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+        
+        # Form layout
+        form_layout = QFormLayout()
+        
+        self.fullname_input = QLineEdit()
+        form_layout.addRow('Full Name:', self.fullname_input)
+        
+        self.email_input = QLineEdit()
+        form_layout.addRow('Email:', self.email_input)
+        
+        self.phone_input = QLineEdit()
+        form_layout.addRow('Phone:', self.phone_input)
+        
+        self.address_input = QLineEdit()
+        form_layout.addRow('Address:', self.address_input)
+        
+        self.license_input = QLineEdit()
+        form_layout.addRow('License No:', self.license_input)
+        
+        self.password_input = QLineEdit()
+        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        form_layout.addRow('Password:', self.password_input)
+        
+        self.confirm_password_input = QLineEdit()
+        self.confirm_password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        form_layout.addRow('Confirm Password:', self.confirm_password_input)
+        
+        layout.addLayout(form_layout)
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.signup_btn = QPushButton('Sign Up')
+        self.signup_btn.clicked.connect(self.signup)
+        self.signup_btn.setStyleSheet('padding: 10px; font-size: 14px;')
+        btn_layout.addWidget(self.signup_btn)
+        
+        self.cancel_btn = QPushButton('Cancel')
+        self.cancel_btn.clicked.connect(self.reject)
+        self.cancel_btn.setStyleSheet('padding: 10px; font-size: 14px;')
+        btn_layout.addWidget(self.cancel_btn)
+        
+        layout.addLayout(btn_layout)
+        
+        self.setLayout(layout)
+        
+    def signup(self):
+        # Validate inputs
+        if not all([
+            self.fullname_input.text().strip(),
+            self.email_input.text().strip(),
+            self.phone_input.text().strip(),
+            self.password_input.text().strip()
+        ]):
+            QMessageBox.warning(self, 'Error', 'Please fill in all required fields')
+            return
+        
+        if self.password_input.text() != self.confirm_password_input.text():
+            QMessageBox.warning(self, 'Error', 'Passwords do not match')
+            return
+        
+        # Register user in the background
+        self.signup_btn.setEnabled(False)
+        self.loader.submit(
+            'save', register_user,
+            full_name=self.fullname_input.text().strip(),
+            email=self.email_input.text().strip(),
+            password=self.password_input.text().strip(),
+            role='customer',
+            phone=self.phone_input.text().strip(),
+            address=self.address_input.text().strip(),
+            license_no=self.license_input.text().strip(),
+            on_result=self.on_registered,
+            on_error=lambda message: self.on_registered(None)
+        )
+        
+    def on_registered(self, user_id):
+        self.signup_btn.setEnabled(True)
+        if user_id:
+            self.accept()
+        else:
+            QMessageBox.warning(self, 'Error', 'Registration failed. Email may already exist.')
+
+
+# Table columns: (header, fn(row) -> display text). Button columns return
+# the button label, or an empty string for rows without a button.
+CAR_COLUMNS = [
+    ('ID', lambda car: car['car_id']),
+    ('Plate No', lambda car: car['plate_no']),
+    ('Brand', lambda car: car['brand']),
+    ('Model', lambda car: car['model']),
+    ('Year', lambda car: car['year']),
+    ('Color', lambda car: car['color']),
+    ('Rate/Day', lambda car: f"${car['rate_per_day']:.2f}"),
+    ('Status', lambda car: car['status']),
+    ('Actions', lambda car: 'Update Status'),
+]
+
+USER_COLUMNS = [
+    ('ID', lambda user: user['user_id']),
+    ('Full Name', lambda user: user['full_name']),
+    ('Email', lambda user: user['email']),
+    ('Role', lambda user: user['role']),
+    ('Phone', lambda user: user.get('phone', '')),
+    ('License No', lambda user: user.get('license_no', '')),
+    ('Address', lambda user: user.get('address', '')),
+]
+
+BOOKING_COLUMNS = [
+    ('ID', lambda booking: booking['booking_id']),
+    ('Customer', lambda booking: booking['customer_name']),
+    ('Car', lambda booking: f"{booking['car_brand']} {booking['car_model']}"),
+    ('Start Date', lambda booking: booking['start_date']),
+    ('End Date', lambda booking: booking['end_date']),
+    ('Total Amount', lambda booking: f"${booking['total_amount']:.2f}"),
+    ('Status', lambda booking: booking['status']),
+    ('Payment', lambda booking: booking.get('payment_status', 'pending')),
+    ('Actions', lambda booking: 'Manage' if booking['status'] == 'pending' else ''),
+    ('Receipt', lambda booking: 'View Receipt'),
+]
+
+REPORT_COLUMNS = [
+    ('Period', lambda row: row['period']),
+    ('Bookings', lambda row: row['bookings']),
+    ('Rentals', lambda row: row['rentals']),
+    ('Avg Length (days)', lambda row: f"{row['avg_rental_days']:.1f}" if row['avg_rental_days'] is not None else ''),
+    ('Utilization', lambda row: f"{row['utilization']:.1%}" if row['utilization'] is not None else ''),
+    ('Payments', lambda row: row['payments']),
+    ('Revenue', lambda row: f"${row['revenue']:,.2f}"),
+]
+
+TOP_CAR_COLUMNS = [
+    ('Plate No', lambda car: car['plate_no']),
+    ('Car', lambda car: f"{car['brand']} {car['model']}"),
+    ('Type', lambda car: car['type']),
+    ('Rentals', lambda car: car['rentals']),
+    ('Rental Days', lambda car: car['rental_days']),
+    ('Revenue', lambda car: f"${car['revenue']:,.2f}"),
+]
+
+AVAILABLE_CAR_COLUMNS = [
+    ('Photo', lambda car: ''),
+    ('Brand', lambda car: car['brand']),
+    ('Model', lambda car: car['model']),
+    ('Year', lambda car: car['year']),
+    ('Color', lambda car: car['color']),
+    ('Seats', lambda car: car['seats']),
+    ('Rate/Day', lambda car: f"${car['rate_per_day']:.2f}"),
+    ('Status', lambda car: car['status']),
+    ('Book', lambda car: 'Book Now' if car['status'] == 'available' else ''),
+]
+
+MY_BOOKING_COLUMNS = [
+    ('ID', lambda booking: booking['booking_id']),
+    ('Car', lambda booking: f"{booking['brand']} {booking['model']}"),
+    ('Start Date', lambda booking: booking['start_date']),
+    ('End Date', lambda booking: booking['end_date']),
+    ('Total', lambda booking: f"${booking['total_amount']:.2f}"),
+    ('Status', lambda booking: booking['status']),
+    ('Payment', lambda booking: booking.get('payment_status', 'pending')),
+    ('Receipt', lambda booking: 'View Receipt'),
+]
+
+
+class MainWindow(QMainWindow):
+    """Main application window"""
+    
+    def __init__(self, user):
+        super().__init__()
+        self.user = user
+        self.loading_labels = {}
+        self.loader = DataLoader(self)
+        self.loader.loading_changed.connect(self.set_loading)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle(f'Car Rental System - {self.user["role"].title()} Dashboard')
+        self.setGeometry(100, 100, 1200, 700)
+        
+        # Create central widget and layout
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        main_layout = QVBoxLayout()
+        central_widget.setLayout(main_layout)
+        
+        # Header
+        header = QLabel(f'Welcome, {self.user["full_name"]} ({self.user["role"].title()})')
+        header.setStyleSheet('font-size: 18px; font-weight: bold; padding: 10px; background-color: #3498db; color: white;')
+        main_layout.addWidget(header)
+        
+        # Logout button
+        logout_btn = QPushButton('Logout')
+        logout_btn.clicked.connect(self.logout)
+        logout_btn.setMaximumWidth(100)
+        main_layout.addWidget(logout_btn, alignment=Qt.AlignmentFlag.AlignRight)
+        
+        # Load dashboard based on role
+        if self.user['role'] == 'admin':
+            self.load_admin_dashboard(main_layout)
+        elif self.user['role'] == 'staff':
+            self.load_staff_dashboard(main_layout)
+        else:
+            self.load_customer_dashboard(main_layout)
+            
+    def check_session(self, roles=None):
+        """Return the logged-in user if their session is still live (and in roles).
+
+        Privileged actions call this instead of asking for the password
+        again. If the session has ended, the user is sent back to the login
+        window and None is returned.
+        """
+        user = get_session_user(self.user.get('session_token'), roles)
+        if user is None:
+            QMessageBox.warning(self, 'Session Ended', 'Your session has ended. Please log in again.')
+            QTimer.singleShot(0, self.logout)
+        return user
+
+    def logout(self):
+        logout_user(self.user.get('session_token'))
+        self.close()
+        login_window = LoginWindow()
+        if login_window.exec() == QDialog.DialogCode.Accepted:
+            main_window = MainWindow(login_window.user)
+            main_window.show()
+            
+    def load_admin_dashboard(self, layout):
+        """Load admin dashboard"""
+        tabs = QTabWidget()
+        
+        # Dashboard tab
+        dashboard_tab = QWidget()
+        dashboard_layout = QVBoxLayout()
+        
+        # Statistics
+        stats_frame = QFrame()
+        stats_frame.setFrameStyle(QFrame.Shape.Box)
+        stats_layout = QHBoxLayout()
+        
+        self.stat_widgets = {
+            'total_cars': self.create_stat_widget('Total Cars', '...'),
+            'active_bookings': self.create_stat_widget('Active Bookings', '...'),
+            'total_users': self.create_stat_widget('Total Users', '...')
+        }
+        for stat_widget in self.stat_widgets.values():
+            stats_layout.addWidget(stat_widget)
+        
+        stats_frame.setLayout(stats_layout)
+        dashboard_layout.addWidget(stats_frame)
+        dashboard_layout.addStretch()
+        dashboard_tab.setLayout(dashboard_layout)
+        
+        # Cars tab
+        cars_tab = self.create_cars_tab()
+        
+        # Users tab
+        users_tab = self.create_users_tab()
+        
+        # Bookings tab
+        bookings_tab = self.create_bookings_tab()
+        
+        # Reports tab
+        reports_tab = self.create_reports_tab()
+        
+        tabs.addTab(dashboard_tab, 'Dashboard')
+        tabs.addTab(cars_tab, 'Cars')
+        tabs.addTab(users_tab, 'Users')
+        tabs.addTab(bookings_tab, 'Bookings')
+        tabs.addTab(reports_tab, 'Reports')
+        
+        layout.addWidget(tabs)
+        
+        # Load the statistics now and keep them fresh
+        self.load_dashboard_stats()
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.load_dashboard_stats)
+        self.stats_timer.start(30000)
+        
+    def load_dashboard_stats(self):
+        """Refresh the dashboard statistics in the background"""
+        self.loader.submit('dashboard', get_dashboard_stats, on_result=self.show_dashboard_stats)
+        
+    def show_dashboard_stats(self, stats):
+        """Update the statistics widgets with freshly loaded values"""
+        if not stats:
+            return
+        for name, stat_widget in self.stat_widgets.items():
+            stat_widget.value_label.setText(str(stats[name]))
+        
+    def create_loading_label(self, key):
+        """Create a hidden 'Loading...' indicator for a background load"""
+        label = QLabel('Loading...')
+        label.setStyleSheet('color: #7f8c8d; font-style: italic;')
+        label.setVisible(self.loader.is_loading(key))
+        self.loading_labels[key] = label
+        return label
+
+    def set_loading(self, key, loading):
+        """Show or hide the loading indicator for a background load"""
+        label = self.loading_labels.get(key)
+        if label:
+            label.setVisible(loading)
+
+    def watch_load_errors(self, model, reload):
+        """Report a listing that stopped loading part way and offer to reload it"""
+        # Queued, so the dialog opens after the view's fetchMore has returned
+        model.load_failed.connect(lambda message: self.on_load_failed(model, reload, message),
+                                  Qt.ConnectionType.QueuedConnection)
+
+    def on_load_failed(self, model, reload, message):
+        answer = QMessageBox.warning(
+            self, 'Loading Stopped',
+            f'Only the first {model.rowCount()} rows could be loaded: {message}\n\nReload the list?',
+            QMessageBox.StandardButton.Retry | QMessageBox.StandardButton.Cancel)
+        if answer == QMessageBox.StandardButton.Retry:
+            reload()
+
+    def create_stat_widget(self, title, value):
+        """Create a statistics widget"""
+        widget = QFrame()
+        widget.setFrameStyle(QFrame.Shape.Box)
+        widget.setStyleSheet('background-color: #ecf0f1; padding: 20px; border-radius: 5px;')
+        
+        layout = QVBoxLayout()
+        
+        title_label = QLabel(title)
+        title_label.setStyleSheet('font-size: 14px; color: #7f8c8d;')
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        value_label = QLabel(str(value))
+        value_label.setStyleSheet('font-size: 32px; font-weight: bold; color: #2c3e50;')
+        value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        layout.addWidget(title_label)
+        layout.addWidget(value_label)
+        
+        widget.setLayout(layout)
+        widget.value_label = value_label
+        return widget
+        
+    def create_cars_tab(self):
+        """Create cars management tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Add car buttons
+        car_btn_layout = QHBoxLayout()
+        
+        add_car_btn = QPushButton('Add New Car')
+        add_car_btn.clicked.connect(self.add_car_dialog)
+        add_car_btn.setMaximumWidth(150)
+        car_btn_layout.addWidget(add_car_btn)
+        
+        import_cars_btn = QPushButton('Import Cars...')
+        import_cars_btn.clicked.connect(self.import_cars_dialog)
+        import_cars_btn.setMaximumWidth(150)
+        car_btn_layout.addWidget(import_cars_btn)
+        car_btn_layout.addStretch()
+        
+        layout.addLayout(car_btn_layout)
+        
+        # Cars table
+        self.cars_model = RowTableModel(CAR_COLUMNS, parent=self, key='car_id', order=CHANGE_ORDER['cars'])
+        self.cars_table = create_table_view(self.cars_model, {
+            8: self.update_car_status_dialog
+        })
+        
+        # Search, filters and sort are applied by the database
+        self.cars_search = SearchBar(
+            'Search plate, brand, model or color...',
+            filters=[('status', [('All statuses', None), ('Available', 'available'),
+                                 ('Rented', 'rented'), ('Maintenance', 'maintenance')]),
+                     ('type', [('All types', None), ('Sedan', 'sedan'), ('SUV', 'suv'), ('Van', 'van'),
+                               ('Truck', 'truck'), ('Coupe', 'coupe')])],
+            sorts=[('Newest', 'newest'), ('Brand', 'brand'),
+                   ('Rate (low to high)', 'rate_low'), ('Rate (high to low)', 'rate_high')])
+        self.cars_search.changed.connect(self.load_cars_data)
+        self.watch_load_errors(self.cars_model, self.load_cars_data)
+        layout.addWidget(self.cars_search)
+        
+        layout.addWidget(self.create_loading_label('cars'))
+        layout.addWidget(self.cars_table)
+        
+        # Refresh button
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.refresh_cars_data)
+        refresh_btn.setMaximumWidth(100)
+        layout.addWidget(refresh_btn)
+        
+        widget.setLayout(layout)
+        
+        # Load initial data
+        self.load_cars_data()
+        
+        return widget
+        
+    def load_cars_data(self):
+        """Load the cars matching the search into the table in the background"""
+        self.loader.submit('cars', stream_search, 'cars', **self.cars_search.criteria(),
+                           on_result=self.cars_model.set_stream)
+        
+    def refresh_cars_data(self):
+        """Patch cars changed since the table was loaded into it"""
+        self.refresh_model('cars', self.cars_model, self.load_cars_data)
+        
+    def refresh_model(self, table, model, reload):
+        """Fetch a tracked table's changes in the background and patch them into its model"""
+        if model.version is None or model.error is not None:
+            reload()
+            return
+        # Same key as the full load, so whichever was requested last wins
+        self.loader.submit(table, list_changes, table, model.version,
+                           on_result=model.apply_changes)
+            
+    def add_car_dialog(self):
+        """Show add car dialog"""
+        dialog = AddCarDialog(self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.refresh_cars_data()
+            
+    def import_cars_dialog(self):
+        """Bulk import cars from a CSV or JSON-lines file"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, 'Import Cars', '', 'Car files (*.csv *.jsonl *.json);;All files (*)')
+        if not path or not self.check_session(STAFF_ROLES):
+            return
+        self.loader.submit('import_cars', import_cars, path,
+                           on_result=self.on_cars_imported,
+                           on_error=lambda message: QMessageBox.warning(
+                               self, 'Error', f'Import failed: {message}'))
+        
+    def on_cars_imported(self, report):
+        message = f"Imported {report['inserted']} cars in {report['elapsed']:.1f}s."
+        if report['errors']:
+            lines = [f"Line {line_no}: {error}" for line_no, error in report['errors'][:10]]
+            if report['failed'] > 10:
+                lines.append(f"... and {report['failed'] - 10} more")
+            message += f"\n\n{report['failed']} rows failed:\n" + "\n".join(lines)
+            QMessageBox.warning(self, 'Import Finished', message)
+        else:
+            QMessageBox.information(self, 'Import Finished', message)
+        self.refresh_cars_data()
+        
+    def update_car_status_dialog(self, car):
+        """Show update car status dialog"""
+        dialog = UpdateCarStatusDialog(car, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.refresh_cars_data()
+            
+    def create_users_tab(self):
+        """Create users management tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Add user button
+        add_user_btn = QPushButton('Add New User')
+        add_user_btn.clicked.connect(self.add_user_dialog)
+        add_user_btn.setMaximumWidth(150)
+        layout.addWidget(add_user_btn)
+        
+        # Users table
+        self.users_model = RowTableModel(USER_COLUMNS, parent=self, key='user_id', order=CHANGE_ORDER['users'])
+        self.users_table = create_table_view(self.users_model)
+        
+        self.users_search = SearchBar(
+            'Search name, email, phone or license...',
+            filters=[('role', [('All roles', None), ('Customer', 'customer'),
+                               ('Staff', 'staff'), ('Admin', 'admin')])],
+            sorts=[('Newest', 'newest'), ('Name', 'name')])
+        self.users_search.changed.connect(self.load_users_data)
+        self.watch_load_errors(self.users_model, self.load_users_data)
+        layout.addWidget(self.users_search)
+        
+        layout.addWidget(self.create_loading_label('users'))
+        layout.addWidget(self.users_table)
+        
+        # Refresh button
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.refresh_users_data)
+        refresh_btn.setMaximumWidth(100)
+        layout.addWidget(refresh_btn)
+        
+        widget.setLayout(layout)
+        
+        # Load initial data
+        self.load_users_data()
+        
+        return widget
+        
+    def load_users_data(self):
+        """Load the users matching the search into the table in the background"""
+        self.loader.submit('users', stream_search, 'users', **self.users_search.criteria(),
+                           on_result=self.users_model.set_stream)
+        
+    def refresh_users_data(self):
+        """Patch users changed since the table was loaded into it"""
+        self.refresh_model('users', self.users_model, self.load_users_data)
+            
+    def add_user_dialog(self):
+        """Show add user dialog"""
+        dialog = AddUserDialog(self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.refresh_users_data()
+            
+    def create_bookings_tab(self):
+        """Create bookings management tab"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Bookings table
+        self.bookings_model = RowTableModel(BOOKING_COLUMNS, parent=self, key='booking_id', order=CHANGE_ORDER['bookings'])
+        self.bookings_table = create_table_view(self.bookings_model, {
+            8: self.manage_booking_dialog,
+            9: lambda booking: self.view_receipt(booking['booking_id'])
+        })
+        # Staff can select several pending bookings and approve them at once
+        self.bookings_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        
+        self.bookings_search = SearchBar(
+            'Search customer, car or booking number...',
+            filters=[('status', [('All statuses', None)] + [(status.title(), status) for status in
+                                 ('pending', 'approved', 'rejected', 'completed', 'cancelled')]),
+                     ('payment_status', [('Paid or unpaid', None), ('Paid', 'paid'), ('Unpaid', 'pending')])],
+            sorts=[('Newest', 'newest'), ('Start date', 'start_date'), ('Amount', 'amount_high')],
+            date_range=('start_from', 'start_to', 'Starting'))
+        self.bookings_search.changed.connect(self.load_bookings_data)
+        self.watch_load_errors(self.bookings_model, self.load_bookings_data)
+        layout.addWidget(self.bookings_search)
+        
+        layout.addWidget(self.create_loading_label('bookings'))
+        layout.addWidget(self.bookings_table)
+        
+        # Batch action and refresh buttons
+        btn_layout = QHBoxLayout()
+        
+        self.approve_selected_btn = QPushButton('Approve Selected')
+        self.approve_selected_btn.clicked.connect(lambda: self.update_selected_bookings('approved'))
+        self.approve_selected_btn.setStyleSheet('background-color: #27ae60; color: white;')
+        btn_layout.addWidget(self.approve_selected_btn)
+        
+        self.reject_selected_btn = QPushButton('Reject Selected')
+        self.reject_selected_btn.clicked.connect(lambda: self.update_selected_bookings('rejected'))
+        self.reject_selected_btn.setStyleSheet('background-color: #e74c3c; color: white;')
+        btn_layout.addWidget(self.reject_selected_btn)
+        
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.refresh_bookings_data)
+        refresh_btn.setMaximumWidth(100)
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addStretch()
+        
+        layout.addLayout(btn_layout)
+        
+        widget.setLayout(layout)
+        
+        # Load initial data
+        self.load_bookings_data()
+        
+        return widget
+        
+    def load_bookings_data(self):
+        """Load the bookings matching the search into the table in the background"""
+        self.loader.submit('bookings', stream_search, 'bookings', **self.bookings_search.criteria(),
+                           on_result=self.bookings_model.set_stream)
+        
+    def refresh_bookings_data(self):
+        """Patch bookings changed since the table was loaded into it"""
+        self.refresh_model('bookings', self.bookings_model, self.load_bookings_data)
+            
+    def update_selected_bookings(self, status):
+        """Approve or reject every selected pending booking in one transaction"""
+        rows = self.bookings_table.selectionModel().selectedRows()
+        booking_ids = [self.bookings_model.row_data(index.row())['booking_id'] for index in rows
+                       if self.bookings_model.row_data(index.row())['status'] == 'pending']
+        if not booking_ids:
+            QMessageBox.warning(self, 'Error', 'Please select one or more pending bookings')
+            return
+        if not self.check_session(STAFF_ROLES):
+            return
+        
+        self.approve_selected_btn.setEnabled(False)
+        self.reject_selected_btn.setEnabled(False)
+        self.loader.submit('update_bookings', update_booking_statuses, booking_ids, status,
+                           on_result=lambda ids: self.on_bookings_updated(status, ids),
+                           on_error=lambda message: self.on_bookings_updated(status, None))
+        
+    def on_bookings_updated(self, status, booking_ids):
+        self.approve_selected_btn.setEnabled(True)
+        self.reject_selected_btn.setEnabled(True)
+        if booking_ids is None:
+            QMessageBox.warning(self, 'Error', 'Failed to update booking status')
+            return
+        QMessageBox.information(self, 'Success', f'{len(booking_ids)} booking(s) {status} successfully!')
+        self.refresh_bookings_data()
+        
+    def manage_booking_dialog(self, booking):
+        """Show manage booking dialog"""
+        dialog = ManageBookingDialog(booking, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.refresh_bookings_data()
+            
+    def create_reports_tab(self):
+        """Create revenue and utilization reports tab (reads only the rollup tables)"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Period and grouping
+        controls = QHBoxLayout()
+        self.report_period = QComboBox()
+        for label, days in [('Last 7 days', 7), ('Last 30 days', 30), ('Last 90 days', 90),
+                            ('Last 12 months', 365), ('Last 3 years', 3 * 365)]:
+            self.report_period.addItem(label, days)
+        self.report_period.setCurrentIndex(1)
+        self.report_grouping = QComboBox()
+        for label, by in [('By day', 'day'), ('By month', 'month'), ('By car type', 'type')]:
+            self.report_grouping.addItem(label, by)
+        self.report_period.currentIndexChanged.connect(self.load_report)
+        self.report_grouping.currentIndexChanged.connect(self.load_report)
+        controls.addWidget(QLabel('Period:'))
+        controls.addWidget(self.report_period)
+        controls.addWidget(self.report_grouping)
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.load_report)
+        refresh_btn.setMaximumWidth(100)
+        controls.addWidget(refresh_btn)
+        controls.addStretch()
+        layout.addLayout(controls)
+        
+        self.report_summary = QLabel('')
+        self.report_summary.setStyleSheet('font-weight: bold;')
+        layout.addWidget(self.report_summary)
+        
+        self.report_model = RowTableModel(REPORT_COLUMNS, parent=self)
+        layout.addWidget(self.create_loading_label('report'))
+        layout.addWidget(create_table_view(self.report_model))
+        
+        layout.addWidget(QLabel('Top cars by revenue'))
+        self.top_cars_model = RowTableModel(TOP_CAR_COLUMNS, parent=self)
+        layout.addWidget(create_table_view(self.top_cars_model))
+        
+        widget.setLayout(layout)
+        self.load_report()
+        return widget
+        
+    def load_report(self):
+        """Load the selected report in the background"""
+        end = date.today()
+        start = end - timedelta(days=self.report_period.currentData() - 1)
+        self.loader.submit('report', revenue_report, start, end, self.report_grouping.currentData(),
+                           on_result=self.show_report,
+                           on_error=lambda message: self.report_summary.setText(
+                               f'Report unavailable: {message}'))
+        self.loader.submit('top_cars', top_cars, 10, on_result=self.top_cars_model.set_rows)
+        
+    def show_report(self, report):
+        if report is None:
+            self.report_summary.setText('Report unavailable: could not connect to the database')
+            return
+        totals = report['totals']
+        summary = (f"Revenue ${totals['revenue']:,.2f} from {totals['payments']} payments, "
+                   f"{totals['rentals']} rentals")
+        if totals['avg_rental_days'] is not None:
+            summary += f" averaging {totals['avg_rental_days']:.1f} days"
+        if totals['utilization'] is not None:
+            summary += f", fleet utilization {totals['utilization']:.1%}"
+        if report['stale']:
+            summary += " (some updates failed; run 'python reports.py backfill')"
+        self.report_summary.setText(summary)
+        self.report_model.set_rows(report['rows'])
+        
+    def view_receipt(self, booking_id):
+        """View booking receipt"""
+        dialog = ReceiptDialog(booking_id, self)
+        dialog.exec()
+        
+    def load_staff_dashboard(self, layout):
+        """Load staff dashboard"""
+        tabs = QTabWidget()
+        
+        # Bookings tab
+        bookings_tab = self.create_bookings_tab()
+        
+        # Cars tab
+        cars_tab = self.create_cars_tab()
+        
+        tabs.addTab(bookings_tab, 'Bookings')
+        tabs.addTab(cars_tab, 'Cars')
+        
+        layout.addWidget(tabs)
+        
+    def load_customer_dashboard(self, layout):
+        """Load customer dashboard"""
+        tabs = QTabWidget()
+        
+        # Warm the availability index so the first booking check is instant
+        self.loader.submit('availability', sync_availability_index)
+        
+        # Available Cars tab
+        available_cars_tab = self.create_available_cars_tab()
+        
+        # My Bookings tab
+        my_bookings_tab = self.create_my_bookings_tab()
+        
+        tabs.addTab(available_cars_tab, 'Available Cars')
+        tabs.addTab(my_bookings_tab, 'My Bookings')
+        
+        layout.addWidget(tabs)
+        
+    def create_available_cars_tab(self):
+        """Create available cars tab for customers"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Date range search
+        search_layout = QHBoxLayout()
+        
+        self.search_start = QDateEdit()
+        self.search_start.setDate(QDate.currentDate())
+        self.search_start.setCalendarPopup(True)
+        self.search_start.setMinimumDate(QDate.currentDate())
+        search_layout.addWidget(QLabel('From:'))
+        search_layout.addWidget(self.search_start)
+        
+        self.search_end = QDateEdit()
+        self.search_end.setDate(QDate.currentDate().addDays(1))
+        self.search_end.setCalendarPopup(True)
+        self.search_end.setMinimumDate(QDate.currentDate().addDays(1))
+        search_layout.addWidget(QLabel('To:'))
+        search_layout.addWidget(self.search_end)
+        
+        self.search_type = QComboBox()
+        self.search_type.addItems(['any', 'sedan', 'suv', 'van', 'truck', 'coupe'])
+        search_layout.addWidget(QLabel('Type:'))
+        search_layout.addWidget(self.search_type)
+        
+        self.search_seats = QSpinBox()
+        self.search_seats.setRange(0, 12)
+        self.search_seats.setSpecialValueText('any')
+        search_layout.addWidget(QLabel('Min Seats:'))
+        search_layout.addWidget(self.search_seats)
+        
+        self.search_rate = QDoubleSpinBox()
+        self.search_rate.setRange(0, 10000)
+        self.search_rate.setPrefix('$')
+        self.search_rate.setSpecialValueText('any')
+        search_layout.addWidget(QLabel('Max Rate/Day:'))
+        search_layout.addWidget(self.search_rate)
+        
+        search_btn = QPushButton('Search')
+        search_btn.clicked.connect(self.search_available_cars)
+        search_layout.addWidget(search_btn)
+        
+        show_all_btn = QPushButton('Show All')
+        show_all_btn.clicked.connect(self.clear_car_search)
+        search_layout.addWidget(show_all_btn)
+        
+        layout.addLayout(search_layout)
+        
+        # Available cars table
+        self.car_search = None
+        # Photos are decoded in the background; cells fill in as they arrive
+        self.thumbnails = ThumbnailCache(parent=self)
+        self.available_cars_model = RowTableModel(
+            AVAILABLE_CAR_COLUMNS, parent=self,
+            decorations={0: lambda car: self.thumbnails.get(car.get('image_path'))})
+        self.thumbnails.thumbnail_ready.connect(
+            lambda path: self.available_cars_model.refresh_column(0))
+        self.watch_load_errors(self.available_cars_model, self.load_available_cars)
+        self.available_cars_table = create_table_view(self.available_cars_model, {
+            8: self.book_car_dialog
+        })
+        self.available_cars_table.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.available_cars_table.verticalHeader().setDefaultSectionSize(THUMBNAIL_SIZE + 8)
+        
+        layout.addWidget(self.create_loading_label('available_cars'))
+        layout.addWidget(self.available_cars_table)
+        
+        # Refresh button
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.load_available_cars)
+        refresh_btn.setMaximumWidth(100)
+        layout.addWidget(refresh_btn)
+        
+        widget.setLayout(layout)
+        
+        # Load initial data
+        self.load_available_cars()
+        
+        return widget
+        
+    def load_available_cars(self):
+        """Load available cars for booking in the background"""
+        if self.car_search:
+            self.loader.submit('available_cars', search_available_cars, **self.car_search,
+                               on_result=self.available_cars_model.set_rows)
+        else:
+            self.loader.submit('available_cars', stream_bookable_cars,
+                               on_result=self.available_cars_model.set_stream)
+            
+    def search_available_cars(self):
+        """Show only the cars that are free for the selected dates"""
+        start_date = self.search_start.date().toPyDate()
+        end_date = self.search_end.date().toPyDate()
+        if end_date <= start_date:
+            QMessageBox.warning(self, 'Error', 'End date must be after start date')
+            return
+        
+        car_type = self.search_type.currentText()
+        self.car_search = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'car_type': None if car_type == 'any' else car_type,
+            'min_seats': self.search_seats.value() or None,
+            'max_rate': self.search_rate.value() or None
+        }
+        self.load_available_cars()
+        
+    def clear_car_search(self):
+        """Go back to listing every bookable car"""
+        self.car_search = None
+        self.load_available_cars()
+            
+    def book_car_dialog(self, car):
+        """Show book car dialog"""
+        dates = None
+        if self.car_search:
+            dates = (self.car_search['start_date'], self.car_search['end_date'])
+        dialog = BookCarDialog(car, self.user, self, dates)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.load_available_cars()
+            
+    def create_my_bookings_tab(self):
+        """Create my bookings tab for customers"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # My bookings table
+        self.my_bookings_model = RowTableModel(MY_BOOKING_COLUMNS, parent=self)
+        self.my_bookings_table = create_table_view(self.my_bookings_model, {
+            7: lambda booking: self.view_receipt(booking['booking_id'])
+        })
+        
+        layout.addWidget(self.create_loading_label('my_bookings'))
+        layout.addWidget(self.my_bookings_table)
+        
+        # Refresh button
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.load_my_bookings)
+        refresh_btn.setMaximumWidth(100)
+        layout.addWidget(refresh_btn)
+        
+        widget.setLayout(layout)
+        
+        # Load initial data
+        self.load_my_bookings()
+        
+        return widget
+        
+    def load_my_bookings(self):
+        """Load customer's bookings in the background"""
+        # A customer's own list is small and cached, so it is loaded whole
+        self.loader.submit('my_bookings', list_user_bookings, self.user['user_id'],
+                           on_result=self.my_bookings_model.set_rows)
+
+
+class AddCarDialog(QDialog):
+    """Dialog for adding a new car"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Add New Car')
+        self.setFixedSize(450, 500)
+        
+        layout = QVBoxLayout()
+        form_layout = QFormLayout()
+        
+        self.plate_no_input = QLineEdit()
+        form_layout.addRow('Plate Number:', self.plate_no_input)
+        
+        self.brand_input = QLineEdit()
+        form_layout.addRow('Brand:', self.brand_input)
+        
+        self.model_input = QLineEdit()
+        form_layout.addRow('Model:', self.model_input)
+        
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(['sedan', 'suv', 'van', 'truck', 'coupe'])
+        form_layout.addRow('Type:', self.type_combo)
+        
+        self.year_input = QSpinBox()
+        self.year_input.setRange(1990, 2030)
+        self.year_input.setValue(2024)
+        form_layout.addRow('Year:', self.year_input)
+        
+        self.color_input = QLineEdit()
+        form_layout.addRow('Color:', self.color_input)
+        
+        self.rate_input = QDoubleSpinBox()
+        self.rate_input.setRange(0, 10000)
+        self.rate_input.setValue(50.0)
+        self.rate_input.setPrefix('$')
+        form_layout.addRow('Rate per Day:', self.rate_input)
+        
+        self.seats_input = QSpinBox()
+        self.seats_input.setRange(2, 12)
+        self.seats_input.setValue(4)
+        form_layout.addRow('Seats:', self.seats_input)
+        
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(['available', 'maintenance'])
+        form_layout.addRow('Status:', self.status_combo)
+        
+        layout.addLayout(form_layout)
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.save_btn = QPushButton('Save')
+        self.save_btn.clicked.connect(self.save_car)
+        btn_layout.addWidget(self.save_btn)
+        
+        cancel_btn = QPushButton('Cancel')
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        
+    def save_car(self):
+        if not all([
+            self.plate_no_input.text().strip(),
+            self.brand_input.text().strip(),
+            self.model_input.text().strip(),
+            self.color_input.text().strip()
+        ]):
+            QMessageBox.warning(self, 'Error', 'Please fill in all required fields')
+            return
+        if not self.parent().check_session(STAFF_ROLES):
+            self.reject()
+            return
+        
+        self.save_btn.setEnabled(False)
+        self.loader.submit(
+            'save', add_car,
+            plate_no=self.plate_no_input.text().strip(),
+            brand=self.brand_input.text().strip(),
+            model=self.model_input.text().strip(),
+            type=self.type_combo.currentText(),
+            year=self.year_input.value(),
+            color=self.color_input.text().strip(),
+            rate_per_day=self.rate_input.value(),
+            seats=self.seats_input.value(),
+            status=self.status_combo.currentText(),
+            on_result=self.on_car_saved,
+            on_error=lambda message: self.on_car_saved(None)
+        )
+        
+    def on_car_saved(self, car_id):
+        self.save_btn.setEnabled(True)
+        if car_id:
+            QMessageBox.information(self, 'Success', 'Car added successfully!')
+            self.accept()
+        else:
+            QMessageBox.warning(self, 'Error', 'Failed to add car')
+
+
+class UpdateCarStatusDialog(QDialog):
+    """Dialog for updating car status"""
+    
+    def __init__(self, car, parent=None):
+        super().__init__(parent)
+        self.car = car
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Update Car Status')
+        self.setFixedSize(350, 200)
+        
+        layout = QVBoxLayout()
+        
+        label = QLabel(f"Update status for {self.car['brand']} {self.car['model']}")
+        label.setStyleSheet('font-weight: bold; margin: 10px;')
+        layout.addWidget(label)
+        
+        form_layout = QFormLayout()
+        
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(['available', 'maintenance', 'rented'])
+        self.status_combo.setCurrentText(self.car['status'])
+        form_layout.addRow('Status:', self.status_combo)
+        
+        layout.addLayout(form_layout)
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.save_btn = QPushButton('Update')
+        self.save_btn.clicked.connect(self.update_status)
+        btn_layout.addWidget(self.save_btn)
+        
+        cancel_btn = QPushButton('Cancel')
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        
+    def update_status(self):
+        new_status = self.status_combo.currentText()
+        if not self.parent().check_session(STAFF_ROLES):
+            self.reject()
+            return
+        
+        self.save_btn.setEnabled(False)
+        self.loader.submit('save', update_car, self.car['car_id'], status=new_status,
+                           on_result=self.on_status_updated,
+                           on_error=self.on_update_failed)
+        
+    def on_status_updated(self, success):
+        if success:
+            QMessageBox.information(self, 'Success', 'Car status updated successfully!')
+            self.accept()
+        else:
+            self.on_update_failed('database error')
+            
+    def on_update_failed(self, message):
+        self.save_btn.setEnabled(True)
+        QMessageBox.warning(self, 'Error', f'Failed to update: {message}')
+
+
+class AddUserDialog(QDialog):
+    """Dialog for adding a new user"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Add New User')
+        self.setFixedSize(450, 450)
+        
+        layout = QVBoxLayout()
+        form_layout = QFormLayout()
+        
+        self.fullname_input = QLineEdit()
+        form_layout.addRow('Full Name:', self.fullname_input)
+        
+        self.email_input = QLineEdit()
+        form_layout.addRow('Email:', self.email_input)
+        
+        self.password_input = QLineEdit()
+        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        form_layout.addRow('Password:', self.password_input)
+        
+        self.role_combo = QComboBox()
+        self.role_combo.addItems(['customer', 'staff', 'admin'])
+        form_layout.addRow('Role:', self.role_combo)
+        
+        self.phone_input = QLineEdit()
+        form_layout.addRow('Phone:', self.phone_input)
+        
+        self.address_input = QLineEdit()
+        form_layout.addRow('Address:', self.address_input)
+        
+        self.license_input = QLineEdit()
+        form_layout.addRow('License No:', self.license_input)
+        
+        layout.addLayout(form_layout)
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.save_btn = QPushButton('Save')
+        self.save_btn.clicked.connect(self.save_user)
+        btn_layout.addWidget(self.save_btn)
+        
+        cancel_btn = QPushButton('Cancel')
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        
+    def save_user(self):
+        if not all([
+            self.fullname_input.text().strip(),
+            self.email_input.text().strip(),
+            self.password_input.text().strip()
+        ]):
+            QMessageBox.warning(self, 'Error', 'Please fill in all required fields')
+            return
+        if not self.parent().check_session(ADMIN_ROLES):
+            self.reject()
+            return
+        
+        self.save_btn.setEnabled(False)
+        self.loader.submit(
+            'save', register_user,
+            full_name=self.fullname_input.text().strip(),
+            email=self.email_input.text().strip(),
+            password=self.password_input.text().strip(),
+            role=self.role_combo.currentText(),
+            phone=self.phone_input.text().strip(),
+            address=self.address_input.text().strip(),
+            license_no=self.license_input.text().strip(),
+            on_result=self.on_user_saved,
+            on_error=lambda message: self.on_user_saved(None)
+        )
+        
+    def on_user_saved(self, user_id):
+        self.save_btn.setEnabled(True)
+        if user_id:
+            QMessageBox.information(self, 'Success', 'User added successfully!')
+            self.accept()
+        else:
+            QMessageBox.warning(self, 'Error', 'Failed to add user. Email may already exist.')
+
+
+class ManageBookingDialog(QDialog):
+    """Dialog for managing bookings"""
+    
+    def __init__(self, booking, parent=None):
+        super().__init__(parent)
+        self.booking = booking
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Manage Booking')
+        self.setFixedSize(400, 300)
+        
+        layout = QVBoxLayout()
+        
+        # Booking details
+        details = f"""
+        Booking ID: {self.booking['booking_id']}
+        Customer: {self.booking['customer_name']}
+        Car: {self.booking['car_brand']} {self.booking['car_model']}
+        Start Date: {self.booking['start_date']}
+        End Date: {self.booking['end_date']}
+        Total Amount: ${self.booking['total_amount']:.2f}
+        Current Status: {self.booking['status']}
+        """
+        
+        details_label = QLabel(details)
+        details_label.setStyleSheet('background-color: #ecf0f1; padding: 10px; border-radius: 5px;')
+        layout.addWidget(details_label)
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.approve_btn = QPushButton('Approve')
+        self.approve_btn.clicked.connect(lambda: self.update_booking('approved'))
+        self.approve_btn.setStyleSheet('background-color: #27ae60; color: white; padding: 10px;')
+        btn_layout.addWidget(self.approve_btn)
+        
+        self.reject_btn = QPushButton('Reject')
+        self.reject_btn.clicked.connect(lambda: self.update_booking('rejected'))
+        self.reject_btn.setStyleSheet('background-color: #e74c3c; color: white; padding: 10px;')
+        btn_layout.addWidget(self.reject_btn)
+        
+        layout.addLayout(btn_layout)
+        
+        cancel_btn = QPushButton('Cancel')
+        cancel_btn.clicked.connect(self.reject)
+        layout.addWidget(cancel_btn)
+        
+        self.setLayout(layout)
+        
+    def update_booking(self, status):
+        if not self.parent().check_session(STAFF_ROLES):
+            self.reject()
+            return
+        self.approve_btn.setEnabled(False)
+        self.reject_btn.setEnabled(False)
+        self.loader.submit('save', update_booking_status, self.booking['booking_id'], status,
+                           on_result=lambda success: self.on_booking_updated(status, success),
+                           on_error=lambda message: self.on_booking_updated(status, False))
+        
+    def on_booking_updated(self, status, success):
+        self.approve_btn.setEnabled(True)
+        self.reject_btn.setEnabled(True)
+        if success:
+            QMessageBox.information(self, 'Success', f'Booking {status} successfully!')
+            self.accept()
+        else:
+            QMessageBox.warning(self, 'Error', 'Failed to update booking status')
+
+
+class BookCarDialog(QDialog):
+    """Dialog for booking a car"""
+    
+    def __init__(self, car, user, parent=None, dates=None):
+        super().__init__(parent)
+        self.car = car
+        self.user = user
+        self.dates = dates
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Book Car')
+        self.setFixedSize(450, 450)
+        
+        layout = QVBoxLayout()
+        
+        # Car details
+        car_info = QLabel(f"{self.car['brand']} {self.car['model']} ({self.car['year']})\n"
+                         f"Rate: ${self.car['rate_per_day']:.2f} per day")
+        car_info.setStyleSheet('font-weight: bold; font-size: 14px; margin: 10px;')
+        layout.addWidget(car_info)
+        
+        form_layout = QFormLayout()
+        
+        self.start_date = QDateEdit()
+        self.start_date.setDate(QDate.currentDate())
+        self.start_date.setCalendarPopup(True)
+        self.start_date.setMinimumDate(QDate.currentDate())
+        self.start_date.dateChanged.connect(self.calculate_total)
+        form_layout.addRow('Start Date:', self.start_date)
+        
+        self.end_date = QDateEdit()
+        self.end_date.setDate(QDate.currentDate().addDays(1))
+        self.end_date.setCalendarPopup(True)
+        self.end_date.setMinimumDate(QDate.currentDate().addDays(1))
+        self.end_date.dateChanged.connect(self.calculate_total)
+        form_layout.addRow('End Date:', self.end_date)
+        
+        # Pre-fill the dates the customer searched for
+        if self.dates:
+            self.start_date.setDate(QDate(self.dates[0]))
+            self.end_date.setDate(QDate(self.dates[1]))
+        
+        self.pickup_input = QLineEdit()
+        form_layout.addRow('Pickup Location:', self.pickup_input)
+        
+        self.dropoff_input = QLineEdit()
+        form_layout.addRow('Dropoff Location:', self.dropoff_input)
+        
+        self.payment_combo = QComboBox()
+        self.payment_combo.addItems(['credit_card', 'debit_card', 'cash', 'bank_transfer'])
+        form_layout.addRow('Payment Method:', self.payment_combo)
+        
+        self.total_label = QLabel('$0.00')
+        self.total_label.setStyleSheet('font-size: 16px; font-weight: bold; color: #2c3e50;')
+        form_layout.addRow('Total Amount:', self.total_label)
+        
+        layout.addLayout(form_layout)
+        
+        # Calculate initial total
+        self.calculate_total()
+        
+        # Buttons
+        btn_layout = QHBoxLayout()
+        
+        self.book_btn = QPushButton('Book Now')
+        self.book_btn.clicked.connect(self.book_car)
+        self.book_btn.setStyleSheet('background-color: #3498db; color: white; padding: 10px;')
+        btn_layout.addWidget(self.book_btn)
+        
+        cancel_btn = QPushButton('Cancel')
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        
+    def calculate_total(self):
+        start = self.start_date.date().toPyDate()
+        end = self.end_date.date().toPyDate()
+        
+        if end > start:
+            days = (end - start).days + 1
+            total = Decimal(self.car['rate_per_day']) * days
+            self.total_label.setText(f"${total:.2f}")
+        else:
+            self.total_label.setText('Invalid dates')
+            
+    def book_car(self):
+        if not all([
+            self.pickup_input.text().strip(),
+            self.dropoff_input.text().strip()
+        ]):
+            QMessageBox.warning(self, 'Error', 'Please fill in all fields')
+            return
+        
+        start_date = self.start_date.date().toPyDate()
+        end_date = self.end_date.date().toPyDate()
+        
+        if end_date <= start_date:
+            QMessageBox.warning(self, 'Error', 'End date must be after start date')
+            return
+        
+        # Calculate total
+        days = (end_date - start_date).days + 1
+        total_amount = Decimal(self.car['rate_per_day']) * days
+        
+        user = self.parent().check_session()
+        if user is None:
+            self.reject()
+            return
+        
+        # Check availability and create the booking in one transaction
+        self.book_btn.setEnabled(False)
+        self.loader.submit(
+            'save', reserve_car,
+            customer_id=user['user_id'],
+            car_id=self.car['car_id'],
+            start_date=start_date.strftime('%Y-%m-%d'),
+            end_date=end_date.strftime('%Y-%m-%d'),
+            pickup_location=self.pickup_input.text().strip(),
+            dropoff_location=self.dropoff_input.text().strip(),
+            total_amount=total_amount,
+            payment_method=self.payment_combo.currentText(),
+            on_result=self.on_booked,
+            on_error=self.on_booking_failed
+        )
+        
+    def on_booked(self, result):
+        self.book_btn.setEnabled(True)
+        booking_id, reason = result
+        if reason:
+            QMessageBox.warning(self, 'Error', f'Car is not available for selected dates: {reason}')
+        elif booking_id:
+            QMessageBox.information(self, 'Success', 
+                'Booking created successfully! Waiting for approval.')
+            self.accept()
+        else:
+            QMessageBox.warning(self, 'Error', 'Failed to create booking')
+            
+    def on_booking_failed(self, message):
+        self.book_btn.setEnabled(True)
+        QMessageBox.warning(self, 'Error', f'Failed to create booking: {message}')
+
+
+class ReceiptDialog(QDialog):
+    """Dialog for viewing booking receipt"""
+    
+    def __init__(self, booking_id, parent=None):
+        super().__init__(parent)
+        self.booking_id = booking_id
+        self.loader = DataLoader(self)
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle('Booking Receipt')
+        self.setFixedSize(600, 700)
+        
+        layout = QVBoxLayout()
+        
+        from PyQt6.QtWidgets import QTextBrowser
+        
+        self.text_browser = QTextBrowser()
+        self.text_browser.setHtml('<p style="color: #7f8c8d;">Loading receipt...</p>')
+        layout.addWidget(self.text_browser)
+        
+        # Close button
+        close_btn = QPushButton('Close')
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+        
+        self.setLayout(layout)
+        
+        # Get booking details in the background
+        self.loader.submit('receipt', get_booking_details, self.booking_id,
+                           on_result=self.show_receipt,
+                           on_error=lambda message: self.show_receipt(None))
+        
+    def show_receipt(self, booking_details):
+        """Render the receipt once the booking details have loaded"""
+        if not booking_details:
+            QMessageBox.warning(self, 'Error', 'Booking not found')
+            self.reject()
+            return
+        
+        self.text_browser.setHtml(render_receipt(booking_details))
+
+
+def main():
+    app = QApplication(sys.argv)
+    
+    # The embedded SQLite database is created and upgraded on startup
+    if get_backend().name == 'sqlite':
+        try:
+            migrate()
+        except Exception as e:
+            QMessageBox.critical(None, 'Database Error', str(e))
+            sys.exit(1)
+    
+    # Show login window
+    login_window = LoginWindow()
+    if login_window.exec() == QDialog.DialogCode.Accepted:
+        # Show main window with user data
+        main_window = MainWindow(login_window.user)
+        main_window.show()
+        sys.exit(app.exec())
+    else:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Car Rental System - Query result cache
+A small thread-safe LRU cache with per-entry expiry for read paths that are
+hit repeatedly, such as receipts and a customer's booking list.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class QueryCache:
+    """LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, max_entries=1000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a load that raced with a write
+        # does not cache the value it read before the write
+        self._generation = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+            self._stats['misses'] += 1
+            return default
+
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value, calling loader() to fill it on a miss.
+
+        None results are not cached, so failed loads are retried next time.
+        """
+        generation = self._generation
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            if value is not None:
+                self.put(key, value, generation)
+        return value
+
+    async def get_or_load_async(self, key, loader):
+        """get_or_load for a loader that is a coroutine function"""
+        generation = self._generation
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            if value is not None:
+                self.put(key, value, generation)
+        return value
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
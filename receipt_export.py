@@ -0,0 +1,140 @@
+"""
+Car Rental System - Bulk receipt export
+Streams every paid booking and renders its receipt to PDF in a process pool,
+writing the files to a directory or a single zip archive.
+
+Usage: python receipt_export.py OUT [--zip] [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+                                    [--workers N] [--chunk-size 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from car_rental_system import stream_paid_booking_details
+from receipts import render_receipt_pdf
+
+
+def receipt_filename(details):
+    return f"receipt_{details['booking_id']:08d}.pdf"
+
+
+def render_chunk(rows):
+    """Render a chunk of booking detail rows; runs in a worker process.
+
+    Returns (filename, pdf bytes) pairs and (booking_id, error) pairs.
+    """
+    rendered = []
+    errors = []
+    for details in rows:
+        try:
+            rendered.append((receipt_filename(details), render_receipt_pdf(details)))
+        except Exception as e:
+            errors.append((details.get('booking_id'), str(e)))
+    return rendered, errors
+
+
+class _DirectoryWriter:
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+
+    def write(self, filename, data):
+        with open(os.path.join(self.path, filename), 'wb') as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class _ZipWriter:
+    def __init__(self, path):
+        # PDFs are already compact text streams; store them without recompressing
+        self.archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED)
+
+    def write(self, filename, data):
+        self.archive.writestr(filename, data)
+
+    def close(self):
+        self.archive.close()
+
+
+def export_receipts(out, archive=False, since=None, until=None, workers=None, chunk_size=200):
+    """Export receipts for paid bookings; returns a report dict with counts and throughput"""
+    workers = workers or os.cpu_count() or 1
+    writer = _ZipWriter(out) if archive else _DirectoryWriter(out)
+    exported = 0
+    written_bytes = 0
+    errors = []
+
+    def collect(futures):
+        nonlocal exported, written_bytes
+        for future in futures:
+            rendered, chunk_errors = future.result()
+            for filename, data in rendered:
+                writer.write(filename, data)
+                written_bytes += len(data)
+            exported += len(rendered)
+            errors.extend(chunk_errors)
+
+    start = time.perf_counter()
+    stream = stream_paid_booking_details(since, until)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            while not stream.exhausted:
+                rows = stream.fetch(chunk_size)
+                if rows:
+                    pending.add(executor.submit(render_chunk, rows))
+                # Keep a bounded number of chunks in flight so memory stays flat
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            collect(pending)
+    finally:
+        stream.close()
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'exported': exported,
+        'failed': len(errors),
+        'errors': errors,
+        'bytes': written_bytes,
+        'elapsed': elapsed,
+        'receipts_per_second': exported / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export PDF receipts for paid bookings')
+    parser.add_argument('out', help='output directory, or zip file with --zip')
+    parser.add_argument('--zip', action='store_true', help='write a single zip archive')
+    parser.add_argument('--since', help='only bookings created on or after this date')
+    parser.add_argument('--until', help='only bookings created before this date')
+    parser.add_argument('--workers', type=int,
+                        help='rendering processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=200,
+                        help='bookings per worker task (default 200)')
+    args = parser.parse_args(argv)
+
+    try:
+        report = export_receipts(args.out, args.zip, args.since, args.until,
+                                 args.workers, args.chunk_size)
+    except Exception as e:
+        print(f"Export failed: {e}")
+        return 1
+
+    for booking_id, message in report['errors']:
+        print(f"Booking {booking_id}: {message}")
+    print(f"Exported {report['exported']} receipts ({report['bytes'] / 1024 / 1024:.1f} MB), "
+          f"{report['failed']} failed in {report['elapsed']:.2f}s "
+          f"({report['receipts_per_second']:.0f} receipts/s)")
+    return 0 if not report['failed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Car Rental System - Receipt rendering
+Receipt templates are compiled once at import, and rendered receipts are
+cached by booking id and a fingerprint of the booking details, so paging
+through receipts does not rebuild the same document again.
+"""
+
+import hashlib
+import html
+from datetime import date, datetime
+from string import Template
+
+from query_cache import QueryCache
+
+RECEIPT_CSS = """
+    body { font-family: Arial, sans-serif; padding: 20px; }
+    .header { text-align: center; border-bottom: 2px solid #333; padding-bottom: 20px; }
+    .header h1 { color: #3498db; margin: 10px 0; }
+    .section { margin: 20px 0; padding: 15px; background-color: #f8f9fa; border-radius: 5px; }
+    .section-title { font-weight: bold; color: #2c3e50; font-size: 16px; margin-bottom: 10px; }
+    .detail-row { display: flex; justify-content: space-between; margin: 5px 0; }
+    .detail-label { font-weight: bold; }
+    .total { font-size: 20px; color: #27ae60; font-weight: bold; }
+    .footer { margin-top: 30px; text-align: center; color: #7f8c8d; font-size: 12px; }
+"""
+
+# Receipt sections: (title, [(label, context key)])
+RECEIPT_SECTIONS = [
+    ('Booking Information', [
+        ('Booking ID', 'booking_ref'),
+        ('Booking Date', 'date_created'),
+        ('Status', 'status'),
+    ]),
+    ('Customer Information', [
+        ('Name', 'full_name'),
+        ('Email', 'email'),
+        ('Phone', 'phone'),
+        ('License No', 'license_no'),
+    ]),
+    ('Car Information', [
+        ('Car', 'car'),
+        ('Plate Number', 'plate_no'),
+        ('Color', 'color'),
+    ]),
+    ('Rental Details', [
+        ('Start Date', 'start_date'),
+        ('End Date', 'end_date'),
+        ('Rental Duration', 'duration'),
+        ('Rate per Day', 'rate_per_day'),
+        ('Pickup Location', 'pickup_location'),
+        ('Dropoff Location', 'dropoff_location'),
+    ]),
+    ('Payment Information', [
+        ('Payment Method', 'payment_method'),
+        ('Payment Status', 'payment_status'),
+    ]),
+]
+
+
+def _compile_html_template():
+    sections = []
+    for title, rows in RECEIPT_SECTIONS:
+        lines = ['<div class="section">', f'<div class="section-title">{title}</div>']
+        for label, key in rows:
+            lines.append(f'<div class="detail-row"><span class="detail-label">{label}:</span>'
+                         f'<span>${{{key}}}</span></div>')
+        if title == 'Payment Information':
+            lines.append('<div class="detail-row"><span class="detail-label total">Total Amount:</span>'
+                         '<span class="total">${total_amount}</span></div>')
+        lines.append('</div>')
+        sections.append('\n'.join(lines))
+
+    css = RECEIPT_CSS.replace('$', '$$')
+    return Template(f"""<html>
+<head><style>{css}</style></head>
+<body>
+<div class="header">
+<h1>CAR RENTAL SYSTEM</h1>
+<p>Booking Receipt</p>
+<p>Receipt Date: ${{receipt_date}}</p>
+</div>
+{chr(10).join(sections)}
+<div class="footer">
+<p>Thank you for choosing our Car Rental System!</p>
+<p>For any inquiries, please contact our support team.</p>
+</div>
+</body>
+</html>""")
+
+
+def _compile_text_template():
+    width = max(len(label) for _, rows in RECEIPT_SECTIONS for label, _ in rows) + 2
+    lines = ['CAR RENTAL SYSTEM'.center(48), 'Booking Receipt'.center(48),
+             'Receipt Date: ${receipt_date}', '=' * 48]
+    for title, rows in RECEIPT_SECTIONS:
+        lines += ['', title.upper(), '-' * len(title)]
+        lines += [f"{(label + ':').ljust(width)}${{{key}}}" for label, key in rows]
+    lines += ['', '=' * 48, f"{'Total Amount:'.ljust(width)}${{total_amount}}", '',
+              'Thank you for choosing our Car Rental System!']
+    return Template('\n'.join(lines) + '\n')
+
+
+# Compiled once; rendering is a single substitute() call
+TEMPLATES = {
+    'html': _compile_html_template(),
+    'text': _compile_text_template(),
+}
+
+_rendered = QueryCache(max_entries=500, ttl=3600)
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def receipt_context(details):
+    """Build the template values for a booking details row"""
+    days = (_to_date(details['end_date']) - _to_date(details['start_date'])).days + 1
+    context = {
+        'booking_ref': f"#{details['booking_id']}",
+        'date_created': details.get('date_created', 'N/A'),
+        'status': details['status'],
+        'full_name': details['full_name'],
+        'email': details['email'],
+        'phone': details.get('phone', 'N/A'),
+        'license_no': details.get('license_no', 'N/A'),
+        'car': f"{details['brand']} {details['model']}",
+        'plate_no': details['plate_no'],
+        'color': details['color'],
+        'start_date': details['start_date'],
+        'end_date': details['end_date'],
+        'duration': f"{days} day(s)",
+        'rate_per_day': f"${details['rate_per_day']:.2f}",
+        'pickup_location': details.get('pickup_location', 'N/A'),
+        'dropoff_location': details.get('dropoff_location', 'N/A'),
+        'payment_method': details.get('payment_method', 'N/A'),
+        'payment_status': details.get('payment_status', 'pending'),
+        'total_amount': f"${float(details['total_amount']):.2f}",
+    }
+    return {key: '' if value is None else str(value) for key, value in context.items()}
+
+
+def receipt_version(details):
+    """Fingerprint of the booking details; changes whenever the receipt would"""
+    payload = '\x1f'.join(f"{key}={details[key]}" for key in sorted(details))
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def render_receipt(details, fmt='html'):
+    """Render a receipt as 'html' (for the dialog) or 'text' (printable)"""
+    today = date.today().isoformat()
+    key = (details['booking_id'], receipt_version(details), fmt, today)
+    rendered = _rendered.get(key)
+    if rendered is None:
+        context = receipt_context(details)
+        if fmt == 'html':
+            context = {name: html.escape(value) for name, value in context.items()}
+        context['receipt_date'] = today
+        rendered = TEMPLATES[fmt].substitute(context)
+        _rendered.put(key, rendered)
+    return rendered
+
+
+# PDF page layout, in points (US Letter, monospaced text)
+PDF_PAGE_SIZE = (612, 792)
+PDF_MARGIN = 56
+PDF_FONT_SIZE = 10
+PDF_LEADING = 14
+
+
+def _pdf_escape(line):
+    line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return line.encode('latin-1', 'replace')
+
+
+def text_to_pdf(text):
+    """Lay plain text out as a minimal PDF document and return its bytes.
+
+    Uses the built-in Courier font so no fonts are embedded and no PDF
+    library is needed; long documents flow onto further pages.
+    """
+    width, height = PDF_PAGE_SIZE
+    per_page = (height - 2 * PDF_MARGIN) // PDF_LEADING
+    lines = text.splitlines() or ['']
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+
+    # Object 1: catalog, 2: page tree, 3: font, then a page + content stream per page
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>']
+    kids = []
+    for page in pages:
+        content = [b'BT', b'/F1 %d Tf' % PDF_FONT_SIZE, b'%d TL' % PDF_LEADING,
+                   b'%d %d Td' % (PDF_MARGIN, height - PDF_MARGIN)]
+        for line in page:
+            content.append(b'(' + _pdf_escape(line) + b") '")
+        content.append(b'ET')
+        stream = b'\n'.join(content)
+        page_no = len(objects) + 1
+        kids.append(b'%d 0 R' % page_no)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>'
+                       % (width, height, page_no + 1))
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+    objects[1] = b'<< /Type /Pages /Kids [' + b' '.join(kids) + b'] /Count %d >>' % len(pages)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_receipt_pdf(details):
+    """Render a receipt as PDF bytes (the text receipt laid out on a page)"""
+    return text_to_pdf(render_receipt(details, 'text'))
+
+
+def get_render_cache_stats():
+    """Return rendered receipt cache hit/miss statistics"""
+    return _rendered.stats()
@@ -0,0 +1,151 @@
+"""
+Car Rental System - Revenue and utilization reports
+Reports read only the rollup tables the data layer keeps up to date (see
+Reporting Rollups in car_rental_system.py), so a report over years of
+history reads a handful of rows per day instead of every booking and payment.
+
+Usage: python reports.py backfill
+       python reports.py show [--by day|month|type] [--days 30]
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+from car_rental_system import db_connection, get_dashboard_stats, rebuild_rollups, rollups_stale
+
+REPORT_GROUPS = ('day', 'month', 'type')
+REPORT_FIELDS = ('bookings', 'rentals', 'rental_days', 'rented_car_days', 'payments', 'revenue')
+
+
+def _load_daily(start, end):
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT day, car_type, bookings, rentals, rental_days, rented_car_days, payments, revenue
+                FROM rollup_daily
+                WHERE day BETWEEN %s AND %s
+                ORDER BY day
+            """, (start, end))
+            return cursor.fetchall()
+
+
+def _days_in_month(month, start, end):
+    """Days of the month (YYYY-MM) that fall between start and end"""
+    first = date.fromisoformat(f"{month}-01")
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return (min(last, end) - max(first, start)).days + 1
+
+
+def _summarise(period, totals, fleet, days):
+    row = dict(totals, period=period)
+    row['revenue'] = Decimal(row['revenue']).quantize(Decimal('0.01'))
+    row['avg_rental_days'] = row['rental_days'] / row['rentals'] if row['rentals'] else None
+    # Share of the fleet's car-days spent on rent; measured against today's
+    # fleet size, and not per car type since types are not counted separately
+    row['utilization'] = row['rented_car_days'] / (fleet * days) if fleet and days else None
+    return row
+
+
+def revenue_report(start, end, by='day'):
+    """Summarise bookings, rentals, utilization and revenue from start to end inclusive.
+
+    by groups the rows per 'day', 'month' or car 'type'. Returns a dict
+    with the grouped rows, a totals row, the fleet size and whether the
+    rollups may be out of date, or None if the database is unavailable.
+    """
+    if by not in REPORT_GROUPS:
+        raise ValueError(f"Unknown report grouping: {by}")
+    if isinstance(start, str):
+        start, end = date.fromisoformat(start), date.fromisoformat(end)
+    daily = _load_daily(start, end)
+    if daily is None:
+        return None
+    stats = get_dashboard_stats() or {}
+    fleet = stats.get('total_cars')
+
+    groups = {}
+    if by == 'day':
+        # Every day is listed, including days without activity
+        for offset in range((end - start).days + 1):
+            groups[start + timedelta(days=offset)] = dict.fromkeys(REPORT_FIELDS, 0)
+    overall = dict.fromkeys(REPORT_FIELDS, 0)
+    for rollup in daily:
+        if by == 'day':
+            key = rollup['day']
+        elif by == 'month':
+            key = rollup['day'].strftime('%Y-%m')
+        else:
+            key = rollup['car_type']
+        totals = groups.setdefault(key, dict.fromkeys(REPORT_FIELDS, 0))
+        for field in REPORT_FIELDS:
+            totals[field] += rollup[field]
+            overall[field] += rollup[field]
+
+    period_days = (end - start).days + 1
+    rows = []
+    for key in sorted(groups):
+        if by == 'day':
+            days = 1
+        elif by == 'month':
+            days = _days_in_month(key, start, end)
+        else:
+            days = None
+        rows.append(_summarise(key, groups[key], fleet, days))
+    return {'rows': rows, 'totals': _summarise('Total', overall, fleet, period_days),
+            'fleet': fleet, 'stale': rollups_stale()}
+
+
+def top_cars(limit=10):
+    """Return the cars that brought in the most revenue, with their rental totals"""
+    with db_connection() as conn:
+        if conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT r.car_id, c.plate_no, c.brand, c.model, c.type,
+                       r.rentals, r.rental_days, r.payments, r.revenue
+                FROM rollup_car r
+                JOIN cars c ON c.car_id = r.car_id
+                ORDER BY r.revenue DESC
+                LIMIT %s
+            """, (int(limit),))
+            return cursor.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Revenue and utilization reports')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('backfill', help='recompute the rollup tables from bookings and payments')
+    show = sub.add_parser('show', help='print a report')
+    show.add_argument('--by', choices=REPORT_GROUPS, default='day')
+    show.add_argument('--days', type=int, default=30, help='days up to today to cover (default 30)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'backfill':
+        written = rebuild_rollups()
+        if written is None:
+            print("Backfill failed")
+            return 1
+        print(f"Wrote {written} rollup rows")
+        return 0
+
+    end = date.today()
+    report = revenue_report(end - timedelta(days=args.days - 1), end, args.by)
+    if report is None:
+        print("Could not connect to the database")
+        return 1
+    print(f"{'period':<12}{'bookings':>10}{'rentals':>10}{'avg days':>10}{'utilization':>13}{'revenue':>14}")
+    for row in report['rows'] + [report['totals']]:
+        avg = f"{row['avg_rental_days']:.1f}" if row['avg_rental_days'] is not None else '-'
+        utilization = f"{row['utilization']:.1%}" if row['utilization'] is not None else '-'
+        print(f"{str(row['period']):<12}{row['bookings']:>10}{row['rentals']:>10}{avg:>10}"
+              f"{utilization:>13}{row['revenue']:>14,.2f}")
+    if report['stale']:
+        print("Warning: a rollup update failed; run 'python reports.py backfill'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
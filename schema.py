@@ -0,0 +1,671 @@
+"""
+Car Rental System - Schema and migrations
+Creates the tables with the indexes the hot queries rely on, applies
+versioned migrations recorded in schema_migrations, and checks the queries in
+the application modules with EXPLAIN for full table scans. Works against
+either storage backend (see backends.py).
+
+Usage: python schema.py migrate
+       python schema.py status
+       python schema.py check [file.py ...]
+"""
+
+import argparse
+import ast
+import os
+import re
+import sys
+
+from backends import DB_ERRORS
+from car_rental_system import FULLTEXT_COLUMNS, db_connection, get_backend, write_rollups
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INT AUTO_INCREMENT PRIMARY KEY,
+        full_name VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        role ENUM('customer', 'staff', 'admin') NOT NULL DEFAULT 'customer',
+        phone VARCHAR(20),
+        address VARCHAR(255),
+        license_no VARCHAR(50),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_users_email (email)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cars (
+        car_id INT AUTO_INCREMENT PRIMARY KEY,
+        plate_no VARCHAR(20) NOT NULL,
+        brand VARCHAR(50) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        type ENUM('sedan', 'suv', 'van', 'truck', 'coupe') NOT NULL,
+        year INT NOT NULL,
+        color VARCHAR(30) NOT NULL,
+        rate_per_day DECIMAL(10, 2) NOT NULL,
+        seats INT NOT NULL DEFAULT 4,
+        status ENUM('available', 'rented', 'maintenance') NOT NULL DEFAULT 'available',
+        image_path VARCHAR(255),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_cars_plate_no (plate_no)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        booking_id INT AUTO_INCREMENT PRIMARY KEY,
+        customer_id INT NOT NULL,
+        car_id INT NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        pickup_location VARCHAR(255),
+        dropoff_location VARCHAR(255),
+        total_amount DECIMAL(10, 2) NOT NULL,
+        status ENUM('pending', 'approved', 'rejected', 'completed', 'cancelled')
+            NOT NULL DEFAULT 'pending',
+        payment_status ENUM('pending', 'paid') NOT NULL DEFAULT 'pending',
+        payment_method VARCHAR(30),
+        date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_bookings_customer FOREIGN KEY (customer_id) REFERENCES users (user_id),
+        CONSTRAINT fk_bookings_car FOREIGN KEY (car_id) REFERENCES cars (car_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS payments (
+        payment_id INT AUTO_INCREMENT PRIMARY KEY,
+        booking_id INT NOT NULL,
+        amount DECIMAL(10, 2) NOT NULL,
+        payment_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_payments_booking FOREIGN KEY (booking_id) REFERENCES bookings (booking_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS maintenance (
+        maintenance_id INT AUTO_INCREMENT PRIMARY KEY,
+        car_id INT NOT NULL,
+        description TEXT NOT NULL,
+        date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_maintenance_car FOREIGN KEY (car_id) REFERENCES cars (car_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        name VARCHAR(50) PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0
+    ) ENGINE=InnoDB
+    """,
+]
+
+# The same tables in SQLite's dialect. Column types are declared as DATE,
+# TIMESTAMP and DECIMAL so the SQLite backend converts values back to the
+# Python types MySQL returns.
+SQLITE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        full_name VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        role TEXT NOT NULL DEFAULT 'customer' CHECK (role IN ('customer', 'staff', 'admin')),
+        phone VARCHAR(20),
+        address VARCHAR(255),
+        license_no VARCHAR(50),
+        created_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+        CONSTRAINT uq_users_email UNIQUE (email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cars (
+        car_id INTEGER PRIMARY KEY,
+        plate_no VARCHAR(20) NOT NULL,
+        brand VARCHAR(50) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        type TEXT NOT NULL CHECK (type IN ('sedan', 'suv', 'van', 'truck', 'coupe')),
+        year INTEGER NOT NULL,
+        color VARCHAR(30) NOT NULL,
+        rate_per_day DECIMAL(10, 2) NOT NULL,
+        seats INTEGER NOT NULL DEFAULT 4,
+        status TEXT NOT NULL DEFAULT 'available'
+            CHECK (status IN ('available', 'rented', 'maintenance')),
+        image_path VARCHAR(255),
+        created_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+        CONSTRAINT uq_cars_plate_no UNIQUE (plate_no)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        booking_id INTEGER PRIMARY KEY,
+        customer_id INTEGER NOT NULL REFERENCES users (user_id),
+        car_id INTEGER NOT NULL REFERENCES cars (car_id),
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        pickup_location VARCHAR(255),
+        dropoff_location VARCHAR(255),
+        total_amount DECIMAL(10, 2) NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending'
+            CHECK (status IN ('pending', 'approved', 'rejected', 'completed', 'cancelled')),
+        payment_status TEXT NOT NULL DEFAULT 'pending' CHECK (payment_status IN ('pending', 'paid')),
+        payment_method VARCHAR(30),
+        date_created TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS payments (
+        payment_id INTEGER PRIMARY KEY,
+        booking_id INTEGER NOT NULL REFERENCES bookings (booking_id),
+        amount DECIMAL(10, 2) NOT NULL,
+        payment_date TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS maintenance (
+        maintenance_id INTEGER PRIMARY KEY,
+        car_id INTEGER NOT NULL REFERENCES cars (car_id),
+        description TEXT NOT NULL,
+        date_created TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        name VARCHAR(50) PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+# (table, index name, columns, unique) for the hot query paths
+INDEXES = [
+    # Overlap checks in reserve_car: car, then status, then the date range
+    ('bookings', 'idx_bookings_car_status_dates', 'car_id, status, start_date, end_date', False),
+    # A customer's bookings, newest first (and its keyset pages)
+    ('bookings', 'idx_bookings_customer_created', 'customer_id, date_created, booking_id', False),
+    # All bookings newest first, and the receipt export range
+    ('bookings', 'idx_bookings_created', 'date_created, booking_id', False),
+    # Availability index sync: active bookings that have not ended
+    ('bookings', 'idx_bookings_status_end', 'status, end_date', False),
+    ('bookings', 'idx_bookings_payment_status', 'payment_status, booking_id', False),
+    ('users', 'uq_users_email', 'email', True),
+    ('cars', 'idx_cars_status', 'status, brand, model', False),
+    ('cars', 'idx_cars_created', 'created_at', False),
+    ('maintenance', 'idx_maintenance_car_created', 'car_id, date_created, maintenance_id', False),
+    ('maintenance', 'idx_maintenance_created', 'date_created, maintenance_id', False),
+    ('payments', 'idx_payments_booking', 'booking_id, payment_id', False),
+]
+
+
+def _create_tables(cursor):
+    for statement in TABLES:
+        cursor.execute(statement)
+
+
+def _create_indexes(cursor):
+    # MySQL has no CREATE INDEX IF NOT EXISTS, so look the index up first
+    for table, name, columns, unique in INDEXES:
+        cursor.execute("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            LIMIT 1
+        """, (table, name))
+        if cursor.fetchone():
+            continue
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({columns})")
+
+
+def _create_index(cursor, sqlite, table, name, columns, unique=False):
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    if sqlite:
+        cursor.execute(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({columns})")
+        return
+    # MySQL has no CREATE INDEX IF NOT EXISTS, so look the index up first
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, name))
+    if not cursor.fetchone():
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({columns})")
+
+
+def _create_sqlite_tables(cursor):
+    for statement in SQLITE_TABLES:
+        cursor.execute(statement)
+
+
+def _create_sqlite_indexes(cursor):
+    # The table constraints already provide the unique indexes
+    for table, name, columns, unique in INDEXES:
+        if not unique:
+            _create_index(cursor, True, table, name, columns)
+
+
+# Tables whose rows carry change versions (see list_changes in
+# car_rental_system.py), with their primary keys
+TRACKED_TABLES = {'cars': 'car_id', 'bookings': 'booking_id', 'users': 'user_id'}
+
+# SQLite cannot add a column with a non-constant default or ON UPDATE, so
+# triggers stamp inserted and updated rows instead. Timestamps are UTC with
+# millisecond precision so they never go backwards at a DST change.
+SQLITE_NOW_MS = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def _create_sqlite_stamp_triggers(cursor, table, key):
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_stamp AFTER INSERT ON {table}
+        FOR EACH ROW WHEN NEW.updated_at IS NULL
+        BEGIN
+            UPDATE {table} SET updated_at = {SQLITE_NOW_MS} WHERE {key} = NEW.{key};
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_update_stamp AFTER UPDATE ON {table}
+        FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE {table} SET updated_at = {SQLITE_NOW_MS} WHERE {key} = NEW.{key};
+        END
+    """)
+
+
+def _add_updated_at(cursor):
+    sqlite = get_backend().name == 'sqlite'
+    for table, key in TRACKED_TABLES.items():
+        if sqlite:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP")
+            cursor.execute(f"UPDATE {table} SET updated_at = {SQLITE_NOW_MS}")
+            _create_sqlite_stamp_triggers(cursor, table, key)
+        else:
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = %s AND column_name = 'updated_at'
+            """, (table,))
+            if not cursor.fetchone():
+                cursor.execute(f"""
+                    ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+                """)
+        _create_index(cursor, sqlite, table, f"idx_{table}_updated", 'updated_at')
+
+
+# Indexes for the search filters and sort orders (see SEARCHES in
+# car_rental_system.py)
+SEARCH_INDEXES = [
+    ('cars', 'idx_cars_brand', 'brand, model, car_id'),
+    ('users', 'idx_users_name', 'full_name, user_id'),
+    ('users', 'idx_users_role_name', 'role, full_name, user_id'),
+    ('bookings', 'idx_bookings_start', 'start_date, booking_id'),
+    ('bookings', 'idx_bookings_status_created', 'status, date_created, booking_id'),
+]
+
+
+def _add_search_indexes(cursor):
+    sqlite = get_backend().name == 'sqlite'
+    for table, name, columns in SEARCH_INDEXES:
+        _create_index(cursor, sqlite, table, name, columns)
+
+    for table, (key, columns) in FULLTEXT_COLUMNS.items():
+        column_list = ', '.join(columns)
+        if not sqlite:
+            cursor.execute("""
+                SELECT 1 FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+                LIMIT 1
+            """, (table, f"ft_{table}_text"))
+            if not cursor.fetchone():
+                cursor.execute(f"CREATE FULLTEXT INDEX ft_{table}_text ON {table} ({column_list})")
+            continue
+        # An external-content FTS5 table indexes the rows without copying
+        # them; triggers keep it in step with the table
+        new_values = ', '.join(f"NEW.{column}" for column in columns)
+        old_values = ', '.join(f"OLD.{column}" for column in columns)
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts
+            USING fts5({column_list}, content='{table}', content_rowid='{key}')
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {table}_fts (rowid, {column_list}) VALUES (NEW.{key}, {new_values});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {table}_fts ({table}_fts, rowid, {column_list})
+                VALUES ('delete', OLD.{key}, {old_values});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE OF {column_list} ON {table}
+            BEGIN
+                INSERT INTO {table}_fts ({table}_fts, rowid, {column_list})
+                VALUES ('delete', OLD.{key}, {old_values});
+                INSERT INTO {table}_fts (rowid, {column_list}) VALUES (NEW.{key}, {new_values});
+            END
+        """)
+        cursor.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+
+
+# Reporting rollups maintained by the data layer (see Reporting Rollups in
+# car_rental_system.py). The column types are valid on both backends.
+ROLLUP_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS rollup_daily (
+        day DATE NOT NULL,
+        car_type VARCHAR(20) NOT NULL,
+        bookings INT NOT NULL DEFAULT 0,
+        rentals INT NOT NULL DEFAULT 0,
+        rental_days INT NOT NULL DEFAULT 0,
+        rented_car_days INT NOT NULL DEFAULT 0,
+        payments INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, car_type)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_car (
+        car_id INT NOT NULL PRIMARY KEY,
+        rentals INT NOT NULL DEFAULT 0,
+        rental_days INT NOT NULL DEFAULT 0,
+        payments INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+
+def _add_rollups(cursor):
+    sqlite = get_backend().name == 'sqlite'
+    for statement in ROLLUP_TABLES:
+        cursor.execute(statement if sqlite else statement.rstrip() + " ENGINE=InnoDB")
+    _create_index(cursor, sqlite, 'rollup_car', 'idx_rollup_car_revenue', 'revenue')
+    # Existing bookings and payments are counted straight away
+    write_rollups(cursor)
+
+
+# Change sequence for list_changes (see car_rental_system.py). Every insert
+# or update of a tracked row takes the next value of its table's counter in
+# change_counters, in the same transaction. The counter row stays locked
+# until commit (and SQLite has one writer at a time anyway), so values are
+# handed out in commit order: once a reader sees counter value N, every row
+# stamped N or lower is visible too. Writers to a table queue on its
+# counter, which is the price of that guarantee. Migration 7 removes it
+# again, since that queue serializes every booking and car write.
+CHANGE_COUNTERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS change_counters (
+        table_name VARCHAR(50) NOT NULL PRIMARY KEY,
+        seq BIGINT NOT NULL DEFAULT 0
+    )
+"""
+
+
+def _change_seq_trigger_body(table, key, sqlite, stamp):
+    next_seq = f"(SELECT seq FROM change_counters WHERE table_name = '{table}')"
+    if not sqlite:
+        return f"""
+            UPDATE change_counters SET seq = seq + 1 WHERE table_name = '{table}';
+            SET NEW.change_seq = {next_seq};
+        """
+    # SQLite triggers cannot assign to NEW, so the row is updated after the
+    # fact; the same statement also stamps updated_at (taking over from the
+    # migration 3 triggers) so each change bumps the counter once
+    return f"""
+        UPDATE change_counters SET seq = seq + 1 WHERE table_name = '{table}';
+        UPDATE {table} SET change_seq = {next_seq}, updated_at = {stamp} WHERE {key} = NEW.{key};
+    """
+
+
+def _add_change_seq(cursor):
+    sqlite = get_backend().name == 'sqlite'
+    cursor.execute(CHANGE_COUNTERS_TABLE if sqlite else CHANGE_COUNTERS_TABLE.rstrip() + " ENGINE=InnoDB")
+    for table, key in TRACKED_TABLES.items():
+        cursor.execute("SELECT 1 FROM change_counters WHERE table_name = %s", (table,))
+        if not cursor.fetchone():
+            cursor.execute("INSERT INTO change_counters (table_name, seq) VALUES (%s, 0)", (table,))
+
+        if sqlite:
+            # Existing rows start at 0, before any version a listing can hold
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN change_seq BIGINT NOT NULL DEFAULT 0")
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_insert_stamp")
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_update_stamp")
+            insert_stamp = f"COALESCE(NEW.updated_at, {SQLITE_NOW_MS})"
+            update_stamp = f"CASE WHEN NEW.updated_at IS OLD.updated_at THEN {SQLITE_NOW_MS} ELSE NEW.updated_at END"
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_seq_insert AFTER INSERT ON {table}
+                FOR EACH ROW
+                BEGIN{_change_seq_trigger_body(table, key, sqlite, insert_stamp)}END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_seq_update AFTER UPDATE ON {table}
+                FOR EACH ROW WHEN NEW.change_seq IS OLD.change_seq
+                BEGIN{_change_seq_trigger_body(table, key, sqlite, update_stamp)}END
+            """)
+        else:
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = %s AND column_name = 'change_seq'
+            """, (table,))
+            if not cursor.fetchone():
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN change_seq BIGINT NOT NULL DEFAULT 0")
+            for event in ('INSERT', 'UPDATE'):
+                # No CREATE TRIGGER IF NOT EXISTS before MySQL 8.0.29
+                name = f"trg_{table}_change_seq_{event.lower()}"
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(f"""
+                    CREATE TRIGGER {name} BEFORE {event} ON {table}
+                    FOR EACH ROW
+                    BEGIN{_change_seq_trigger_body(table, key, sqlite, None)}END
+                """)
+        _create_index(cursor, sqlite, table, f"idx_{table}_change_seq", 'change_seq')
+
+
+def _drop_change_seq(cursor):
+    # list_changes goes back to updated_at (migration 3), read against the
+    # database clock with a safety window, which no writer waits on
+    sqlite = get_backend().name == 'sqlite'
+    for table, key in TRACKED_TABLES.items():
+        for event in ('insert', 'update'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_change_seq_{event}")
+        if sqlite:
+            cursor.execute(f"DROP INDEX IF EXISTS idx_{table}_change_seq")
+            cursor.execute(f"ALTER TABLE {table} DROP COLUMN change_seq")
+            # Migration 6 folded these into its own triggers
+            _create_sqlite_stamp_triggers(cursor, table, key)
+        else:
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = %s AND column_name = 'change_seq'
+            """, (table,))
+            if cursor.fetchone():
+                # Drops idx_<table>_change_seq along with it
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN change_seq")
+    cursor.execute("DROP TABLE IF EXISTS change_counters")
+
+
+# Versioned migrations: (version, description, fn(cursor)). Append only;
+# never edit a migration once it has shipped.
+MIGRATIONS = [
+    (1, 'Create base tables', _create_tables),
+    (2, 'Add indexes for booking, login, car and maintenance lookups', _create_indexes),
+    (3, 'Track row changes with updated_at on cars, bookings and users', _add_updated_at),
+    (4, 'Add full-text and search indexes for the admin tables', _add_search_indexes),
+    (5, 'Add revenue and utilization rollup tables', _add_rollups),
+    (6, 'Track row changes with a commit-ordered change sequence', _add_change_seq),
+    (7, 'Drop the change sequence; writers no longer queue on a shared counter', _drop_change_seq),
+]
+
+# The SQLite backend came after migrations 1 and 2 shipped. Those stay as
+# they shipped, for MySQL; SQLite databases run these versions instead.
+SQLITE_MIGRATIONS = {
+    1: _create_sqlite_tables,
+    2: _create_sqlite_indexes,
+}
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions():
+    """Return the set of migration versions already applied"""
+    with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to the database")
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        conn.commit()
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {version for (version,) in cursor.fetchall()}
+
+
+def migrate():
+    """Apply pending migrations in order; returns the versions applied"""
+    done = applied_versions()
+    sqlite = get_backend().name == 'sqlite'
+    applied = []
+    with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to the database")
+        cursor = conn.cursor()
+        for version, description, apply in MIGRATIONS:
+            if version in done:
+                continue
+            if sqlite:
+                apply = SQLITE_MIGRATIONS.get(version, apply)
+            # DDL commits implicitly in MySQL, so each step must be re-runnable
+            # if a later statement in it fails
+            try:
+                apply(cursor)
+                cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                               (version, description))
+                conn.commit()
+            except DB_ERRORS as err:
+                conn.rollback()
+                raise Exception(f"Migration {version} ({description}) failed: {err}")
+            print(f"Applied migration {version}: {description}")
+            applied.append(version)
+    return applied
+
+
+# Query checker
+
+# Modules whose queries are checked by default
+CHECKED_MODULES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                   for name in ('car_rental_system.py', 'main_app.py', 'reports.py')]
+
+# Tables small enough that a scan is cheaper than an index lookup
+SMALL_TABLES = {'dashboard_counters', 'schema_migrations'}
+
+_STATEMENT = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+
+def find_queries(path):
+    """Yield (line number, sql) for every literal SQL statement in a Python file.
+
+    f-strings are skipped since their final text is only known at runtime.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    # Literal pieces of f-strings are Constant nodes too; leave them out
+    fragments = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr)
+                 for part in node.values}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Constant) and isinstance(node.value, str)
+                and id(node) not in fragments):
+            if _STATEMENT.match(node.value) and re.search(r'\b(FROM|SET)\b', node.value, re.IGNORECASE):
+                yield node.lineno, node.value
+
+
+def _explainable(sql):
+    """Fill placeholders with dummy values so the statement can be EXPLAINed"""
+    sql = re.sub(r'\bFOR UPDATE\b', '', sql, flags=re.IGNORECASE)
+    return sql.replace('%s', '1')
+
+
+def _plan_scans(cursor, sql, sqlite):
+    """Return (table, rows estimate) for each whole-table scan in the query's plan"""
+    if sqlite:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        scans = []
+        for step in cursor.fetchall():
+            # 'SCAN cars' reads the table; 'SCAN b USING INDEX ...' walks an index
+            match = re.match(r'SCAN (\w+)$', step['detail'])
+            if match:
+                scans.append((match.group(1), '?'))
+        return scans
+    cursor.execute("EXPLAIN " + sql)
+    return [(step.get('table') or '', step.get('rows')) for step in cursor.fetchall()
+            if step.get('type') == 'ALL']
+
+
+def check_queries(paths=None):
+    """EXPLAIN every literal query in the given files.
+
+    Returns a list of (path, line, table, problem, sql) for plans that scan a
+    whole table. Scans of unfiltered listings are reported as 'listing' rather
+    than 'full scan', since reading every row is what they are for.
+    """
+    problems = []
+    sqlite = get_backend().name == 'sqlite'
+    with db_connection() as conn:
+        if not conn:
+            raise Exception("Could not connect to the database")
+        cursor = conn.cursor(dictionary=True)
+        for path in paths or CHECKED_MODULES:
+            for line, sql in find_queries(path):
+                try:
+                    scans = _plan_scans(cursor, _explainable(sql), sqlite)
+                except DB_ERRORS as err:
+                    problems.append((path, line, None, f"EXPLAIN failed: {err}", sql))
+                    continue
+                filtered = re.search(r'\bWHERE\b', sql, re.IGNORECASE)
+                for table, rows in scans:
+                    if table.startswith('<') or table in SMALL_TABLES:
+                        continue
+                    problem = 'full scan' if filtered else 'listing'
+                    problems.append((path, line, table, f"{problem} (~{rows} rows)", sql))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Car rental schema migrations and index checks')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('migrate', help='apply pending migrations')
+    sub.add_parser('status', help='list applied and pending migrations')
+    check = sub.add_parser('check', help='EXPLAIN queries and flag full table scans')
+    default_paths = ', '.join(os.path.basename(path) for path in CHECKED_MODULES)
+    check.add_argument('paths', nargs='*', help=f'files to check (default: {default_paths})')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'migrate':
+            applied = migrate()
+            print(f"{len(applied)} migration(s) applied" if applied else "Schema is up to date")
+            return 0
+
+        if args.command == 'status':
+            done = applied_versions()
+            for version, description, _ in MIGRATIONS:
+                print(f"{version:>4}  {'applied' if version in done else 'pending'}  {description}")
+            return 0
+
+        problems = check_queries(args.paths)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    for path, line, table, problem, sql in problems:
+        print(f"{path}:{line}: {table or '-'}: {problem}")
+        print('    ' + ' '.join(sql.split()))
+    full_scans = sum(1 for problem in problems if not problem[3].startswith('listing'))
+    print(f"{len(problems)} scan(s) found, {full_scans} on filtered queries")
+    return 0 if not full_scans else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
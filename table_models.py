@@ -0,0 +1,318 @@
+"""
+Car Rental System - Shared table model/view
+Rows are pulled from a RowStream in chunks as the view scrolls, so only the
+rows the user actually reaches are ever materialized. SearchBar collects the
+search, filters and sort order that are applied on the server.
+"""
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QDate, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (QApplication, QStyledItemDelegate, QStyleOptionButton,
+                             QStyle, QTableView, QHeaderView, QAbstractItemView,
+                             QWidget, QHBoxLayout, QLineEdit, QComboBox, QCheckBox,
+                             QDateEdit, QLabel)
+
+# How long typing must pause before a search runs
+SEARCH_DEBOUNCE_MS = 300
+
+
+class RowTableModel(QAbstractTableModel):
+    """Table model over a list of row dicts, filled lazily from a RowStream"""
+    load_failed = pyqtSignal(str)   # error message; the rows loaded so far stay
+
+    def __init__(self, columns, chunk_size=200, parent=None, decorations=None, key=None, order=None):
+        # columns: list of (header, fn(row) -> display text)
+        # decorations: {column: fn(row) -> QPixmap or None} for cell images
+        # key: row field identifying a row, needed for apply_changes
+        # order: row fields the listing is sorted on, newest first (see
+        #        CHANGE_ORDER), needed for apply_changes
+        super().__init__(parent)
+        self.columns = columns
+        self.decorations = decorations or {}
+        self.chunk_size = chunk_size
+        self.key = key
+        self.order = order
+        self.rows = []
+        self.stream = None
+        self.version = None     # change version of the rows (see list_changes)
+        self._pending = {}      # key -> changed row not loaded yet (None to drop it)
+        self.error = None       # why loading stopped before the end of the listing
+
+    def set_stream(self, stream):
+        """Replace the model contents with rows read from a new stream"""
+        self.beginResetModel()
+        self.close_stream()
+        self.rows = []
+        self.stream = stream
+        self.version = getattr(stream, 'version', None)
+        self._pending = {}
+        self.error = None
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """Replace the model contents with an already loaded list of rows"""
+        if rows is None:
+            return
+        self.beginResetModel()
+        self.close_stream()
+        self.rows = list(rows)
+        self.version = None
+        self._pending = {}
+        self.error = None
+        self.endResetModel()
+
+    def close_stream(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def is_complete(self):
+        """True once every row of the listing is loaded"""
+        return self.error is None and not self.canFetchMore()
+
+    def row_data(self, row):
+        """Return the row dict displayed at the given row number"""
+        return self.rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DecorationRole:
+            decoration = self.decorations.get(index.column())
+            return decoration(self.rows[index.row()]) if decoration else None
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self.columns[index.column()][1](self.rows[index.row()])
+        return '' if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return str(section + 1)
+
+    def refresh_column(self, column, role=Qt.ItemDataRole.DecorationRole):
+        """Tell views a column changed, e.g. once its images have loaded.
+
+        Views only repaint the visible cells, so this is cheap for any row count.
+        """
+        if self.rows:
+            self.dataChanged.emit(self.index(0, column), self.index(len(self.rows) - 1, column), [role])
+
+    def _sort_key(self, row):
+        return tuple(row[field] for field in self.order)
+
+    def apply_changes(self, changes, keep=None):
+        """Patch changed rows into the model in place.
+
+        changes is (rows, version) as returned by list_changes. Rows already
+        shown are replaced, or removed when keep(row) is false. Only
+        newest-first listings carry a version (see stream_search), so a row
+        that is not shown yet either belongs among the loaded rows (a new
+        one goes on top) or further down. The stream has yet to reach those;
+        they are swapped in, or dropped, when it does, since the stream
+        still returns them as they were when it was opened.
+        """
+        if changes is None:
+            return
+        if not self.rows and self.canFetchMore():
+            # Load a first chunk so there is a newest row to compare with
+            self.fetchMore()
+        rows, self.version = changes
+        positions = {row[self.key]: number for number, row in enumerate(self.rows)}
+        streaming = self.canFetchMore()
+        oldest = self._sort_key(self.rows[-1]) if self.rows else None
+        added, removed = [], []
+        for row in rows:
+            number = positions.get(row[self.key])
+            wanted = keep is None or keep(row)
+            if number is not None:
+                if wanted:
+                    self.rows[number] = row
+                    self.dataChanged.emit(self.index(number, 0), self.index(number, len(self.columns) - 1))
+                else:
+                    removed.append(number)
+            elif streaming and (oldest is None or self._sort_key(row) < oldest):
+                self._pending[row[self.key]] = row if wanted else None
+            elif wanted:
+                added.append(row)
+        for number in sorted(removed, reverse=True):
+            self.beginRemoveRows(QModelIndex(), number, number)
+            del self.rows[number]
+            self.endRemoveRows()
+        self._insert_sorted(added)
+
+    def _insert_sorted(self, rows):
+        """Insert rows at their places in the newest-first order"""
+        rows = sorted(rows, key=self._sort_key, reverse=True)
+        newest = self._sort_key(self.rows[0]) if self.rows else None
+        # Rows newer than everything loaded, the usual case, go on top in one block
+        top = [row for row in rows if newest is None or self._sort_key(row) > newest]
+        if top:
+            self.beginInsertRows(QModelIndex(), 0, len(top) - 1)
+            self.rows[0:0] = top
+            self.endInsertRows()
+        for row in rows[len(top):]:
+            sort_key = self._sort_key(row)
+            number = next((number for number, loaded in enumerate(self.rows)
+                           if self._sort_key(loaded) < sort_key), len(self.rows))
+            self.beginInsertRows(QModelIndex(), number, number)
+            self.rows.insert(number, row)
+            self.endInsertRows()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.stream is not None and not self.stream.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        try:
+            rows = self.stream.fetch(self.chunk_size)
+        except Exception as e:
+            # The server may have dropped the stream (MySQL closes an unread
+            # one after net_write_timeout). Keep the rows so far, but report
+            # the listing as cut short instead of letting it look complete.
+            print(f"Error fetching rows: {e}")
+            self.error = str(e)
+            self.close_stream()
+            self.load_failed.emit(self.error)
+            return
+        if self._pending:
+            rows = [self._pending.pop(row[self.key], row) for row in rows]
+            rows = [row for row in rows if row is not None]
+            if self.stream is None or self.stream.exhausted:
+                self._pending = {}
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints the cell text as a push button and calls back with the row on click.
+
+    Cells whose text is empty get no button.
+    """
+
+    def __init__(self, callback, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+
+    def paint(self, painter, option, index):
+        label = index.data()
+        if not label:
+            return
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 2, -4, -2)
+        button.text = label
+        button.state = QStyle.StateFlag.State_Enabled
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and index.data():
+            self.callback(model.row_data(index.row()))
+            return True
+        return False
+
+
+def create_table_view(model, actions=None):
+    """Create a QTableView for a RowTableModel.
+
+    actions maps a column number to the callback its buttons should invoke.
+    """
+    view = QTableView()
+    view.setModel(model)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    for column, callback in (actions or {}).items():
+        view.setItemDelegateForColumn(column, ButtonDelegate(callback, view))
+    return view
+
+
+class SearchBar(QWidget):
+    """Search box with filter and sort pickers for a table searched on the server.
+
+    Typing is debounced, so changed fires once the user pauses rather than on
+    every keystroke; picking a filter or sort order fires it straight away.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, placeholder='Search...', filters=(), sorts=(), date_range=None,
+                 debounce_ms=SEARCH_DEBOUNCE_MS, parent=None):
+        # filters: list of (filter name, [(label, value), ...]); a None value means "any"
+        # sorts: list of (label, sort name)
+        # date_range: (from filter name, to filter name, label) for a pair of date pickers
+        super().__init__(parent)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.text = QLineEdit()
+        self.text.setPlaceholderText(placeholder)
+        self.text.setClearButtonEnabled(True)
+        layout.addWidget(self.text)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.changed.emit)
+        self.text.textChanged.connect(lambda: self._timer.start())
+        self.text.returnPressed.connect(self._emit_now)
+
+        self.filters = {}
+        for name, choices in filters:
+            combo = QComboBox()
+            for label, value in choices:
+                combo.addItem(label, value)
+            combo.currentIndexChanged.connect(self._emit_now)
+            layout.addWidget(combo)
+            self.filters[name] = combo
+
+        self.date_range = date_range
+        if date_range:
+            self.date_check = QCheckBox(date_range[2])
+            self.date_from = QDateEdit(QDate.currentDate())
+            self.date_to = QDateEdit(QDate.currentDate().addMonths(1))
+            self.date_check.toggled.connect(self._emit_now)
+            for edit in (self.date_from, self.date_to):
+                edit.setCalendarPopup(True)
+                edit.dateChanged.connect(self._dates_changed)
+            layout.addWidget(self.date_check)
+            layout.addWidget(self.date_from)
+            layout.addWidget(QLabel('to'))
+            layout.addWidget(self.date_to)
+
+        self.sort = QComboBox()
+        for label, name in sorts:
+            self.sort.addItem(label, name)
+        self.sort.currentIndexChanged.connect(self._emit_now)
+        if sorts:
+            layout.addWidget(QLabel('Sort:'))
+            layout.addWidget(self.sort)
+
+        self.setLayout(layout)
+
+    def _emit_now(self):
+        self._timer.stop()
+        self.changed.emit()
+
+    def _dates_changed(self):
+        if self.date_check.isChecked():
+            self._timer.start()
+
+    def criteria(self):
+        """Return the search as keyword arguments for stream_search"""
+        filters = {name: combo.currentData() for name, combo in self.filters.items()}
+        if self.date_range and self.date_check.isChecked():
+            filters[self.date_range[0]] = self.date_from.date().toPyDate()
+            filters[self.date_range[1]] = self.date_to.date().toPyDate()
+        return {'text': self.text.text().strip(), 'filters': filters, 'sort': self.sort.currentData()}
@@ -0,0 +1,57 @@
+"""
+Shared fixtures: every test gets its own migrated SQLite database file and
+fresh in-memory caches, so tests never see each other's rows.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+import car_rental_system as crs
+import schema
+from auth import SessionStore
+from availability import AvailabilityIndex
+from instrumentation import INSTRUMENTATION_CONFIG
+from query_cache import QueryCache
+
+PASSWORD = 'secret123'
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch, capsys):
+    """Point the data layer at an empty SQLite database migrated to the latest version"""
+    crs.close_pool()
+    monkeypatch.setattr(crs, 'DB_BACKEND', 'sqlite')
+    monkeypatch.setitem(crs.SQLITE_CONFIG, 'path', str(tmp_path / 'carrental.db'))
+    monkeypatch.setattr(crs, '_backend', None)
+    monkeypatch.setattr(crs, '_booking_cache', QueryCache(**crs.CACHE_CONFIG))
+    monkeypatch.setattr(crs, '_metrics', {'stats': None, 'loaded_at': 0, 'rebuild': False})
+    monkeypatch.setattr(crs, '_rollups', {'stale': False})
+    monkeypatch.setattr(crs, '_sessions', SessionStore())
+    monkeypatch.setattr(crs, '_availability', AvailabilityIndex())
+    # Keep slow test queries out of the application's slow-query log
+    monkeypatch.setitem(INSTRUMENTATION_CONFIG, 'slow_query_ms', float('inf'))
+    schema.migrate()
+    capsys.readouterr()
+    yield crs
+    crs.close_pool()
+
+
+@pytest.fixture
+def customer(db):
+    """A registered customer's user id"""
+    return db.register_user('Test Customer', 'customer@example.com', PASSWORD)
+
+
+@pytest.fixture
+def cars(db):
+    """Ids of three available cars: two sedans and an SUV"""
+    return [
+        db.add_car('ABC-001', 'Toyota', 'Corolla', 'sedan', 2022, 'white', 45.00),
+        db.add_car('ABC-002', 'Honda', 'Civic', 'sedan', 2021, 'black', 50.00),
+        db.add_car('ABC-003', 'Ford', 'Explorer', 'suv', 2023, 'blue', 80.00, seats=7),
+    ]
+
+
+def days_from_now(days):
+    return date.today() + timedelta(days=days)
@@ -0,0 +1,74 @@
+"""Fleet analytics: the vectorized occupancy matrix agrees with a day-by-day loop"""
+
+from datetime import timedelta
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import analytics
+from analytics import FleetIntervals, idle_gaps, load_intervals, occupancy_matrix
+
+from .conftest import days_from_now
+
+
+def _brute_force(intervals):
+    matrix = np.zeros((len(intervals.car_ids), intervals.days), dtype=bool)
+    for car, start, end in zip(intervals.car, intervals.start, intervals.end):
+        for day in range(start, end + 1):
+            matrix[car, day] = True
+    return matrix
+
+
+def _random_intervals(rng, cars, days, bookings):
+    since = days_from_now(0)
+    car = rng.integers(0, cars, bookings)
+    start = rng.integers(0, days, bookings)
+    end = np.minimum(start + rng.integers(0, 15, bookings), days - 1)
+    return FleetIntervals(since, since + timedelta(days=days - 1),
+                          np.arange(1, cars + 1), np.array(['sedan'] * cars, dtype=object),
+                          car, start, end)
+
+
+@pytest.mark.parametrize('block_cells', [analytics.BLOCK_CELLS, 64, 1])
+def test_matrix_matches_brute_force(monkeypatch, block_cells):
+    monkeypatch.setattr(analytics, 'BLOCK_CELLS', block_cells)
+    rng = np.random.default_rng(7)
+    for cars, days, bookings in [(1, 1, 1), (5, 30, 0), (13, 45, 60), (40, 90, 400)]:
+        intervals = _random_intervals(rng, cars, days, bookings)
+        assert np.array_equal(occupancy_matrix(intervals), _brute_force(intervals))
+
+
+def test_idle_gaps_ignore_overlaps_and_other_cars():
+    since = days_from_now(0)
+    intervals = FleetIntervals(since, since + timedelta(days=29), np.array([1, 2]),
+                               np.array(['sedan', 'suv'], dtype=object),
+                               np.array([0, 0, 0, 1, 0]), np.array([0, 10, 4, 3, 11]),
+                               np.array([2, 11, 6, 5, 20]))
+    # Car 0 runs 0-2, 4-6, 10-11 and 11-20 (overlapping the previous one)
+    assert sorted(idle_gaps(intervals).tolist()) == [1, 3]
+
+
+def test_loaded_intervals_match_the_bookings(db, customer, cars):
+    since, until = days_from_now(0), days_from_now(20)
+    spans = [(cars[0], -5, 2), (cars[0], 4, 6), (cars[1], 18, 25), (cars[2], 3, 3),
+             (cars[2], 30, 32), (cars[1], -9, -1)]
+    booking_ids = [db.create_booking(customer, car_id, days_from_now(start), days_from_now(end),
+                                     'Airport', 'Airport', 100, 'cash')
+                   for car_id, start, end in spans]
+    db.update_booking_statuses(booking_ids[:-1], 'approved')
+    db.update_booking_status(booking_ids[3], 'completed')
+    db.create_booking(customer, cars[1], days_from_now(8), days_from_now(9),
+                      'Airport', 'Airport', 100, 'cash')   # pending: not a rental
+
+    intervals = load_intervals(since, until)
+    expected = np.zeros((len(cars), 21), dtype=bool)
+    for car_id, start, end in spans[:-1]:
+        for day in range(max(start, 0), min(end, 20) + 1):
+            expected[cars.index(car_id), day] = True
+    assert intervals.car_ids.tolist() == cars
+    assert np.array_equal(occupancy_matrix(intervals), expected)
+
+    suvs = load_intervals(since, until, car_type='suv')
+    assert suvs.car_ids.tolist() == [cars[2]]
+    assert np.array_equal(occupancy_matrix(suvs), expected[2:])
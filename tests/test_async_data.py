@@ -0,0 +1,247 @@
+"""async_data: the asyncio API over its own pool agrees with the blocking API"""
+
+import asyncio
+from contextlib import aclosing
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+
+import async_data
+from backends import ASYNC_DB_ERRORS, AsyncSQLiteBackend
+from db_pool import AsyncConnectionPool, PoolError
+
+from .conftest import PASSWORD, days_from_now
+from .test_rollups import _read_rollups
+
+
+def run(coroutine):
+    """Run a coroutine on a new event loop, closing the loop's pool afterwards"""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await async_data.close_pool()
+    return asyncio.run(main())
+
+
+def _reserve(api, customer, car_id, start, end):
+    return api.reserve_car(customer, car_id, days_from_now(start), days_from_now(end),
+                           'Airport', 'Downtown', Decimal('150.00'), 'card')
+
+
+def _pool(db, size=2, timeout=1):
+    backend = AsyncSQLiteBackend(db.SQLITE_CONFIG['path'])
+    return AsyncConnectionPool(backend, size=size, timeout=timeout, errors=ASYNC_DB_ERRORS)
+
+
+def test_reads_match_the_blocking_api(db, customer, cars):
+    booking_id, _ = _reserve(db, customer, cars[0], 1, 3)
+    db.record_payment(booking_id, Decimal('150.00'))
+    db.log_maintenance(cars[2], 'Oil change')
+    version = db.get_change_version('cars')
+
+    def reads(api):
+        return [
+            api.list_cars(),
+            api.list_available_cars(),
+            api.list_bookable_cars(),
+            api.list_users(),
+            api.get_booking_details(booking_id),
+            api.list_user_bookings(customer),
+            api.list_all_bookings(),
+            api.get_payment_history(booking_id),
+            api.list_maintenance_records(cars[2]),
+            api.search_listing('cars', 'toyota'),
+            api.search_listing('bookings', filters={'status': 'pending'}),
+            api.search_available_cars(days_from_now(2), days_from_now(4)),
+            api.check_car_availability(cars[0], days_from_now(2), days_from_now(4)),
+            api.get_dashboard_stats(),
+        ]
+
+    async def read_async():
+        return [await read for read in reads(async_data)]
+
+    results = run(read_async())
+    # Both share the booking cache; make the blocking API read the database too
+    db._booking_cache.clear()
+    assert results == reads(db)
+    assert results[4]['booking_id'] == booking_id and results[5] and results[9]
+
+    changes = run(async_data.list_changes('cars', version))
+    assert sorted(row['car_id'] for row in changes[0]) == sorted(
+        row['car_id'] for row in db.list_changes('cars', version)[0])
+    assert changes[1] >= version
+
+
+def test_writes_match_the_blocking_api(db, customer, cars):
+    async def writes():
+        car_id = await async_data.add_car('ABC-004', 'Mazda', '3', 'sedan', 2022, 'red', 40.00)
+        first, _ = await _reserve(async_data, customer, cars[0], -2, 2)
+        second, _ = await _reserve(async_data, customer, cars[1], 3, 5)
+        third = await async_data.create_booking(customer, car_id, days_from_now(6), days_from_now(8),
+                                                'Airport', 'Airport', Decimal('90.00'), 'cash')
+        assert await async_data.update_booking_status(first, 'approved')
+        assert await async_data.update_booking_statuses([second, third], 'approved') == [second, third]
+        assert await async_data.update_booking_status(third, 'cancelled')
+        assert await async_data.record_payment(first, Decimal('99.50'))
+        assert await async_data.update_car(cars[2], color='green')
+        assert await async_data.create_maintenance_record(cars[2], 'Brakes')
+        return car_id, first, third
+
+    db.get_dashboard_stats()
+    car_id, first, third = run(writes())
+
+    # The counters and rollups were kept up to date the same way
+    stats = db.get_dashboard_stats()
+    assert stats == {'total_cars': 4, 'active_bookings': 2, 'total_users': 1}
+    incremental = _read_rollups(db)
+    db.rebuild_rollups()
+    assert _read_rollups(db) == incremental
+    assert not db.rollups_stale()
+
+    assert db.get_booking_details(first)['payment_status'] == 'paid'
+    status = {car['car_id']: car['status'] for car in db.list_cars()}
+    assert (status[cars[0]], status[cars[2]]) == ('rented', 'maintenance')
+    # The shared availability index saw every change
+    assert not db.check_car_availability(cars[0], days_from_now(1), days_from_now(1))
+    assert db.check_car_availability(car_id, days_from_now(6), days_from_now(8))
+
+
+def test_writes_invalidate_the_shared_cache(db, customer, cars):
+    booking_id, _ = _reserve(db, customer, cars[0], 1, 2)
+    assert db.get_booking_details(booking_id)['status'] == 'pending'
+    assert len(db.list_user_bookings(customer)) == 1
+    run(async_data.update_booking_status(booking_id, 'approved'))
+    assert db.get_booking_details(booking_id)['status'] == 'approved'
+    run(_reserve(async_data, customer, cars[1], 1, 2))
+    assert len(db.list_user_bookings(customer)) == 2
+
+
+def test_concurrent_reservations_book_a_car_once(db, customer, cars):
+    async def reserve_all():
+        return await asyncio.gather(*(_reserve(async_data, customer, cars[0], 5, 7)
+                                      for _ in range(20)))
+
+    results = run(reserve_all())
+    assert len([booking_id for booking_id, _ in results if booking_id]) == 1
+    assert all(reason.startswith("Car is already booked") for booking_id, reason in results if not booking_id)
+    assert len(db.list_all_bookings()) == 1
+
+
+def test_refused_reservations_give_the_same_reasons(db, customer, cars):
+    _reserve(db, customer, cars[0], 5, 7)
+    db.create_maintenance_record(cars[1], 'Tyres')
+    for car_id in (cars[0], cars[1], 9999):
+        assert run(_reserve(async_data, customer, car_id, 6, 8)) == _reserve(db, customer, car_id, 6, 8)
+
+
+def test_login_sessions_are_shared(db, customer):
+    async def register_and_login():
+        user_id = await async_data.register_user('Async User', 'async@example.com', PASSWORD)
+        user = await async_data.login_user('async@example.com', PASSWORD)
+        wrong = await async_data.login_user('async@example.com', 'wrong password')
+        return user_id, user, wrong
+
+    user_id, user, wrong = run(register_and_login())
+    assert user['user_id'] == user_id and wrong is None
+    assert db.get_session_user(user['session_token'])['email'] == 'async@example.com'
+    assert db.login_user('async@example.com', PASSWORD)['user_id'] == user_id
+    run(async_data.logout_user(user['session_token']))
+    assert db.get_session_user(user['session_token']) is None
+
+
+def test_streams_match_the_blocking_api(db, customer, cars):
+    for start in range(1, 6):
+        _reserve(db, customer, cars[start % 3], start * 10, start * 10 + 1)
+
+    async def stream():
+        rows = [row async for row in async_data.iter_table_rows('bookings', chunk_size=2)]
+        found = [row async for row in async_data.iter_search('cars', sort='brand')]
+        return rows, found
+
+    rows, found = run(stream())
+    assert rows == list(db.iter_table_rows('bookings'))
+    assert [car['car_id'] for car in found] == [row['car_id'] for row in
+                                                 db.search_listing('cars', sort='brand')]
+
+
+def test_open_streams_count_against_the_pool(db, customer, cars, monkeypatch):
+    monkeypatch.setitem(async_data.ASYNC_POOL_CONFIG, 'size', 1)
+    monkeypatch.setitem(async_data.ASYNC_POOL_CONFIG, 'timeout', 0.05)
+
+    async def stream_and_query():
+        async with aclosing(async_data.iter_rows("SELECT * FROM cars", chunk_size=1)) as rows:
+            await anext(rows)
+            during = await async_data.list_cars()
+        after = await async_data.list_cars()
+        return during, after, async_data.get_pool_stats()
+
+    during, after, stats = run(stream_and_query())
+    assert during is None
+    assert len(after) == 3
+    assert stats['exhaustion_events'] == 1 and stats['open'] <= 1
+
+
+def test_pool_bounds_connections_in_flight(db):
+    async def borrow_many():
+        pool = _pool(db, size=2)
+        in_use = []
+
+        async def borrow():
+            async with await pool.get_connection() as conn:
+                in_use.append(pool.stats()['in_use'])
+                cursor = conn.cursor()
+                await cursor.execute("SELECT COUNT(*) FROM cars")
+                await cursor.fetchone()
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(borrow() for _ in range(10)))
+        stats = pool.stats()
+        await pool.close()
+        return in_use, stats
+
+    in_use, stats = asyncio.run(borrow_many())
+    assert len(in_use) == 10 and max(in_use) == 2
+    assert stats['created'] == 2 and stats['borrows'] == 10 and stats['waits'] > 0
+
+
+def test_pool_times_out_and_survives_cancelled_waiters(db):
+    async def exhaust():
+        pool = _pool(db, size=1, timeout=0.05)
+        held = await pool.get_connection()
+        with pytest.raises(PoolError):
+            await pool.get_connection()
+
+        waiter = asyncio.ensure_future(pool.get_connection())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await held.close()
+
+        # The cancelled waiter left no slot or wake-up behind
+        conn = await asyncio.wait_for(pool.get_connection(), 1)
+        await conn.close()
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(exhaust())
+    assert stats['exhaustion_events'] == 1 and stats['open'] == 1
+
+
+def test_pool_rolls_back_on_release(db, cars):
+    async def write_without_commit():
+        pool = _pool(db, size=1)
+        async with await pool.get_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute("UPDATE cars SET color = %s", ('purple',))
+            assert conn.in_transaction
+        async with await pool.get_connection() as conn:
+            assert not conn.in_transaction
+        await pool.close()
+
+    asyncio.run(write_without_commit())
+    assert 'purple' not in {car['color'] for car in db.list_cars()}
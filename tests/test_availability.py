@@ -0,0 +1,152 @@
+"""Availability index: overlap checks and rebuilds racing with writers"""
+
+import random
+
+import pytest
+
+from availability import AvailabilityIndex, CarIntervals
+
+from .conftest import days_from_now
+
+
+def test_conflicts_use_inclusive_end_days():
+    index = AvailabilityIndex()
+    index.rebuild(lambda: [(1, 10, '2030-01-05', '2030-01-08')])
+    assert index.conflicts(10, '2030-01-08', '2030-01-09') == [1]
+    assert index.conflicts(10, '2030-01-01', '2030-01-05') == [1]
+    assert index.is_available(10, '2030-01-09', '2030-01-12')
+    assert index.is_available(11, '2030-01-05', '2030-01-08')
+
+
+def test_overlapping_matches_brute_force():
+    rng = random.Random(5)
+    car = CarIntervals()
+    live = set()
+    for booking_id in range(300):
+        start = rng.randrange(0, 400)
+        entry = (start, start + rng.choice([0, 1, 3, 7, 60]), booking_id)
+        car.add(*entry)
+        live.add(entry)
+        if rng.random() < 0.3:
+            gone = rng.choice(sorted(live))
+            car.remove(*gone)
+            live.discard(gone)
+        query_start = rng.randrange(0, 450)
+        query_end = query_start + rng.randrange(0, 10)
+        expected = sorted(b for s, e, b in live if s <= query_end and e >= query_start)
+        assert sorted(car.overlapping(query_start, query_end)) == expected
+
+
+def test_removing_a_long_booking_narrows_the_scan():
+    car = CarIntervals([(0, 365, 1)] + [(day, day, day + 10) for day in range(400, 500)])
+    assert car.max_ends[-1] == 499
+    car.remove(0, 365, 1)
+    assert car.max_ends == list(range(400, 500))
+    assert car.overlapping(450, 450) == [460]
+
+
+def test_bookings_made_during_a_rebuild_are_kept():
+    index = AvailabilityIndex()
+    index.add(1, 10, '2030-01-01', '2030-01-03')
+
+    def fetch():
+        # Committed after the snapshot below was read
+        index.add(2, 10, '2030-02-01', '2030-02-03')
+        index.remove(1)
+        return [(1, 10, '2030-01-01', '2030-01-03'), (3, 11, '2030-03-01', '2030-03-02')]
+
+    index.rebuild(fetch)
+    assert index.conflicts(10, '2030-02-02', '2030-02-02') == [2]
+    assert index.is_available(10, '2030-01-01', '2030-01-03')
+    assert index.conflicts(11, '2030-03-01', '2030-03-01') == [3]
+    assert not index._journals
+
+
+def test_failed_rebuild_keeps_old_contents():
+    index = AvailabilityIndex()
+    index.add(1, 10, '2030-01-01', '2030-01-03')
+
+    def fetch():
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        index.rebuild(fetch)
+    assert index.conflicts(10, '2030-01-02', '2030-01-02') == [1]
+    assert index.is_stale() and not index._journals
+
+
+def test_free_cars_matches_conflicts():
+    index = AvailabilityIndex()
+    index.add(1, 10, days_from_now(2), days_from_now(4))
+    index.add(2, 11, days_from_now(6), days_from_now(6))
+    for start in range(0, 9):
+        for end in range(start, 9):
+            expected = [car_id for car_id in (10, 11, 12)
+                        if index.is_available(car_id, days_from_now(start), days_from_now(end))]
+            assert index.free_cars([10, 11, 12], days_from_now(start), days_from_now(end)) == expected
+
+
+def test_sync_loads_active_bookings(db, customer, cars):
+    pending = db.create_booking(customer, cars[0], days_from_now(1), days_from_now(3),
+                                'Airport', 'Airport', 100, 'cash')
+    rejected = db.create_booking(customer, cars[1], days_from_now(1), days_from_now(3),
+                                 'Airport', 'Airport', 100, 'cash')
+    db.update_booking_status(rejected, 'rejected')
+
+    assert db.sync_availability_index()
+    assert db._availability.conflicts(cars[0], days_from_now(2), days_from_now(2)) == [pending]
+    assert db.check_car_availability(cars[1], days_from_now(1), days_from_now(3))
+    free = [car['car_id'] for car in db.search_available_cars(days_from_now(1), days_from_now(1))]
+    assert sorted(free) == sorted(cars[1:])
+
+
+def test_search_refuses_a_range_ending_before_it_starts(db, cars):
+    with pytest.raises(ValueError):
+        db.search_available_cars(days_from_now(5), days_from_now(2))
+    assert len(db.search_available_cars(days_from_now(5), days_from_now(5))) == 3
+
+
+def test_search_applies_the_car_filters(db, cars):
+    db.add_car('ABC-004', 'Audi', 'Q7', 'suv', 2023, 'black', 120.00, seats=7)
+    db.create_maintenance_record(cars[1], 'Brakes')
+
+    def plates(**filters):
+        return [car['plate_no'] for car in db.search_available_cars(days_from_now(1), days_from_now(2), **filters)]
+
+    # In brand, model order, without cars in maintenance
+    assert plates() == ['ABC-004', 'ABC-003', 'ABC-001']
+    assert plates(car_type='suv') == ['ABC-004', 'ABC-003']
+    assert plates(min_seats=5, max_rate=100) == ['ABC-003']
+    assert plates(car_type='sedan', max_rate=40) == []
+
+
+def test_search_matches_per_car_checks(db, customer, cars):
+    rng = random.Random(6)
+    for car_id in cars:
+        for _ in range(4):
+            start = rng.randrange(0, 40)
+            db.create_booking(customer, car_id, days_from_now(start), days_from_now(start + rng.randrange(0, 5)),
+                              'Airport', 'Airport', 100, 'cash')
+
+    def booked(car_id, start, end):
+        return any(booking['car_id'] == car_id and booking['status'] in ('approved', 'pending')
+                   and booking['start_date'] <= days_from_now(end) and booking['end_date'] >= days_from_now(start)
+                   for booking in db.list_all_bookings())
+
+    for _ in range(30):
+        start = rng.randrange(0, 45)
+        end = start + rng.randrange(0, 6)
+        free = [car['car_id'] for car in db.search_available_cars(days_from_now(start), days_from_now(end))]
+        assert sorted(free) == [car_id for car_id in sorted(cars) if not booked(car_id, start, end)]
+
+
+def test_search_follows_booking_changes(db, customer, cars):
+    def free():
+        return sorted(car['car_id'] for car in db.search_available_cars(days_from_now(3), days_from_now(4)))
+
+    assert free() == sorted(cars)
+    booking_id = db.create_booking(customer, cars[0], days_from_now(4), days_from_now(6),
+                                   'Airport', 'Airport', 100, 'cash')
+    assert free() == sorted(cars[1:])
+    db.update_booking_status(booking_id, 'cancelled')
+    assert free() == sorted(cars)
@@ -0,0 +1,117 @@
+"""Storage backends: MySQL dialect translation and the SQLite connection wrapper"""
+
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from backends import SQLiteBackend, create_backend, translate_sql
+
+
+def test_placeholders_and_literal_percents():
+    assert translate_sql("SELECT * FROM cars WHERE brand = %s AND model LIKE %s") \
+        == ("SELECT * FROM cars WHERE brand = ? AND model LIKE ?", False)
+    assert translate_sql("SELECT * FROM cars WHERE plate_no LIKE 'AB%%' AND seats = %s")[0] \
+        == "SELECT * FROM cars WHERE plate_no LIKE 'AB%' AND seats = ?"
+
+
+def test_functions_are_rewritten():
+    sql, _ = translate_sql("SELECT * FROM bookings WHERE end_date >= CURDATE() AND date_created < now()")
+    assert sql == ("SELECT * FROM bookings WHERE end_date >= date('now', 'localtime') "
+                   "AND date_created < datetime('now', 'localtime')")
+    assert translate_sql("SELECT MYCURDATE() FROM cars")[0] == "SELECT MYCURDATE() FROM cars"
+
+
+def test_writes_and_locking_reads_take_the_write_lock():
+    sql, locks = translate_sql("SELECT status FROM bookings WHERE booking_id = %s FOR UPDATE")
+    assert locks and 'FOR UPDATE' not in sql
+    assert translate_sql("select * from cars for   update")[1]
+    for statement in ("INSERT INTO cars (plate_no) VALUES (%s)", "  update cars SET seats = 4",
+                      "DELETE FROM cars", "CREATE INDEX idx ON cars (brand)", "DROP TABLE cars"):
+        assert translate_sql(statement)[1], statement
+    assert not translate_sql("SELECT * FROM cars WHERE status = 'updated'")[1]
+
+
+def test_create_backend():
+    assert isinstance(create_backend('sqlite', sqlite_config={'path': ':memory:'}), SQLiteBackend)
+    with pytest.raises(ValueError):
+        create_backend('postgres')
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'test.db'), pragmas={'busy_timeout': 50})
+    conn = backend.connect()
+    conn.cursor().execute("""
+        CREATE TABLE items (id INTEGER PRIMARY KEY, price DECIMAL(10, 2), day DATE, seen TIMESTAMP)
+    """)
+    conn.commit()
+    conn.close()
+    return backend
+
+
+def test_values_come_back_as_mysql_types(backend):
+    conn = backend.connect()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("INSERT INTO items (price, day, seen) VALUES (%s, %s, %s)",
+                   (Decimal('19.99'), date(2024, 2, 29), datetime(2024, 2, 29, 13, 45, 1)))
+    assert cursor.lastrowid == 1 and cursor.rowcount == 1
+    conn.commit()
+    cursor.execute("SELECT * FROM items")
+    assert cursor.column_names == ['id', 'price', 'day', 'seen']
+    assert cursor.fetchall() == [{'id': 1, 'price': Decimal('19.99'), 'day': date(2024, 2, 29),
+                                  'seen': datetime(2024, 2, 29, 13, 45, 1)}]
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO items (price) VALUES (%s)", [(Decimal('1.50'),), (Decimal('2.50'),)])
+    conn.commit()
+    cursor.execute("SELECT price FROM items WHERE day IS NULL ORDER BY id")
+    assert list(cursor) == [(Decimal('1.50'),), (Decimal('2.50'),)]
+    conn.close()
+
+
+def test_connections_use_wal_and_the_pragmas(backend):
+    conn = backend.connect()
+    assert conn.raw.execute("PRAGMA journal_mode").fetchone() == ('wal',)
+    assert conn.raw.execute("PRAGMA foreign_keys").fetchone() == (1,)
+    assert conn.raw.execute("PRAGMA busy_timeout").fetchone() == (50,)
+    assert conn.is_connected()
+    conn.close()
+    assert not conn.is_connected()
+
+
+def test_reads_autocommit_and_writes_open_a_transaction(backend):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM items")
+    assert not conn.in_transaction
+    cursor.execute("SELECT * FROM items WHERE id = %s FOR UPDATE", (1,))
+    assert conn.in_transaction
+    conn.rollback()
+    cursor.execute("INSERT INTO items (price) VALUES (%s)", (Decimal('5'),))
+    assert conn.in_transaction
+    conn.rollback()
+    cursor.execute("SELECT COUNT(*) FROM items")
+    assert cursor.fetchone() == (0,)
+    conn.close()
+
+
+def test_a_second_writer_waits_then_gets_a_retryable_error(backend):
+    first, second = backend.connect(), backend.connect()
+    first.start_transaction()
+    first.cursor().execute("INSERT INTO items (price) VALUES (%s)", (Decimal('1'),))
+
+    # Readers are not blocked by the open write transaction
+    reader = second.cursor()
+    reader.execute("SELECT COUNT(*) FROM items")
+    assert reader.fetchone() == (0,)
+
+    with pytest.raises(sqlite3.OperationalError) as info:
+        second.cursor().execute("SELECT * FROM items FOR UPDATE")
+    assert backend.is_retryable(info.value)
+    assert not backend.is_retryable(sqlite3.OperationalError("no such table: items"))
+    first.commit()
+    second.start_transaction()
+    second.commit()
+    first.close()
+    second.close()
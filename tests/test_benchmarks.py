@@ -0,0 +1,74 @@
+"""Benchmarks: seeding synthetic data and timing every data-access function"""
+
+import json
+
+from benchmarks import compare_results, run_benchmarks, seed_database
+from benchmarks.__main__ import main
+from benchmarks.runner import build_cases, percentile
+
+
+def _count(db, table):
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+
+def _overlapping_bookings(db):
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM bookings a JOIN bookings b
+            ON a.car_id = b.car_id AND a.booking_id < b.booking_id
+            AND a.start_date <= b.end_date AND b.start_date <= a.end_date
+        """)
+        return cursor.fetchone()[0]
+
+
+def test_seeding_adds_consistent_rows(db):
+    report = seed_database(users=20, cars=15, bookings=400, history_days=90, batch_size=64, seed=1)
+    assert (report['users'], report['cars'], report['bookings'], report['maintenance']) == (20, 15, 400, 3)
+    for table in ('users', 'cars', 'bookings', 'payments', 'maintenance'):
+        assert _count(db, table) == report[table]
+    assert _overlapping_bookings(db) == 0
+    # Payments belong to paid bookings only
+    assert report['payments'] == len([b for b in db.list_all_bookings() if b['payment_status'] == 'paid']) > 0
+
+    # A second run adds after the existing rows
+    again = seed_database(users=5, cars=5, bookings=50, history_days=90, seed=2)
+    assert _count(db, 'bookings') == report['bookings'] + again['bookings']
+    assert db.login_user('bench1@example.com', 'benchmark') is not None
+
+
+def test_runner_times_every_public_function(db):
+    seed_database(users=20, cars=15, bookings=300, history_days=90, seed=1)
+    results = run_benchmarks(iterations=2, heavy_iterations=1, include_heavy=True, include_writes=True)
+    assert results['untimed_functions'] == [] and results['skipped'] == []
+    heavy = {case['name'] for case in build_cases() if case['heavy']}
+    assert heavy
+    for name, result in results['results'].items():
+        assert result['errors'] == 0, name
+        assert result['iterations'] == (1 if name in heavy else 2)
+        assert result['p50_ms'] <= result['p95_ms'] <= result['max_ms']
+    assert results['meta']['iterations'] == 2
+
+    quick = run_benchmarks(iterations=1, only=['booking_details'])
+    assert list(quick['results']) == [name for name in results['results'] if 'booking_details' in name]
+
+
+def test_percentiles_and_comparison(tmp_path, capsys):
+    assert percentile([], 50) is None
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 95) == 4
+    assert percentile(list(range(1, 101)), 99) == 99
+
+    baseline = {'results': {'fast': {'p95_ms': 10.0}, 'slow': {'p95_ms': 10.0}, 'gone': {'p95_ms': 1.0}}}
+    current = {'results': {'fast': {'p95_ms': 10.5}, 'slow': {'p95_ms': 12.0}, 'new': {'p95_ms': 1.0}}}
+    assert [(name, regressed) for name, _, _, _, regressed in compare_results(baseline, current)] \
+        == [('fast', False), ('slow', True)]
+
+    for name, results in (('baseline.json', baseline), ('current.json', current)):
+        (tmp_path / name).write_text(json.dumps(results))
+    assert main(['compare', str(tmp_path / 'baseline.json'), str(tmp_path / 'current.json')]) == 2
+    assert "1 regression(s) above 10%" in capsys.readouterr().out
+    assert main(['compare', str(tmp_path / 'baseline.json'), str(tmp_path / 'current.json'),
+                 '--threshold', '0.5']) == 0
@@ -0,0 +1,62 @@
+"""update_booking_statuses: many pending bookings change in one transaction"""
+
+import pytest
+
+from .conftest import days_from_now
+from .test_rollups import _read_rollups
+
+
+def _book(db, customer, car_id, offset):
+    return db.create_booking(customer, car_id, days_from_now(offset), days_from_now(offset + 2),
+                             'Airport', 'Airport', 100, 'cash')
+
+
+@pytest.mark.parametrize('status', ['approved', 'rejected'])
+def test_batch_updates_bookings_cars_and_summaries(db, customer, cars, status):
+    db.get_dashboard_stats()
+    batch = [_book(db, customer, car_id, offset) for car_id, offset in zip(cars, (-1, 3, 6))]
+    other = _book(db, customer, cars[0], 20)
+    assert db.get_booking_details(batch[0])['status'] == 'pending'
+
+    assert sorted(db.update_booking_statuses(batch, status)) == sorted(batch)
+
+    # Cached details were invalidated and the rest is untouched
+    assert [db.get_booking_details(booking_id)['status'] for booking_id in batch] == [status] * 3
+    assert db.get_booking_details(other)['status'] == 'pending'
+    car_status = db.CAR_STATUS_FOR_BOOKING[status]
+    assert {car['status'] for car in db.list_cars()} == {car_status}
+
+    # Counters, rollups and the availability index match the new statuses
+    counters = db._read_dashboard_counters()
+    assert counters['active_bookings'] == (3 if status == 'approved' else 0)
+    assert db.rebuild_dashboard_counters() and db._read_dashboard_counters() == counters
+    incremental = _read_rollups(db)
+    db.rebuild_rollups()
+    assert _read_rollups(db) == incremental
+    assert db.check_car_availability(cars[1], days_from_now(3), days_from_now(5)) == (status == 'rejected')
+
+
+def test_bookings_no_longer_pending_are_skipped(db, customer, cars):
+    first, second, third = (_book(db, customer, car_id, 1) for car_id in cars)
+    db.update_booking_status(first, 'rejected')
+    db.update_booking_status(second, 'approved')
+    assert db.update_booking_statuses([first, second, third, 9999], 'approved') == [third]
+    assert [db.get_booking_details(booking_id)['status'] for booking_id in (first, second, third)] \
+        == ['rejected', 'approved', 'approved']
+    assert db.get_dashboard_stats()['active_bookings'] == 2
+
+
+def test_nothing_to_update(db, customer, cars):
+    assert db.update_booking_statuses([], 'approved') == []
+    booking_id = _book(db, customer, cars[0], 1)
+    db.update_booking_status(booking_id, 'approved')
+    assert db.update_booking_statuses([booking_id], 'rejected') == []
+    assert db.get_booking_details(booking_id)['status'] == 'approved'
+
+
+def test_failed_batch_changes_nothing(db, customer, cars, capsys):
+    batch = [_book(db, customer, car_id, 1) for car_id in cars]
+    # A status the bookings table's CHECK constraint refuses
+    assert db.update_booking_statuses(batch, 'bogus') is None
+    assert "Error updating bookings" in capsys.readouterr().out
+    assert {booking['status'] for booking in db.list_all_bookings()} == {'pending'}
@@ -0,0 +1,54 @@
+"""bulk_import: bad rows are reported by line and cost only themselves"""
+
+import json
+
+import pytest
+
+from bulk_import import import_cars
+
+HEADER = "plate_no,brand,model,type,year,color,rate_per_day,seats\n"
+
+
+def _plates(db):
+    return sorted(car['plate_no'] for car in db.list_cars())
+
+
+@pytest.mark.parametrize('batch_size', [1, 3, 500])
+def test_csv_errors_are_reported_per_line(db, cars, tmp_path, batch_size):
+    path = tmp_path / 'cars.csv'
+    path.write_text(HEADER
+                    + "NEW-001,Kia,Rio,sedan,2020,red,30.00,4\n"        # line 2
+                    + "NEW-002,,Rio,sedan,2020,red,30.00,4\n"           # line 3: no brand
+                    + "NEW-003,Kia,Rio,boat,2020,red,30.00,4\n"         # line 4: bad type
+                    + "NEW-004,Kia,Rio,sedan,abc,red,30.00,4\n"         # line 5: bad year
+                    + "ABC-001,Kia,Rio,sedan,2020,red,30.00,4\n"        # line 6: plate taken
+                    + "NEW-005,Kia,Sportage,suv,2023,grey,55.50,5\n"    # line 7
+                    + "NEW-001,Kia,Rio,sedan,2020,red,30.00,4\n"        # line 8: duplicate
+                    + "NEW-006,Kia,Rio,sedan,2020,red,30.00,40\n")      # line 9: seats
+    report = import_cars(str(path), batch_size=batch_size)
+
+    assert report['inserted'] == 2
+    assert report['failed'] == 6
+    assert [line_no for line_no, _ in report['errors']] == [3, 4, 5, 6, 8, 9]
+    assert 'brand' in report['errors'][0][1]
+    assert _plates(db) == ['ABC-001', 'ABC-002', 'ABC-003', 'NEW-001', 'NEW-005']
+    assert db.get_dashboard_stats()['total_cars'] == 5
+
+
+def test_jsonl_errors_are_reported_per_line(db, tmp_path):
+    good = {'plate_no': 'J-1', 'brand': 'Kia', 'model': 'Rio', 'type': 'sedan',
+            'year': 2020, 'color': 'red', 'rate_per_day': '30.00'}
+    path = tmp_path / 'cars.jsonl'
+    path.write_text(json.dumps(good) + "\n"
+                    + "{not json\n"
+                    + "\n"
+                    + "[1, 2]\n"
+                    + json.dumps(dict(good, plate_no='J-2', rate_per_day=-5)) + "\n"
+                    + json.dumps(dict(good, plate_no='J-3', status='maintenance')) + "\n")
+    report = import_cars(str(path))
+
+    assert report['inserted'] == 2
+    assert [line_no for line_no, _ in report['errors']] == [2, 4, 5]
+    assert report['errors'][0][1].startswith("Invalid JSON")
+    statuses = {car['plate_no']: car['status'] for car in db.list_cars()}
+    assert statuses == {'J-1': 'available', 'J-3': 'maintenance'}
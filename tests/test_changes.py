@@ -0,0 +1,137 @@
+"""Change tracking: list_changes returns every row changed since a version"""
+
+import threading
+from datetime import timedelta
+
+from .conftest import days_from_now
+
+
+def _changed_ids(rows, key):
+    return sorted(row[key] for row in rows)
+
+
+def _set_updated_at(db, table, seconds_ago, where="1 = 1"):
+    """Backdate updated_at, as if the rows were written that long ago"""
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"UPDATE {table} SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', "
+                       f"'-{seconds_ago} seconds') WHERE {where}")
+        conn.commit()
+
+
+def _age_all_rows(db):
+    for table in db.CHANGES_SQL:
+        _set_updated_at(db, table, 3600)
+
+
+def test_inserts_and_updates_are_listed(db, customer, cars):
+    _age_all_rows(db)
+    version = db.get_change_version('cars')
+    assert db.list_changes('cars', version)[0] == []
+
+    new_car = db.add_car('ABC-004', 'Mazda', '3', 'sedan', 2022, 'red', 40.00)
+    db.update_car(cars[0], color='green')
+    rows, next_version = db.list_changes('cars', version)
+    assert _changed_ids(rows, 'car_id') == sorted([cars[0], new_car])
+    assert {row['car_id']: row['color'] for row in rows}[cars[0]] == 'green'
+    assert next_version >= version
+
+
+def test_late_commits_inside_the_window_are_not_missed(db, customer, cars):
+    # A row stamped before a version was read but committed after it
+    _age_all_rows(db)
+    version = db.get_change_version('cars')
+    _set_updated_at(db, 'cars', 10, f"car_id = {cars[1]}")
+    rows, _ = db.list_changes('cars', version)
+    assert _changed_ids(rows, 'car_id') == [cars[1]]
+
+
+def test_rows_stay_listed_for_the_window(db, cars):
+    _age_all_rows(db)
+    version = db.get_change_version('cars')
+    db.update_car(cars[0], color='green')
+    _, version = db.list_changes('cars', version)
+    assert _changed_ids(db.list_changes('cars', version)[0], 'car_id') == [cars[0]]
+    assert db.list_changes('cars', version + db.CHANGE_WINDOW + timedelta(seconds=1))[0] == []
+
+
+def test_booking_changes_carry_the_listing_columns(db, customer, cars):
+    version = db.get_change_version('bookings')
+    booking_id, _ = db.reserve_car(customer, cars[0], days_from_now(1), days_from_now(2),
+                                   'Airport', 'Airport', 100, 'card')
+    rows, version = db.list_changes('bookings', version)
+    assert [row['booking_id'] for row in rows] == [booking_id]
+    assert rows[0]['customer_name'] == 'Test Customer' and rows[0]['car_brand'] == 'Toyota'
+
+    db.update_booking_status(booking_id, 'approved')
+    rows, _ = db.list_changes('bookings', version)
+    assert [(row['booking_id'], row['status']) for row in rows] == [(booking_id, 'approved')]
+
+
+def test_users_changes_leave_out_passwords(db, customer):
+    rows, _ = db.list_changes('users', db.get_change_version('users'))
+    assert [row['user_id'] for row in rows] == [customer]
+    assert 'password' not in rows[0]
+
+
+def test_only_unfiltered_newest_first_searches_keep_a_version(db, cars):
+    streams = {
+        'default': db.stream_search('cars'),
+        'newest': db.stream_search('cars', sort='newest'),
+        'sorted': db.stream_search('cars', sort='brand'),
+        'filtered': db.stream_search('cars', filters={'type': 'suv'}),
+        'text': db.stream_search('cars', text='toyota'),
+    }
+    try:
+        versions = {name: stream.version is not None for name, stream in streams.items()}
+    finally:
+        for stream in streams.values():
+            stream.close()
+    assert versions == {'default': True, 'newest': True, 'sorted': False,
+                        'filtered': False, 'text': False}
+
+
+def test_users_listing_is_newest_first_with_a_version(db, customer):
+    other = db.register_user('Other Customer', 'other@example.com', 'secret123')
+    for stream in (db.stream_users(), db.stream_search('users')):
+        try:
+            assert stream.version is not None
+            assert [row['user_id'] for row in stream.fetch(10)] == [other, customer]
+        finally:
+            stream.close()
+
+
+def test_change_sequence_is_gone(db):
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE '%change%'")
+        assert cursor.fetchall() == []
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {name for (name,) in cursor.fetchall()}
+    assert {f"trg_{table}_{event}_stamp" for table in db.CHANGES_SQL
+            for event in ('insert', 'update')} <= triggers
+
+
+def test_polling_during_writes_misses_nothing(db, cars):
+    # A view kept up to date only from list_changes ends up equal to the table
+    done = threading.Event()
+
+    def write():
+        try:
+            for i in range(150):
+                db.update_car(cars[i % len(cars)], color=f"color-{i}")
+        finally:
+            done.set()
+
+    version = db.get_change_version('cars')
+    view = {car['car_id']: car['color'] for car in db.list_cars()}
+    writer = threading.Thread(target=write)
+    writer.start()
+    while True:
+        finished = done.is_set()
+        rows, version = db.list_changes('cars', version)
+        view.update((row['car_id'], row['color']) for row in rows)
+        if finished:
+            break
+    writer.join()
+    assert view == {car['car_id']: car['color'] for car in db.list_cars()}
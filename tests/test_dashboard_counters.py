@@ -0,0 +1,55 @@
+"""Dashboard counters: incremental adjustments agree with a full rebuild"""
+
+from .conftest import days_from_now
+
+
+def _book(db, customer, car_id, offset):
+    booking_id, _ = db.reserve_car(customer, car_id, days_from_now(offset), days_from_now(offset + 2),
+                                   'Airport', 'Airport', 120, 'card')
+    return booking_id
+
+
+def _counters_after_rebuild(db):
+    assert db.rebuild_dashboard_counters()
+    return db._read_dashboard_counters()
+
+
+def test_first_read_builds_the_counters(db, customer, cars):
+    assert db._read_dashboard_counters() is None
+    assert db.get_dashboard_stats() == {'total_cars': 3, 'active_bookings': 0, 'total_users': 1}
+
+
+def test_counters_follow_every_write(db, customer, cars):
+    db.get_dashboard_stats()
+    db.register_user('Staff Member', 'staff@example.com', 'secret123', role='staff')
+    db.add_cars_bulk([(1, ('BULK-1', 'Kia', 'Rio', 'sedan', 2020, 'red', 30, 4, 'available', None)),
+                      (2, ('BULK-2', 'Kia', 'Rio', 'sedan', 2020, 'red', 30, 4, 'available', None))])
+    first, second, third, fourth = (_book(db, customer, car_id, offset)
+                                    for car_id, offset in zip(cars + cars[:1], (1, 1, 1, 10)))
+    db.update_booking_status(first, 'approved')
+    db.update_booking_statuses([second, third], 'approved')
+    db.update_booking_status(second, 'completed')
+    db.update_booking_status(fourth, 'rejected')
+    db.update_booking_status(first, 'approved')   # no change
+
+    incremental = db._read_dashboard_counters()
+    assert incremental == {'total_cars': 5, 'active_bookings': 2, 'total_users': 2}
+    assert incremental == _counters_after_rebuild(db)
+
+
+def test_stats_are_not_served_stale_after_a_write(db, customer, cars):
+    db.get_dashboard_stats()
+    booking_id = _book(db, customer, cars[0], 1)
+    assert db.get_dashboard_stats()['active_bookings'] == 0
+    db.update_booking_status(booking_id, 'approved')
+    assert db.get_dashboard_stats()['active_bookings'] == 1
+
+
+def test_missing_counters_are_rebuilt(db, customer, cars):
+    db.get_dashboard_stats()
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM dashboard_counters WHERE name = 'total_cars'")
+        conn.commit()
+    db.add_car('ABC-004', 'Mazda', '3', 'sedan', 2022, 'red', 40.00)
+    assert db.get_dashboard_stats() == {'total_cars': 4, 'active_bookings': 0, 'total_users': 1}
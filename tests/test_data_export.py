@@ -0,0 +1,101 @@
+"""Table export: a resumed export produces the same file as an uninterrupted one"""
+
+import gzip
+import json
+import os
+from decimal import Decimal
+
+import pytest
+
+import data_export
+from data_export import export_table
+
+from .conftest import days_from_now
+
+
+@pytest.fixture
+def bookings(db, customer, cars):
+    """23 bookings, the first 10 of them paid"""
+    ids = [db.create_booking(customer, cars[i % len(cars)], days_from_now(i * 4), days_from_now(i * 4 + 2),
+                             'Airport', 'Harbour, "North" gate', Decimal('99.50') + i, 'card')
+           for i in range(23)]
+    for booking_id in ids[:10]:
+        db.record_payment(booking_id, Decimal('45.25'))
+    return ids
+
+
+def _crash_after(monkeypatch, rows):
+    real = data_export.iter_table_rows
+
+    def iter_table_rows(*args, **kwargs):
+        source = real(*args, **kwargs)
+        try:
+            for count, row in enumerate(source):
+                if count == rows:
+                    raise RuntimeError("export interrupted")
+                yield row
+        finally:
+            source.close()
+
+    monkeypatch.setattr(data_export, 'iter_table_rows', iter_table_rows)
+
+
+def _contents(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    # gzip headers carry a timestamp, so compare what they decompress to
+    return gzip.decompress(data) if path.endswith('.gz') else data
+
+
+@pytest.mark.parametrize('name', ['bookings.csv', 'bookings.jsonl', 'bookings.csv.gz',
+                                  'bookings.jsonl.gz'])
+@pytest.mark.parametrize('crash_after', [0, 4, 5, 12, 22])
+def test_resume_matches_an_uninterrupted_export(db, bookings, tmp_path, monkeypatch, name, crash_after):
+    expected_path = str(tmp_path / f"expected-{name}")
+    export_table('bookings', expected_path, checkpoint_every=5)
+
+    path = str(tmp_path / name)
+    with monkeypatch.context() as patch:
+        _crash_after(patch, crash_after)
+        with pytest.raises(RuntimeError):
+            export_table('bookings', path, checkpoint_every=5)
+    checkpointed = crash_after // 5 * 5
+    if checkpointed:
+        with open(f"{path}.checkpoint", encoding='utf-8') as f:
+            assert json.load(f)['rows'] == checkpointed
+
+    report = export_table('bookings', path, checkpoint_every=5, resume=True)
+    assert report['rows'] == 23 and report['resumed_from'] == checkpointed
+    assert _contents(path) == _contents(expected_path)
+    assert not os.path.exists(f"{path}.checkpoint")
+
+
+def test_export_rows_round_trip(db, bookings, tmp_path):
+    path = str(tmp_path / 'payments.jsonl.gz')
+    export_table('payments', path)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert [row['booking_id'] for row in rows] == bookings[:10]
+    assert {row['amount'] for row in rows} == {'45.25'}
+
+
+def test_checkpoint_of_another_export_is_refused(db, bookings, tmp_path, monkeypatch):
+    path = str(tmp_path / 'bookings.csv')
+    with monkeypatch.context() as patch:
+        _crash_after(patch, 7)
+        with pytest.raises(RuntimeError):
+            export_table('bookings', path, checkpoint_every=5)
+    with pytest.raises(ValueError):
+        export_table('bookings', path, fmt='jsonl', checkpoint_every=5, resume=True)
+    with pytest.raises(ValueError):
+        export_table('bookings', path, since='2020-01-01', checkpoint_every=5, resume=True)
+
+
+def test_without_resume_the_export_starts_over(db, bookings, tmp_path, monkeypatch):
+    path = str(tmp_path / 'bookings.csv')
+    with monkeypatch.context() as patch:
+        _crash_after(patch, 7)
+        with pytest.raises(RuntimeError):
+            export_table('bookings', path, checkpoint_every=5)
+    report = export_table('bookings', path, checkpoint_every=5)
+    assert report['resumed_from'] == 0 and report['rows'] == 23
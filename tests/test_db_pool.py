@@ -0,0 +1,133 @@
+"""db_pool: connections are reused, bounded, cleaned up on release and recycled"""
+
+import threading
+import time
+
+import pytest
+
+from backends import DB_ERRORS, SQLiteBackend
+from db_pool import ConnectionPool, PoolError
+
+
+def _pool(db, **options):
+    return ConnectionPool(SQLiteBackend(db.SQLITE_CONFIG['path']), errors=DB_ERRORS, **options)
+
+
+def test_connections_are_reused(db):
+    pool = _pool(db, size=2)
+    for _ in range(5):
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM cars")
+            cursor.fetchone()
+    stats = pool.stats()
+    pool.close()
+    assert stats['borrows'] == 5 and stats['created'] == 1
+    assert stats['open'] == stats['idle'] == 1 and stats['in_use'] == 0
+
+
+def test_returned_connections_cannot_be_used(db):
+    pool = _pool(db)
+    conn = pool.get_connection()
+    conn.close()
+    conn.close()
+    with pytest.raises(PoolError):
+        conn.cursor()
+    assert pool.stats()['idle'] == 1
+    pool.close()
+
+
+def test_pool_bounds_connections_across_threads(db):
+    pool = _pool(db, size=2)
+    in_use = []
+    lock = threading.Lock()
+
+    def borrow():
+        with pool.get_connection():
+            with lock:
+                in_use.append(pool.stats()['in_use'])
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=borrow) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    pool.close()
+    assert len(in_use) == 8 and max(in_use) == 2
+    assert stats['created'] == 2 and stats['waits'] > 0
+
+
+def test_full_pool_times_out(db):
+    pool = _pool(db, size=1, timeout=0.05)
+    held = pool.get_connection()
+    with pytest.raises(PoolError):
+        pool.get_connection()
+    held.close()
+    pool.get_connection().close()
+    stats = pool.stats()
+    pool.close()
+    assert stats['exhaustion_events'] == 1 and stats['borrows'] == 2
+
+
+def test_get_db_connection_reports_exhaustion(db, monkeypatch, capsys):
+    monkeypatch.setitem(db.POOL_CONFIG, 'size', 1)
+    monkeypatch.setitem(db.POOL_CONFIG, 'timeout', 0.05)
+    db.close_pool()
+    with db.db_connection() as held:
+        assert held is not None
+        assert db.get_db_connection() is None
+    assert "Error connecting to database" in capsys.readouterr().out
+    assert db.get_pool_stats()['exhaustion_events'] == 1
+
+
+def test_release_rolls_back_open_transactions(db, cars):
+    pool = _pool(db, size=1)
+    with pool.get_connection() as conn:
+        conn.cursor().execute("UPDATE cars SET color = %s", ('purple',))
+        assert conn.in_transaction
+    with pool.get_connection() as conn:
+        assert not conn.in_transaction
+    pool.close()
+    assert 'purple' not in {car['color'] for car in db.list_cars()}
+
+
+def test_old_connections_are_recycled(db):
+    pool = _pool(db, recycle=0)
+    first = pool.get_connection()
+    raw = first._raw
+    first.close()
+    second = pool.get_connection()
+    assert second._raw is not raw
+    second.close()
+    stats = pool.stats()
+    pool.close()
+    assert stats['recycled'] >= 1 and stats['open'] == 0
+
+
+def test_dead_idle_connections_are_replaced(db):
+    pool = _pool(db, ping_after=0)
+    conn = pool.get_connection()
+    raw = conn._raw
+    conn.close()
+    # The server went away while the connection sat idle
+    raw.raw.close()
+    with pool.get_connection() as conn:
+        assert conn._raw is not raw
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        assert cursor.fetchone() == (1,)
+    stats = pool.stats()
+    pool.close()
+    assert stats['failed_health_checks'] == 1 and stats['created'] == 2
+
+
+def test_closed_pool_refuses_borrowers(db):
+    pool = _pool(db)
+    held = pool.get_connection()
+    pool.close()
+    with pytest.raises(PoolError):
+        pool.get_connection()
+    held.close()
+    assert pool.stats()['open'] == 0
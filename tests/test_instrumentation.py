@@ -0,0 +1,56 @@
+"""Query instrumentation: attribution to public functions and the slow-query log"""
+
+import asyncio
+
+import async_data
+import instrumentation
+from instrumentation import get_query_stats, reset_query_stats
+
+from .conftest import days_from_now
+
+
+def _booking(db, customer, car_id):
+    return db.create_booking(customer, car_id, days_from_now(1), days_from_now(2),
+                             'Airport', 'Airport', 100, 'cash')
+
+
+def test_queries_count_towards_the_public_function(db, customer, cars):
+    booking_id = _booking(db, customer, cars[0])
+    reset_query_stats()
+    db.get_booking_details(booking_id)      # loads through the cache and a private helper
+    db.list_bookings_page(page_size=5)      # goes through _fetch_keyset_page
+    assert set(get_query_stats()) == {'car_rental_system.get_booking_details',
+                                      'car_rental_system.list_bookings_page'}
+
+
+def test_async_queries_are_attributed_too(db, customer, cars):
+    booking_id = _booking(db, customer, cars[0])
+    reset_query_stats()
+
+    async def details():
+        try:
+            return await async_data.get_booking_details(booking_id)
+        finally:
+            await async_data.close_pool()
+
+    assert asyncio.run(details())['booking_id'] == booking_id
+    assert list(get_query_stats()) == ['async_data.get_booking_details']
+
+
+def test_slow_queries_are_logged_once_with_redacted_params(db, customer, tmp_path, monkeypatch):
+    log_path = tmp_path / 'slow.log'
+    monkeypatch.setattr(instrumentation._slow_log, 'handlers', [])
+    monkeypatch.setitem(instrumentation.INSTRUMENTATION_CONFIG, 'slow_query_log', str(log_path))
+    monkeypatch.setitem(instrumentation.INSTRUMENTATION_CONFIG, 'slow_query_ms', 0)
+    try:
+        db.login_user('customer@example.com', 'wrong password')
+        db.login_user('customer@example.com', 'wrong password')
+    finally:
+        for handler in instrumentation._slow_log.handlers:
+            handler.close()
+
+    assert len(instrumentation._slow_log.handlers) == 1
+    lines = log_path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2
+    assert all('car_rental_system.login_user' in line and 'params=(<str>)' in line for line in lines)
+    assert 'customer@example.com' not in log_path.read_text(encoding='utf-8')
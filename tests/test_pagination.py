@@ -0,0 +1,72 @@
+"""Keyset pagination: tokens walk every row exactly once, newest first"""
+
+import pytest
+
+from .conftest import days_from_now
+
+
+def _book(db, customer, car_id, offset):
+    return db.create_booking(customer, car_id, days_from_now(offset), days_from_now(offset + 1),
+                             'Airport', 'Airport', 100, 'cash')
+
+
+@pytest.fixture
+def bookings(db, customer, cars):
+    """23 bookings; several share a creation time so booking_id breaks the tie"""
+    ids = [_book(db, customer, cars[i % len(cars)], i * 3) for i in range(23)]
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        for days_ago, booking_id in enumerate(ids[:8]):
+            cursor.execute("UPDATE bookings SET date_created = %s WHERE booking_id = %s",
+                           (f"{days_from_now(-10 - days_ago)} 09:00:00", booking_id))
+        conn.commit()
+    return ids
+
+
+def _newest_first(rows):
+    return [row['booking_id'] for row in
+            sorted(rows, key=lambda row: (row['date_created'], row['booking_id']), reverse=True)]
+
+
+def _walk(fetch, page_size):
+    pages = []
+    token = None
+    while True:
+        rows, token = fetch(page_size=page_size, page_token=token)
+        pages.append([row['booking_id'] for row in rows])
+        if token is None:
+            return pages
+
+
+def test_pages_cover_every_booking_once_in_order(db, bookings):
+    pages = _walk(db.list_bookings_page, 5)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == _newest_first(db.list_all_bookings())
+
+
+def test_no_empty_page_when_rows_divide_evenly(db, bookings):
+    pages = _walk(db.list_bookings_page, 23)
+    assert len(pages) == 1 and len(pages[0]) == 23
+
+
+def test_page_size_is_clamped(db, bookings):
+    rows, token = db.list_bookings_page(page_size=0)
+    assert len(rows) == 1 and token is not None
+
+
+def test_user_pages_only_list_that_user(db, bookings, cars):
+    other = db.register_user('Other Customer', 'other@example.com', 'secret123')
+    other_booking = _book(db, other, cars[0], 200)
+    pages = _walk(lambda **kwargs: db.list_user_bookings_page(other, **kwargs), 5)
+    assert pages == [[other_booking]]
+
+
+def test_token_from_another_listing_is_rejected(db, customer, bookings):
+    _, token = db.list_user_bookings_page(customer, page_size=5)
+    with pytest.raises(ValueError):
+        db.list_bookings_page(page_size=5, page_token=token)
+
+
+def test_garbage_token_is_rejected(db, bookings):
+    with pytest.raises(ValueError):
+        db.list_bookings_page(page_size=5, page_token='not-a-token')
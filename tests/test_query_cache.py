@@ -0,0 +1,85 @@
+"""QueryCache and the booking read-through cache: expiry, LRU and invalidation"""
+
+import query_cache
+from query_cache import QueryCache
+
+from .conftest import days_from_now
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_cache.time, 'monotonic', clock)
+    cache = QueryCache(ttl=10)
+    cache.put('key', 'value')
+    clock.now += 9.9
+    assert cache.get('key') == 'value'
+    clock.now += 0.1
+    assert cache.get('key') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['size'] == 2
+    assert stats['hits'] == 3 and stats['misses'] == 1 and stats['hit_rate'] == 0.75
+
+
+def test_get_or_load_fills_once_and_retries_failures():
+    cache = QueryCache()
+    calls = []
+
+    def load(value):
+        calls.append(value)
+        return value
+
+    assert cache.get_or_load('key', lambda: load(None)) is None
+    assert cache.get_or_load('key', lambda: load('value')) == 'value'
+    assert cache.get_or_load('key', lambda: load('other')) == 'value'
+    assert calls == [None, 'value']
+
+
+def test_a_load_racing_an_invalidation_is_not_cached():
+    cache = QueryCache()
+
+    def load():
+        # A writer changes the row after the loader has read it
+        cache.invalidate('key')
+        return 'before the write'
+
+    assert cache.get_or_load('key', load) == 'before the write'
+    assert cache.get_or_load('key', lambda: 'after the write') == 'after the write'
+
+
+def test_booking_reads_are_cached_until_a_write(db, customer, cars):
+    booking_id = db.create_booking(customer, cars[0], days_from_now(1), days_from_now(2),
+                                   'Airport', 'Airport', 100, 'cash')
+    assert db.get_booking_details(booking_id)['status'] == 'pending'
+    assert len(db.list_user_bookings(customer)) == 1
+    db.get_booking_details(booking_id)['status'] = 'changed by the caller'
+    assert db.get_booking_details(booking_id)['status'] == 'pending'
+    db.list_user_bookings(customer)
+    assert db.get_cache_stats()['hits'] == 3
+
+    # Each write drops exactly the entries it affects
+    db.update_booking_status(booking_id, 'approved')
+    assert db.get_booking_details(booking_id)['status'] == 'approved'
+    assert db.list_user_bookings(customer)[0]['status'] == 'approved'
+    db.record_payment(booking_id, 100)
+    assert db.get_booking_details(booking_id)['payment_status'] == 'paid'
+    db.create_booking(customer, cars[1], days_from_now(1), days_from_now(2), 'Airport', 'Airport', 100, 'cash')
+    assert len(db.list_user_bookings(customer)) == 2
+    assert db.get_cache_stats()['invalidations'] >= 4
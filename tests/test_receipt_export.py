@@ -0,0 +1,55 @@
+"""receipt_export: paid bookings' receipts rendered in worker processes"""
+
+import os
+import zipfile
+
+from receipt_export import export_receipts, main, receipt_filename
+from receipts import render_receipt_pdf
+
+from .conftest import days_from_now
+
+
+def _paid_bookings(db, customer, cars, count=5):
+    booking_ids = []
+    for n in range(count):
+        booking_id = db.create_booking(customer, cars[n % len(cars)], days_from_now(n * 4), days_from_now(n * 4 + 1),
+                                       'Airport', 'Airport', 100 + n, 'card')
+        booking_ids.append(booking_id)
+        if n % 2 == 0:
+            db.record_payment(booking_id, 100 + n)
+    return booking_ids[::2]
+
+
+def test_exports_one_pdf_per_paid_booking(db, customer, cars, tmp_path):
+    paid = _paid_bookings(db, customer, cars)
+    report = export_receipts(str(tmp_path / 'out'), workers=2, chunk_size=1)
+    assert report['exported'] == len(paid) and report['failed'] == 0
+    assert sorted(os.listdir(tmp_path / 'out')) == [f"receipt_{booking_id:08d}.pdf" for booking_id in paid]
+    details = db.get_booking_details(paid[0])
+    with open(tmp_path / 'out' / receipt_filename(details), 'rb') as f:
+        # Same bytes unless the receipt date rolled over mid-test
+        assert f.read() == render_receipt_pdf(details)
+
+
+def test_exports_to_a_zip_archive(db, customer, cars, tmp_path):
+    paid = _paid_bookings(db, customer, cars)
+    report = export_receipts(str(tmp_path / 'receipts.zip'), archive=True, workers=2)
+    with zipfile.ZipFile(tmp_path / 'receipts.zip') as archive:
+        names = archive.namelist()
+        assert all(archive.read(name).startswith(b'%PDF-') for name in names)
+        assert report['bytes'] == sum(info.file_size for info in archive.infolist())
+    assert len(names) == len(paid) == report['exported']
+
+
+def test_exports_a_date_range(db, customer, cars, tmp_path, capsys):
+    paid = _paid_bookings(db, customer, cars)
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        for booking_id, created in zip(paid, ('2024-01-05', '2024-02-05', '2024-03-05')):
+            cursor.execute("UPDATE bookings SET date_created = %s WHERE booking_id = %s",
+                           (created + ' 10:00:00', booking_id))
+        conn.commit()
+
+    assert main([str(tmp_path / 'out'), '--since', '2024-02-01', '--until', '2024-03-01', '--workers', '1']) == 0
+    assert os.listdir(tmp_path / 'out') == [f"receipt_{paid[1]:08d}.pdf"]
+    assert "Exported 1 receipts" in capsys.readouterr().out
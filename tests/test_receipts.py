@@ -0,0 +1,70 @@
+"""Receipts: compiled templates, the rendered cache and the PDF layout"""
+
+import re
+
+import pytest
+
+import receipts
+from query_cache import QueryCache
+from receipts import render_receipt, render_receipt_pdf, text_to_pdf
+
+from .conftest import days_from_now
+
+
+@pytest.fixture
+def details(db, customer, cars, monkeypatch):
+    monkeypatch.setattr(receipts, '_rendered', QueryCache(max_entries=500, ttl=3600))
+    booking_id = db.create_booking(customer, cars[0], days_from_now(1), days_from_now(3),
+                                   'Airport', 'Down <town> & Co', 135, 'card')
+    return db.get_booking_details(booking_id)
+
+
+def _pdf_objects(pdf):
+    """Check the xref table points at every object; returns the object offsets"""
+    xref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', pdf).group(1))
+    assert pdf[xref:xref + 5] == b'xref\n'
+    offsets = [int(offset) for offset in re.findall(rb'(\d{10}) 00000 n ', pdf[xref:])]
+    for number, offset in enumerate(offsets, 1):
+        assert pdf[offset:].startswith(b'%d 0 obj\n' % number)
+    return offsets
+
+
+def test_receipts_show_the_booking(details):
+    text = render_receipt(details, 'text')
+    assert f"#{details['booking_id']}" in text
+    assert 'Toyota Corolla' in text and 'ABC-001' in text
+    assert '3 day(s)' in text and '$45.00' in text and '$135.00' in text
+    assert 'Down <town> & Co' in text
+
+    page = render_receipt(details, 'html')
+    assert 'Down &lt;town&gt; &amp; Co' in page
+    assert '<span class="total">$135.00</span>' in page
+    assert '${' not in page and '${' not in text
+
+
+def test_rendered_receipts_are_cached_per_version(db, details):
+    first = render_receipt(details)
+    assert render_receipt(dict(details)) is first
+    assert receipts.get_render_cache_stats()['hits'] == 1
+
+    db.update_booking_status(details['booking_id'], 'approved')
+    changed = db.get_booking_details(details['booking_id'])
+    assert receipts.receipt_version(changed) != receipts.receipt_version(details)
+    assert 'approved' in render_receipt(changed) and render_receipt(changed) is not first
+
+
+def test_receipt_pdf_is_well_formed(details):
+    pdf = render_receipt_pdf(details)
+    assert pdf.startswith(b'%PDF-1.4\n')
+    assert len(_pdf_objects(pdf)) == 5
+    assert b'/Count 1' in pdf
+    assert b'Down <town> & Co' in pdf
+
+
+def test_long_text_flows_onto_more_pages():
+    per_page = (receipts.PDF_PAGE_SIZE[1] - 2 * receipts.PDF_MARGIN) // receipts.PDF_LEADING
+    pdf = text_to_pdf('\n'.join(f"line {n} (of many) \\ done" for n in range(per_page * 2 + 1)))
+    assert b'/Count 3' in pdf
+    assert len(_pdf_objects(pdf)) == 3 + 2 * 3
+    assert b'(line 0 \\(of many\\) \\\\ done)' in pdf
+    assert text_to_pdf('').count(b'/Type /Page ') == 1
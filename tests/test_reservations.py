@@ -0,0 +1,65 @@
+"""reserve_car: overlap checks and concurrent reservations of one car"""
+
+import threading
+
+from .conftest import days_from_now
+
+
+def _reserve(db, customer, car_id, start, end):
+    return db.reserve_car(customer, car_id, days_from_now(start), days_from_now(end),
+                          'Airport', 'Downtown', 150, 'card')
+
+
+def test_reservation_creates_pending_booking(db, customer, cars):
+    booking_id, reason = _reserve(db, customer, cars[0], 5, 7)
+    assert reason is None
+    booking = db.get_booking_details(booking_id)
+    assert booking['status'] == 'pending' and booking['car_id'] == cars[0]
+    assert not db.check_car_availability(cars[0], days_from_now(7), days_from_now(9))
+
+
+def test_overlapping_reservation_is_refused(db, customer, cars):
+    first, _ = _reserve(db, customer, cars[0], 5, 7)
+    for start, end in [(5, 7), (3, 5), (7, 10), (6, 6), (1, 20)]:
+        booking_id, reason = _reserve(db, customer, cars[0], start, end)
+        assert booking_id is None
+        assert reason.startswith("Car is already booked")
+    assert [b['booking_id'] for b in db.list_all_bookings()] == [first]
+
+
+def test_adjacent_dates_and_other_cars_are_free(db, customer, cars):
+    _reserve(db, customer, cars[0], 5, 7)
+    assert _reserve(db, customer, cars[0], 8, 9)[1] is None
+    assert _reserve(db, customer, cars[0], 2, 4)[1] is None
+    assert _reserve(db, customer, cars[1], 5, 7)[1] is None
+
+
+def test_rejected_booking_frees_its_dates(db, customer, cars):
+    first, _ = _reserve(db, customer, cars[0], 5, 7)
+    db.update_booking_status(first, 'rejected')
+    assert _reserve(db, customer, cars[0], 5, 7)[1] is None
+
+
+def test_unknown_car_and_maintenance_are_refused(db, customer, cars):
+    assert _reserve(db, customer, 9999, 5, 7) == (None, "Car not found")
+    db.update_car(cars[2], status='maintenance')
+    assert _reserve(db, customer, cars[2], 5, 7) == (None, "Car is under maintenance")
+
+
+def test_concurrent_reservations_book_the_car_once(db, customer, cars):
+    start = threading.Barrier(6)
+    results = []
+
+    def reserve():
+        start.wait()
+        results.append(_reserve(db, customer, cars[0], 5, 7))
+
+    threads = [threading.Thread(target=reserve) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    booked = [booking_id for booking_id, _ in results if booking_id]
+    assert len(results) == 6 and len(booked) == 1
+    assert [b['booking_id'] for b in db.list_all_bookings()] == booked
@@ -0,0 +1,96 @@
+"""Reporting rollups: incremental adjustments agree with rebuild_rollups"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from .conftest import days_from_now
+
+
+def _read_rollups(db):
+    """Rollup rows by table and key, leaving out rows that net to zero"""
+    rollups = {}
+    with db.db_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        for table, key in db.ROLLUP_KEYS.items():
+            cursor.execute(f"SELECT * FROM {table}")
+            rows = {}
+            for row in cursor.fetchall():
+                values = {name: db._as_money(value) if name == 'revenue' else value
+                          for name, value in row.items() if name not in key}
+                if any(values.values()):
+                    rows[tuple(db._as_date(row[name]) if name == 'day' else row[name]
+                               for name in key)] = values
+            rollups[table] = rows
+    return rollups
+
+
+def _reserve(db, customer, car_id, start, end):
+    booking_id, _ = db.reserve_car(customer, car_id, days_from_now(start), days_from_now(end),
+                                   'Airport', 'Airport', 150, 'card')
+    return booking_id
+
+
+def test_incremental_rollups_match_a_rebuild(db, customer, cars):
+    first = _reserve(db, customer, cars[0], -3, 2)     # started before today
+    second = _reserve(db, customer, cars[1], 1, 1)
+    third = _reserve(db, customer, cars[2], 4, 9)
+    fourth = _reserve(db, customer, cars[0], 10, 12)
+    fifth = db.create_booking(customer, cars[1], days_from_now(20), days_from_now(21),
+                              'Airport', 'Airport', 90, 'cash')
+
+    assert db.update_booking_status(first, 'approved')
+    assert len(db.update_booking_statuses([second, third, fifth], 'approved')) == 3
+    assert db.update_booking_status(second, 'completed')   # still a rental
+    assert db.update_booking_status(third, 'cancelled')   # no longer one
+    assert db.update_booking_status(fourth, 'rejected')   # never was one
+    assert db.record_payment(first, Decimal('250.00'))
+    assert db.record_payment(first, Decimal('0.50'))
+    assert db.record_payment(second, Decimal('45.25'))
+
+    incremental = _read_rollups(db)
+    assert not db.rollups_stale()
+    assert db.rebuild_rollups() > 0
+    assert incremental == _read_rollups(db)
+
+
+class _TomorrowDate(date):
+    """A date whose today() is a day ahead, like an application clock past midnight"""
+
+    @classmethod
+    def today(cls):
+        return date.today() + timedelta(days=1)
+
+
+def test_days_come_from_the_database_clock(db, customer, cars, monkeypatch):
+    monkeypatch.setattr(db, 'date', _TomorrowDate)
+    booking_id = _reserve(db, customer, cars[0], 1, 2)
+    assert db.record_payment(booking_id, Decimal('90.00'))
+
+    incremental = _read_rollups(db)
+    assert set(incremental['rollup_daily']) == {(date.today(), 'sedan')}
+    db.rebuild_rollups()
+    assert incremental == _read_rollups(db)
+
+
+def test_incremental_values(db, customer, cars):
+    booking_id = _reserve(db, customer, cars[2], 1, 3)
+    db.update_booking_status(booking_id, 'approved')
+    db.record_payment(booking_id, Decimal('240.00'))
+
+    rollups = _read_rollups(db)
+    assert rollups['rollup_car'] == {
+        (cars[2],): {'rentals': 1, 'rental_days': 3, 'payments': 1, 'revenue': Decimal('240.00')}}
+    daily = rollups['rollup_daily']
+    assert daily[(days_from_now(0), 'suv')]['bookings'] == 1
+    assert daily[(days_from_now(0), 'suv')]['revenue'] == Decimal('240.00')
+    assert daily[(days_from_now(1), 'suv')]['rentals'] == 1
+    assert daily[(days_from_now(1), 'suv')]['rental_days'] == 3
+    assert [daily[(days_from_now(day), 'suv')]['rented_car_days'] for day in (1, 2, 3)] == [1, 1, 1]
+    assert (days_from_now(4), 'suv') not in daily
+
+
+def test_rebuild_clears_the_stale_flag(db, customer, cars):
+    db._rollups['stale'] = True
+    assert db.rollups_stale()
+    assert db.rebuild_rollups() == 0
+    assert not db.rollups_stale()
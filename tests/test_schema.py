@@ -0,0 +1,85 @@
+"""Schema: migrations on a fresh or part-migrated database, and the query checker"""
+
+import pytest
+
+import schema
+
+from .conftest import days_from_now
+
+
+@pytest.fixture
+def empty_db(db, tmp_path, monkeypatch):
+    """Like db, but pointed at a database no migration has run on"""
+    db.close_pool()
+    monkeypatch.setitem(db.SQLITE_CONFIG, 'path', str(tmp_path / 'empty.db'))
+    monkeypatch.setattr(db, '_backend', None)
+    yield db
+    db.close_pool()
+
+
+def _schema_objects(db):
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%%'")
+        return set(cursor.fetchall())
+
+
+def test_migrations_build_a_fresh_database(empty_db, capsys):
+    assert schema.migrate() == [version for version, _, _ in schema.MIGRATIONS]
+    assert "Applied migration 7" in capsys.readouterr().out
+    objects = _schema_objects(empty_db)
+    for table in ('users', 'cars', 'bookings', 'payments', 'maintenance', 'dashboard_counters',
+                  'rollup_daily', 'rollup_car', 'cars_fts', 'users_fts'):
+        assert ('table', table) in objects
+    # SQLite's unique indexes come from the table constraints instead
+    for _table, name, _columns, unique in schema.INDEXES:
+        assert ('index', name) in objects or unique
+    # Migration 7 took migration 6's change sequence back out
+    assert not any('change' in name or 'seq' in name for _, name in objects)
+
+    assert schema.migrate() == []
+    assert schema.main(['status']) == 0
+    assert capsys.readouterr().out.count('applied') == len(schema.MIGRATIONS)
+
+
+def test_later_migrations_upgrade_a_database_in_use(empty_db, monkeypatch, capsys):
+    migrations = schema.MIGRATIONS
+    monkeypatch.setattr(schema, 'MIGRATIONS', migrations[:5])
+    assert schema.migrate() == [1, 2, 3, 4, 5]
+    customer = empty_db.register_user('Early Customer', 'early@example.com', 'secret123')
+    car_id = empty_db.add_car('OLD-001', 'Toyota', 'Corolla', 'sedan', 2019, 'white', 40.00)
+    booking_id, _ = empty_db.reserve_car(customer, car_id, days_from_now(1), days_from_now(2),
+                                         'Airport', 'Airport', 80, 'card')
+    version = empty_db.get_change_version('bookings')
+
+    monkeypatch.setattr(schema, 'MIGRATIONS', migrations)
+    assert schema.migrate() == [6, 7]
+    assert schema.main(['migrate']) == 0
+    assert "Schema is up to date" in capsys.readouterr().out
+    assert empty_db.get_booking_details(booking_id)['customer_id'] == customer
+    empty_db.update_booking_status(booking_id, 'approved')
+    changed, _ = empty_db.list_changes('bookings', version)
+    assert [row['booking_id'] for row in changed] == [booking_id]
+
+
+def test_application_queries_use_indexes(db):
+    problems = schema.check_queries()
+    assert problems and all(problem.startswith('listing') for _, _, _, problem, _ in problems)
+
+
+def test_checker_flags_filtered_scans(db, tmp_path, capsys):
+    module = tmp_path / 'queries.py'
+    module.write_text(
+        'BY_ID = "SELECT * FROM bookings WHERE booking_id = %s"\n'
+        'BY_COLOR = """\n    SELECT * FROM cars\n    WHERE color = %s\n"""\n'
+        'def by_plate(plate):\n'
+        '    return f"SELECT * FROM cars WHERE plate_no = \'{plate}\'"\n'
+        'NOT_SQL = "Please select a car from the list"\n'
+        'BROKEN = "SELECT * FROM no_such_table WHERE id = %s"\n')
+    assert [line for line, _ in schema.find_queries(str(module))] == [1, 2, 9]
+
+    problems = schema.check_queries([str(module)])
+    assert [(line, table, problem.split(' (')[0]) for _, line, table, problem, _ in problems] \
+        == [(2, 'cars', 'full scan'), (9, None, 'EXPLAIN failed: no such table: no_such_table')]
+    assert schema.main(['check', str(module)]) == 2
+    assert "2 scan(s) found, 2 on filtered queries" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+"""Admin table search: free text, filters and sort orders built into one query"""
+
+import pytest
+
+from car_rental_system import search_terms
+
+from .conftest import days_from_now
+
+
+def _plates(rows):
+    return [row['plate_no'] for row in rows]
+
+
+def test_search_terms():
+    assert search_terms(None) == []
+    assert search_terms("  Toyota, COROLLA-2022 ") == ['toyota', 'corolla', '2022']
+
+
+def test_unknown_names_are_refused(db):
+    for args in (('trucks',), ('cars', None, {'seats': 4}), ('cars', None, None, 'cheapest')):
+        with pytest.raises(ValueError):
+            db.build_search_query(*args)
+
+
+def test_empty_filters_are_ignored_and_the_first_sort_is_the_default(db):
+    sql, params = db.build_search_query('cars', '', {'status': '', 'type': None})
+    assert sql == "SELECT * FROM cars ORDER BY created_at DESC, car_id DESC" and params == []
+
+
+def test_mysql_full_text_skips_stopwords_and_short_words(db):
+    sql, params = db._fulltext_keys('cars', ['the', 'gt', 'corolla', 'whi'], sqlite=False)
+    assert sql == ("SELECT car_id FROM cars WHERE MATCH(plate_no, brand, model, color) "
+                   "AGAINST (%s IN BOOLEAN MODE) AND (plate_no LIKE %s OR brand LIKE %s "
+                   "OR model LIKE %s OR color LIKE %s)")
+    assert params == ['+corolla* +whi*', 'gt%', 'gt%', 'gt%', 'gt%']
+
+
+def test_cars_by_text_filters_and_sort(db, cars):
+    assert _plates(db.search_listing('cars', 'toy')) == ['ABC-001']
+    assert _plates(db.search_listing('cars', 'honda BLACK')) == ['ABC-002']
+    assert _plates(db.search_listing('cars', 'honda white')) == []
+    assert _plates(db.search_listing('cars', filters={'type': 'sedan'}, sort='rate_high')) == ['ABC-002', 'ABC-001']
+    assert _plates(db.search_listing('cars', sort='brand')) == ['ABC-003', 'ABC-002', 'ABC-001']
+    assert _plates(db.search_listing('cars', sort='rate_low', limit=1)) == ['ABC-001']
+
+    # The full-text index follows edits
+    db.update_car(cars[0], color='silver')
+    assert _plates(db.search_listing('cars', 'silver')) == ['ABC-001']
+    assert db.search_listing('cars', 'white') == []
+
+
+def test_users_by_name_email_and_role(db, customer):
+    db.register_user('Ada Staff', 'ada@rentals.example', 'secret123', role='staff')
+    assert [user['email'] for user in db.search_listing('users', 'ada')] == ['ada@rentals.example']
+    assert [user['user_id'] for user in db.search_listing('users', 'customer example')] == [customer]
+    assert [user['role'] for user in db.search_listing('users', filters={'role': 'staff'}, sort='name')] == ['staff']
+    assert 'password' not in db.search_listing('users')[0]
+
+
+def test_bookings_match_customer_car_or_id(db, customer, cars):
+    other = db.register_user('Bob Renter', 'bob@example.com', 'secret123')
+    first = db.create_booking(customer, cars[0], days_from_now(1), days_from_now(2), 'Airport', 'Airport', 90, 'card')
+    second = db.create_booking(other, cars[2], days_from_now(5), days_from_now(6), 'Airport', 'Airport', 160, 'card')
+    db.record_payment(second, 160)
+
+    def ids(text=None, filters=None, sort=None):
+        return [row['booking_id'] for row in db.search_listing('bookings', text, filters, sort)]
+
+    assert ids('bob') == [second]
+    # Each word may match either the customer or the car
+    assert ids('bob ford') == [second] and ids('bob toyota') == []
+    assert ids(str(first)) == [first]
+    assert ids(filters={'payment_status': 'paid'}) == [second]
+    assert ids(filters={'start_from': days_from_now(3)}) == [second]
+    assert ids(sort='start_date') == [first, second]
+    assert ids(sort='amount_high') == [second, first]
+
+
+def test_only_unfiltered_newest_first_streams_keep_a_version(db, cars):
+    stream = db.stream_search('cars')
+    assert stream.version is not None
+    stream.close()
+    for args in (('toyota',), (None, {'type': 'suv'}), (None, None, 'brand')):
+        stream = db.stream_search('cars', *args)
+        assert stream.version is None
+        stream.close()
+    stream = db.stream_search('cars', 'toyota')
+    assert _plates(stream.fetch(10)) == ['ABC-001']
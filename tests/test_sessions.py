@@ -0,0 +1,55 @@
+"""Login, session tokens and logout"""
+
+from auth import HASH_PREFIX, SessionStore
+
+from .conftest import PASSWORD
+
+
+def _stored_password(db, user_id):
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT password FROM users WHERE user_id = %s", (user_id,))
+        return cursor.fetchone()[0]
+
+
+def test_login_issues_a_session_token(db, customer):
+    user = db.login_user('customer@example.com', PASSWORD)
+    assert user['user_id'] == customer and 'password' not in user
+    assert db.get_session_user(user['session_token'])['user_id'] == customer
+    assert db.get_session_user(user['session_token'], roles=('admin', 'staff')) is None
+    assert db.get_session_user(None) is None
+
+
+def test_wrong_password_or_email_is_refused(db, customer):
+    assert db.login_user('customer@example.com', 'wrong') is None
+    assert db.login_user('nobody@example.com', PASSWORD) is None
+    assert _stored_password(db, customer).startswith(HASH_PREFIX)
+
+
+def test_logout_ends_every_session_of_the_user(db, customer):
+    other = db.register_user('Other Customer', 'other@example.com', PASSWORD)
+    laptop = db.login_user('customer@example.com', PASSWORD)['session_token']
+    phone = db.login_user('customer@example.com', PASSWORD)['session_token']
+    elsewhere = db.login_user('other@example.com', PASSWORD)['session_token']
+
+    db.logout_user(laptop)
+    assert db.get_session_user(laptop) is None
+    assert db.get_session_user(phone) is None
+    assert db.get_session_user(elsewhere)['user_id'] == other
+    db.logout_user(laptop)   # already ended
+
+
+def test_plaintext_password_is_upgraded_on_login(db, customer):
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE users SET password = %s WHERE user_id = %s", ('legacy-pass', customer))
+        conn.commit()
+    assert db.login_user('customer@example.com', 'legacy-pass')
+    assert _stored_password(db, customer).startswith(HASH_PREFIX)
+    assert db.login_user('customer@example.com', 'legacy-pass')
+
+
+def test_sessions_expire_after_inactivity():
+    store = SessionStore(ttl=0)
+    token = store.issue({'user_id': 1, 'role': 'admin'})
+    assert store.validate(token) is None
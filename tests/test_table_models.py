@@ -0,0 +1,146 @@
+"""RowTableModel: streamed listings and changes patched in place"""
+
+import pytest
+
+pytest.importorskip('PyQt6.QtCore')
+
+from PyQt6.QtCore import Qt
+
+from table_models import RowTableModel
+
+from .conftest import days_from_now
+
+COLUMNS = [('Plate', lambda row: row['plate_no']), ('Color', lambda row: row['color'])]
+
+
+def _age_cars(db):
+    """Backdate updated_at so only rows changed from here on are listed"""
+    with db.db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE cars SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', '-3600 seconds')")
+        conn.commit()
+
+
+def _cars_model(db, chunk_size=2):
+    model = RowTableModel(COLUMNS, chunk_size=chunk_size, key='car_id', order=db.CHANGE_ORDER['cars'])
+    model.set_stream(db.stream_search('cars', sort=db.CHANGES_SORT))
+    model.fetchMore()
+    return model
+
+
+def _fetch_all(model):
+    while model.canFetchMore():
+        model.fetchMore()
+    return [row['car_id'] for row in model.rows]
+
+
+@pytest.fixture
+def five_cars(db, cars):
+    return cars + [
+        db.add_car('ABC-004', 'Mazda', '3', 'sedan', 2022, 'red', 40.00),
+        db.add_car('ABC-005', 'Kia', 'Rio', 'sedan', 2020, 'grey', 35.00),
+    ]
+
+
+def test_streams_in_chunks(db, five_cars):
+    model = _cars_model(db)
+    assert model.rowCount() == 2
+    assert _fetch_all(model) == five_cars[::-1]
+
+
+def test_new_rows_go_on_top(db, five_cars):
+    _age_cars(db)
+    model = _cars_model(db)
+    new_car = db.add_car('ABC-006', 'Seat', 'Ibiza', 'sedan', 2021, 'white', 38.00)
+    db.update_car(five_cars[4], color='green')
+    model.apply_changes(db.list_changes('cars', model.version))
+    assert [row['car_id'] for row in model.rows] == [new_car, five_cars[4], five_cars[3]]
+    assert model.rows[1]['color'] == 'green'
+    assert _fetch_all(model) == [new_car] + five_cars[::-1]
+
+
+def test_rows_not_loaded_yet_arrive_through_the_stream(db, five_cars):
+    _age_cars(db)
+    model = _cars_model(db)
+    db.update_car(five_cars[1], color='green')
+    model.apply_changes(db.list_changes('cars', model.version))
+    # Not moved to the top: the row stays where the listing has it
+    assert [row['car_id'] for row in model.rows] == five_cars[:2:-1]
+    assert _fetch_all(model) == five_cars[::-1]
+    assert model.rows[3]['color'] == 'green'
+
+
+def test_rows_not_kept_are_dropped(db, five_cars):
+    _age_cars(db)
+    model = _cars_model(db)
+    db.update_car(five_cars[4], status='maintenance')
+    db.update_car(five_cars[1], status='maintenance')
+    model.apply_changes(db.list_changes('cars', model.version), keep=lambda row: row['status'] == 'available')
+    assert [row['car_id'] for row in model.rows] == [five_cars[3]]
+    assert _fetch_all(model) == [five_cars[3], five_cars[2], five_cars[0]]
+
+
+def test_changes_after_the_stream_ends(db, five_cars):
+    _age_cars(db)
+    model = _cars_model(db, chunk_size=10)
+    _fetch_all(model)
+    new_car = db.add_car('ABC-006', 'Seat', 'Ibiza', 'sedan', 2021, 'white', 38.00)
+    model.apply_changes(db.list_changes('cars', model.version))
+    assert [row['car_id'] for row in model.rows] == [new_car] + five_cars[::-1]
+
+
+def test_a_failed_chunk_is_reported_not_taken_as_the_end(db, five_cars):
+    model = _cars_model(db)
+    errors = []
+    model.load_failed.connect(errors.append)
+    model.stream.conn.close()   # as if the server dropped the stream
+    model.fetchMore()
+    assert len(errors) == 1
+    assert model.rowCount() == 2
+    assert not model.canFetchMore()
+    assert not model.is_complete()
+
+    model.set_stream(db.stream_search('cars', sort=db.CHANGES_SORT))
+    assert _fetch_all(model) == five_cars[::-1]
+    assert model.is_complete()
+
+
+def test_streams_read_the_same_rows_as_the_lists(db, customer, five_cars):
+    for start in range(3):
+        db.reserve_car(customer, five_cars[start], days_from_now(start * 5 + 1), days_from_now(start * 5 + 2),
+                       'Airport', 'Downtown', 150, 'card')
+    for listed, stream in [(db.list_cars, db.stream_cars), (db.list_users, db.stream_users),
+                           (db.list_all_bookings, db.stream_all_bookings),
+                           (db.list_bookable_cars, db.stream_bookable_cars),
+                           (lambda: db.list_user_bookings(customer), lambda: db.stream_user_bookings(customer))]:
+        model = RowTableModel(COLUMNS[:1], chunk_size=2)
+        model.set_stream(stream())
+        while model.canFetchMore():
+            model.fetchMore()
+        assert model.rows == listed()
+
+
+def test_a_stream_closes_itself_once_read(db, five_cars):
+    stream = db.stream_cars()
+    assert len(stream.fetch(3)) == 3 and not stream.exhausted
+    assert len(stream.fetch(3)) == 2 and stream.exhausted
+    assert stream.fetch(3) == []
+    # Closing early discards the rest without error
+    stream = db.stream_cars()
+    stream.fetch(1)
+    stream.close()
+    assert stream.exhausted and stream.fetch(1) == []
+
+
+def test_cells_and_headers(db, cars):
+    model = RowTableModel(COLUMNS + [('Seats', lambda row: None)])
+    model.set_rows(db.list_cars())
+    assert model.rowCount() == 3 and model.columnCount() == 3
+    assert model.headerData(0, Qt.Orientation.Horizontal) == 'Plate'
+    assert model.headerData(1, Qt.Orientation.Vertical) == '2'
+    assert model.data(model.index(0, 0)) == model.row_data(0)['plate_no']
+    assert model.data(model.index(0, 2)) == ''
+    assert model.data(model.index(0, 0), Qt.ItemDataRole.DecorationRole) is None
+    # set_rows(None) is a failed load: keep what is shown
+    model.set_rows(None)
+    assert model.rowCount() == 3 and not model.canFetchMore()
@@ -0,0 +1,103 @@
+"""Thumbnails: decoded to size off the GUI thread, cached on disk and in memory"""
+
+import os
+
+import pytest
+
+pytest.importorskip('PyQt6.QtGui')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtGui import QColor, QGuiApplication, QImage
+
+import thumbnails
+from thumbnails import ThumbnailCache, file_digest, image_thread_pool, load_thumbnail_image
+
+
+@pytest.fixture(scope='module')
+def gui_app():
+    # One application for every test: the image pool goes away with it
+    app = QCoreApplication.instance() or QGuiApplication([])
+    if not isinstance(app, QGuiApplication):
+        pytest.skip("a non-GUI Qt application is already running")
+    yield app
+    image_thread_pool().waitForDone()
+
+
+@pytest.fixture
+def app(gui_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, 'THUMBNAIL_DIR', str(tmp_path / 'thumbnails'))
+    return gui_app
+
+
+def _photo(path, width, height, color='red'):
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor(color))
+    assert image.save(str(path), 'PNG')
+    return str(path)
+
+
+def _wait(app):
+    image_thread_pool().waitForDone()
+    app.processEvents()
+
+
+def test_photos_are_scaled_down_and_cached_on_disk(app, tmp_path):
+    photo = _photo(tmp_path / 'car.png', 200, 100)
+    image = load_thumbnail_image(photo)
+    assert (image.width(), image.height()) == (64, 32)
+    cached = os.listdir(thumbnails.THUMBNAIL_DIR)
+    assert cached == [f"{file_digest(photo)}_64.png"]
+
+    # The next load is served from the disk cache, not decoded again
+    _photo(os.path.join(thumbnails.THUMBNAIL_DIR, cached[0]), 10, 10, 'blue')
+    assert load_thumbnail_image(photo).width() == 10
+    assert load_thumbnail_image(photo, size=32).width() == 32
+
+
+def test_digests_follow_file_changes(tmp_path):
+    photo = _photo(tmp_path / 'car.png', 20, 20)
+    first = file_digest(photo)
+    assert file_digest(photo) == first
+    _photo(tmp_path / 'car.png', 30, 20)
+    assert file_digest(photo) != first
+
+
+def test_unreadable_photos_raise(app, tmp_path):
+    broken = tmp_path / 'broken.jpg'
+    broken.write_bytes(b'not an image')
+    with pytest.raises(ValueError):
+        load_thumbnail_image(str(broken))
+
+
+def test_cache_loads_in_the_background(app, tmp_path):
+    first = _photo(tmp_path / 'first.png', 100, 100)
+    second = _photo(tmp_path / 'second.png', 100, 50, 'green')
+    cache = ThumbnailCache(max_entries=1)
+    ready = []
+    cache.thumbnail_ready.connect(ready.append)
+
+    assert cache.get(first) is None and cache.get(None) is None
+    _wait(app)
+    assert ready == [first]
+    assert cache.get(first).width() == 64
+
+    assert cache.get(second) is None
+    _wait(app)
+    assert cache.get(second).height() == 32
+    # Only one thumbnail fits, so the first is loaded again
+    assert cache.get(first) is None
+    _wait(app)
+    assert ready == [first, second, first]
+
+
+def test_failed_photos_are_not_retried(app, tmp_path):
+    cache = ThumbnailCache()
+    missing = str(tmp_path / 'missing.png')
+    assert cache.get(missing) is None
+    _wait(app)
+    assert cache.get(missing) is None
+    assert not cache.loader.is_loading(missing)
+    cache.clear()
+    assert cache.get(missing) is None and cache.loader.is_loading(missing)
+    _wait(app)
@@ -0,0 +1,106 @@
+"""DataLoader: background loads report back on the GUI thread, newest load wins"""
+
+import threading
+
+import pytest
+
+pytest.importorskip('PyQt6.QtCore')
+
+from PyQt6.QtCore import QCoreApplication, QThreadPool
+
+from workers import DataLoader
+
+
+@pytest.fixture
+def loader():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    loader = DataLoader(pool=pool)
+    loader.events = []
+    loader.loading_changed.connect(lambda key, loading: loader.events.append((key, loading)))
+
+    def wait():
+        pool.waitForDone()
+        app.processEvents()
+    loader.wait = wait
+    yield loader
+    pool.waitForDone()
+
+
+def test_results_arrive_through_callbacks(db, cars, loader):
+    results = []
+    loader.submit('cars', db.list_cars, on_result=results.append)
+    assert loader.is_loading('cars')
+    loader.wait()
+    assert sorted(car['car_id'] for car in results[0]) == sorted(cars)
+    assert not loader.is_loading('cars')
+    assert loader.events == [('cars', True), ('cars', False)]
+
+
+def test_failures_arrive_through_on_error(loader, capsys):
+    def fail():
+        raise RuntimeError("database went away")
+
+    errors = []
+    loader.submit('cars', fail, on_result=pytest.fail, on_error=errors.append)
+    loader.wait()
+    assert errors == ["database went away"]
+    assert "Background task 'cars' failed" in capsys.readouterr().out
+    assert not loader.is_loading('cars')
+
+
+def test_newer_loads_supersede_older_ones(loader):
+    release = threading.Event()
+    calls, results = [], []
+
+    def load(value, block=False):
+        calls.append(value)
+        if block:
+            release.wait(5)
+        return value
+
+    loader.submit('other', load, 'busy', block=True)
+    loader.submit('cars', load, 'old', on_result=results.append)
+    loader.submit('cars', load, 'new', on_result=results.append)
+    release.set()
+    loader.wait()
+    # The old load was skipped while it waited in the queue
+    assert calls == ['busy', 'new'] and results == ['new']
+    assert loader.events.count(('cars', True)) == 1
+    assert loader.events[-1] == ('cars', False)
+
+
+def test_superseded_results_are_dropped(loader):
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'old'
+
+    loader.submit('cars', slow, on_result=results.append)
+    assert started.wait(5)
+    loader.submit('cars', lambda: 'new', on_result=results.append)
+    release.set()
+    loader.wait()
+    assert results == ['new']
+
+
+def test_cancelled_loads_never_report(loader):
+    release = threading.Event()
+    calls, results = [], []
+
+    def load(value):
+        calls.append(value)
+        release.wait(5)
+        return value
+
+    loader.submit('first', load, 'first')
+    loader.submit('cars', load, 'cars', on_result=results.append)
+    loader.cancel('cars')
+    release.set()
+    loader.wait()
+    assert calls == ['first'] and results == []
+    assert ('cars', False) in loader.events and not loader.is_loading('cars')
@@ -0,0 +1,122 @@
+"""
+Car Rental System - Car photo thumbnails
+Photos are decoded and downscaled on a worker pool (QImageReader decodes
+straight to the target size), cached on disk by a hash of the file contents
+and kept in memory as an LRU of QPixmaps. Table cells ask for a thumbnail,
+get None while it loads, and are refreshed when thumbnail_ready fires.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from PyQt6.QtCore import QObject, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+from workers import DataLoader
+
+THUMBNAIL_SIZE = 64
+THUMBNAIL_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'car_rental', 'thumbnails')
+
+_digests = {}   # (path, mtime_ns, size) -> content hash
+_digests_lock = threading.Lock()
+_image_pool = None
+
+
+def image_thread_pool():
+    """Return the thread pool used for decoding images.
+
+    Kept apart from the query pool so a screen of photos never queues
+    behind (or in front of) database work.
+    """
+    global _image_pool
+    if _image_pool is None:
+        _image_pool = QThreadPool()
+        _image_pool.setMaxThreadCount(max(2, (os.cpu_count() or 2) // 2))
+    return _image_pool
+
+
+def file_digest(path):
+    """Hash a file's contents, remembering the result until the file changes"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        digest = _digests.get(key)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with _digests_lock:
+            _digests[key] = digest
+    return digest
+
+
+def load_thumbnail_image(path, size=THUMBNAIL_SIZE):
+    """Return a QImage thumbnail of the photo at path; safe to call off the GUI thread"""
+    cache_path = os.path.join(THUMBNAIL_DIR, f"{file_digest(path)}_{size}.png")
+    if os.path.exists(cache_path):
+        image = QImage(cache_path)
+        if not image.isNull():
+            return image
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    if original.isValid():
+        reader.setScaledSize(original.scaled(QSize(size, size), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Cannot decode {path}: {reader.errorString()}")
+
+    # Write to a temporary name first so a concurrent reader never sees a partial file
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+    if image.save(temp_path, 'PNG'):
+        os.replace(temp_path, cache_path)
+    return image
+
+
+class ThumbnailCache(QObject):
+    """In-memory LRU of thumbnail QPixmaps, filled in the background"""
+    thumbnail_ready = pyqtSignal(str)   # image path
+
+    def __init__(self, size=THUMBNAIL_SIZE, max_entries=500, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.max_entries = max_entries
+        self.loader = DataLoader(self, pool=image_thread_pool())
+        self._pixmaps = OrderedDict()
+        self._failed = set()
+
+    def get(self, path):
+        """Return the thumbnail for path, or None while it is loading (or unavailable)"""
+        if not path:
+            return None
+        pixmap = self._pixmaps.get(path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(path)
+            return pixmap
+        if path not in self._failed and not self.loader.is_loading(path):
+            self.loader.submit(path, load_thumbnail_image, path, self.size,
+                               on_result=partial(self._on_loaded, path),
+                               on_error=partial(self._on_failed, path))
+        return None
+
+    def _on_loaded(self, path, image):
+        # QPixmaps may only be created on the GUI thread, so convert here
+        self._pixmaps[path] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.max_entries:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(path)
+
+    def _on_failed(self, path, message):
+        # Missing or broken photos are not retried on every repaint
+        self._failed.add(path)
+
+    def clear(self):
+        self._pixmaps.clear()
+        self._failed.clear()
@@ -0,0 +1,115 @@
+"""
+Car Rental System - Background query execution
+Runs blocking database calls on a QThreadPool and delivers the results
+back to the GUI thread through signals.
+"""
+
+import itertools
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from car_rental_system import POOL_CONFIG
+
+_query_pool = None
+
+
+def query_thread_pool():
+    """Return the shared thread pool used for database work"""
+    global _query_pool
+    if _query_pool is None:
+        _query_pool = QThreadPool()
+        # More threads than pooled connections would only queue on the pool
+        _query_pool.setMaxThreadCount(POOL_CONFIG['size'])
+    return _query_pool
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a QueryWorker"""
+    finished = pyqtSignal(str, int, object)   # key, ticket, result
+    failed = pyqtSignal(str, int, str)        # key, ticket, error message
+
+
+class QueryWorker(QRunnable):
+    """Runs a single blocking callable on the thread pool"""
+
+    def __init__(self, key, ticket, fn, args, kwargs, is_current):
+        super().__init__()
+        self.key = key
+        self.ticket = ticket
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.is_current = is_current
+        self.signals = WorkerSignals()
+
+    def run(self):
+        # Skip loads that were superseded while waiting in the queue
+        if not self.is_current(self.key, self.ticket):
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"Background task '{self.key}' failed: {e}")
+            self.signals.failed.emit(self.key, self.ticket, str(e))
+        else:
+            self.signals.finished.emit(self.key, self.ticket, result)
+
+
+class DataLoader(QObject):
+    """Submits keyed background loads; a new load for a key supersedes the old one"""
+    loading_changed = pyqtSignal(str, bool)   # key, in flight
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or query_thread_pool()
+        self._tickets = {}
+        self._callbacks = {}
+        self._counter = itertools.count(1)
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, **kwargs):
+        """Run fn(*args, **kwargs) in the background and call on_result with its value"""
+        ticket = next(self._counter)
+        was_loading = key in self._tickets
+        self._tickets[key] = ticket
+        self._callbacks[key] = (on_result, on_error)
+
+        worker = QueryWorker(key, ticket, fn, args, kwargs, self.is_current)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        if not was_loading:
+            self.loading_changed.emit(key, True)
+        self.pool.start(worker)
+        return ticket
+
+    def cancel(self, key):
+        """Drop the in-flight load for key; its result will be ignored"""
+        if self._tickets.pop(key, None) is not None:
+            self._callbacks.pop(key, None)
+            self.loading_changed.emit(key, False)
+
+    def is_current(self, key, ticket):
+        return self._tickets.get(key) == ticket
+
+    def is_loading(self, key):
+        return key in self._tickets
+
+    def _complete(self, key, ticket):
+        """Return the callbacks for a finished load, or None if it was superseded"""
+        if not self.is_current(key, ticket):
+            return None
+        del self._tickets[key]
+        callbacks = self._callbacks.pop(key)
+        self.loading_changed.emit(key, False)
+        return callbacks
+
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, key, ticket, result):
+        callbacks = self._complete(key, ticket)
+        if callbacks and callbacks[0]:
+            callbacks[0](result)
+
+    @pyqtSlot(str, int, str)
+    def _on_failed(self, key, ticket, message):
+        callbacks = self._complete(key, ticket)
+        if callbacks and callbacks[1]:
+            callbacks[1](message)